@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: MIT
+"""Expiry-ordered index of the recommendations that are still valid"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from collections.abc import Iterable
+from datetime import date, datetime
+from typing import Optional
+
+from src.main.app.config import get_cache_config
+from src.main.app.schema.stock_daily_recommendation_schema import ActiveRecommendation
+
+
+def today() -> datetime:
+    """Start of the current day, the cut-off below which a recommendation is expired."""
+    return datetime.combine(date.today(), datetime.min.time())
+
+
+class ActiveRecommendationIndex:
+    """
+    In-memory set of the recommendations whose expiry_date is not in the past.
+
+    Recommendations are grouped per stock in heaps ordered by expiry_date, so
+    that expired calls are popped from the top of the heap as days pass and a
+    lookup only touches the active calls of a stock. Updated or deleted
+    recommendations leave stale heap entries behind; they are skipped and
+    compacted away on the next read of the stock.
+
+    The index is a complete view of the active set once loaded, and is
+    reloaded after ``reload_seconds`` to pick up writes made by other workers.
+    """
+
+    def __init__(self, reload_seconds: int):
+        """
+        Args:
+            reload_seconds: Age after which the index must be reloaded from the database.
+        """
+        self.reload_seconds = reload_seconds
+        self._records: dict[int, ActiveRecommendation] = {}
+        self._heaps: dict[str, list[tuple[datetime, int]]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def is_fresh(self) -> bool:
+        """Whether the index is loaded and younger than ``reload_seconds``."""
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.reload_seconds
+        )
+
+    def load(self, records: Iterable[ActiveRecommendation]) -> None:
+        """Replace the content of the index with a snapshot of the active set."""
+        self._records.clear()
+        self._heaps.clear()
+        cut_off = today()
+        for record in records:
+            self._add(record, cut_off)
+        self._loaded_at = time.monotonic()
+
+    def put(self, records: Iterable[ActiveRecommendation]) -> None:
+        """Add or replace recommendations, dropping those that are no longer active."""
+        cut_off = today()
+        for record in records:
+            self._add(record, cut_off)
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """Drop recommendations by id."""
+        for id in ids:
+            self._records.pop(id, None)
+
+    def active_for(self, stock_symbol_full: str) -> list[ActiveRecommendation]:
+        """Active recommendations of a stock, soonest expiring first."""
+        return self._collect(stock_symbol_full, today())
+
+    def active_all(self) -> list[ActiveRecommendation]:
+        """All active recommendations, grouped by stock and soonest expiring first."""
+        cut_off = today()
+        records: list[ActiveRecommendation] = []
+        for stock_symbol_full in list(self._heaps):
+            records.extend(self._collect(stock_symbol_full, cut_off))
+        return records
+
+    def _add(self, record: ActiveRecommendation, cut_off: datetime) -> None:
+        if (
+            record.stock_symbol_full is None
+            or record.expiry_date is None
+            or record.expiry_date < cut_off
+        ):
+            self._records.pop(record.id, None)
+            return
+        previous = self._records.get(record.id)
+        self._records[record.id] = record
+        if (
+            previous is not None
+            and previous.expiry_date == record.expiry_date
+            and previous.stock_symbol_full == record.stock_symbol_full
+        ):
+            # The existing heap entry still points at the right place
+            return
+        heapq.heappush(
+            self._heaps.setdefault(record.stock_symbol_full, []),
+            (record.expiry_date, record.id),
+        )
+
+    def _is_current(self, entry: tuple[datetime, int], stock_symbol_full: str) -> bool:
+        record = self._records.get(entry[1])
+        return (
+            record is not None
+            and record.expiry_date == entry[0]
+            and record.stock_symbol_full == stock_symbol_full
+        )
+
+    def _collect(self, stock_symbol_full: str, cut_off: datetime) -> list[ActiveRecommendation]:
+        heap = self._heaps.get(stock_symbol_full)
+        if heap is None:
+            return []
+        while heap and (heap[0][0] < cut_off or not self._is_current(heap[0], stock_symbol_full)):
+            entry = heapq.heappop(heap)
+            if self._is_current(entry, stock_symbol_full):
+                # Expired: it leaves the active set for good
+                del self._records[entry[1]]
+        live = sorted(entry for entry in heap if self._is_current(entry, stock_symbol_full))
+        if not live:
+            del self._heaps[stock_symbol_full]
+            return []
+        if len(live) < len(heap):
+            # A sorted list is a valid heap, reuse it to drop stale entries
+            self._heaps[stock_symbol_full] = live
+        return [self._records[id] for _, id in live]
+
+
+activeRecommendationIndex = ActiveRecommendationIndex(
+    reload_seconds=get_cache_config().active_recommendation_reload_seconds
+)
@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: MIT
+"""Per-user cache of resolved roles, permissions and visible menus"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from typing import Optional
+
+from fastlib import ConfigManager
+from loguru import logger
+
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_cache_config
+from src.main.app.schema.auth_schema import ResolvedAuthorization
+
+_REDIS_KEY_PREFIX = "zeta:auth:user:"
+_REDIS_VERSION_KEY = "zeta:auth:version"
+
+
+class AuthorizationCache:
+    """
+    Cache answering "what may this user see and do" without hitting the database.
+
+    Entries are stamped with the cache version current when their resolution
+    started. Every invalidation bumps the version, and an entry whose stamp is
+    older than the latest invalidation is refused on ``put``: a resolution that
+    raced with a role or menu write can never be cached. Entries expire after
+    ``ttl_seconds``, which also bounds how long a write that is not routed
+    through the services stays invisible. When ``shared`` is enabled the
+    entries and the version live in Redis so that all workers see the same data.
+    """
+
+    def __init__(self, max_users: int, ttl_seconds: int, shared: bool = False):
+        """
+        Args:
+            max_users: Number of users kept before LRU eviction.
+            ttl_seconds: Lifetime of an entry.
+            shared: Store entries in Redis instead of process memory.
+        """
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be a positive integer")
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._version = 0
+        self._entries: LRUCache[int, tuple[float, ResolvedAuthorization]] = LRUCache(
+            max_size=max_users
+        )
+
+    async def version(self) -> int:
+        """Current version, to be stamped on an entry before resolving it."""
+        if self.shared:
+            client = await self._redis()
+            return int(await client.get(_REDIS_VERSION_KEY) or 0)
+        return self._version
+
+    async def get(self, user_id: int) -> Optional[ResolvedAuthorization]:
+        """Return the resolved authorization of a user, or None on a cache miss."""
+        if self.shared:
+            client = await self._redis()
+            cached = await client.get(_REDIS_KEY_PREFIX + str(user_id))
+            if cached is None:
+                return None
+            if isinstance(cached, dict):
+                return ResolvedAuthorization.model_validate(cached)
+            return ResolvedAuthorization.model_validate_json(cached)
+        cached = self._entries.get(user_id)
+        if cached is None:
+            return None
+        expires_at, authorization = cached
+        if time.monotonic() >= expires_at:
+            self._entries.pop(user_id)
+            return None
+        return authorization
+
+    async def put(self, authorization: ResolvedAuthorization) -> bool:
+        """
+        Store a resolved authorization unless an invalidation happened since
+        its version was read. Returns whether the entry was stored.
+        """
+        if self.shared:
+            return await self._redis_put(authorization)
+        if authorization.version != self._version:
+            return False
+        self._entries.put(
+            authorization.user_id, (time.monotonic() + self.ttl_seconds, authorization)
+        )
+        return True
+
+    async def invalidate(self, user_ids: Iterable[Optional[int]]) -> None:
+        """Drop the entries of the given users and bump the version."""
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return
+        if self.shared:
+            client = await self._redis()
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.incr(_REDIS_VERSION_KEY)
+                pipe.delete(*[_REDIS_KEY_PREFIX + str(user_id) for user_id in user_ids])
+                await pipe.execute()
+            return
+        self._version += 1
+        for user_id in user_ids:
+            self._entries.pop(user_id)
+
+    async def clear(self) -> None:
+        """Drop every entry and bump the version."""
+        if self.shared:
+            client = await self._redis()
+            keys = [key async for key in client.scan_iter(match=_REDIS_KEY_PREFIX + "*")]
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.incr(_REDIS_VERSION_KEY)
+                if keys:
+                    pipe.delete(*keys)
+                await pipe.execute()
+            return
+        self._version += 1
+        self._entries.clear()
+
+    @staticmethod
+    async def _redis():
+        from fastlib.cache._redis_cache import RedisCacheManager
+
+        return await RedisCacheManager.get_instance()
+
+    async def _redis_put(self, authorization: ResolvedAuthorization) -> bool:
+        from redis.exceptions import WatchError
+
+        client = await self._redis()
+        key = _REDIS_KEY_PREFIX + str(authorization.user_id)
+        async with client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(_REDIS_VERSION_KEY)
+                if int(await pipe.get(_REDIS_VERSION_KEY) or 0) != authorization.version:
+                    return False
+                pipe.multi()
+                pipe.set(key, authorization.model_dump_json(), ex=self.ttl_seconds)
+                await pipe.execute()
+            except WatchError:
+                # Invalidated while storing, the entry may already be stale
+                return False
+        return True
+
+
+def _create_authorization_cache() -> AuthorizationCache:
+    cache_config = get_cache_config()
+    database_config = ConfigManager.get_database_config()
+    if database_config.enable_redis:
+        logger.info("Authorization cache is shared through redis")
+    return AuthorizationCache(
+        max_users=cache_config.authorization_max_users,
+        ttl_seconds=cache_config.authorization_ttl_seconds,
+        shared=database_config.enable_redis,
+    )
+
+
+authorizationCache = _create_authorization_cache()
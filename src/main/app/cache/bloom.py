@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: MIT
+"""Fixed-size Bloom filter for set membership with false positives only"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Probabilistic set of strings: ``might_contain`` never answers False for an
+    added item, and answers True for an absent one with probability close to
+    ``error_rate`` as long as at most ``capacity`` items were added.
+
+    Items cannot be removed; rebuild the filter to drop them. Not thread-safe:
+    it is meant to be used from a single event loop.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity: Number of items the filter is sized for, must be positive.
+            error_rate: Target false positive rate at capacity, in (0, 1).
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be a positive integer")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        # Double hashing: h1 + i * h2 simulates hash_count independent hashes
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def might_contain(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def __len__(self) -> int:
+        """Number of add calls, duplicates included."""
+        return self._count
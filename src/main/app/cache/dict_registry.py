@@ -0,0 +1,205 @@
+# SPDX-License-Identifier: MIT
+"""Dictionary types and their ordered options held in memory"""
+
+from __future__ import annotations
+
+import functools
+import json
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from src.main.app.config import get_cache_config
+from src.main.app.utils import etag_util
+
+_Options = Iterable[tuple[Optional[str], Optional[str], Optional[str]]]
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@functools.cache
+def dict_fields(schema: type[BaseModel]) -> dict[str, str]:
+    """
+    Dictionary-backed fields of a schema and their dictionary type, declared
+    as ``Field(json_schema_extra={"dict_type": ...})``.
+    """
+    fields: dict[str, str] = {}
+    for name, field in schema.model_fields.items():
+        extra = field.json_schema_extra
+        if isinstance(extra, dict) and extra.get("dict_type"):
+            fields[name] = extra["dict_type"]
+    return fields
+
+
+class DictRegistry:
+    """
+    Map of every dictionary type to its options, in sort order.
+
+    The registry is loaded in full once. Writes through the dict services mark
+    the types they touch as stale, stamped with the registry version, and only
+    those types are read again on the next request; a stale mark is cleared by
+    a read that started after it was set. Every type is kept as its encoded
+    JSON member, so a response body is a concatenation of the requested types,
+    and as a value to label map used to enrich list responses. The registry
+    is loaded again after ``reload_seconds`` to pick up writes made by other
+    workers. ETags are derived from the body, so they stay consistent across
+    workers.
+    """
+
+    def __init__(self, reload_seconds: int):
+        """
+        Args:
+            reload_seconds: Age after which the registry must be loaded again.
+        """
+        self.reload_seconds = reload_seconds
+        self.version = 0
+        # type -> encoded '"type":[{"label":..,"value":..},..]' member
+        self._members: dict[str, bytes] = {}
+        # type -> {value: label}
+        self._labels: dict[str, dict[str, Optional[str]]] = {}
+        # type -> version at which it was marked stale
+        self._stale: dict[str, int] = {}
+        self._all: Optional[tuple[str, bytes]] = None
+        self._loaded_at: Optional[float] = None
+
+    def is_fresh(self) -> bool:
+        """Whether the registry is loaded and younger than ``reload_seconds``."""
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.reload_seconds
+        )
+
+    def stale_types(self) -> list[str]:
+        """Types written since they were last read."""
+        return list(self._stale)
+
+    def load(self, version: int, types: Iterable[str], options: _Options) -> None:
+        """
+        Replace the registry by a snapshot read at ``version``.
+
+        Args:
+            version: Registry version read before the snapshot.
+            types: Every dictionary type, including the ones without options.
+            options: (type, label, value) rows ordered by type then sort.
+        """
+        grouped = self._group(types, options)
+        self._members = {
+            dict_type: self._encode_member(dict_type, items) for dict_type, items in grouped
+        }
+        self._labels = {dict_type: self._label_map(items) for dict_type, items in grouped}
+        self._clear_stale(version, list(self._stale))
+        self._all = None
+        self._loaded_at = time.monotonic()
+
+    def reload(
+        self,
+        version: int,
+        reloaded_types: Sequence[str],
+        types: Iterable[str],
+        options: _Options,
+    ) -> None:
+        """
+        Replace the given types by a snapshot read at ``version``, the types
+        found neither in ``types`` nor in ``options`` are dropped.
+        """
+        grouped = dict(self._group(types, options))
+        for dict_type in reloaded_types:
+            items = grouped.get(dict_type)
+            if items is None:
+                self._members.pop(dict_type, None)
+                self._labels.pop(dict_type, None)
+            else:
+                self._members[dict_type] = self._encode_member(dict_type, items)
+                self._labels[dict_type] = self._label_map(items)
+        self._clear_stale(version, reloaded_types)
+        self._all = None
+
+    def invalidate(self, types: Iterable[Optional[str]]) -> None:
+        """Bump the version and mark the given types stale."""
+        types = {dict_type for dict_type in types if dict_type is not None}
+        if not types:
+            return
+        self.version += 1
+        for dict_type in types:
+            self._stale[dict_type] = self.version
+
+    def render(self, types: Optional[Sequence[str]] = None) -> tuple[str, bytes]:
+        """
+        ETag and JSON body of the options of the given types, of every type
+        when ``types`` is None. Unknown types are left out.
+        """
+        if types is None:
+            if self._all is None:
+                self._all = self._render(sorted(self._members))
+            return self._all
+        return self._render(list(dict.fromkeys(types)))
+
+    def resolve_labels(
+        self, records: Iterable[Any], fields: Mapping[str, str]
+    ) -> dict[str, dict[str, Optional[str]]]:
+        """
+        Labels of the values the given fields take in a page of records.
+
+        Args:
+            records: Records of the page, fields are read as attributes.
+            fields: Field name -> dictionary type of the field.
+
+        Returns:
+            Field name -> {value: label}, values are compared as strings and
+            the ones without a label are left out.
+        """
+        records = list(records)
+        resolved: dict[str, dict[str, Optional[str]]] = {}
+        for field, dict_type in fields.items():
+            options = self._labels.get(dict_type, {})
+            labels: dict[str, Optional[str]] = {}
+            for record in records:
+                value = getattr(record, field, None)
+                if value is None:
+                    continue
+                value = str(value)
+                if value not in labels and value in options:
+                    labels[value] = options[value]
+            resolved[field] = labels
+        return resolved
+
+    def _render(self, types: list[str]) -> tuple[str, bytes]:
+        members = [self._members[dict_type] for dict_type in types if dict_type in self._members]
+        content = b'{"options":{' + b",".join(members) + b"}}"
+        return etag_util.compute_etag(content), content
+
+    def _clear_stale(self, version: int, types: Iterable[str]) -> None:
+        for dict_type in types:
+            if self._stale.get(dict_type, version + 1) <= version:
+                del self._stale[dict_type]
+
+    @staticmethod
+    def _group(
+        types: Iterable[str], options: _Options
+    ) -> list[tuple[str, list[dict[str, Optional[str]]]]]:
+        grouped: dict[str, list[dict[str, Optional[str]]]] = {
+            dict_type: [] for dict_type in types if dict_type is not None
+        }
+        for dict_type, label, value in options:
+            if dict_type is not None:
+                grouped.setdefault(dict_type, []).append({"label": label, "value": value})
+        return list(grouped.items())
+
+    @staticmethod
+    def _encode_member(dict_type: str, items: list[dict[str, Optional[str]]]) -> bytes:
+        return _encode(dict_type) + b":" + _encode(items)
+
+    @staticmethod
+    def _label_map(items: list[dict[str, Optional[str]]]) -> dict[str, Optional[str]]:
+        labels: dict[str, Optional[str]] = {}
+        for item in items:
+            if item["value"] is not None:
+                labels.setdefault(item["value"], item["label"])
+        return labels
+
+
+dictRegistry = DictRegistry(reload_seconds=get_cache_config().dict_registry_reload_seconds)
@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: MIT
+"""Read-through cache of the rows mappers look up by a unique field"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from fastlib import ConfigManager
+from loguru import logger
+from pydantic_core import from_json, to_json
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_cache_config
+
+_REDIS_KEY_PREFIX = "zeta:entity:"
+# Cached tables written by the transaction of a pooled connection
+_WRITTEN_TABLES = "zeta_entity_written_tables"
+
+
+class _CachedTable:
+    """Rows of one table cached in process, keyed by (field, value)."""
+
+    __slots__ = ("generation", "entries", "hits", "shared_hits", "misses", "invalidations")
+
+    def __init__(self, max_size: int):
+        # Bumped by every invalidation, a fill that raced with one is refused
+        self.generation = 0
+        self.entries: LRUCache[tuple[str, Any], tuple[float, dict[str, Any]]] = LRUCache(
+            max_size=max_size
+        )
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict[str, float]:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "sharedHits": self.shared_hits,
+            "misses": self.misses,
+            "hitRatio": round((self.hits + self.shared_hits) / (lookups or 1), 4),
+            "invalidations": self.invalidations,
+            "size": len(self.entries),
+        }
+
+
+class EntityCache:
+    """
+    Cache of the rows a mapper looks up by a unique field, such as a stock by
+    its code or a user by its name, kept as their column values.
+
+    A row is cached after a lookup found it, stamped with the generation of
+    its table read before the lookup. An INSERT, UPDATE or DELETE on a cached
+    table, whether run by a mapper method, a flush of the ORM or a Core
+    statement, bumps the generation and drops the rows of that table, once
+    when it is executed and again when its transaction ends: a fill that
+    raced with the write is refused, and a row read before the write was
+    committed is not kept. When ``shared`` is enabled the rows are cached in
+    Redis as well, under the generation of their table, so that workers
+    share their fills and never read there a row another worker invalidated;
+    the rows cached in process may outlive a write of another worker by up
+    to ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: int,
+        shared_ttl_seconds: int,
+        shared: bool = False,
+    ):
+        """
+        Args:
+            max_size: Number of rows of a table kept in process before LRU eviction.
+            ttl_seconds: Lifetime of a row cached in process.
+            shared_ttl_seconds: Lifetime of a row cached in Redis.
+            shared: Also cache the rows in Redis.
+        """
+        if ttl_seconds <= 0 or shared_ttl_seconds <= 0:
+            raise ValueError("ttl_seconds and shared_ttl_seconds must be positive integers")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self.shared = shared
+        self._tables: dict[str, _CachedTable] = {}
+
+    def register(self, table: str) -> None:
+        """Cache the rows of a table, invalidated by the writes to it from now on."""
+        if table not in self._tables:
+            self._tables[table] = _CachedTable(self.max_size)
+
+    def is_cached(self, table: str) -> bool:
+        return table in self._tables
+
+    async def get(
+        self, table: str, field: str, value: Any
+    ) -> tuple[Optional[dict[str, Any]], tuple[int, Optional[int]]]:
+        """
+        Return the column values of the row of ``table`` whose ``field`` is
+        ``value``, or None on a cache miss, and the generations to stamp on
+        the values loaded on a miss.
+        """
+        cached_table = self._tables[table]
+        key = (field, value)
+        cached = cached_table.entries.get(key)
+        if cached is not None:
+            expires_at, values = cached
+            if time.monotonic() < expires_at:
+                cached_table.hits += 1
+                return values, (cached_table.generation, None)
+            cached_table.entries.pop(key)
+        generation = cached_table.generation
+        shared_generation = None
+        if self.shared:
+            try:
+                client = await self._redis()
+                shared_generation = int(await client.get(self._generation_key(table)) or 0)
+                cached = await client.get(self._key(table, shared_generation, field, value))
+            except Exception as e:
+                logger.warning(f"Entity cache of {table} could not read from redis: {e}")
+                shared_generation = cached = None
+            if cached is not None:
+                values = cached if isinstance(cached, dict) else from_json(cached)
+                cached_table.shared_hits += 1
+                self._put_local(cached_table, key, values, generation)
+                return values, (generation, shared_generation)
+        cached_table.misses += 1
+        return None, (generation, shared_generation)
+
+    async def put(
+        self,
+        table: str,
+        field: str,
+        value: Any,
+        values: dict[str, Any],
+        generations: tuple[int, Optional[int]],
+    ) -> None:
+        """Cache the values of a row loaded after ``get`` missed, unless invalidated since."""
+        cached_table = self._tables[table]
+        generation, shared_generation = generations
+        self._put_local(cached_table, (field, value), values, generation)
+        if shared_generation is None:
+            return
+        # Stored under the generation read before the load: if the table was
+        # written since, the row is never read again
+        try:
+            client = await self._redis()
+            await client.set(
+                self._key(table, shared_generation, field, value),
+                to_json(values).decode(),
+                ex=self.shared_ttl_seconds,
+            )
+        except Exception as e:
+            logger.warning(f"Entity cache of {table} could not write to redis: {e}")
+
+    def invalidate(self, table: str) -> None:
+        """Drop the cached rows of a table and bump its generation."""
+        cached_table = self._tables.get(table)
+        if cached_table is None:
+            return
+        cached_table.generation += 1
+        cached_table.invalidations += 1
+        cached_table.entries.clear()
+        # Writes run in the greenlet of an async session; a write of a sync
+        # engine only invalidates the rows cached in process
+        if self.shared and in_greenlet():
+            try:
+                await_only(self._bump_shared_generation(table))
+            except Exception as e:
+                logger.warning(f"Entity cache of {table} could not be invalidated in redis: {e}")
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Lookup counters and size of the cache of each table, since startup."""
+        return {table: cached_table.as_dict() for table, cached_table in self._tables.items()}
+
+    def _put_local(
+        self,
+        cached_table: _CachedTable,
+        key: tuple[str, Any],
+        values: dict[str, Any],
+        generation: int,
+    ) -> None:
+        if cached_table.generation == generation:
+            cached_table.entries.put(key, (time.monotonic() + self.ttl_seconds, values))
+
+    @staticmethod
+    def _generation_key(table: str) -> str:
+        return f"{_REDIS_KEY_PREFIX}{table}:generation"
+
+    @staticmethod
+    def _key(table: str, generation: int, field: str, value: Any) -> str:
+        return f"{_REDIS_KEY_PREFIX}{table}:{generation}:{field}:{value}"
+
+    @staticmethod
+    async def _redis():
+        from fastlib.cache._redis_cache import RedisCacheManager
+
+        return await RedisCacheManager.get_instance()
+
+    async def _bump_shared_generation(self, table: str) -> None:
+        client = await self._redis()
+        await client.incr(self._generation_key(table))
+
+
+def _create_entity_cache() -> EntityCache:
+    cache_config = get_cache_config()
+    database_config = ConfigManager.get_database_config()
+    if database_config.enable_redis:
+        logger.info("Entity cache is shared through redis")
+    return EntityCache(
+        max_size=cache_config.entity_max_size,
+        ttl_seconds=cache_config.entity_ttl_seconds,
+        shared_ttl_seconds=cache_config.entity_shared_ttl_seconds,
+        shared=database_config.enable_redis,
+    )
+
+
+entityCache = _create_entity_cache()
+
+
+def _on_execute(conn: Any, clauseelement: Any, *_: Any) -> None:
+    if not getattr(clauseelement, "is_dml", False):
+        return
+    table = getattr(getattr(clauseelement, "table", None), "name", None)
+    if table is None or not entityCache.is_cached(table):
+        return
+    entityCache.invalidate(table)
+    conn.info.setdefault(_WRITTEN_TABLES, set()).add(table)
+
+
+def _on_checkin(_: Any, connection_record: Any) -> None:
+    # The transaction of the connection was committed or rolled back
+    if connection_record is None:
+        return
+    for table in connection_record.info.pop(_WRITTEN_TABLES, ()):
+        entityCache.invalidate(table)
+
+
+def written_in(session: Any, table: str) -> bool:
+    """Whether the transaction of a sync session wrote to the table, not committed yet."""
+    transaction = session.get_transaction()
+    if transaction is None:
+        return False
+    return any(
+        table in connection.info.get(_WRITTEN_TABLES, ())
+        for connection, *_ in transaction._connections.values()
+    )
+
+
+event.listen(Engine, "before_execute", _on_execute)
+event.listen(Pool, "checkin", _on_checkin)
+
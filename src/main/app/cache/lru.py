@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: MIT
+"""Bounded least-recently-used mapping"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Generic, Optional, TypeVar
+
+KeyType = TypeVar("KeyType")
+ValueType = TypeVar("ValueType")
+
+
+class LRUCache(Generic[KeyType, ValueType]):
+    """
+    Mapping that keeps at most ``max_size`` entries and evicts the least
+    recently used one when full.
+
+    Not thread-safe: it is meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        on_evict: Optional[Callable[[KeyType, ValueType], None]] = None,
+    ):
+        """
+        Args:
+            max_size: Maximum number of entries, must be positive.
+            on_evict: Optional callback invoked with the evicted key and value.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self._data: OrderedDict[KeyType, ValueType] = OrderedDict()
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        """Return the value for key and mark it as most recently used."""
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def peek(self, key: KeyType) -> Optional[ValueType]:
+        """Return the value for key without touching its recency."""
+        return self._data.get(key)
+
+    def put(self, key: KeyType, value: ValueType) -> None:
+        """Insert or replace a value, evicting the oldest entry if needed."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            evicted_key, evicted_value = self._data.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key: KeyType) -> Optional[ValueType]:
+        """Remove key and return its value, or None if absent."""
+        return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def keys(self) -> list[KeyType]:
+        """Keys ordered from least to most recently used."""
+        return list(self._data.keys())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[KeyType]:
+        return iter(self._data)
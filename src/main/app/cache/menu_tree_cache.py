@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: MIT
+"""Menu tree compiled once per menu table version"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_cache_config
+from src.main.app.schema.menu_schema import Menu
+from src.main.app.utils import etag_util
+from src.main.app.utils.tree_util import list_to_tree
+
+
+class CompiledMenuTree:
+    """
+    Snapshot of the menu and role_menu tables ready to be served.
+
+    Every menu is given a bit in sort order, and every role the bitmask of the
+    menus granted to it, so that the menus of a user are the OR of the masks of
+    their roles. Every permission declared by menus is given the bitmask of
+    those menus, so that a permission check is a single AND. The rendered tree and its ETag are memoized per mask: users
+    sharing the same roles share the same response body.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        menus: list[Menu],
+        role_menus: Iterable[tuple[int, int]],
+        max_renders: int,
+    ):
+        """
+        Args:
+            version: Menu table version the snapshot was loaded at.
+            menus: Every menu, ordered by sort.
+            role_menus: (role_id, menu_id) pairs of the role_menu table.
+            max_renders: Number of rendered masks kept before LRU eviction.
+        """
+        self.version = version
+        self._records: list[dict[str, Any]] = [
+            jsonable_encoder(menu.model_dump(exclude={"children"})) for menu in menus
+        ]
+        bits = {menu.id: 1 << position for position, menu in enumerate(menus)}
+        self.full_mask = (1 << len(menus)) - 1
+        self.visible_mask = 0
+        for menu in menus:
+            if menu.visible == 1:
+                self.visible_mask |= bits[menu.id]
+        self._role_masks: dict[int, int] = {}
+        for role_id, menu_id in role_menus:
+            self._role_masks[role_id] = self._role_masks.get(role_id, 0) | bits.get(menu_id, 0)
+        self._permission_masks: dict[str, int] = {}
+        for menu in menus:
+            if menu.permission:
+                permission = menu.permission.strip()
+                self._permission_masks[permission] = (
+                    self._permission_masks.get(permission, 0) | bits[menu.id]
+                )
+        self._renders: LRUCache[int, tuple[str, bytes]] = LRUCache(max_size=max_renders)
+
+    def mask_of(self, role_ids: Iterable[int]) -> int:
+        """Bitmask of the menus granted to any of the roles."""
+        mask = 0
+        for role_id in role_ids:
+            mask |= self._role_masks.get(role_id, 0)
+        return mask
+
+    def permission_mask(self, permissions: Iterable[str]) -> int:
+        """Bitmask of the menus declaring any of the permissions."""
+        mask = 0
+        for permission in permissions:
+            mask |= self._permission_masks.get(permission, 0)
+        return mask
+
+    def render(self, mask: int) -> tuple[str, bytes]:
+        """ETag and JSON body of the tree of the visible menus in ``mask``."""
+        mask &= self.visible_mask
+        rendered = self._renders.get(mask)
+        if rendered is not None:
+            return rendered
+        records: list[dict[str, Any]] = []
+        remaining = mask
+        while remaining:
+            lowest = remaining & -remaining
+            records.append(self._records[lowest.bit_length() - 1])
+            remaining ^= lowest
+        content = json.dumps(
+            list_to_tree(records), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        rendered = (etag_util.compute_etag(content), content)
+        self._renders.put(mask, rendered)
+        return rendered
+
+
+class MenuTreeCache:
+    """
+    Holder of the compiled menu tree of the current menu table version.
+
+    Menu and role_menu writes bump the version and drop the compiled tree; a
+    tree compiled from a version older than the latest write is not kept. The
+    tree is also recompiled after ``reload_seconds`` to pick up writes made by
+    other workers. ETags are derived from the rendered body, so they stay
+    consistent across workers whatever their local version.
+    """
+
+    def __init__(self, reload_seconds: int, max_renders: int):
+        """
+        Args:
+            reload_seconds: Age after which the tree must be compiled again.
+            max_renders: Number of rendered masks kept per compiled tree.
+        """
+        self.reload_seconds = reload_seconds
+        self.max_renders = max_renders
+        self.version = 0
+        self._tree: Optional[CompiledMenuTree] = None
+        self._loaded_at: Optional[float] = None
+
+    def get(self) -> Optional[CompiledMenuTree]:
+        """The compiled tree, or None when it must be compiled again."""
+        if (
+            self._tree is None
+            or self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.reload_seconds
+        ):
+            return None
+        return self._tree
+
+    def load(
+        self, version: int, menus: list[Menu], role_menus: Iterable[tuple[int, int]]
+    ) -> CompiledMenuTree:
+        """Compile a tree from a snapshot read at ``version`` and keep it if still current."""
+        tree = CompiledMenuTree(version, menus, role_menus, self.max_renders)
+        if version == self.version:
+            self._tree = tree
+            self._loaded_at = time.monotonic()
+        return tree
+
+    def invalidate(self) -> None:
+        """Bump the version and drop the compiled tree."""
+        self.version += 1
+        self._tree = None
+        self._loaded_at = None
+
+
+_cache_config = get_cache_config()
+menuTreeCache = MenuTreeCache(
+    reload_seconds=_cache_config.menu_tree_reload_seconds,
+    max_renders=_cache_config.menu_tree_max_renders,
+)
@@ -0,0 +1,344 @@
+# SPDX-License-Identifier: MIT
+"""Per-stock ring buffers of the latest news headers"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import islice
+from typing import Optional
+
+from fastlib import ConfigManager
+from loguru import logger
+
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_cache_config
+from src.main.app.schema.intelligence_information_schema import LatestNews
+
+# Sorted set of the ids of the headers of a symbol, scored by publish_time
+_REDIS_KEY_PREFIX = "zeta:news:latest:"
+# Hash of the headers of a symbol by id, with the completeness mark
+_REDIS_ITEMS_KEY_PREFIX = "zeta:news:items:"
+_REDIS_SYMBOLS_KEY = "zeta:news:latest-symbols"
+# Counter of the writes, and version of the latest write to each symbol
+_REDIS_VERSION_KEY = "zeta:news:version"
+_REDIS_SYMBOL_VERSION_KEY_PREFIX = "zeta:news:version:"
+# Field marking the headers of a symbol as a complete snapshot of the table
+_REDIS_COMPLETE_FIELD = "complete"
+
+
+def _sort_key(news: LatestNews) -> datetime:
+    return news.publish_time or datetime.min
+
+
+class LatestNewsCache:
+    """
+    Cache answering "latest N news for this stock" without hitting the database.
+
+    Every cached symbol owns a bounded buffer of the ``buffer_size`` newest
+    headers ordered by publish_time descending; the symbols themselves are kept
+    under an LRU of ``max_symbols`` entries. A symbol absent from the cache is a
+    miss and must be filled from the database, so a resident buffer is always a
+    complete view of the newest rows. Buffers expire after ``ttl_seconds``,
+    which also bounds how long a write not routed through the services stays
+    invisible. Writes push or invalidate once committed, bump the cache
+    version and stamp it on the symbols they touched; a fill whose version
+    was read before the latest write to its symbol is refused, so a snapshot
+    that raced with a write is never cached, while writes to other symbols
+    leave it be. When ``shared`` is enabled the buffers live in Redis so that
+    all workers see the same data.
+    """
+
+    def __init__(
+        self, buffer_size: int, max_symbols: int, ttl_seconds: int, shared: bool = False
+    ):
+        """
+        Args:
+            buffer_size: Number of headers kept per symbol.
+            max_symbols: Number of symbols kept before LRU eviction.
+            ttl_seconds: Lifetime of the buffer of a symbol.
+            shared: Store buffers in Redis instead of process memory.
+        """
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be a positive integer")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be a positive integer")
+        self.buffer_size = buffer_size
+        self.max_symbols = max_symbols
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._version = 0
+        # Version of the latest write to each symbol written since startup
+        self._written: dict[str, int] = {}
+        self._buffers: LRUCache[str, tuple[float, deque[LatestNews]]] = LRUCache(
+            max_size=max_symbols
+        )
+
+    async def version(self) -> int:
+        """Current version, to be read before loading a snapshot to fill."""
+        if self.shared:
+            client = await self._redis()
+            return int(await client.get(_REDIS_VERSION_KEY) or 0)
+        return self._version
+
+    async def get(self, stock_symbol_full: str, limit: int) -> Optional[list[LatestNews]]:
+        """
+        Return up to ``limit`` newest headers, or None on a cache miss.
+
+        Requests larger than the buffer cannot be answered from it and are
+        reported as a miss as well.
+        """
+        if limit > self.buffer_size:
+            return None
+        if self.shared:
+            return await self._redis_get(stock_symbol_full, limit)
+        buffer = self._resident(stock_symbol_full, touch=True)
+        if buffer is None:
+            return None
+        return list(islice(buffer, limit))
+
+    async def fill(
+        self, stock_symbol_full: str, news_list: Iterable[LatestNews], version: int
+    ) -> bool:
+        """
+        Replace the buffer of a symbol with a snapshot loaded from the database,
+        unless the symbol was written since ``version`` was read. Returns
+        whether the buffer was stored.
+        """
+        ordered = sorted(news_list, key=_sort_key, reverse=True)[: self.buffer_size]
+        if self.shared:
+            return await self._redis_fill(stock_symbol_full, ordered, version)
+        if self._written.get(stock_symbol_full, 0) > version:
+            return False
+        self._buffers.put(
+            stock_symbol_full,
+            (time.monotonic() + self.ttl_seconds, deque(ordered, maxlen=self.buffer_size)),
+        )
+        return True
+
+    async def push(self, news_list: Iterable[LatestNews]) -> None:
+        """
+        Add committed headers to the buffers of their symbols, replacing the
+        older copy of a header pushed again.
+
+        Symbols that are not resident are skipped: they are filled from the
+        database on their next read.
+        """
+        news_list = [news for news in news_list if news.stock_symbol_full]
+        if not news_list:
+            return
+        if self.shared:
+            await self._redis_push(news_list)
+            return
+        self._bump(news.stock_symbol_full for news in news_list)
+        for news in news_list:
+            buffer = self._resident(news.stock_symbol_full)
+            if buffer is not None:
+                self._insert(buffer, news)
+
+    async def invalidate(self, stock_symbols: Iterable[Optional[str]]) -> None:
+        """Drop the buffers of the given symbols and bump their version."""
+        symbols = {symbol for symbol in stock_symbols if symbol}
+        if not symbols:
+            return
+        if self.shared:
+            client = await self._redis()
+            version = await client.incr(_REDIS_VERSION_KEY)
+            async with client.pipeline(transaction=False) as pipe:
+                for symbol in symbols:
+                    self._redis_stamp(pipe, symbol, version)
+                    pipe.delete(_REDIS_KEY_PREFIX + symbol, _REDIS_ITEMS_KEY_PREFIX + symbol)
+                    pipe.zrem(_REDIS_SYMBOLS_KEY, json.dumps(symbol))
+                await pipe.execute()
+            return
+        self._bump(symbols)
+        for symbol in symbols:
+            self._buffers.pop(symbol)
+
+    async def clear(self) -> None:
+        """Drop every buffer and bump the version of the symbols dropped."""
+        if self.shared:
+            client = await self._redis()
+            await self.invalidate(await client.zrange(_REDIS_SYMBOLS_KEY, 0, -1))
+            return
+        self._bump(self._buffers.keys())
+        self._buffers.clear()
+
+    def _bump(self, stock_symbols: Iterable[str]) -> None:
+        self._version += 1
+        for symbol in stock_symbols:
+            self._written[symbol] = self._version
+
+    def _resident(self, stock_symbol_full: str, touch: bool = False) -> Optional[deque[LatestNews]]:
+        cached = (
+            self._buffers.get(stock_symbol_full)
+            if touch
+            else self._buffers.peek(stock_symbol_full)
+        )
+        if cached is None:
+            return None
+        expires_at, buffer = cached
+        if time.monotonic() >= expires_at:
+            self._buffers.pop(stock_symbol_full)
+            return None
+        return buffer
+
+    def _insert(self, buffer: deque[LatestNews], news: LatestNews) -> None:
+        """Insert a header into a descending buffer, replacing an older copy."""
+        for index, cached in enumerate(buffer):
+            if cached.id == news.id:
+                del buffer[index]
+                break
+        key = _sort_key(news)
+        if not buffer or key >= _sort_key(buffer[0]):
+            buffer.appendleft(news)
+            return
+        if len(buffer) == buffer.maxlen and key < _sort_key(buffer[-1]):
+            # Older than everything retained, it would be evicted right away
+            return
+        position = next(
+            (index for index, cached in enumerate(buffer) if key >= _sort_key(cached)),
+            len(buffer),
+        )
+        if len(buffer) == buffer.maxlen:
+            buffer.pop()
+        buffer.insert(position, news)
+
+    @staticmethod
+    async def _redis():
+        from fastlib.cache._redis_cache import RedisCacheManager
+
+        return await RedisCacheManager.get_instance()
+
+    def _redis_stamp(self, pipe, stock_symbol_full: str, version: int) -> None:
+        # Outlives any load that read an older version by far
+        pipe.set(
+            _REDIS_SYMBOL_VERSION_KEY_PREFIX + stock_symbol_full, version, ex=self.ttl_seconds
+        )
+
+    @staticmethod
+    def _score(news: LatestNews) -> float:
+        return news.publish_time.timestamp() if news.publish_time else 0.0
+
+    # Every member, field and value stored is valid JSON: the client of
+    # fastlib decodes each reply as JSON.
+
+    async def _redis_get(self, stock_symbol_full: str, limit: int) -> Optional[list[LatestNews]]:
+        client = await self._redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zrevrange(_REDIS_KEY_PREFIX + stock_symbol_full, 0, limit - 1)
+            pipe.hvals(_REDIS_ITEMS_KEY_PREFIX + stock_symbol_full)
+            pipe.zadd(_REDIS_SYMBOLS_KEY, {json.dumps(stock_symbol_full): time.time()}, xx=True)
+            ids, items, _ = await pipe.execute()
+        # The completeness mark is the only value that is not a header
+        if True not in items:
+            return None
+        news_by_id = {}
+        for item in items:
+            if item is True:
+                continue
+            news = (
+                LatestNews.model_validate(item)
+                if isinstance(item, dict)
+                else LatestNews.model_validate_json(item)
+            )
+            news_by_id[news.id] = news
+        return [news_by_id[news_id] for news_id in ids if news_id in news_by_id]
+
+    async def _redis_fill(
+        self, stock_symbol_full: str, ordered: list[LatestNews], version: int
+    ) -> bool:
+        from redis.exceptions import WatchError
+
+        client = await self._redis()
+        key = _REDIS_KEY_PREFIX + stock_symbol_full
+        items_key = _REDIS_ITEMS_KEY_PREFIX + stock_symbol_full
+        version_key = _REDIS_SYMBOL_VERSION_KEY_PREFIX + stock_symbol_full
+        items = {str(news.id): news.model_dump_json() for news in ordered}
+        items[_REDIS_COMPLETE_FIELD] = "true"
+        async with client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(version_key)
+                if int(await pipe.get(version_key) or 0) > version:
+                    return False
+                pipe.multi()
+                pipe.delete(key, items_key)
+                if ordered:
+                    pipe.zadd(key, {str(news.id): self._score(news) for news in ordered})
+                    pipe.expire(key, self.ttl_seconds)
+                pipe.hset(items_key, mapping=items)
+                pipe.expire(items_key, self.ttl_seconds)
+                pipe.zadd(_REDIS_SYMBOLS_KEY, {json.dumps(stock_symbol_full): time.time()})
+                pipe.zcard(_REDIS_SYMBOLS_KEY)
+                *_, symbol_count = await pipe.execute()
+            except WatchError:
+                # Written while storing, the snapshot may already be stale
+                return False
+        overflow = symbol_count - self.max_symbols
+        if overflow > 0:
+            evicted = await client.zpopmin(_REDIS_SYMBOLS_KEY, overflow)
+            if evicted:
+                keys = []
+                for symbol, _ in evicted:
+                    keys += [_REDIS_KEY_PREFIX + symbol, _REDIS_ITEMS_KEY_PREFIX + symbol]
+                await client.delete(*keys)
+        return True
+
+    async def _redis_push(self, news_list: list[LatestNews]) -> None:
+        client = await self._redis()
+        symbols = list({news.stock_symbol_full for news in news_list})
+        version = await client.incr(_REDIS_VERSION_KEY)
+        async with client.pipeline(transaction=False) as pipe:
+            for symbol in symbols:
+                self._redis_stamp(pipe, symbol, version)
+                pipe.exists(_REDIS_ITEMS_KEY_PREFIX + symbol)
+            exists = (await pipe.execute())[1::2]
+        resident = [symbol for symbol, found in zip(symbols, exists, strict=True) if found]
+        if not resident:
+            return
+        async with client.pipeline(transaction=False) as pipe:
+            for news in news_list:
+                if news.stock_symbol_full not in resident:
+                    continue
+                key = _REDIS_KEY_PREFIX + news.stock_symbol_full
+                items_key = _REDIS_ITEMS_KEY_PREFIX + news.stock_symbol_full
+                # Members are ids: a header pushed again only moves to its new
+                # score, and its copy in the hash is replaced
+                pipe.zadd(key, {str(news.id): self._score(news)})
+                pipe.hset(items_key, str(news.id), news.model_dump_json())
+                # Should the keys expire meanwhile, they are created without
+                # the completeness mark, read as a miss, and expire in turn
+                pipe.expire(key, self.ttl_seconds, nx=True)
+                pipe.expire(items_key, self.ttl_seconds, nx=True)
+            for symbol in resident:
+                # Ids beyond the newest buffer_size, oldest first
+                pipe.zrange(_REDIS_KEY_PREFIX + symbol, 0, -(self.buffer_size + 1))
+            results = await pipe.execute()
+        overflow = results[-len(resident) :]
+        async with client.pipeline(transaction=False) as pipe:
+            for symbol, news_ids in zip(resident, overflow, strict=True):
+                if news_ids:
+                    pipe.zrem(_REDIS_KEY_PREFIX + symbol, *[str(news_id) for news_id in news_ids])
+                    pipe.hdel(
+                        _REDIS_ITEMS_KEY_PREFIX + symbol, *[str(news_id) for news_id in news_ids]
+                    )
+            await pipe.execute()
+
+
+def _create_latest_news_cache() -> LatestNewsCache:
+    cache_config = get_cache_config()
+    database_config = ConfigManager.get_database_config()
+    if database_config.enable_redis:
+        logger.info("Latest news cache is shared through redis")
+    return LatestNewsCache(
+        buffer_size=cache_config.news_buffer_size,
+        max_symbols=cache_config.news_max_symbols,
+        ttl_seconds=cache_config.news_ttl_seconds,
+        shared=database_config.enable_redis,
+    )
+
+
+latestNewsCache = _create_latest_news_cache()
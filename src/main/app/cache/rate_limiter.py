@@ -0,0 +1,189 @@
+# SPDX-License-Identifier: MIT
+"""Sliding-window rate limit counters, in process or in Redis"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, NamedTuple
+
+from fastlib import ConfigManager
+from loguru import logger
+
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_cache_config
+
+_REDIS_KEY_PREFIX = "zeta:ratelimit:"
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_PATTERN = re.compile(
+    r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE
+)
+
+# Sliding window counter, run atomically in Redis:
+# KEYS[1] current window, KEYS[2] previous window,
+# ARGV[1] limit, ARGV[2] weight of the previous window, ARGV[3] window seconds
+_REDIS_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local estimated = previous * tonumber(ARGV[2]) + current + 1
+if estimated > tonumber(ARGV[1]) then
+    return {0, tostring(estimated - 1)}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]) * 2)
+return {1, tostring(estimated)}
+"""
+
+
+class RateLimit(NamedTuple):
+    """At most ``count`` requests per ``seconds``."""
+
+    count: int
+    seconds: int
+
+    def __str__(self) -> str:
+        return f"{self.count}/{self.seconds}s"
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: RateLimit
+    remaining: int
+    # Seconds after which the request may be retried, 0 when allowed
+    retry_after: int
+
+
+def parse_rate_limits(limits: str) -> list[RateLimit]:
+    """
+    Parse limits such as ``"10/second"``, ``"100 per minute"`` or
+    ``"5/10 seconds"``; several limits are separated by ``;`` or ``,``.
+    """
+    parsed: list[RateLimit] = []
+    for limit in re.split(r"[;,]", limits):
+        if not limit.strip():
+            continue
+        matched = _LIMIT_PATTERN.match(limit)
+        if matched is None:
+            raise ValueError(f"Invalid rate limit: {limit!r}")
+        count, multiplier, unit = matched.groups()
+        parsed.append(
+            RateLimit(int(count), int(multiplier or 1) * _UNIT_SECONDS[unit.lower()])
+        )
+    return parsed
+
+
+def _weigh(limit: RateLimit, now: float) -> tuple[int, float]:
+    """Index of the current window and the weight left to the previous one."""
+    window = int(now // limit.seconds)
+    elapsed = now - window * limit.seconds
+    return window, 1.0 - elapsed / limit.seconds
+
+
+def _result(limit: RateLimit, allowed: bool, estimated: float, weight: float) -> RateLimitResult:
+    remaining = max(0, math.floor(limit.count - estimated))
+    retry_after = 0 if allowed else max(1, math.ceil(weight * limit.seconds))
+    return RateLimitResult(allowed, limit, remaining, retry_after)
+
+
+class InMemoryRateLimiter:
+    """
+    Sliding window counters of the current process.
+
+    Each key keeps the request count of the current and of the previous fixed
+    window; the previous count is weighted by the part of it still covered by
+    the sliding window. Counters are spread over ``shards`` LRU maps bounded
+    to ``max_keys`` keys overall, so idle keys are evicted without a sweep.
+    Updates run without awaiting and need no lock on the event loop. Only
+    allowed requests are counted.
+    """
+
+    def __init__(self, shards: int, max_keys: int):
+        """
+        Args:
+            shards: Number of counter maps keys are spread over.
+            max_keys: Number of keys kept overall before LRU eviction.
+        """
+        if shards <= 0:
+            raise ValueError("shards must be a positive integer")
+        self._shards: list[LRUCache[tuple[str, int], list[float]]] = [
+            LRUCache(max_size=max(1, max_keys // shards)) for _ in range(shards)
+        ]
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        return self.hit_at(key, limit, time.time())
+
+    def hit_at(self, key: str, limit: RateLimit, now: float) -> RateLimitResult:
+        window, weight = _weigh(limit, now)
+        counter_key = (key, limit.seconds)
+        shard = self._shards[hash(counter_key) % len(self._shards)]
+        # [window index, previous window count, current window count]
+        counter = shard.get(counter_key)
+        if counter is None:
+            counter = [window, 0, 0]
+            shard.put(counter_key, counter)
+        elif counter[0] != window:
+            counter[1] = counter[2] if counter[0] == window - 1 else 0
+            counter[0], counter[2] = window, 0
+        estimated = counter[1] * weight + counter[2] + 1
+        if estimated > limit.count:
+            return _result(limit, False, estimated - 1, weight)
+        counter[2] += 1
+        return _result(limit, True, estimated, weight)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+
+class RedisRateLimiter:
+    """
+    Sliding window counters shared by every worker through Redis.
+
+    Same algorithm as ``InMemoryRateLimiter``, run atomically by a Lua script
+    on one key per window. Works with any server speaking the Redis protocol
+    with scripting, the client is injected for that purpose.
+    """
+
+    def __init__(self, client_factory: Callable[[], Awaitable[Any]]):
+        """
+        Args:
+            client_factory: Coroutine function returning an asyncio Redis client.
+        """
+        self._client_factory = client_factory
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        window, weight = _weigh(limit, time.time())
+        prefix = f"{_REDIS_KEY_PREFIX}{limit.seconds}:{key}:"
+        client = await self._client_factory()
+        allowed, estimated = await client.eval(
+            _REDIS_HIT_SCRIPT,
+            2,
+            f"{prefix}{window}",
+            f"{prefix}{window - 1}",
+            limit.count,
+            weight,
+            limit.seconds,
+        )
+        return _result(limit, bool(int(allowed)), float(estimated), weight)
+
+
+async def _redis_client():
+    from fastlib.cache._redis_cache import RedisCacheManager
+
+    return await RedisCacheManager.get_instance()
+
+
+def _create_rate_limiter() -> InMemoryRateLimiter | RedisRateLimiter:
+    database_config = ConfigManager.get_database_config()
+    if database_config.enable_redis:
+        logger.info("Rate limits are shared through redis")
+        return RedisRateLimiter(client_factory=_redis_client)
+    cache_config = get_cache_config()
+    return InMemoryRateLimiter(
+        shards=cache_config.rate_limit_shards, max_keys=cache_config.rate_limit_max_keys
+    )
+
+
+rateLimiter = _create_rate_limiter()
@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: MIT
+"""Verified JWT claims and the revoked token filter"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from src.main.app.cache.bloom import BloomFilter
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_cache_config
+
+
+class VerifiedTokenCache:
+    """
+    Claims of tokens whose signature was already verified, keyed by token
+    digest, so that a token is decoded once instead of on every request.
+
+    An entry is served until the ``exp`` claim of its token, after which the
+    token would fail verification anyway. Revocation is not reflected here and
+    must be checked on every request, see ``TokenRevocationFilter``.
+    """
+
+    def __init__(self, max_tokens: int):
+        """
+        Args:
+            max_tokens: Number of tokens kept before LRU eviction.
+        """
+        self._claims: LRUCache[str, dict[str, Any]] = LRUCache(max_size=max_tokens)
+
+    def get(self, token_digest: str) -> Optional[dict[str, Any]]:
+        """Return the verified claims of a token, or None if absent or expired."""
+        claims = self._claims.get(token_digest)
+        if claims is None:
+            return None
+        if claims["exp"] <= time.time():
+            self._claims.pop(token_digest)
+            return None
+        return claims
+
+    def put(self, token_digest: str, claims: dict[str, Any]) -> None:
+        self._claims.put(token_digest, claims)
+
+    def pop(self, token_digest: str) -> None:
+        self._claims.pop(token_digest)
+
+    def clear(self) -> None:
+        self._claims.clear()
+
+
+class TokenRevocationFilter:
+    """
+    In-memory view of the persisted deny list.
+
+    Revoked token digests are held in a Bloom filter: a negative answer is
+    final and costs a few hash probes, a positive one must be confirmed
+    against the deny list in the database. Confirmed positives and tokens
+    revoked by this worker are remembered exactly, so a revoked token that is
+    replayed does not reach the database again. Forced sign-outs are few and
+    kept exactly, as the time up to which every token of the user is rejected.
+
+    The filter is rebuilt from the database after ``reload_seconds`` to drop
+    expired revocations and to pick up revocations made by other workers.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, reload_seconds: int):
+        """
+        Args:
+            capacity: Number of revoked tokens the Bloom filter is sized for.
+            error_rate: False positive rate of the Bloom filter at capacity.
+            reload_seconds: Age after which the filter must be rebuilt.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.reload_seconds = reload_seconds
+        self._tokens = BloomFilter(capacity, error_rate)
+        self._confirmed: LRUCache[str, bool] = LRUCache(max_size=capacity)
+        self._users: dict[int, float] = {}
+        self._loaded_at: Optional[float] = None
+
+    def is_fresh(self) -> bool:
+        """Whether the filter is loaded and younger than ``reload_seconds``."""
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.reload_seconds
+        )
+
+    def load(self, revocations: Iterable[tuple[Optional[str], int, Optional[float]]]) -> None:
+        """Rebuild the filter from (token_digest, user_id, revoked_at) rows."""
+        revocations = list(revocations)
+        tokens = BloomFilter(max(self.capacity, len(revocations)), self.error_rate)
+        users: dict[int, float] = {}
+        for token_digest, user_id, revoked_at in revocations:
+            if token_digest is not None:
+                tokens.add(token_digest)
+            elif revoked_at is not None:
+                users[user_id] = max(users.get(user_id, revoked_at), revoked_at)
+        self._tokens = tokens
+        self._confirmed.clear()
+        self._users = users
+        self._loaded_at = time.monotonic()
+
+    def revoke_token(self, token_digest: str) -> None:
+        self._tokens.add(token_digest)
+        self._confirmed.put(token_digest, True)
+
+    def confirm_revoked(self, token_digest: str) -> None:
+        """Remember a positive confirmed by the database until the next reload."""
+        self._confirmed.put(token_digest, True)
+
+    def revoke_user(self, user_id: int, revoked_at: float) -> None:
+        """Reject every token of the user issued before the epoch ``revoked_at``."""
+        self._users[user_id] = max(self._users.get(user_id, revoked_at), revoked_at)
+
+    def is_user_revoked(self, claims: dict[str, Any]) -> bool:
+        """Whether the token was issued before a forced sign-out of its user."""
+        revoked_at = self._users.get(int(claims["sub"]))
+        # Tokens without iat predate forced sign-out support and count as older
+        return revoked_at is not None and claims.get("iat", 0) < revoked_at
+
+    def might_be_revoked(self, token_digest: str) -> bool:
+        """False if the token is certainly not revoked, True if it may be."""
+        return self._tokens.might_contain(token_digest)
+
+    def is_confirmed_revoked(self, token_digest: str) -> bool:
+        """Whether the token is known to be on the deny list."""
+        return token_digest in self._confirmed
+
+
+_cache_config = get_cache_config()
+verifiedTokenCache = VerifiedTokenCache(max_tokens=_cache_config.verified_token_max_size)
+tokenRevocationFilter = TokenRevocationFilter(
+    capacity=_cache_config.token_revocation_capacity,
+    error_rate=_cache_config.token_revocation_error_rate,
+    reload_seconds=_cache_config.token_revocation_reload_seconds,
+)
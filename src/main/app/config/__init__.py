@@ -0,0 +1,31 @@
+"""Export application config symbols"""
+
+from src.main.app.config._cache_config import CacheConfig
+from src.main.app.config._export_config import ExportConfig
+from src.main.app.config._import_config import ImportConfig
+from src.main.app.config._password_config import PasswordConfig
+from src.main.app.config._replica_config import ReplicaConfig
+from src.main.app.config._snowflake_config import SnowflakeConfig
+from src.main.app.config.manager import (
+    get_cache_config,
+    get_export_config,
+    get_import_config,
+    get_password_config,
+    get_replica_config,
+    get_snowflake_config,
+)
+
+__all__ = [
+    CacheConfig,
+    ExportConfig,
+    ImportConfig,
+    PasswordConfig,
+    ReplicaConfig,
+    SnowflakeConfig,
+    get_cache_config,
+    get_export_config,
+    get_import_config,
+    get_password_config,
+    get_replica_config,
+    get_snowflake_config,
+]
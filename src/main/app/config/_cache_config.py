@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: MIT
+"""Cache configuration for the application."""
+
+from dataclasses import dataclass
+
+from fastlib.config.base import BaseConfig
+
+
+@dataclass
+class CacheConfig(BaseConfig):
+    """
+    Cache configuration for the application.
+
+    Attributes:
+        news_buffer_size: Latest news headers kept per stock symbol. Default: 50.
+        news_max_symbols: Stock symbols kept in the news cache before the least
+            recently used one is evicted. Default: 2000.
+        news_warm_on_startup: Whether to preload the news cache at startup. Default: True.
+        news_ttl_seconds: Lifetime of the news buffer of a stock symbol; it also
+            bounds how long a write not routed through the services stays
+            invisible. Default: 300.
+        active_recommendation_reload_seconds: Age in seconds after which the active
+            recommendation index is reloaded from the database. Default: 300.
+        authorization_max_users: Users whose resolved authorization is kept before
+            the least recently used one is evicted. Default: 10000.
+        authorization_ttl_seconds: Age in seconds after which a resolved
+            authorization is loaded again from the database. Default: 300.
+        menu_tree_reload_seconds: Age in seconds after which the compiled menu tree
+            is compiled again from the database. Default: 300.
+        menu_tree_max_renders: Rendered menu trees, one per distinct set of roles,
+            kept per compiled tree. Default: 256.
+        verified_token_max_size: Tokens whose verified claims are kept before the
+            least recently used one is evicted. Default: 10000.
+        token_revocation_capacity: Revoked tokens the revocation Bloom filter is
+            sized for. Default: 100000.
+        token_revocation_error_rate: False positive rate of the revocation Bloom
+            filter at capacity; positives are confirmed in the database. Default: 0.001.
+        token_revocation_reload_seconds: Age in seconds after which the revocation
+            filter is rebuilt from the deny list. Default: 30.
+        rate_limit_shards: Counter maps the in-process rate limiter spreads its
+            keys over. Default: 16.
+        rate_limit_max_keys: Rate limit counters kept in process before the least
+            recently used one is evicted. Default: 100000.
+        dict_registry_reload_seconds: Age in seconds after which the dictionary
+            registry is loaded again from the database. Default: 300.
+        entity_max_size: Rows kept in process per mapper with an entity cache
+            before the least recently used one is evicted. Default: 10000.
+        entity_ttl_seconds: Lifetime of a row cached in process; it also bounds
+            how long a write made by another worker stays invisible. Default: 60.
+        entity_shared_ttl_seconds: Lifetime of a row cached in Redis, when
+            ``database.enable_redis`` is set. Default: 600.
+    """
+
+    news_buffer_size: int = 50
+    news_max_symbols: int = 2000
+    news_warm_on_startup: bool = True
+    news_ttl_seconds: int = 300
+    active_recommendation_reload_seconds: int = 300
+    authorization_max_users: int = 10000
+    authorization_ttl_seconds: int = 300
+    menu_tree_reload_seconds: int = 300
+    menu_tree_max_renders: int = 256
+    verified_token_max_size: int = 10000
+    token_revocation_capacity: int = 100000
+    token_revocation_error_rate: float = 0.001
+    token_revocation_reload_seconds: int = 30
+    rate_limit_shards: int = 16
+    rate_limit_max_keys: int = 100000
+    dict_registry_reload_seconds: int = 300
+    entity_max_size: int = 10000
+    entity_ttl_seconds: int = 60
+    entity_shared_ttl_seconds: int = 600
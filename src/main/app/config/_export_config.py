@@ -0,0 +1,25 @@
+# SPDX-License-Identifier: MIT
+"""Data export configuration for the application."""
+
+from dataclasses import dataclass
+
+from fastlib.config.base import BaseConfig
+
+
+@dataclass
+class ExportConfig(BaseConfig):
+    """
+    Data export configuration for the application.
+
+    Attributes:
+        chunk_size: Rows fetched from the server-side cursor and written to the
+            workbook at a time. Default: 2000.
+        ids_per_statement: Requested ids selected by one statement; longer id
+            lists are exported through several statements. Default: 10000.
+        stream_chunk_size: Rows fetched from the server-side cursor and sent
+            at a time by the NDJSON streaming list endpoints. Default: 1000.
+    """
+
+    chunk_size: int = 2000
+    ids_per_statement: int = 10000
+    stream_chunk_size: int = 1000
@@ -0,0 +1,25 @@
+# SPDX-License-Identifier: MIT
+"""Data import configuration for the application."""
+
+from dataclasses import dataclass
+
+from fastlib.config.base import BaseConfig
+
+
+@dataclass
+class ImportConfig(BaseConfig):
+    """
+    Data import configuration for the application.
+
+    Attributes:
+        chunk_size: Rows of an uploaded file validated and inserted at a
+            time. Default: 5000.
+        validate_processes: Processes validating the chunks of a large import,
+            0 for the number of CPUs. Default: 0.
+        max_errors: Row errors returned by an import; further invalid rows are
+            counted but not listed. Default: 1000.
+    """
+
+    chunk_size: int = 5000
+    validate_processes: int = 0
+    max_errors: int = 1000
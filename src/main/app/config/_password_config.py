@@ -0,0 +1,28 @@
+# SPDX-License-Identifier: MIT
+"""Password hashing configuration for the application."""
+
+from dataclasses import dataclass
+
+from fastlib.config.base import BaseConfig
+
+
+@dataclass
+class PasswordConfig(BaseConfig):
+    """
+    Password hashing configuration for the application.
+
+    Attributes:
+        hash_workers: Threads hashing and verifying passwords of interactive
+            requests, which bounds how many run at once. Default: 4.
+        max_pending: Password operations admitted to the thread pool at once;
+            further requests wait on the event loop. Default: 64.
+        bulk_processes: Processes hashing the passwords of a bulk user import,
+            0 for the number of CPUs. Default: 0.
+        bulk_min_size: Passwords below which a bulk import is hashed on the
+            thread pool instead of starting processes. Default: 32.
+    """
+
+    hash_workers: int = 4
+    max_pending: int = 64
+    bulk_processes: int = 0
+    bulk_min_size: int = 32
@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: MIT
+"""Read replica configuration for the application."""
+
+import os
+from dataclasses import dataclass
+
+from fastlib.config.base import BaseConfig
+
+
+@dataclass
+class ReplicaConfig(BaseConfig):
+    """
+    Read replica configuration for the application.
+
+    Attributes:
+        urls: Comma separated URLs of the read replicas, in the format of
+            ``database.url``; empty to serve every query from the primary.
+            Overridden by the environment variable DB_REPLICA_URLS. Default: "".
+        max_lag_seconds: Replication lag in seconds above which a replica stops
+            serving reads until it catches up. Default: 5.
+        health_check_seconds: Interval in seconds between two health and lag
+            checks of the replicas. Default: 5.
+        health_check_timeout: Seconds after which a replica not answering its
+            check is taken out of rotation. Default: 2.
+        lag_query: Query returning the lag of a replica in seconds, NULL when
+            replication is broken; empty to use the query of the dialect, or no
+            lag for dialects without replication such as SQLite. Default: "".
+        max_sticky_clients: Clients that wrote recently, and whose reads are
+            served by the primary to see their own writes, kept before the least
+            recently used one is evicted. Default: 10000.
+    """
+
+    urls: str = ""
+    max_lag_seconds: float = 5
+    health_check_seconds: float = 5
+    health_check_timeout: float = 2
+    lag_query: str = ""
+    max_sticky_clients: int = 10000
+
+    def __post_init__(self) -> None:
+        env_urls = os.getenv("DB_REPLICA_URLS")
+        if env_urls is not None:
+            self.urls = env_urls
+
+    @property
+    def url_list(self) -> list[str]:
+        return [url.strip() for url in self.urls.split(",") if url.strip()]
@@ -0,0 +1,22 @@
+# SPDX-License-Identifier: MIT
+"""Snowflake id configuration for the application."""
+
+from dataclasses import dataclass
+
+from fastlib.config.base import BaseConfig
+
+
+@dataclass
+class SnowflakeConfig(BaseConfig):
+    """
+    Snowflake id configuration for the application.
+
+    Attributes:
+        datacenter_id: Datacenter bits of the ids (0-31), distinct for every host
+            writing to the same database. Default: 1.
+        worker_id: Worker bits of the ids (0-31); -1 lets every process claim a
+            worker id of its own among the processes of the host. Default: -1.
+    """
+
+    datacenter_id: int = 1
+    worker_id: int = -1
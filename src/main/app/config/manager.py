@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: MIT
+"""Application specific configuration on top of the fastlib global config."""
+
+from typing import TypeVar
+
+from fastlib import ConfigManager
+from fastlib.config.base import BaseConfig
+
+from src.main.app.config._cache_config import CacheConfig
+from src.main.app.config._export_config import ExportConfig
+from src.main.app.config._import_config import ImportConfig
+from src.main.app.config._password_config import PasswordConfig
+from src.main.app.config._replica_config import ReplicaConfig
+from src.main.app.config._snowflake_config import SnowflakeConfig
+
+ConfigType = TypeVar("ConfigType", bound=BaseConfig)
+
+_config_instances: dict[str, BaseConfig] = {}
+
+
+def _get_config(name: str, config_class: type[ConfigType]) -> ConfigType:
+    """
+    Build a config section from the loaded config dict once and reuse it.
+
+    Args:
+        name: Section name in config.yml
+        config_class: Dataclass the section is loaded into
+
+    Returns:
+        The configuration instance for the section.
+    """
+    instance = _config_instances.get(name)
+    if instance is None:
+        config_dict = ConfigManager.get_config_dict() or {}
+        instance = config_class(**(config_dict.get(name) or {}))
+        _config_instances[name] = instance
+    return instance
+
+
+def get_cache_config() -> CacheConfig:
+    """
+    Get the cache configuration.
+
+    Returns:
+        CacheConfig: The cache configuration object
+    """
+    return _get_config("cache", CacheConfig)
+
+
+def get_password_config() -> PasswordConfig:
+    """
+    Get the password hashing configuration.
+
+    Returns:
+        PasswordConfig: The password hashing configuration object
+    """
+    return _get_config("password", PasswordConfig)
+
+
+def get_export_config() -> ExportConfig:
+    """
+    Get the data export configuration.
+
+    Returns:
+        ExportConfig: The data export configuration object
+    """
+    return _get_config("export", ExportConfig)
+
+
+def get_import_config() -> ImportConfig:
+    """
+    Get the data import configuration.
+
+    Returns:
+        ImportConfig: The data import configuration object
+    """
+    return _get_config("import", ImportConfig)
+
+
+def get_snowflake_config() -> SnowflakeConfig:
+    """
+    Get the snowflake id configuration.
+
+    Returns:
+        SnowflakeConfig: The snowflake id configuration object
+    """
+    return _get_config("snowflake", SnowflakeConfig)
+
+
+def get_replica_config() -> ReplicaConfig:
+    """
+    Get the read replica configuration.
+
+    Returns:
+        ReplicaConfig: The read replica configuration object
+    """
+    return _get_config("replica", ReplicaConfig)
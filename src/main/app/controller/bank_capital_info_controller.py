@@ -3,12 +3,14 @@
 from __future__ import annotations
 from typing import Annotated
 
-from fastlib.response import ListResponse
 from fastapi import APIRouter, Query, Form
 from starlette.responses import StreamingResponse
 
 from src.main.app.mapper.bank_capital_info_mapper import bankCapitalInfoMapper
+from src.main.app.mapper.dict_datum_mapper import dictDatumMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.bank_capital_info_model import BankCapitalInfoModel
+from src.main.app.schema.dict_datum_schema import LabeledListResponse
 from src.main.app.schema.bank_capital_info_schema import (
     ListBankCapitalInfosRequest,
     BankCapitalInfo,
@@ -24,13 +26,19 @@ from src.main.app.schema.bank_capital_info_schema import (
     ImportBankCapitalInfosResponse,
     BatchGetBankCapitalInfosResponse,
     ImportBankCapitalInfosRequest,
-    ImportBankCapitalInfo, BatchPatchBankCapitalInfosRequest,
+    BatchPatchBankCapitalInfosRequest,
+    ListBankCapitalPeerStatsRequest,
+    BankCapitalPeerStat,
 )
 from src.main.app.service.impl.bank_capital_info_service_impl import BankCapitalInfoServiceImpl
 from src.main.app.service.bank_capital_info_service import BankCapitalInfoService
+from src.main.app.service.dict_datum_service import DictDatumService
+from src.main.app.service.impl.dict_datum_service_impl import DictDatumServiceImpl
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 bank_capital_info_router = APIRouter()
 bank_capital_info_service: BankCapitalInfoService = BankCapitalInfoServiceImpl(mapper=bankCapitalInfoMapper)
+dict_datum_service: DictDatumService = DictDatumServiceImpl(mapper=dictDatumMapper)
 
 
 @bank_capital_info_router.get("/bankCapitalInfos/{id}")
@@ -52,13 +60,13 @@ async def get_bank_capital_info(id: int) -> BankCapitalInfoDetail:
         HTTPException(404 Not Found): If the requested bank_capital_info does not exist.
     """
     bank_capital_info_record: BankCapitalInfoModel = await bank_capital_info_service.get_bank_capital_info(id=id)
-    return BankCapitalInfoDetail(**bank_capital_info_record.model_dump())
+    return BankCapitalInfoDetail.model_validate(bank_capital_info_record, from_attributes=True)
 
 
 @bank_capital_info_router.get("/bankCapitalInfos")
 async def list_bank_capital_infos(
     req: Annotated[ListBankCapitalInfosRequest, Query()],
-) -> ListResponse[BankCapitalInfo]:
+) -> LabeledListResponse[BankCapitalInfo]:
     """
     List bank_capital_infos with pagination.
 
@@ -68,14 +76,81 @@ async def list_bank_capital_infos(
 
     Returns:
 
-        ListResponse: Paginated list of bank_capital_infos and total count.
+        LabeledListResponse: Paginated list of bank_capital_infos and total count, with the
+        labels of its dictionary-backed fields when with_labels is set.
 
     Raises:
 
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     bank_capital_info_records, total = await bank_capital_info_service.list_bank_capital_infos(req=req)
-    return ListResponse(records=bank_capital_info_records, total=total)
+    labels = None
+    if req.with_labels:
+        labels = await dict_datum_service.resolve_dict_labels(records=bank_capital_info_records, schema=BankCapitalInfo)
+    return json_response(
+        LabeledListResponse[BankCapitalInfo],
+        records=bank_capital_info_records,
+        total=total,
+        labels=labels,
+    )
+
+
+@bank_capital_info_router.get("/bankCapitalInfos:stream")
+async def stream_bank_capital_infos(
+    req: Annotated[ListBankCapitalInfosRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every bank_capital_info matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the bank_capital_infos, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await bank_capital_info_service.stream_bank_capital_infos(req=req)
+    return ndjson_response(BankCapitalInfo, chunks)
+
+
+@bank_capital_info_router.get("/bankCapitalInfos:peerStats")
+async def list_bank_capital_peer_stats(
+    req: Annotated[ListBankCapitalPeerStatsRequest, Query()],
+) -> LabeledListResponse[BankCapitalPeerStat]:
+    """
+    List precomputed peer ranks, percentiles and z-scores of banks within their bank_type.
+
+    Args:
+
+        req: Request object containing pagination, filter and sort parameters,
+            sorted by peer rank unless sort_str is given.
+
+    Returns:
+
+        LabeledListResponse: Paginated list of bank_capital_peer_stats and total count, with the
+        labels of its dictionary-backed fields when with_labels is set.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    peer_stat_records, total = await bank_capital_info_service.list_bank_capital_peer_stats(req=req)
+    labels = None
+    if req.with_labels:
+        labels = await dict_datum_service.resolve_dict_labels(records=peer_stat_records, schema=BankCapitalPeerStat)
+    return json_response(
+        LabeledListResponse[BankCapitalPeerStat],
+        records=peer_stat_records,
+        total=total,
+        labels=labels,
+    )
 
 
 @bank_capital_info_router.post("/bankCapitalInfos")
@@ -99,7 +174,7 @@ async def creat_bank_capital_info(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     bank_capital_info: BankCapitalInfoModel = await bank_capital_info_service.create_bank_capital_info(req=req)
-    return BankCapitalInfo(**bank_capital_info.model_dump())
+    return BankCapitalInfo.model_validate(bank_capital_info, from_attributes=True)
 
 
 @bank_capital_info_router.put("/bankCapitalInfos")
@@ -123,7 +198,7 @@ async def update_bank_capital_info(
         HTTPException(404 Not Found): If the bank_capital_info to update doesn't exist.
     """
     bank_capital_info: BankCapitalInfoModel = await bank_capital_info_service.update_bank_capital_info(req=req)
-    return BankCapitalInfo(**bank_capital_info.model_dump())
+    return BankCapitalInfo.model_validate(bank_capital_info, from_attributes=True)
 
 
 @bank_capital_info_router.delete("/bankCapitalInfos/{id}")
@@ -167,7 +242,7 @@ async def batch_get_bank_capital_infos(
     """
     bank_capital_info_records: list[BankCapitalInfoModel] = await bank_capital_info_service.batch_get_bank_capital_infos(ids)
     bank_capital_info_detail_list: list[BankCapitalInfoDetail] = [
-        BankCapitalInfoDetail(**bank_capital_info_record.model_dump()) for bank_capital_info_record in bank_capital_info_records
+        BankCapitalInfoDetail.model_validate(bank_capital_info_record, from_attributes=True) for bank_capital_info_record in bank_capital_info_records
     ]
     return BatchGetBankCapitalInfosResponse(bank_capital_infos=bank_capital_info_detail_list)
 
@@ -195,7 +270,7 @@ async def batch_create_bank_capital_infos(
 
     bank_capital_info_records = await bank_capital_info_service.batch_create_bank_capital_infos(req=req)
     bank_capital_info_list: list[BankCapitalInfo] = [
-        BankCapitalInfo(**bank_capital_info_record.model_dump()) for bank_capital_info_record in bank_capital_info_records
+        BankCapitalInfo.model_validate(bank_capital_info_record, from_attributes=True) for bank_capital_info_record in bank_capital_info_records
     ]
     return BatchCreateBankCapitalInfosResponse(bank_capital_infos=bank_capital_info_list)
 
@@ -221,7 +296,7 @@ async def batch_update_bank_capital_infos(
         HTTPException 404 (Not Found): If any specified bank_capital_info ID doesn't exist
     """
     bank_capital_info_records: list[BankCapitalInfoModel] = await bank_capital_info_service.batch_update_bank_capital_infos(req=req)
-    bank_capital_info_list: list[BankCapitalInfo] = [BankCapitalInfo(**bank_capital_info.model_dump()) for bank_capital_info in bank_capital_info_records]
+    bank_capital_info_list: list[BankCapitalInfo] = [BankCapitalInfo.model_validate(bank_capital_info, from_attributes=True) for bank_capital_info in bank_capital_info_records]
     return BatchUpdateBankCapitalInfosResponse(bank_capital_infos=bank_capital_info_list)
 
 
@@ -246,7 +321,7 @@ async def batch_patch_bank_capital_infos(
         HTTPException 404 (Not Found): If any specified bank_capital_info ID doesn't exist
     """
     bank_capital_info_records: list[BankCapitalInfoModel] = await bank_capital_info_service.batch_patch_bank_capital_infos(req=req)
-    bank_capital_info_list: list[BankCapitalInfo] = [BankCapitalInfo(**bank_capital_info.model_dump()) for bank_capital_info in bank_capital_info_records]
+    bank_capital_info_list: list[BankCapitalInfo] = [BankCapitalInfo.model_validate(bank_capital_info, from_attributes=True) for bank_capital_info in bank_capital_info_records]
     return BatchUpdateBankCapitalInfosResponse(bank_capital_infos=bank_capital_info_list)
 
 
@@ -283,6 +358,7 @@ async def export_bank_capital_infos_template() -> StreamingResponse:
 
 
 @bank_capital_info_router.get("/bankCapitalInfos:export")
+@rate_limit("10/minute")
 async def export_bank_capital_infos(
     req: ExportBankCapitalInfosRequest = Query(...),
 ) -> StreamingResponse:
@@ -314,14 +390,12 @@ async def import_bank_capital_infos(
         req (UploadFile): The Excel file containing bank_capital_info data to import.
 
     Returns:
-        ImportBankCapitalInfosResponse: List of successfully parsed bank_capital_info data.
+        ImportBankCapitalInfosResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_bank_capital_infos_resp: list[ImportBankCapitalInfo] = await bank_capital_info_service.import_bank_capital_infos(
-        req=req
-    )
-    return ImportBankCapitalInfosResponse(bank_capital_infos=import_bank_capital_infos_resp)
\ No newline at end of file
+    import_result = await bank_capital_info_service.import_bank_capital_infos(req=req)
+    return ImportBankCapitalInfosResponse.model_validate(import_result, from_attributes=True)
\ No newline at end of file
@@ -16,13 +16,16 @@
 
 from __future__ import annotations
 
+from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Query, Form
+from fastapi import APIRouter, Query, Form, Request, Response
 from starlette.responses import StreamingResponse
 
 from fastlib.response import ListResponse
 from src.main.app.mapper.dict_datum_mapper import dictDatumMapper
+from src.main.app.middleware import rate_limit
+from src.main.app.utils import etag_util
 from src.main.app.model.dict_datum_model import DictDatumModel
 from src.main.app.schema.dict_datum_schema import (
     ListDictDataRequest,
@@ -39,13 +42,12 @@ from src.main.app.schema.dict_datum_schema import (
     ImportDictDataResponse,
     BatchGetDictDataResponse,
     ImportDictDataRequest,
-    ImportDictDatum,
     BatchPatchDictDataRequest,
     DictDataOption,
-    DictDataOptionItem,
 )
 from src.main.app.service.dict_datum_service import DictDatumService
 from src.main.app.service.impl.dict_datum_service_impl import DictDatumServiceImpl
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 dict_datum_router = APIRouter()
 dict_datum_service: DictDatumService = DictDatumServiceImpl(mapper=dictDatumMapper)
@@ -70,7 +72,7 @@ async def get_dict_datum(id: int) -> DictDatumDetail:
         HTTPException(404 Not Found): If the requested dict_datum does not exist.
     """
     dict_datum_record: DictDatumModel = await dict_datum_service.get_dict_datum(id=id)
-    return DictDatumDetail(**dict_datum_record.model_dump())
+    return DictDatumDetail.model_validate(dict_datum_record, from_attributes=True)
 
 
 @dict_datum_router.get("/dictData")
@@ -93,59 +95,87 @@ async def list_dict_data(
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     dict_datum_records, total = await dict_datum_service.list_dict_data(req=req)
-    return ListResponse(records=dict_datum_records, total=total)
+    return json_response(ListResponse[DictDatum], records=dict_datum_records, total=total)
 
 
-@dict_datum_router.get("/dictData:all")
-async def get_all_dict_data() -> DictDataOption:
-    """Get all dictionary data.
+@dict_datum_router.get("/dictData:stream")
+async def stream_dict_data(
+    req: Annotated[ListDictDataRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every dict_datum matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
 
     Returns:
 
-        DictDataOption: Structured dictionary data object.
+        StreamingResponse: Newline-delimited JSON of the dict_data, read by a
+        single query on a server-side cursor.
 
     Raises:
 
-        HTTPException: 403 Forbidden if user doesn't have access rights.
+        HTTPException(403 Forbidden): If user don't have access rights.
     """
-    dict_data_records: list[DictDatumModel] = await dict_datum_service.get_all_dict_data()
+    chunks = await dict_datum_service.stream_dict_data(req=req)
+    return ndjson_response(DictDatum, chunks)
+
 
-    grouped_data = {}
-    for record in dict_data_records:
-        if record.type not in grouped_data:
-            grouped_data[record.type] = []
-        grouped_data[record.type].append(DictDataOptionItem(label=record.label, value=record.value))
+@dict_datum_router.get("/dictData:all", response_model=DictDataOption)
+async def get_all_dict_data(request: Request) -> Response:
+    """Get all dictionary data.
 
-    return DictDataOption(options=grouped_data)
+    Args:
 
+        request: Incoming request, its If-None-Match header is honored.
 
-@dict_datum_router.get("/dictData:options")
+    Returns:
+
+        DictDataOption: Structured dictionary data object, or 304 Not Modified
+        when the ETag still matches.
+
+    Raises:
+
+        HTTPException: 403 Forbidden if user doesn't have access rights.
+    """
+    etag, content = await dict_datum_service.get_dict_options()
+    return _options_response(request, etag, content)
+
+
+@dict_datum_router.get("/dictData:options", response_model=DictDataOption)
 async def get_dict_options(
+    request: Request,
     req: list[str] = Query(..., description="List of dict type to get options for"),
-) -> DictDataOption:
+) -> Response:
     """
     Get dictionary options for the given dict types.
 
     Args:
 
+        request: Incoming request, its If-None-Match header is honored.
+
         req: List of dict keys to retrieve options for.
 
     Returns:
 
-        DictDataOption: Structured dictionary data object.
+        DictDataOption: Structured dictionary data object, or 304 Not Modified
+        when the ETag still matches.
 
     Raises:
 
         HTTPException: 403 Forbidden if user doesn't have access rights.
     """
-    dict_data_records: list[DictDatumModel] = await dict_datum_service.get_dict_options(req=req)
-    grouped_data = {}
-    for record in dict_data_records:
-        if record.type not in grouped_data:
-            grouped_data[record.type] = []
-        grouped_data[record.type].append(DictDataOptionItem(label=record.label, value=record.value))
+    etag, content = await dict_datum_service.get_dict_options(types=req)
+    return _options_response(request, etag, content)
 
-    return DictDataOption(options=grouped_data)
+
+def _options_response(request: Request, etag: str, content: bytes) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_util.if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @dict_datum_router.post("/dictData")
@@ -169,7 +199,7 @@ async def creat_dict_datum(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     dict_datum: DictDatumModel = await dict_datum_service.create_dict_datum(req=req)
-    return DictDatum(**dict_datum.model_dump())
+    return DictDatum.model_validate(dict_datum, from_attributes=True)
 
 
 @dict_datum_router.put("/dictData")
@@ -193,7 +223,7 @@ async def update_dict_datum(
         HTTPException(404 Not Found): If the dict_datum to update doesn't exist.
     """
     dict_datum: DictDatumModel = await dict_datum_service.update_dict_datum(req=req)
-    return DictDatum(**dict_datum.model_dump())
+    return DictDatum.model_validate(dict_datum, from_attributes=True)
 
 
 @dict_datum_router.delete("/dictData/{id}")
@@ -237,7 +267,7 @@ async def batch_get_dict_data(
     """
     dict_datum_records: list[DictDatumModel] = await dict_datum_service.batch_get_dict_data(ids)
     dict_datum_detail_list: list[DictDatumDetail] = [
-        DictDatumDetail(**dict_datum_record.model_dump())
+        DictDatumDetail.model_validate(dict_datum_record, from_attributes=True)
         for dict_datum_record in dict_datum_records
     ]
     return BatchGetDictDataResponse(dict_data=dict_datum_detail_list)
@@ -266,7 +296,7 @@ async def batch_create_dict_data(
 
     dict_datum_records = await dict_datum_service.batch_create_dict_data(req=req)
     dict_datum_list: list[DictDatum] = [
-        DictDatum(**dict_datum_record.model_dump()) for dict_datum_record in dict_datum_records
+        DictDatum.model_validate(dict_datum_record, from_attributes=True) for dict_datum_record in dict_datum_records
     ]
     return BatchCreateDictDataResponse(dict_data=dict_datum_list)
 
@@ -295,7 +325,7 @@ async def batch_update_dict_data(
         req=req
     )
     dict_datum_list: list[DictDatum] = [
-        DictDatum(**dict_datum.model_dump()) for dict_datum in dict_datum_records
+        DictDatum.model_validate(dict_datum, from_attributes=True) for dict_datum in dict_datum_records
     ]
     return BatchUpdateDictDataResponse(dict_data=dict_datum_list)
 
@@ -324,7 +354,7 @@ async def batch_patch_dict_data(
         req=req
     )
     dict_datum_list: list[DictDatum] = [
-        DictDatum(**dict_datum.model_dump()) for dict_datum in dict_datum_records
+        DictDatum.model_validate(dict_datum, from_attributes=True) for dict_datum in dict_datum_records
     ]
     return BatchUpdateDictDataResponse(dict_data=dict_datum_list)
 
@@ -362,6 +392,7 @@ async def export_dict_data_template() -> StreamingResponse:
 
 
 @dict_datum_router.get("/dictData:export")
+@rate_limit("10/minute")
 async def export_dict_data(
     req: ExportDictDataRequest = Query(...),
 ) -> StreamingResponse:
@@ -394,14 +425,12 @@ async def import_dict_data(
         req (UploadFile): The Excel file containing dict_datum data to import.
 
     Returns:
-        ImportDictDataResponse: List of successfully parsed dict_datum data.
+        ImportDictDataResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_dict_data_resp: list[ImportDictDatum] = await dict_datum_service.import_dict_data(
-        req=req
-    )
-    return ImportDictDataResponse(dict_data=import_dict_data_resp)
+    import_result = await dict_datum_service.import_dict_data(req=req)
+    return ImportDictDataResponse.model_validate(import_result, from_attributes=True)
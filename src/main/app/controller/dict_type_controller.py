@@ -22,6 +22,7 @@ from starlette.responses import StreamingResponse
 
 from fastlib.response import ListResponse
 from src.main.app.mapper.dict_type_mapper import dictTypeMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.dict_type_model import DictTypeModel
 from src.main.app.schema.dict_type_schema import (
     ListDictTypesRequest,
@@ -38,11 +39,11 @@ from src.main.app.schema.dict_type_schema import (
     ImportDictTypesResponse,
     BatchGetDictTypesResponse,
     ImportDictTypesRequest,
-    ImportDictType,
     BatchPatchDictTypesRequest,
 )
 from src.main.app.service.impl.dict_type_service_impl import DictTypeServiceImpl
 from src.main.app.service.dict_type_service import DictTypeService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 dict_type_router = APIRouter()
 dict_type_service: DictTypeService = DictTypeServiceImpl(mapper=dictTypeMapper)
@@ -67,7 +68,7 @@ async def get_dict_type(id: int) -> DictTypeDetail:
         HTTPException(404 Not Found): If the requested dict_type does not exist.
     """
     dict_type_record: DictTypeModel = await dict_type_service.get_dict_type(id=id)
-    return DictTypeDetail(**dict_type_record.model_dump())
+    return DictTypeDetail.model_validate(dict_type_record, from_attributes=True)
 
 
 @dict_type_router.get("/dictTypes")
@@ -90,7 +91,32 @@ async def list_dict_types(
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     dict_type_records, total = await dict_type_service.list_dict_types(req=req)
-    return ListResponse(records=dict_type_records, total=total)
+    return json_response(ListResponse[DictType], records=dict_type_records, total=total)
+
+
+@dict_type_router.get("/dictTypes:stream")
+async def stream_dict_types(
+    req: Annotated[ListDictTypesRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every dict_type matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the dict_types, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await dict_type_service.stream_dict_types(req=req)
+    return ndjson_response(DictType, chunks)
 
 
 @dict_type_router.post("/dictTypes")
@@ -114,7 +140,7 @@ async def creat_dict_type(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     dict_type: DictTypeModel = await dict_type_service.create_dict_type(req=req)
-    return DictType(**dict_type.model_dump())
+    return DictType.model_validate(dict_type, from_attributes=True)
 
 
 @dict_type_router.put("/dictTypes")
@@ -138,7 +164,7 @@ async def update_dict_type(
         HTTPException(404 Not Found): If the dict_type to update doesn't exist.
     """
     dict_type: DictTypeModel = await dict_type_service.update_dict_type(req=req)
-    return DictType(**dict_type.model_dump())
+    return DictType.model_validate(dict_type, from_attributes=True)
 
 
 @dict_type_router.delete("/dictTypes/{id}")
@@ -182,7 +208,7 @@ async def batch_get_dict_types(
     """
     dict_type_records: list[DictTypeModel] = await dict_type_service.batch_get_dict_types(ids)
     dict_type_detail_list: list[DictTypeDetail] = [
-        DictTypeDetail(**dict_type_record.model_dump()) for dict_type_record in dict_type_records
+        DictTypeDetail.model_validate(dict_type_record, from_attributes=True) for dict_type_record in dict_type_records
     ]
     return BatchGetDictTypesResponse(dict_types=dict_type_detail_list)
 
@@ -210,7 +236,7 @@ async def batch_create_dict_types(
 
     dict_type_records = await dict_type_service.batch_create_dict_types(req=req)
     dict_type_list: list[DictType] = [
-        DictType(**dict_type_record.model_dump()) for dict_type_record in dict_type_records
+        DictType.model_validate(dict_type_record, from_attributes=True) for dict_type_record in dict_type_records
     ]
     return BatchCreateDictTypesResponse(dict_types=dict_type_list)
 
@@ -239,7 +265,7 @@ async def batch_update_dict_types(
         req=req
     )
     dict_type_list: list[DictType] = [
-        DictType(**dict_type.model_dump()) for dict_type in dict_type_records
+        DictType.model_validate(dict_type, from_attributes=True) for dict_type in dict_type_records
     ]
     return BatchUpdateDictTypesResponse(dict_types=dict_type_list)
 
@@ -266,7 +292,7 @@ async def batch_patch_dict_types(
     """
     dict_type_records: list[DictTypeModel] = await dict_type_service.batch_patch_dict_types(req=req)
     dict_type_list: list[DictType] = [
-        DictType(**dict_type.model_dump()) for dict_type in dict_type_records
+        DictType.model_validate(dict_type, from_attributes=True) for dict_type in dict_type_records
     ]
     return BatchUpdateDictTypesResponse(dict_types=dict_type_list)
 
@@ -304,6 +330,7 @@ async def export_dict_types_template() -> StreamingResponse:
 
 
 @dict_type_router.get("/dictTypes:export")
+@rate_limit("10/minute")
 async def export_dict_types(
     req: ExportDictTypesRequest = Query(...),
 ) -> StreamingResponse:
@@ -336,14 +363,12 @@ async def import_dict_types(
         req (UploadFile): The Excel file containing dict_type data to import.
 
     Returns:
-        ImportDictTypesResponse: List of successfully parsed dict_type data.
+        ImportDictTypesResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_dict_types_resp: list[ImportDictType] = await dict_type_service.import_dict_types(
-        req=req
-    )
-    return ImportDictTypesResponse(dict_types=import_dict_types_resp)
+    import_result = await dict_type_service.import_dict_types(req=req)
+    return ImportDictTypesResponse.model_validate(import_result, from_attributes=True)
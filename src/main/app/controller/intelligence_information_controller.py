@@ -28,6 +28,7 @@
 # )
 # from src.main.app.service.impl.intelligence_information_service_impl import IntelligenceInformationServiceImpl
 # from src.main.app.service.intelligence_information_service import IntelligenceInformationService
+# from src.main.app.utils.response_util import ndjson_response
 
 # intelligence_information_router = APIRouter()
 # intelligence_information_service: IntelligenceInformationService = IntelligenceInformationServiceImpl(mapper=intelligenceInformationMapper)
@@ -78,6 +79,31 @@
 #     return ListResponse(records=intelligence_information_records, total=total)
 
 
+# @intelligence_information_router.get("/intelligenceInformation:stream")
+# async def stream_intelligence_information(
+#     req: Annotated[ListIntelligenceInformationRequest, Query()],
+# ) -> StreamingResponse:
+#     """
+#     Stream every intelligence_information matching the filters, one JSON record per line.
+
+#     Args:
+
+#         req: Request object containing filter and sort parameters, the
+#         pagination parameters are ignored.
+
+#     Returns:
+
+#         StreamingResponse: Newline-delimited JSON of the intelligence_information, read by a
+#         single query on a server-side cursor.
+
+#     Raises:
+
+#         HTTPException(403 Forbidden): If user don't have access rights.
+#     """
+#     chunks = await intelligence_information_service.stream_intelligence_information(req=req)
+#     return ndjson_response(IntelligenceInformation, chunks)
+
+
 # @intelligence_information_router.post("/intelligenceInformation")
 # async def creat_intelligence_information(
 #     req: CreateIntelligenceInformationRequest,
@@ -314,14 +340,12 @@
 #         req (UploadFile): The Excel file containing intelligence_information data to import.
 
 #     Returns:
-#         ImportIntelligenceInformationResponse: List of successfully parsed intelligence_information data.
+#         ImportIntelligenceInformationResponse: Import counts and the errors of the invalid rows.
 
 #     Raises:
 #         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
 #         HTTPException(403 Forbidden): If the current user lacks access rights.
 #     """
 
-#     import_intelligence_information_resp: list[ImportIntelligenceInformation] = await intelligence_information_service.import_intelligence_information(
-#         req=req
-#     )
-#     return ImportIntelligenceInformationResponse(intelligence_information=import_intelligence_information_resp)
\ No newline at end of file
+#     import_result = await intelligence_information_service.import_intelligence_information(req=req)
+#     return ImportIntelligenceInformationResponse.model_validate(import_result, from_attributes=True)
\ No newline at end of file
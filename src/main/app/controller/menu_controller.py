@@ -20,6 +20,7 @@ from starlette.responses import StreamingResponse
 
 from fastlib.response import ListResponse
 from src.main.app.mapper.menu_mapper import menuMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.menu_model import MenuModel
 from src.main.app.schema.menu_schema import (
     ListMenusRequest,
@@ -36,16 +37,102 @@ from src.main.app.schema.menu_schema import (
     ImportMenusResponse,
     BatchGetMenusResponse,
     ImportMenusRequest,
-    ImportMenu,
     BatchPatchMenusRequest,
+    MenuTreeResponse,
+    MoveMenuRequest,
 )
 from src.main.app.service.impl.menu_service_impl import MenuServiceImpl
 from src.main.app.service.menu_service import MenuService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 menu_router = APIRouter()
 menu_service: MenuService = MenuServiceImpl(mapper=menuMapper)
 
 
+# Declared before /menus/{id}, which would otherwise capture "{id}:subtree"
+@menu_router.get("/menus/{id}:subtree")
+async def get_menu_subtree(id: int) -> Menu:
+    """
+    Retrieve a menu with all of its descendants.
+
+    Args:
+
+        id: Unique ID of the menu resource.
+
+    Returns:
+
+        Menu: The menu with its descendants nested in children, at any depth.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If the current user does not have permission.
+        HTTPException(404 Not Found): If the requested menu does not exist.
+    """
+    return await menu_service.get_menu_subtree(id=id)
+
+
+@menu_router.get("/menus/{id}:ancestors")
+async def get_menu_ancestors(id: int) -> MenuTreeResponse:
+    """
+    Retrieve the ancestors of a menu.
+
+    Args:
+
+        id: Unique ID of the menu resource.
+
+    Returns:
+
+        MenuTreeResponse: The ancestors ordered from the root down.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If the current user does not have permission.
+        HTTPException(404 Not Found): If the requested menu does not exist.
+    """
+    menu_records: list[MenuModel] = await menu_service.get_menu_ancestors(id=id)
+    return MenuTreeResponse(menus=[Menu.model_validate(menu_record, from_attributes=True) for menu_record in menu_records])
+
+
+@menu_router.get("/menus:tree")
+async def get_menu_tree() -> MenuTreeResponse:
+    """
+    Retrieve the whole menu tree.
+
+    Returns:
+
+        MenuTreeResponse: The root menus with their descendants nested in children.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If the current user does not have permission.
+    """
+    return MenuTreeResponse(menus=await menu_service.get_menu_tree())
+
+
+@menu_router.post("/menus/{id}:move")
+async def move_menu(id: int, req: MoveMenuRequest) -> Menu:
+    """
+    Move a menu and its descendants under another parent.
+
+    Args:
+
+        id: The ID of the menu to move.
+        req: Request object containing the new parent ID.
+
+    Returns:
+
+        Menu: The moved menu object.
+
+    Raises:
+
+        HTTPException(400 Bad Request): If the new parent is the menu or one of its descendants.
+        HTTPException(403 Forbidden): If the current user doesn't have update permissions.
+        HTTPException(404 Not Found): If the menu or the new parent doesn't exist.
+    """
+    menu: MenuModel = await menu_service.move_menu(id=id, parent_id=req.parent_id)
+    return Menu.model_validate(menu, from_attributes=True)
+
+
 @menu_router.get("/menus/{id}")
 async def get_menu(id: int) -> MenuDetail:
     """
@@ -65,7 +152,7 @@ async def get_menu(id: int) -> MenuDetail:
         HTTPException(404 Not Found): If the requested menu does not exist.
     """
     menu_record: MenuModel = await menu_service.get_menu(id=id)
-    return MenuDetail(**menu_record.model_dump())
+    return MenuDetail.model_validate(menu_record, from_attributes=True)
 
 
 @menu_router.get("/menus")
@@ -91,7 +178,32 @@ async def list_menus(
     menu_records_with_children: list[Menu] = await menu_service.get_children_recursively(
         parent_data=menu_records, schema_class=Menu
     )
-    return ListResponse(records=menu_records_with_children, total=total)
+    return json_response(ListResponse[Menu], records=menu_records_with_children, total=total)
+
+
+@menu_router.get("/menus:stream")
+async def stream_menus(
+    req: Annotated[ListMenusRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every menu matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the menus, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await menu_service.stream_menus(req=req)
+    return ndjson_response(Menu, chunks)
 
 
 @menu_router.post("/menus")
@@ -115,7 +227,7 @@ async def creat_menu(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     menu: MenuModel = await menu_service.create_menu(req=req)
-    return Menu(**menu.model_dump())
+    return Menu.model_validate(menu, from_attributes=True)
 
 
 @menu_router.put("/menus")
@@ -139,7 +251,7 @@ async def update_menu(
         HTTPException(404 Not Found): If the menu to update doesn't exist.
     """
     menu: MenuModel = await menu_service.update_menu(req=req)
-    return Menu(**menu.model_dump())
+    return Menu.model_validate(menu, from_attributes=True)
 
 
 @menu_router.delete("/menus/{id}")
@@ -183,7 +295,7 @@ async def batch_get_menus(
     """
     menu_records: list[MenuModel] = await menu_service.batch_get_menus(ids)
     menu_detail_list: list[MenuDetail] = [
-        MenuDetail(**menu_record.model_dump()) for menu_record in menu_records
+        MenuDetail.model_validate(menu_record, from_attributes=True) for menu_record in menu_records
     ]
     return BatchGetMenusResponse(menus=menu_detail_list)
 
@@ -210,7 +322,7 @@ async def batch_create_menus(
     """
 
     menu_records = await menu_service.batch_create_menus(req=req)
-    menu_list: list[Menu] = [Menu(**menu_record.model_dump()) for menu_record in menu_records]
+    menu_list: list[Menu] = [Menu.model_validate(menu_record, from_attributes=True) for menu_record in menu_records]
     return BatchCreateMenusResponse(menus=menu_list)
 
 
@@ -235,7 +347,7 @@ async def batch_update_menus(
         HTTPException 404 (Not Found): If any specified menu ID doesn't exist
     """
     menu_records: list[MenuModel] = await menu_service.batch_update_menus(req=req)
-    menu_list: list[Menu] = [Menu(**menu.model_dump()) for menu in menu_records]
+    menu_list: list[Menu] = [Menu.model_validate(menu, from_attributes=True) for menu in menu_records]
     return BatchUpdateMenusResponse(menus=menu_list)
 
 
@@ -260,7 +372,7 @@ async def batch_patch_menus(
         HTTPException 404 (Not Found): If any specified menu ID doesn't exist
     """
     menu_records: list[MenuModel] = await menu_service.batch_patch_menus(req=req)
-    menu_list: list[Menu] = [Menu(**menu.model_dump()) for menu in menu_records]
+    menu_list: list[Menu] = [Menu.model_validate(menu, from_attributes=True) for menu in menu_records]
     return BatchUpdateMenusResponse(menus=menu_list)
 
 
@@ -297,6 +409,7 @@ async def export_menus_template() -> StreamingResponse:
 
 
 @menu_router.get("/menus:export")
+@rate_limit("10/minute")
 async def export_menus(
     req: ExportMenusRequest = Query(...),
 ) -> StreamingResponse:
@@ -329,12 +442,12 @@ async def import_menus(
         req (UploadFile): The Excel file containing menu data to import.
 
     Returns:
-        ImportMenusResponse: List of successfully parsed menu data.
+        ImportMenusResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_menus_resp: list[ImportMenu] = await menu_service.import_menus(req=req)
-    return ImportMenusResponse(menus=import_menus_resp)
+    import_result = await menu_service.import_menus(req=req)
+    return ImportMenusResponse.model_validate(import_result, from_attributes=True)
@@ -4,6 +4,9 @@
 from fastapi import APIRouter
 from fastlib.response import HttpResponse
 
+from src.main.app.cache.entity_cache import entityCache
+from src.main.app.mapper.db_session import session_stats
+
 probe_router = APIRouter()
 
 
@@ -17,3 +20,29 @@ async def liveness() -> HttpResponse[str]:
         with the string "Hi".
     """
     return HttpResponse.success(message="Hi")
+
+
+@probe_router.get("/probes:dbSessions")
+async def db_sessions() -> HttpResponse[dict[str, float]]:
+    """
+    Database session counters of the serving process, since its startup.
+
+    Returns:
+        HttpResponse[dict[str, float]]: Requests served, sessions opened and
+        pool checkouts made while serving them, checkouts per request, and
+        pool checkouts of the process overall.
+    """
+    return HttpResponse.success(data=session_stats())
+
+
+@probe_router.get("/probes:entityCache")
+async def entity_cache() -> HttpResponse[dict[str, dict[str, float]]]:
+    """
+    Entity cache counters of the serving process, since its startup.
+
+    Returns:
+        HttpResponse[dict[str, dict[str, float]]]: For each cached table, the
+        lookups served in process, from Redis and from the database, the hit
+        ratio, the invalidations by writes and the rows cached in process.
+    """
+    return HttpResponse.success(data=entityCache.stats())
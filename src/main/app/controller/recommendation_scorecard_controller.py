@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationScorecard REST Controller"""
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+from fastlib.response import ListResponse
+
+from src.main.app.mapper.recommendation_scorecard_mapper import (
+    recommendationScorecardMapper,
+)
+from src.main.app.schema.recommendation_scorecard_schema import (
+    ListRecommendationOutcomesRequest,
+    ListRecommendationScorecardsRequest,
+    RecommendationOutcome,
+    RecommendationScorecard,
+    RefreshRecommendationScorecardsRequest,
+    RefreshRecommendationScorecardsResponse,
+)
+from src.main.app.service.impl.recommendation_scorecard_service_impl import (
+    RecommendationScorecardServiceImpl,
+)
+from src.main.app.service.recommendation_scorecard_service import (
+    RecommendationScorecardService,
+)
+from src.main.app.utils.response_util import json_response
+
+recommendation_scorecard_router = APIRouter()
+recommendation_scorecard_service: RecommendationScorecardService = RecommendationScorecardServiceImpl(
+    mapper=recommendationScorecardMapper
+)
+
+
+@recommendation_scorecard_router.get("/recommendationScorecards")
+async def list_recommendation_scorecards(
+    req: Annotated[ListRecommendationScorecardsRequest, Query()],
+) -> ListResponse[RecommendationScorecard]:
+    """
+    List analyst and institution scorecards with pagination.
+
+    Args:
+
+        req: Request object containing pagination, filter and sort parameters.
+
+    Returns:
+
+        ListResponse: Paginated list of recommendation_scorecards and total count.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    scorecard_records, total = await recommendation_scorecard_service.list_recommendation_scorecards(req=req)
+    return json_response(
+        ListResponse[RecommendationScorecard], records=scorecard_records, total=total
+    )
+
+
+@recommendation_scorecard_router.get("/recommendationOutcomes")
+async def list_recommendation_outcomes(
+    req: Annotated[ListRecommendationOutcomesRequest, Query()],
+) -> ListResponse[RecommendationOutcome]:
+    """
+    List evaluated recommendation outcomes with pagination.
+
+    Args:
+
+        req: Request object containing pagination, filter and sort parameters.
+
+    Returns:
+
+        ListResponse: Paginated list of recommendation_outcomes and total count.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    outcome_records, total = await recommendation_scorecard_service.list_recommendation_outcomes(req=req)
+    return json_response(ListResponse[RecommendationOutcome], records=outcome_records, total=total)
+
+
+@recommendation_scorecard_router.post("/recommendationScorecards:refresh")
+async def refresh_recommendation_scorecards(
+    req: RefreshRecommendationScorecardsRequest,
+) -> RefreshRecommendationScorecardsResponse:
+    """
+    Evaluate pending recommendations against the latest bars and rebuild the
+    scorecards they contribute to.
+
+    Args:
+
+        req: Request object optionally restricting the refresh to some stocks.
+
+    Returns:
+
+        RefreshRecommendationScorecardsResponse: Number of evaluated and finalized
+        recommendations and of rebuilt scorecards.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    return await recommendation_scorecard_service.refresh_recommendation_scorecards(req=req)
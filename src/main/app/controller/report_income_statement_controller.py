@@ -8,6 +8,7 @@ from fastapi import APIRouter, Query, Form
 from starlette.responses import StreamingResponse
 
 from src.main.app.mapper.report_income_statement_mapper import reportIncomeStatementMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.report_income_statement_model import ReportIncomeStatementModel
 from src.main.app.schema.report_income_statement_schema import (
     ListReportIncomeStatementsRequest,
@@ -28,11 +29,13 @@ from src.main.app.schema.report_income_statement_schema import (
 )
 from src.main.app.service.impl.report_income_statement_service_impl import ReportIncomeStatementServiceImpl
 from src.main.app.service.report_income_statement_service import ReportIncomeStatementService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 report_income_statement_router = APIRouter()
 report_income_statement_service: ReportIncomeStatementService = ReportIncomeStatementServiceImpl(mapper=reportIncomeStatementMapper)
 
 @report_income_statement_router.post("/reportIncomeStatements:syncManually")
+@rate_limit("2/minute")
 async def sync_stocks_manual(year: int, quarter: int):
     """
     手动同步 akshare 的股票利润表信息。
@@ -59,7 +62,7 @@ async def get_report_income_statement(id: int) -> ReportIncomeStatementDetail:
         HTTPException(404 Not Found): If the requested report_income_statement does not exist.
     """
     report_income_statement_record: ReportIncomeStatementModel = await report_income_statement_service.get_report_income_statement(id=id)
-    return ReportIncomeStatementDetail(**report_income_statement_record.model_dump())
+    return ReportIncomeStatementDetail.model_validate(report_income_statement_record, from_attributes=True)
 
 
 @report_income_statement_router.get("/reportIncomeStatements")
@@ -82,7 +85,34 @@ async def list_report_income_statements(
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     report_income_statement_records, total = await report_income_statement_service.list_report_income_statements(req=req)
-    return ListResponse(records=report_income_statement_records, total=total)
+    return json_response(
+        ListResponse[ReportIncomeStatement], records=report_income_statement_records, total=total
+    )
+
+
+@report_income_statement_router.get("/reportIncomeStatements:stream")
+async def stream_report_income_statements(
+    req: Annotated[ListReportIncomeStatementsRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every report_income_statement matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the report_income_statements, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await report_income_statement_service.stream_report_income_statements(req=req)
+    return ndjson_response(ReportIncomeStatement, chunks)
 
 
 @report_income_statement_router.post("/reportIncomeStatements")
@@ -106,7 +136,7 @@ async def creat_report_income_statement(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     report_income_statement: ReportIncomeStatementModel = await report_income_statement_service.create_report_income_statement(req=req)
-    return ReportIncomeStatement(**report_income_statement.model_dump())
+    return ReportIncomeStatement.model_validate(report_income_statement, from_attributes=True)
 
 
 @report_income_statement_router.put("/reportIncomeStatements")
@@ -130,7 +160,7 @@ async def update_report_income_statement(
         HTTPException(404 Not Found): If the report_income_statement to update doesn't exist.
     """
     report_income_statement: ReportIncomeStatementModel = await report_income_statement_service.update_report_income_statement(req=req)
-    return ReportIncomeStatement(**report_income_statement.model_dump())
+    return ReportIncomeStatement.model_validate(report_income_statement, from_attributes=True)
 
 
 @report_income_statement_router.delete("/reportIncomeStatements/{id}")
@@ -321,15 +351,13 @@ async def delete_report_income_statement(
 #         req (UploadFile): The Excel file containing report_income_statement data to import.
 # 
 #     Returns:
-#         ImportReportIncomeStatementsResponse: List of successfully parsed report_income_statement data.
+#         ImportReportIncomeStatementsResponse: Import counts and the errors of the invalid rows.
 # 
 #     Raises:
 #         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
 #         HTTPException(403 Forbidden): If the current user lacks access rights.
 #     """
 # 
-#     import_report_income_statements_resp: list[ImportReportIncomeStatement] = await report_income_statement_service.import_report_income_statements(
-#         req=req
-#     )
-#     return ImportReportIncomeStatementsResponse(report_income_statements=import_report_income_statements_resp)
+#     import_result = await report_income_statement_service.import_report_income_statements(req=req)
+#     return ImportReportIncomeStatementsResponse.model_validate(import_result, from_attributes=True)
 # 
\ No newline at end of file
@@ -21,12 +21,14 @@ from typing import Annotated
 from fastapi import APIRouter, Query, Form
 from starlette.responses import StreamingResponse
 
-from fastlib.response import ListResponse
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception import BusinessException
+from src.main.app.mapper.dict_datum_mapper import dictDatumMapper
 from src.main.app.mapper.role_mapper import roleMapper
 from src.main.app.mapper.role_menu_mapper import roleMenuMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.role_model import RoleModel
+from src.main.app.schema.dict_datum_schema import LabeledListResponse
 from src.main.app.schema.role_menu_schema import (
     BatchCreateRoleMenusRequest,
     CreateRoleMenu,
@@ -48,17 +50,20 @@ from src.main.app.schema.role_schema import (
     ImportRolesResponse,
     BatchGetRolesResponse,
     ImportRolesRequest,
-    ImportRole,
     BatchPatchRolesRequest,
 )
+from src.main.app.service.impl.dict_datum_service_impl import DictDatumServiceImpl
 from src.main.app.service.impl.role_menu_service_impl import RoleMenuServiceImpl
 from src.main.app.service.impl.role_service_impl import RoleServiceImpl
+from src.main.app.service.dict_datum_service import DictDatumService
 from src.main.app.service.role_menu_service import RoleMenuService
 from src.main.app.service.role_service import RoleService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 role_router = APIRouter()
 role_service: RoleService = RoleServiceImpl(mapper=roleMapper)
 role_menu_service: RoleMenuService = RoleMenuServiceImpl(mapper=roleMenuMapper)
+dict_datum_service: DictDatumService = DictDatumServiceImpl(mapper=dictDatumMapper)
 
 
 @role_router.get("/roles/{id}")
@@ -89,7 +94,7 @@ async def get_role(id: int) -> RoleDetail:
 @role_router.get("/roles")
 async def list_roles(
     req: Annotated[ListRolesRequest, Query()],
-) -> ListResponse[Role]:
+) -> LabeledListResponse[Role]:
     """
     List roles with pagination.
 
@@ -99,14 +104,45 @@ async def list_roles(
 
     Returns:
 
-        ListResponse: Paginated list of roles and total count.
+        LabeledListResponse: Paginated list of roles and total count, with the
+        labels of its dictionary-backed fields when with_labels is set.
 
     Raises:
 
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     role_records, total = await role_service.list_roles(req=req)
-    return ListResponse(records=role_records, total=total)
+    labels = None
+    if req.with_labels:
+        labels = await dict_datum_service.resolve_dict_labels(records=role_records, schema=Role)
+    return json_response(
+        LabeledListResponse[Role], records=role_records, total=total, labels=labels
+    )
+
+
+@role_router.get("/roles:stream")
+async def stream_roles(
+    req: Annotated[ListRolesRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every role matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the roles, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await role_service.stream_roles(req=req)
+    return ndjson_response(Role, chunks)
 
 
 @role_router.post("/roles")
@@ -137,7 +173,7 @@ async def creat_role(
     await role_menu_service.batch_create_role_menus(
         req=BatchCreateRoleMenusRequest(role_menus=role_menu_list)
     )
-    return Role(**role.model_dump())
+    return Role.model_validate(role, from_attributes=True)
 
 
 @role_router.put("/roles")
@@ -176,7 +212,7 @@ async def update_role(
     await role_menu_service.batch_create_role_menus(
         req=BatchCreateRoleMenusRequest(role_menus=role_menu_list)
     )
-    return Role(**role.model_dump())
+    return Role.model_validate(role, from_attributes=True)
 
 
 @role_router.delete("/roles/{id}")
@@ -220,7 +256,7 @@ async def batch_get_roles(
     """
     role_records: list[RoleModel] = await role_service.batch_get_roles(ids)
     role_detail_list: list[RoleDetail] = [
-        RoleDetail(**role_record.model_dump()) for role_record in role_records
+        RoleDetail.model_validate(role_record, from_attributes=True) for role_record in role_records
     ]
     return BatchGetRolesResponse(roles=role_detail_list)
 
@@ -247,7 +283,7 @@ async def batch_create_roles(
     """
 
     role_records = await role_service.batch_create_roles(req=req)
-    role_list: list[Role] = [Role(**role_record.model_dump()) for role_record in role_records]
+    role_list: list[Role] = [Role.model_validate(role_record, from_attributes=True) for role_record in role_records]
     return BatchCreateRolesResponse(roles=role_list)
 
 
@@ -272,7 +308,7 @@ async def batch_update_roles(
         HTTPException 404 (Not Found): If any specified role ID doesn't exist
     """
     role_records: list[RoleModel] = await role_service.batch_update_roles(req=req)
-    role_list: list[Role] = [Role(**role.model_dump()) for role in role_records]
+    role_list: list[Role] = [Role.model_validate(role, from_attributes=True) for role in role_records]
     return BatchUpdateRolesResponse(roles=role_list)
 
 
@@ -297,7 +333,7 @@ async def batch_patch_roles(
         HTTPException 404 (Not Found): If any specified role ID doesn't exist
     """
     role_records: list[RoleModel] = await role_service.batch_patch_roles(req=req)
-    role_list: list[Role] = [Role(**role.model_dump()) for role in role_records]
+    role_list: list[Role] = [Role.model_validate(role, from_attributes=True) for role in role_records]
     return BatchUpdateRolesResponse(roles=role_list)
 
 
@@ -334,6 +370,7 @@ async def export_roles_template() -> StreamingResponse:
 
 
 @role_router.get("/roles:export")
+@rate_limit("10/minute")
 async def export_roles(
     req: ExportRolesRequest = Query(...),
 ) -> StreamingResponse:
@@ -366,12 +403,12 @@ async def import_roles(
         req (UploadFile): The Excel file containing role data to import.
 
     Returns:
-        ImportRolesResponse: List of successfully parsed role data.
+        ImportRolesResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_roles_resp: list[ImportRole] = await role_service.import_roles(req=req)
-    return ImportRolesResponse(roles=import_roles_resp)
+    import_result = await role_service.import_roles(req=req)
+    return ImportRolesResponse.model_validate(import_result, from_attributes=True)
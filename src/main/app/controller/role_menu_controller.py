@@ -22,6 +22,7 @@ from starlette.responses import StreamingResponse
 
 from fastlib.response import ListResponse
 from src.main.app.mapper.role_menu_mapper import roleMenuMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.role_menu_model import RoleMenuModel
 from src.main.app.schema.role_menu_schema import (
     ListRoleMenusRequest,
@@ -38,11 +39,11 @@ from src.main.app.schema.role_menu_schema import (
     ImportRoleMenusResponse,
     BatchGetRoleMenusResponse,
     ImportRoleMenusRequest,
-    ImportRoleMenu,
     BatchPatchRoleMenusRequest,
 )
 from src.main.app.service.impl.role_menu_service_impl import RoleMenuServiceImpl
 from src.main.app.service.role_menu_service import RoleMenuService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 role_menu_router = APIRouter()
 role_menu_service: RoleMenuService = RoleMenuServiceImpl(mapper=roleMenuMapper)
@@ -67,7 +68,7 @@ async def get_role_menu(id: int) -> RoleMenuDetail:
         HTTPException(404 Not Found): If the requested role_menu does not exist.
     """
     role_menu_record: RoleMenuModel = await role_menu_service.get_role_menu(id=id)
-    return RoleMenuDetail(**role_menu_record.model_dump())
+    return RoleMenuDetail.model_validate(role_menu_record, from_attributes=True)
 
 
 @role_menu_router.get("/roleMenus")
@@ -90,7 +91,32 @@ async def list_role_menus(
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     role_menu_records, total = await role_menu_service.list_role_menus(req=req)
-    return ListResponse(records=role_menu_records, total=total)
+    return json_response(ListResponse[RoleMenu], records=role_menu_records, total=total)
+
+
+@role_menu_router.get("/roleMenus:stream")
+async def stream_role_menus(
+    req: Annotated[ListRoleMenusRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every role_menu matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the role_menus, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await role_menu_service.stream_role_menus(req=req)
+    return ndjson_response(RoleMenu, chunks)
 
 
 @role_menu_router.post("/roleMenus")
@@ -114,7 +140,7 @@ async def creat_role_menu(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     role_menu: RoleMenuModel = await role_menu_service.create_role_menu(req=req)
-    return RoleMenu(**role_menu.model_dump())
+    return RoleMenu.model_validate(role_menu, from_attributes=True)
 
 
 @role_menu_router.put("/roleMenus")
@@ -138,7 +164,7 @@ async def update_role_menu(
         HTTPException(404 Not Found): If the role_menu to update doesn't exist.
     """
     role_menu: RoleMenuModel = await role_menu_service.update_role_menu(req=req)
-    return RoleMenu(**role_menu.model_dump())
+    return RoleMenu.model_validate(role_menu, from_attributes=True)
 
 
 @role_menu_router.delete("/roleMenus/{id}")
@@ -182,7 +208,7 @@ async def batch_get_role_menus(
     """
     role_menu_records: list[RoleMenuModel] = await role_menu_service.batch_get_role_menus(ids)
     role_menu_detail_list: list[RoleMenuDetail] = [
-        RoleMenuDetail(**role_menu_record.model_dump()) for role_menu_record in role_menu_records
+        RoleMenuDetail.model_validate(role_menu_record, from_attributes=True) for role_menu_record in role_menu_records
     ]
     return BatchGetRoleMenusResponse(role_menus=role_menu_detail_list)
 
@@ -210,7 +236,7 @@ async def batch_create_role_menus(
 
     role_menu_records = await role_menu_service.batch_create_role_menus(req=req)
     role_menu_list: list[RoleMenu] = [
-        RoleMenu(**role_menu_record.model_dump()) for role_menu_record in role_menu_records
+        RoleMenu.model_validate(role_menu_record, from_attributes=True) for role_menu_record in role_menu_records
     ]
     return BatchCreateRoleMenusResponse(role_menus=role_menu_list)
 
@@ -239,7 +265,7 @@ async def batch_update_role_menus(
         req=req
     )
     role_menu_list: list[RoleMenu] = [
-        RoleMenu(**role_menu.model_dump()) for role_menu in role_menu_records
+        RoleMenu.model_validate(role_menu, from_attributes=True) for role_menu in role_menu_records
     ]
     return BatchUpdateRoleMenusResponse(role_menus=role_menu_list)
 
@@ -266,7 +292,7 @@ async def batch_patch_role_menus(
     """
     role_menu_records: list[RoleMenuModel] = await role_menu_service.batch_patch_role_menus(req=req)
     role_menu_list: list[RoleMenu] = [
-        RoleMenu(**role_menu.model_dump()) for role_menu in role_menu_records
+        RoleMenu.model_validate(role_menu, from_attributes=True) for role_menu in role_menu_records
     ]
     return BatchUpdateRoleMenusResponse(role_menus=role_menu_list)
 
@@ -304,6 +330,7 @@ async def export_role_menus_template() -> StreamingResponse:
 
 
 @role_menu_router.get("/roleMenus:export")
+@rate_limit("10/minute")
 async def export_role_menus(
     req: ExportRoleMenusRequest = Query(...),
 ) -> StreamingResponse:
@@ -336,14 +363,12 @@ async def import_role_menus(
         req (UploadFile): The Excel file containing role_menu data to import.
 
     Returns:
-        ImportRoleMenusResponse: List of successfully parsed role_menu data.
+        ImportRoleMenusResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_role_menus_resp: list[ImportRoleMenu] = await role_menu_service.import_role_menus(
-        req=req
-    )
-    return ImportRoleMenusResponse(role_menus=import_role_menus_resp)
+    import_result = await role_menu_service.import_role_menus(req=req)
+    return ImportRoleMenusResponse.model_validate(import_result, from_attributes=True)
@@ -28,6 +28,7 @@
 # )
 # from src.main.app.service.impl.stock_capital_flow_service_impl import StockCapitalFlowServiceImpl
 # from src.main.app.service.stock_capital_flow_service import StockCapitalFlowService
+# from src.main.app.utils.response_util import ndjson_response
 
 # stock_capital_flow_router = APIRouter()
 # stock_capital_flow_service: StockCapitalFlowService = StockCapitalFlowServiceImpl(mapper=stockCapitalFlowMapper)
@@ -78,6 +79,31 @@
 #     return ListResponse(records=stock_capital_flow_records, total=total)
 
 
+# @stock_capital_flow_router.get("/stockCapitalFlows:stream")
+# async def stream_stock_capital_flows(
+#     req: Annotated[ListStockCapitalFlowsRequest, Query()],
+# ) -> StreamingResponse:
+#     """
+#     Stream every stock_capital_flow matching the filters, one JSON record per line.
+
+#     Args:
+
+#         req: Request object containing filter and sort parameters, the
+#         pagination parameters are ignored.
+
+#     Returns:
+
+#         StreamingResponse: Newline-delimited JSON of the stock_capital_flows, read by a
+#         single query on a server-side cursor.
+
+#     Raises:
+
+#         HTTPException(403 Forbidden): If user don't have access rights.
+#     """
+#     chunks = await stock_capital_flow_service.stream_stock_capital_flows(req=req)
+#     return ndjson_response(StockCapitalFlow, chunks)
+
+
 # @stock_capital_flow_router.post("/stockCapitalFlows")
 # async def creat_stock_capital_flow(
 #     req: CreateStockCapitalFlowRequest,
@@ -314,14 +340,12 @@
 #         req (UploadFile): The Excel file containing stock_capital_flow data to import.
 
 #     Returns:
-#         ImportStockCapitalFlowsResponse: List of successfully parsed stock_capital_flow data.
+#         ImportStockCapitalFlowsResponse: Import counts and the errors of the invalid rows.
 
 #     Raises:
 #         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
 #         HTTPException(403 Forbidden): If the current user lacks access rights.
 #     """
 
-#     import_stock_capital_flows_resp: list[ImportStockCapitalFlow] = await stock_capital_flow_service.import_stock_capital_flows(
-#         req=req
-#     )
-#     return ImportStockCapitalFlowsResponse(stock_capital_flows=import_stock_capital_flows_resp)
\ No newline at end of file
+#     import_result = await stock_capital_flow_service.import_stock_capital_flows(req=req)
+#     return ImportStockCapitalFlowsResponse.model_validate(import_result, from_attributes=True)
\ No newline at end of file
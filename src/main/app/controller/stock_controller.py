@@ -7,7 +7,11 @@ from fastlib.response import ListResponse, HttpResponse
 from fastapi import APIRouter, Query, Form
 from starlette.responses import StreamingResponse
 
+from src.main.app.mapper.dict_datum_mapper import dictDatumMapper
+from src.main.app.mapper.intelligence_information_mapper import intelligenceInformationMapper
+from src.main.app.mapper.stock_daily_recommendation_mapper import stockDailyRecommendationMapper
 from src.main.app.mapper.stock_mapper import stockMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.stock_model import StockModel
 from src.main.app.schema.stock_schema import (
     ListStocksRequest,
@@ -24,15 +28,36 @@ from src.main.app.schema.stock_schema import (
     ImportStocksResponse,
     BatchGetStocksResponse,
     ImportStocksRequest,
-    ImportStock, BatchPatchStocksRequest,
+    BatchPatchStocksRequest,
 )
+from src.main.app.schema.intelligence_information_schema import (
+    LatestNews,
+    ListLatestNewsRequest,
+    ListLatestNewsResponse,
+)
+from src.main.app.schema.stock_daily_recommendation_schema import (
+    ActiveRecommendation,
+    ListActiveRecommendationsRequest,
+    ListActiveRecommendationsResponse,
+)
+from src.main.app.service.impl.dict_datum_service_impl import DictDatumServiceImpl
+from src.main.app.service.impl.intelligence_information_service_impl import IntelligenceInformationServiceImpl
+from src.main.app.service.impl.stock_daily_recommendation_service_impl import StockDailyRecommendationServiceImpl
 from src.main.app.service.impl.stock_service_impl import StockServiceImpl
+from src.main.app.service.dict_datum_service import DictDatumService
+from src.main.app.service.intelligence_information_service import IntelligenceInformationService
+from src.main.app.service.stock_daily_recommendation_service import StockDailyRecommendationService
 from src.main.app.service.stock_service import StockService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 stock_router = APIRouter()
 stock_service: StockService = StockServiceImpl(mapper=stockMapper)
+intelligence_information_service: IntelligenceInformationService = IntelligenceInformationServiceImpl(mapper=intelligenceInformationMapper)
+stock_daily_recommendation_service: StockDailyRecommendationService = StockDailyRecommendationServiceImpl(mapper=stockDailyRecommendationMapper)
+dict_datum_service: DictDatumService = DictDatumServiceImpl(mapper=dictDatumMapper)
 
 @stock_router.post("/stocks:syncManually")
+@rate_limit("2/minute")
 async def sync_stocks_manual():
     """
     手动同步 akshare 的股票基础数据。
@@ -40,6 +65,64 @@ async def sync_stocks_manual():
     await stock_service.sync_manually()
     return HttpResponse.success()
 
+@stock_router.get("/stocks:latestNews")
+async def list_latest_news(
+    req: Annotated[ListLatestNewsRequest, Query()],
+) -> ListLatestNewsResponse:
+    """
+    List the latest news headers of a stock for the stock detail page.
+
+    Args:
+
+        req: Request object containing the full stock symbol and the number of items.
+
+    Returns:
+
+        ListLatestNewsResponse: News headers ordered by publish time, newest first,
+        with the labels of the impact fields when with_labels is set.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    news_list = await intelligence_information_service.list_latest_news(req=req)
+    labels = None
+    if req.with_labels:
+        labels = await dict_datum_service.resolve_dict_labels(records=news_list, schema=LatestNews)
+    return json_response(ListLatestNewsResponse, records=news_list, labels=labels)
+
+
+@stock_router.get("/stocks:activeRecommendations")
+async def list_active_recommendations(
+    req: Annotated[ListActiveRecommendationsRequest, Query()],
+) -> ListActiveRecommendationsResponse:
+    """
+    List the recommendations that have not expired, for one stock or for all stocks.
+
+    Args:
+
+        req: Request object containing an optional full stock symbol.
+
+    Returns:
+
+        ListActiveRecommendationsResponse: Active recommendations, soonest expiring first,
+        with the labels of the risk levels when with_labels is set.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    recommendation_list = await stock_daily_recommendation_service.list_active_recommendations(req=req)
+    labels = None
+    if req.with_labels:
+        labels = await dict_datum_service.resolve_dict_labels(
+            records=recommendation_list, schema=ActiveRecommendation
+        )
+    return json_response(
+        ListActiveRecommendationsResponse, records=recommendation_list, labels=labels
+    )
+
+
 @stock_router.get("/stocks/{id}")
 async def get_stock(id: int) -> StockDetail:
     """
@@ -59,7 +142,7 @@ async def get_stock(id: int) -> StockDetail:
         HTTPException(404 Not Found): If the requested stock does not exist.
     """
     stock_record: StockModel = await stock_service.get_stock(id=id)
-    return StockDetail(**stock_record.model_dump())
+    return StockDetail.model_validate(stock_record, from_attributes=True)
 
 
 @stock_router.get("/stocks")
@@ -82,7 +165,32 @@ async def list_stocks(
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     stock_records, total = await stock_service.list_stocks(req=req)
-    return ListResponse(records=stock_records, total=total)
+    return json_response(ListResponse[Stock], records=stock_records, total=total)
+
+
+@stock_router.get("/stocks:stream")
+async def stream_stocks(
+    req: Annotated[ListStocksRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every stock matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the stocks, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await stock_service.stream_stocks(req=req)
+    return ndjson_response(Stock, chunks)
 
 
 @stock_router.post("/stocks")
@@ -106,7 +214,7 @@ async def creat_stock(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     stock: StockModel = await stock_service.create_stock(req=req)
-    return Stock(**stock.model_dump())
+    return Stock.model_validate(stock, from_attributes=True)
 
 
 @stock_router.put("/stocks")
@@ -130,7 +238,7 @@ async def update_stock(
         HTTPException(404 Not Found): If the stock to update doesn't exist.
     """
     stock: StockModel = await stock_service.update_stock(req=req)
-    return Stock(**stock.model_dump())
+    return Stock.model_validate(stock, from_attributes=True)
 
 
 @stock_router.delete("/stocks/{id}")
@@ -174,7 +282,7 @@ async def batch_get_stocks(
     """
     stock_records: list[StockModel] = await stock_service.batch_get_stocks(ids)
     stock_detail_list: list[StockDetail] = [
-        StockDetail(**stock_record.model_dump()) for stock_record in stock_records
+        StockDetail.model_validate(stock_record, from_attributes=True) for stock_record in stock_records
     ]
     return BatchGetStocksResponse(stocks=stock_detail_list)
 
@@ -202,7 +310,7 @@ async def batch_create_stocks(
 
     stock_records = await stock_service.batch_create_stocks(req=req)
     stock_list: list[Stock] = [
-        Stock(**stock_record.model_dump()) for stock_record in stock_records
+        Stock.model_validate(stock_record, from_attributes=True) for stock_record in stock_records
     ]
     return BatchCreateStocksResponse(stocks=stock_list)
 
@@ -228,7 +336,7 @@ async def batch_update_stocks(
         HTTPException 404 (Not Found): If any specified stock ID doesn't exist
     """
     stock_records: list[StockModel] = await stock_service.batch_update_stocks(req=req)
-    stock_list: list[Stock] = [Stock(**stock.model_dump()) for stock in stock_records]
+    stock_list: list[Stock] = [Stock.model_validate(stock, from_attributes=True) for stock in stock_records]
     return BatchUpdateStocksResponse(stocks=stock_list)
 
 
@@ -253,7 +361,7 @@ async def batch_patch_stocks(
         HTTPException 404 (Not Found): If any specified stock ID doesn't exist
     """
     stock_records: list[StockModel] = await stock_service.batch_patch_stocks(req=req)
-    stock_list: list[Stock] = [Stock(**stock.model_dump()) for stock in stock_records]
+    stock_list: list[Stock] = [Stock.model_validate(stock, from_attributes=True) for stock in stock_records]
     return BatchUpdateStocksResponse(stocks=stock_list)
 
 
@@ -290,6 +398,7 @@ async def export_stocks_template() -> StreamingResponse:
 
 
 @stock_router.get("/stocks:export")
+@rate_limit("10/minute")
 async def export_stocks(
     req: ExportStocksRequest = Query(...),
 ) -> StreamingResponse:
@@ -321,14 +430,12 @@ async def import_stocks(
         req (UploadFile): The Excel file containing stock data to import.
 
     Returns:
-        ImportStocksResponse: List of successfully parsed stock data.
+        ImportStocksResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_stocks_resp: list[ImportStock] = await stock_service.import_stocks(
-        req=req
-    )
-    return ImportStocksResponse(stocks=import_stocks_resp)
\ No newline at end of file
+    import_result = await stock_service.import_stocks(req=req)
+    return ImportStocksResponse.model_validate(import_result, from_attributes=True)
\ No newline at end of file
@@ -28,6 +28,7 @@
 # )
 # from src.main.app.service.impl.stock_daily_info_service_impl import StockDailyInfoServiceImpl
 # from src.main.app.service.stock_daily_info_service import StockDailyInfoService
+# from src.main.app.utils.response_util import ndjson_response
 
 # stock_daily_info_router = APIRouter()
 # stock_daily_info_service: StockDailyInfoService = StockDailyInfoServiceImpl(mapper=stockDailyInfoMapper)
@@ -78,6 +79,31 @@
 #     return ListResponse(records=stock_daily_info_records, total=total)
 
 
+# @stock_daily_info_router.get("/stockDailyInfos:stream")
+# async def stream_stock_daily_infos(
+#     req: Annotated[ListStockDailyInfosRequest, Query()],
+# ) -> StreamingResponse:
+#     """
+#     Stream every stock_daily_info matching the filters, one JSON record per line.
+
+#     Args:
+
+#         req: Request object containing filter and sort parameters, the
+#         pagination parameters are ignored.
+
+#     Returns:
+
+#         StreamingResponse: Newline-delimited JSON of the stock_daily_infos, read by a
+#         single query on a server-side cursor.
+
+#     Raises:
+
+#         HTTPException(403 Forbidden): If user don't have access rights.
+#     """
+#     chunks = await stock_daily_info_service.stream_stock_daily_infos(req=req)
+#     return ndjson_response(StockDailyInfo, chunks)
+
+
 # @stock_daily_info_router.post("/stockDailyInfos")
 # async def creat_stock_daily_info(
 #     req: CreateStockDailyInfoRequest,
@@ -314,14 +340,12 @@
 #         req (UploadFile): The Excel file containing stock_daily_info data to import.
 
 #     Returns:
-#         ImportStockDailyInfosResponse: List of successfully parsed stock_daily_info data.
+#         ImportStockDailyInfosResponse: Import counts and the errors of the invalid rows.
 
 #     Raises:
 #         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
 #         HTTPException(403 Forbidden): If the current user lacks access rights.
 #     """
 
-#     import_stock_daily_infos_resp: list[ImportStockDailyInfo] = await stock_daily_info_service.import_stock_daily_infos(
-#         req=req
-#     )
-#     return ImportStockDailyInfosResponse(stock_daily_infos=import_stock_daily_infos_resp)
\ No newline at end of file
+#     import_result = await stock_daily_info_service.import_stock_daily_infos(req=req)
+#     return ImportStockDailyInfosResponse.model_validate(import_result, from_attributes=True)
\ No newline at end of file
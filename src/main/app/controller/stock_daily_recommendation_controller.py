@@ -28,6 +28,7 @@
 # )
 # from src.main.app.service.impl.stock_daily_recommendation_service_impl import StockDailyRecommendationServiceImpl
 # from src.main.app.service.stock_daily_recommendation_service import StockDailyRecommendationService
+# from src.main.app.utils.response_util import ndjson_response
 
 # stock_daily_recommendation_router = APIRouter()
 # stock_daily_recommendation_service: StockDailyRecommendationService = StockDailyRecommendationServiceImpl(mapper=stockDailyRecommendationMapper)
@@ -78,6 +79,31 @@
 #     return ListResponse(records=stock_daily_recommendation_records, total=total)
 
 
+# @stock_daily_recommendation_router.get("/stockDailyRecommendations:stream")
+# async def stream_stock_daily_recommendations(
+#     req: Annotated[ListStockDailyRecommendationsRequest, Query()],
+# ) -> StreamingResponse:
+#     """
+#     Stream every stock_daily_recommendation matching the filters, one JSON record per line.
+
+#     Args:
+
+#         req: Request object containing filter and sort parameters, the
+#         pagination parameters are ignored.
+
+#     Returns:
+
+#         StreamingResponse: Newline-delimited JSON of the stock_daily_recommendations, read by a
+#         single query on a server-side cursor.
+
+#     Raises:
+
+#         HTTPException(403 Forbidden): If user don't have access rights.
+#     """
+#     chunks = await stock_daily_recommendation_service.stream_stock_daily_recommendations(req=req)
+#     return ndjson_response(StockDailyRecommendation, chunks)
+
+
 # @stock_daily_recommendation_router.post("/stockDailyRecommendations")
 # async def creat_stock_daily_recommendation(
 #     req: CreateStockDailyRecommendationRequest,
@@ -314,14 +340,12 @@
 #         req (UploadFile): The Excel file containing stock_daily_recommendation data to import.
 
 #     Returns:
-#         ImportStockDailyRecommendationsResponse: List of successfully parsed stock_daily_recommendation data.
+#         ImportStockDailyRecommendationsResponse: Import counts and the errors of the invalid rows.
 
 #     Raises:
 #         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
 #         HTTPException(403 Forbidden): If the current user lacks access rights.
 #     """
 
-#     import_stock_daily_recommendations_resp: list[ImportStockDailyRecommendation] = await stock_daily_recommendation_service.import_stock_daily_recommendations(
-#         req=req
-#     )
-#     return ImportStockDailyRecommendationsResponse(stock_daily_recommendations=import_stock_daily_recommendations_resp)
\ No newline at end of file
+#     import_result = await stock_daily_recommendation_service.import_stock_daily_recommendations(req=req)
+#     return ImportStockDailyRecommendationsResponse.model_validate(import_result, from_attributes=True)
\ No newline at end of file
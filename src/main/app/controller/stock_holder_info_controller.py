@@ -28,6 +28,7 @@
 # )
 # from src.main.app.service.impl.stock_holder_info_service_impl import StockHolderInfoServiceImpl
 # from src.main.app.service.stock_holder_info_service import StockHolderInfoService
+# from src.main.app.utils.response_util import ndjson_response
 
 # stock_holder_info_router = APIRouter()
 # stock_holder_info_service: StockHolderInfoService = StockHolderInfoServiceImpl(mapper=stockHolderInfoMapper)
@@ -78,6 +79,31 @@
 #     return ListResponse(records=stock_holder_info_records, total=total)
 
 
+# @stock_holder_info_router.get("/stockHolderInfos:stream")
+# async def stream_stock_holder_infos(
+#     req: Annotated[ListStockHolderInfosRequest, Query()],
+# ) -> StreamingResponse:
+#     """
+#     Stream every stock_holder_info matching the filters, one JSON record per line.
+
+#     Args:
+
+#         req: Request object containing filter and sort parameters, the
+#         pagination parameters are ignored.
+
+#     Returns:
+
+#         StreamingResponse: Newline-delimited JSON of the stock_holder_infos, read by a
+#         single query on a server-side cursor.
+
+#     Raises:
+
+#         HTTPException(403 Forbidden): If user don't have access rights.
+#     """
+#     chunks = await stock_holder_info_service.stream_stock_holder_infos(req=req)
+#     return ndjson_response(StockHolderInfo, chunks)
+
+
 # @stock_holder_info_router.post("/stockHolderInfos")
 # async def creat_stock_holder_info(
 #     req: CreateStockHolderInfoRequest,
@@ -314,14 +340,12 @@
 #         req (UploadFile): The Excel file containing stock_holder_info data to import.
 
 #     Returns:
-#         ImportStockHolderInfosResponse: List of successfully parsed stock_holder_info data.
+#         ImportStockHolderInfosResponse: Import counts and the errors of the invalid rows.
 
 #     Raises:
 #         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
 #         HTTPException(403 Forbidden): If the current user lacks access rights.
 #     """
 
-#     import_stock_holder_infos_resp: list[ImportStockHolderInfo] = await stock_holder_info_service.import_stock_holder_infos(
-#         req=req
-#     )
-#     return ImportStockHolderInfosResponse(stock_holder_infos=import_stock_holder_infos_resp)
\ No newline at end of file
+#     import_result = await stock_holder_info_service.import_stock_holder_infos(req=req)
+#     return ImportStockHolderInfosResponse.model_validate(import_result, from_attributes=True)
\ No newline at end of file
@@ -20,9 +20,11 @@ from typing import Annotated
 from fastapi import APIRouter, Query, Form
 from starlette.responses import StreamingResponse
 
-from fastlib.response import ListResponse
+from src.main.app.mapper.dict_datum_mapper import dictDatumMapper
 from src.main.app.mapper.user_mapper import userMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.user_model import UserModel
+from src.main.app.schema.dict_datum_schema import LabeledListResponse
 from src.main.app.schema.user_schema import (
     ListUsersRequest,
     User,
@@ -38,14 +40,17 @@ from src.main.app.schema.user_schema import (
     ImportUsersResponse,
     BatchGetUsersResponse,
     ImportUsersRequest,
-    ImportUser,
     BatchPatchUsersRequest,
 )
+from src.main.app.service.impl.dict_datum_service_impl import DictDatumServiceImpl
 from src.main.app.service.impl.user_service_impl import UserServiceImpl
+from src.main.app.service.dict_datum_service import DictDatumService
 from src.main.app.service.user_service import UserService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 user_router = APIRouter()
 user_service: UserService = UserServiceImpl(mapper=userMapper)
+dict_datum_service: DictDatumService = DictDatumServiceImpl(mapper=dictDatumMapper)
 
 
 @user_router.get("/users/{id}")
@@ -67,13 +72,13 @@ async def get_user(id: int) -> UserDetail:
         HTTPException(404 Not Found): If the requested user does not exist.
     """
     user_record: UserModel = await user_service.get_user(id=id)
-    return UserDetail(**user_record.model_dump())
+    return UserDetail.model_validate(user_record, from_attributes=True)
 
 
 @user_router.get("/users")
 async def list_users(
     req: Annotated[ListUsersRequest, Query()],
-) -> ListResponse[User]:
+) -> LabeledListResponse[User]:
     """
     List users with pagination.
 
@@ -83,14 +88,45 @@ async def list_users(
 
     Returns:
 
-        ListResponse: Paginated list of users and total count.
+        LabeledListResponse: Paginated list of users and total count, with the
+        labels of its dictionary-backed fields when with_labels is set.
 
     Raises:
 
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     user_records, total = await user_service.list_users(req=req)
-    return ListResponse(records=user_records, total=total)
+    labels = None
+    if req.with_labels:
+        labels = await dict_datum_service.resolve_dict_labels(records=user_records, schema=User)
+    return json_response(
+        LabeledListResponse[User], records=user_records, total=total, labels=labels
+    )
+
+
+@user_router.get("/users:stream")
+async def stream_users(
+    req: Annotated[ListUsersRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every user matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the users, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await user_service.stream_users(req=req)
+    return ndjson_response(User, chunks)
 
 
 @user_router.post("/users")
@@ -114,7 +150,7 @@ async def creat_user(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     user: UserModel = await user_service.create_user(req=req)
-    return User(**user.model_dump())
+    return User.model_validate(user, from_attributes=True)
 
 
 @user_router.put("/users")
@@ -138,7 +174,7 @@ async def update_user(
         HTTPException(404 Not Found): If the user to update doesn't exist.
     """
     user: UserModel = await user_service.update_user(req=req)
-    return User(**user.model_dump())
+    return User.model_validate(user, from_attributes=True)
 
 
 @user_router.delete("/users/{id}")
@@ -182,7 +218,7 @@ async def batch_get_users(
     """
     user_records: list[UserModel] = await user_service.batch_get_users(ids)
     user_detail_list: list[UserDetail] = [
-        UserDetail(**user_record.model_dump()) for user_record in user_records
+        UserDetail.model_validate(user_record, from_attributes=True) for user_record in user_records
     ]
     return BatchGetUsersResponse(users=user_detail_list)
 
@@ -209,7 +245,7 @@ async def batch_create_users(
     """
 
     user_records = await user_service.batch_create_users(req=req)
-    user_list: list[User] = [User(**user_record.model_dump()) for user_record in user_records]
+    user_list: list[User] = [User.model_validate(user_record, from_attributes=True) for user_record in user_records]
     return BatchCreateUsersResponse(users=user_list)
 
 
@@ -234,7 +270,7 @@ async def batch_update_users(
         HTTPException 404 (Not Found): If any specified user ID doesn't exist
     """
     user_records: list[UserModel] = await user_service.batch_update_users(req=req)
-    user_list: list[User] = [User(**user.model_dump()) for user in user_records]
+    user_list: list[User] = [User.model_validate(user, from_attributes=True) for user in user_records]
     return BatchUpdateUsersResponse(users=user_list)
 
 
@@ -259,7 +295,7 @@ async def batch_patch_users(
         HTTPException 404 (Not Found): If any specified user ID doesn't exist
     """
     user_records: list[UserModel] = await user_service.batch_patch_users(req=req)
-    user_list: list[User] = [User(**user.model_dump()) for user in user_records]
+    user_list: list[User] = [User.model_validate(user, from_attributes=True) for user in user_records]
     return BatchUpdateUsersResponse(users=user_list)
 
 
@@ -296,6 +332,7 @@ async def export_users_template() -> StreamingResponse:
 
 
 @user_router.get("/users:export")
+@rate_limit("10/minute")
 async def export_users(
     req: ExportUsersRequest = Query(...),
 ) -> StreamingResponse:
@@ -328,12 +365,12 @@ async def import_users(
         req (UploadFile): The Excel file containing user data to import.
 
     Returns:
-        ImportUsersResponse: List of successfully parsed user data.
+        ImportUsersResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_users_resp: list[ImportUser] = await user_service.import_users(req=req)
-    return ImportUsersResponse(users=import_users_resp)
+    import_result = await user_service.import_users(req=req)
+    return ImportUsersResponse.model_validate(import_result, from_attributes=True)
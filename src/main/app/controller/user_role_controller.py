@@ -23,6 +23,7 @@ from starlette.responses import StreamingResponse
 
 from fastlib.response import ListResponse
 from src.main.app.mapper.user_role_mapper import userRoleMapper
+from src.main.app.middleware import rate_limit
 from src.main.app.model.user_role_model import UserRoleModel
 from src.main.app.schema.user_role_schema import (
     ListUserRolesRequest,
@@ -39,12 +40,12 @@ from src.main.app.schema.user_role_schema import (
     ImportUserRolesResponse,
     BatchGetUserRolesResponse,
     ImportUserRolesRequest,
-    ImportUserRole,
     BatchPatchUserRolesRequest,
     AssignUserRoles,
 )
 from src.main.app.service.impl.user_role_service_impl import UserRoleServiceImpl
 from src.main.app.service.user_role_service import UserRoleService
+from src.main.app.utils.response_util import json_response, ndjson_response
 
 user_role_router = APIRouter()
 user_role_service: UserRoleService = UserRoleServiceImpl(mapper=userRoleMapper)
@@ -87,7 +88,7 @@ async def get_user_role(id: int) -> UserRoleDetail:
         HTTPException(404 Not Found): If the requested user_role does not exist.
     """
     user_role_record: UserRoleModel = await user_role_service.get_user_role(id=id)
-    return UserRoleDetail(**user_role_record.model_dump())
+    return UserRoleDetail.model_validate(user_role_record, from_attributes=True)
 
 
 @user_role_router.get("/userRoles")
@@ -110,7 +111,32 @@ async def list_user_roles(
         HTTPException(403 Forbidden): If user don't have access rights.
     """
     user_role_records, total = await user_role_service.list_user_roles(req=req)
-    return ListResponse(records=user_role_records, total=total)
+    return json_response(ListResponse[UserRole], records=user_role_records, total=total)
+
+
+@user_role_router.get("/userRoles:stream")
+async def stream_user_roles(
+    req: Annotated[ListUserRolesRequest, Query()],
+) -> StreamingResponse:
+    """
+    Stream every user_role matching the filters, one JSON record per line.
+
+    Args:
+
+        req: Request object containing filter and sort parameters, the
+        pagination parameters are ignored.
+
+    Returns:
+
+        StreamingResponse: Newline-delimited JSON of the user_roles, read by a
+        single query on a server-side cursor.
+
+    Raises:
+
+        HTTPException(403 Forbidden): If user don't have access rights.
+    """
+    chunks = await user_role_service.stream_user_roles(req=req)
+    return ndjson_response(UserRole, chunks)
 
 
 @user_role_router.post("/userRoles")
@@ -134,7 +160,7 @@ async def creat_user_role(
         HTTPException(409 Conflict): If the creation data already exists.
     """
     user_role: UserRoleModel = await user_role_service.create_user_role(req=req)
-    return UserRole(**user_role.model_dump())
+    return UserRole.model_validate(user_role, from_attributes=True)
 
 
 @user_role_router.put("/userRoles")
@@ -158,7 +184,7 @@ async def update_user_role(
         HTTPException(404 Not Found): If the user_role to update doesn't exist.
     """
     user_role: UserRoleModel = await user_role_service.update_user_role(req=req)
-    return UserRole(**user_role.model_dump())
+    return UserRole.model_validate(user_role, from_attributes=True)
 
 
 @user_role_router.delete("/userRoles/{id}")
@@ -202,7 +228,7 @@ async def batch_get_user_roles(
     """
     user_role_records: list[UserRoleModel] = await user_role_service.batch_get_user_roles(ids)
     user_role_detail_list: list[UserRoleDetail] = [
-        UserRoleDetail(**user_role_record.model_dump()) for user_role_record in user_role_records
+        UserRoleDetail.model_validate(user_role_record, from_attributes=True) for user_role_record in user_role_records
     ]
     return BatchGetUserRolesResponse(user_roles=user_role_detail_list)
 
@@ -230,7 +256,7 @@ async def batch_create_user_roles(
 
     user_role_records = await user_role_service.batch_create_user_roles(req=req)
     user_role_list: list[UserRole] = [
-        UserRole(**user_role_record.model_dump()) for user_role_record in user_role_records
+        UserRole.model_validate(user_role_record, from_attributes=True) for user_role_record in user_role_records
     ]
     return BatchCreateUserRolesResponse(user_roles=user_role_list)
 
@@ -259,7 +285,7 @@ async def batch_update_user_roles(
         req=req
     )
     user_role_list: list[UserRole] = [
-        UserRole(**user_role.model_dump()) for user_role in user_role_records
+        UserRole.model_validate(user_role, from_attributes=True) for user_role in user_role_records
     ]
     return BatchUpdateUserRolesResponse(user_roles=user_role_list)
 
@@ -286,7 +312,7 @@ async def batch_patch_user_roles(
     """
     user_role_records: list[UserRoleModel] = await user_role_service.batch_patch_user_roles(req=req)
     user_role_list: list[UserRole] = [
-        UserRole(**user_role.model_dump()) for user_role in user_role_records
+        UserRole.model_validate(user_role, from_attributes=True) for user_role in user_role_records
     ]
     return BatchUpdateUserRolesResponse(user_roles=user_role_list)
 
@@ -324,6 +350,7 @@ async def export_user_roles_template() -> StreamingResponse:
 
 
 @user_role_router.get("/userRoles:export")
+@rate_limit("10/minute")
 async def export_user_roles(
     req: ExportUserRolesRequest = Query(...),
 ) -> StreamingResponse:
@@ -356,14 +383,12 @@ async def import_user_roles(
         req (UploadFile): The Excel file containing user_role data to import.
 
     Returns:
-        ImportUserRolesResponse: List of successfully parsed user_role data.
+        ImportUserRolesResponse: Import counts and the errors of the invalid rows.
 
     Raises:
         HTTPException(400 Bad Request): If the uploaded file is invalid or cannot be parsed.
         HTTPException(403 Forbidden): If the current user lacks access rights.
     """
 
-    import_user_roles_resp: list[ImportUserRole] = await user_role_service.import_user_roles(
-        req=req
-    )
-    return ImportUserRolesResponse(user_roles=import_user_roles_resp)
+    import_result = await user_role_service.import_user_roles(req=req)
+    return ImportUserRolesResponse.model_validate(import_result, from_attributes=True)
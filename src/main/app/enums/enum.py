@@ -10,6 +10,12 @@ class TokenTypeEnum(str, Enum):
     refresh = "refresh"
     bearer = "Bearer"
 
+class ScorecardScopeEnum(str, Enum):
+    """Dimensions recommendation scorecards are aggregated by."""
+
+    analyst = "analyst"
+    institution = "institution"
+
 class UserStatusEnum(Enum):
     """User Status Enum"""
 
@@ -17,6 +17,12 @@ class AuthErrorCode:
     TOKEN_EXPIRED = ErrorDetail(
         code=HTTPStatus.UNAUTHORIZED, message="Token has expired"
     )
+    TOKEN_REVOKED = ErrorDetail(
+        code=HTTPStatus.UNAUTHORIZED, message="Token has been revoked"
+    )
+    PERMISSION_DENIED = ErrorDetail(
+        code=HTTPStatus.FORBIDDEN, message="Permission denied"
+    )
     OPENAPI_FORBIDDEN = ErrorDetail(
         code=HTTPStatus.FORBIDDEN, message="OpenAPI is not ready"
     )
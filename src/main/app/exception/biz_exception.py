@@ -17,6 +17,10 @@ class BusinessErrorCode:
     MENU_NAME_EXISTS = ErrorDetail(
         code=HTTPStatus.CONFLICT, message="Menu name already exists"
     )
+    MENU_MOVE_CYCLE = ErrorDetail(
+        code=HTTPStatus.BAD_REQUEST,
+        message="Menu cannot be moved under itself or its descendants",
+    )
 
     RESOURCE_NOT_FOUND = ErrorDetail(
         code=HTTPStatus.NOT_FOUND, message="Requested resource not found"
@@ -26,6 +30,10 @@ class BusinessErrorCode:
         code=HTTPStatus.BAD_REQUEST, message="Parameter error"
     )
 
+    RATE_LIMITED = ErrorDetail(
+        code=HTTPStatus.TOO_MANY_REQUESTS, message="Too many requests"
+    )
+
 
 class BusinessException(BaseException):
     def __init__(
@@ -3,11 +3,13 @@
 
 from __future__ import annotations
 
+from datetime import datetime
+from sqlalchemy import Row
 from sqlmodel import select
 from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.bank_capital_info_model import BankCapitalInfoModel
 
 
@@ -87,6 +89,24 @@ class BankCapitalInfoMapper(SqlModelMapper[BankCapitalInfoModel]):
         )
         return result.all()
 
+    async def select_cross_section(
+        self,
+        *,
+        fields: list[str],
+        trade_date_list: list[datetime],
+        db_session: Optional[AsyncSession] = None,
+    ) -> list[Row]:
+        """
+        Retrieve the given fields of every bank on the given trade dates.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(*[getattr(self.model, field) for field in fields]).where(
+                self.model.trade_date.in_(trade_date_list)
+            )
+        )
+        return result.all()
+
 
 
 bankCapitalInfoMapper = BankCapitalInfoMapper(BankCapitalInfoModel)
\ No newline at end of file
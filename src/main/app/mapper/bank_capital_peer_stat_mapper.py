@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: MIT
+"""BankCapitalPeerStat mapper"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.model.bank_capital_peer_stat_model import BankCapitalPeerStatModel
+
+
+class BankCapitalPeerStatMapper(SqlModelMapper[BankCapitalPeerStatModel]):
+
+    async def delete_by_trade_date_list(
+        self, *, trade_date_list: list[datetime], db_session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Delete records by list of trade_date.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            delete(self.model).where(self.model.trade_date.in_(trade_date_list))
+        )
+        return result.rowcount
+
+
+bankCapitalPeerStatMapper = BankCapitalPeerStatMapper(BankCapitalPeerStatModel)
@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: MIT
+"""Base mapper of the application"""
+
+from __future__ import annotations
+
+from typing import Any, ClassVar, Optional, TypeVar
+
+from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper as _SqlModelMapper
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.cache.entity_cache import entityCache, written_in
+from src.main.app.mapper.db_session import db
+
+ModelType = TypeVar("ModelType", bound=SQLModel)
+
+
+class SqlModelMapper(_SqlModelMapper[ModelType]):
+    """
+    ``fastlib``'s SqlModelMapper, on the session of ``mapper.db_session.db``.
+
+    A mapper opts in to the entity cache by listing in ``cached_fields`` the
+    unique fields its single-row lookups are cached by; ``select_by_id`` goes
+    through the cache when ``id`` is one of them.
+    """
+
+    cached_fields: ClassVar[tuple[str, ...]] = ()
+
+    def __init__(self, model: type[ModelType]):
+        super().__init__(model)
+        self.db = db
+        self._table = model.__table__.name
+        if self.cached_fields:
+            entityCache.register(self._table)
+
+    async def select_by_id(
+        self,
+        *,
+        id: Any,
+        fields: Optional[list[str]] = None,
+        schema: Optional[type[SQLModel]] = None,
+        db_session: Optional[AsyncSession] = None,
+    ) -> Any:
+        if "id" in self.cached_fields and fields is None and schema is None:
+            return await self.select_one_by(field="id", value=id, db_session=db_session)
+        return await super().select_by_id(
+            id=id, fields=fields, schema=schema, db_session=db_session
+        )
+
+    async def select_one_by(
+        self, *, field: str, value: Any, db_session: Optional[AsyncSession] = None
+    ) -> Optional[ModelType]:
+        """
+        Retrieve the record whose unique ``field`` is ``value``, from the
+        entity cache if the field is cached.
+
+        A cached record is attached to the session as if it had been loaded,
+        without a query nor a connection; a session that wrote to the table
+        in its ongoing transaction reads from the database.
+        """
+        db_session = db_session or self.db.session
+        statement = select(self.model).where(getattr(self.model, field) == value)
+        if field not in self.cached_fields or written_in(db_session.sync_session, self._table):
+            return (await db_session.exec(statement)).one_or_none()
+        values, generations = await entityCache.get(self._table, field, value)
+        if values is not None:
+            return await self._attach(values, db_session)
+        record = (await db_session.exec(statement)).one_or_none()
+        if record is not None:
+            await entityCache.put(self._table, field, value, record.model_dump(), generations)
+        return record
+
+    async def _attach(self, values: dict[str, Any], db_session: AsyncSession) -> ModelType:
+        sync_session = db_session.sync_session
+        identity_key = self.model.__mapper__.identity_key_from_primary_key([values["id"]])
+        # The instance the session already holds, with its pending changes if any
+        record = sync_session.identity_map.get(identity_key)
+        if record is not None:
+            return record
+        record = self.model.model_validate(values)
+        make_transient_to_detached(record)
+        return await db_session.merge(record, load=False)
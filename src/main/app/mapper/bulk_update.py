@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: MIT
+"""Rows patched with different values in one UPDATE per set of changed fields"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Union
+
+from sqlalchemy import case, literal, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.mapper.base_mapper import SqlModelMapper
+
+# Bound parameters per statement, below the 32767 of SQLite and asyncpg
+_MAX_PARAMETERS = 30000
+
+
+def _primary_key(mapper: SqlModelMapper):
+    return mapper.model.__table__.primary_key.columns[0]
+
+
+def _group_by_fields(
+    columns, pk_name: str, items: Sequence[Mapping[str, Any]]
+) -> tuple[list[Any], dict[tuple[str, ...], dict[Any, dict[str, Any]]]]:
+    """
+    Ids of the items in request order, and their changes grouped by the
+    fields they set. Items of the same id are merged, a later one wins, as if
+    they were applied one after the other.
+    """
+    changes: dict[Any, dict[str, Any]] = {}
+    for item in items:
+        if item.get(pk_name) is None:
+            continue
+        fields = {
+            field: value
+            for field, value in item.items()
+            if field != pk_name and field in columns
+        }
+        changes.setdefault(item[pk_name], {}).update(fields)
+    groups: dict[tuple[str, ...], dict[Any, dict[str, Any]]] = {}
+    for key, fields in changes.items():
+        if fields:
+            groups.setdefault(tuple(sorted(fields)), {})[key] = fields
+    return list(changes), groups
+
+
+async def batch_patch(
+    mapper: SqlModelMapper,
+    items: Sequence[Mapping[str, Any]],
+    db_session: Union[AsyncSession, None] = None,
+) -> list[Any]:
+    """
+    Patch rows with values of their own and return the patched records.
+
+    Items are grouped by the set of fields they change, and each group is
+    written by one ``UPDATE ... SET field = CASE id WHEN .. THEN .. END``
+    statement instead of an UPDATE per item. Where the dialect supports
+    ``UPDATE ... RETURNING`` the statement also returns the patched rows,
+    otherwise they are selected once after the updates. The records are the
+    instances of the session, refreshed with the new values.
+
+    Args:
+        mapper: Mapper of the patched model.
+        items: Changed fields of each row, with its primary key. Items
+            without a primary key are skipped, as are fields that are not
+            columns of the table, such as the menu_ids of a role.
+        db_session: The database session to use.
+
+    Returns:
+        The records of the patched ids that exist, in request order.
+    """
+    db_session = db_session or mapper.db.session
+    model = mapper.model
+    pk = _primary_key(mapper)
+    columns = model.__table__.columns
+    ids, groups = _group_by_fields(columns, pk.name, items)
+    if not ids:
+        return []
+    connection = await db_session.connection()
+    returning = connection.dialect.update_returning
+    records: dict[Any, Any] = {}
+    for fields, changes in groups.items():
+        keys = list(changes)
+        step = max(_MAX_PARAMETERS // (2 * len(fields) + 1), 1)
+        for start in range(0, len(keys), step):
+            chunk = keys[start : start + step]
+            values = {
+                field: case(
+                    {
+                        key: literal(changes[key][field], type_=columns[field].type)
+                        for key in chunk
+                    },
+                    value=pk,
+                    else_=columns[field],
+                )
+                for field in fields
+            }
+            statement = (
+                update(model)
+                .where(pk.in_(chunk))
+                .values(values)
+                .execution_options(synchronize_session=False)
+            )
+            if not returning:
+                await db_session.exec(statement)
+                continue
+            statement = statement.returning(model).execution_options(populate_existing=True)
+            for record in (await db_session.exec(statement)).scalars():
+                records[getattr(record, pk.name)] = record
+    # Rows the dialect did not return or that had nothing to change, selected
+    # over the instances of the session which the updates left as they were
+    missing = [key for key in ids if key not in records]
+    for start in range(0, len(missing), _MAX_PARAMETERS):
+        statement = (
+            select(model)
+            .where(pk.in_(missing[start : start + _MAX_PARAMETERS]))
+            .execution_options(populate_existing=True)
+        )
+        for record in (await db_session.exec(statement)).all():
+            records[getattr(record, pk.name)] = record
+    return [records[key] for key in ids if key in records]
@@ -0,0 +1,243 @@
+# SPDX-License-Identifier: MIT
+"""Database session of a request, opened on first use"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_Session: Optional[async_sessionmaker] = None
+# Callbacks of a session to run once its transaction is committed
+_AFTER_COMMIT = "zeta_after_commit"
+
+
+class SessionStats:
+    """Counters of the database sessions of this process, since startup."""
+
+    __slots__ = ("requests", "request_sessions", "request_checkouts", "checkouts")
+
+    def __init__(self):
+        self.requests = 0
+        # Sessions opened and pool checkouts made while serving requests
+        self.request_sessions = 0
+        self.request_checkouts = 0
+        # Checkouts of every pool, requests or not
+        self.checkouts = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "requestSessions": self.request_sessions,
+            "requestCheckouts": self.request_checkouts,
+            "checkoutsPerRequest": round(self.request_checkouts / (self.requests or 1), 4),
+            "checkouts": self.checkouts,
+        }
+
+
+sessionStats = SessionStats()
+
+
+class _SessionScope:
+    """Session of a ``db()`` block or of a request, opened when first used."""
+
+    __slots__ = ("session_args", "commit_on_exit", "request", "session")
+
+    def __init__(self, session_args: dict, commit_on_exit: bool, request: bool = False):
+        self.session_args = session_args
+        self.commit_on_exit = commit_on_exit
+        self.request = request
+        self.session: Optional[AsyncSession] = None
+
+    def open(self) -> AsyncSession:
+        if self.session is None:
+            self.session = _Session(**self.session_args)
+            if self.request:
+                sessionStats.request_sessions += 1
+        return self.session
+
+    async def commit(self) -> None:
+        if self.session is not None and self.commit_on_exit:
+            await self.session.commit()
+
+    async def close(self, failed: bool) -> None:
+        session = self.session
+        if session is None:
+            return
+        try:
+            if failed:
+                await session.rollback()
+            elif self.commit_on_exit:
+                await session.commit()
+        finally:
+            await session.close()
+
+
+_scope: ContextVar[Optional[_SessionScope]] = ContextVar("_scope", default=None)
+
+
+def _on_checkout(*_: Any) -> None:
+    sessionStats.checkouts += 1
+    scope = _scope.get()
+    if scope is not None and scope.request:
+        sessionStats.request_checkouts += 1
+
+
+class DBSessionMeta(type):
+    """Metaclass for DBSession providing session property."""
+
+    @property
+    def session(cls) -> AsyncSession:
+        """Session of the current context, opened on first access."""
+        scope = _scope.get()
+        if _Session is None or scope is None:
+            raise RuntimeError("Session is not initialised")
+        return scope.open()
+
+
+class DBSession(metaclass=DBSessionMeta):
+    """
+    Context manager for database sessions, as ``fastlib``'s ``db``.
+
+    The session is only opened when ``db.session`` is first accessed within
+    the block, so that a block or a request not using the database neither
+    builds a session nor ends a transaction.
+    """
+
+    def __init__(self, session_args: dict = None, commit_on_exit: bool = False):
+        self.token = None
+        self.session_args = session_args or {}
+        self.commit_on_exit = commit_on_exit
+
+    async def __aenter__(self):
+        if _Session is None:
+            raise RuntimeError("Session is not initialised")
+        # A block within a request, as the body of a streamed response, counts for it
+        parent = _scope.get()
+        self.token = _scope.set(
+            _SessionScope(
+                self.session_args,
+                self.commit_on_exit,
+                request=parent is not None and parent.request,
+            )
+        )
+        return type(self)
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            await _scope.get().close(failed=exc_type is not None)
+        finally:
+            _scope.reset(self.token)
+
+
+db = DBSession
+
+
+class DBSessionMiddleware:
+    """
+    ASGI middleware giving every request a session opened on first use.
+
+    Replaces ``fastlib``'s ``SQLAlchemyMiddleware``: it is not a
+    ``BaseHTTPMiddleware``, so a request does not pay for an extra task and
+    stream, and requests that never access ``db.session``, such as probes,
+    static assets or rejected requests, neither build a session nor check a
+    connection out of the pool. The session of a request is committed before
+    the response starts, so that a failed commit still fails the request,
+    and rolled back if the request raises.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        custom_engine: AsyncEngine,
+        session_args: dict = None,
+        commit_on_exit: bool = True,
+    ):
+        global _Session
+        self.app = app
+        self.commit_on_exit = commit_on_exit
+        _Session = async_sessionmaker(
+            custom_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            **(session_args or {}),
+        )
+        if not event.contains(Pool, "checkout", _on_checkout):
+            event.listen(Pool, "checkout", _on_checkout)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        sessionStats.requests += 1
+        session_scope = _SessionScope({}, self.commit_on_exit, request=True)
+        token = _scope.set(session_scope)
+
+        async def send_committed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await session_scope.commit()
+            await send(message)
+
+        failed = True
+        try:
+            await self.app(scope, receive, send_committed)
+            failed = False
+        finally:
+            try:
+                await session_scope.close(failed)
+            finally:
+                _scope.reset(token)
+
+
+def after_commit(
+    callback: Callable[[], Awaitable[None]], session: Optional[AsyncSession] = None
+) -> None:
+    """
+    Run ``callback`` once the transaction of ``session``, by default the
+    session of the current context, is committed; it is dropped if the
+    transaction is rolled back.
+
+    Meant for the upkeep of caches after a write, so that they never hold
+    rows that were not committed. A failing callback is logged, the commit
+    stands.
+    """
+    session = session or DBSession.session
+    session.sync_session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+def _run_after_commit(session: Session) -> None:
+    callbacks = session.info.pop(_AFTER_COMMIT, None)
+    if not callbacks:
+        return
+    # Commits of an AsyncSession run in its greenlet, where they can be awaited
+    if not in_greenlet():
+        logger.warning(f"Dropped {len(callbacks)} callbacks committed outside an async session")
+        return
+    for callback in callbacks:
+        try:
+            await_only(callback())
+        except Exception as e:
+            logger.warning(f"Callback after commit failed: {e}")
+
+
+def _drop_after_commit(session: Session, *_: Any) -> None:
+    session.info.pop(_AFTER_COMMIT, None)
+
+
+event.listen(Session, "after_commit", _run_after_commit)
+event.listen(Session, "after_rollback", _drop_after_commit)
+
+
+def session_stats() -> dict[str, float]:
+    """Counters of the database sessions and pool checkouts of this process."""
+    return sessionStats.as_dict()
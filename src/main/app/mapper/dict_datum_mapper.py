@@ -16,12 +16,12 @@
 
 from __future__ import annotations
 
-from typing import Union
+from typing import Optional, Union
 
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.dict_datum_model import DictDatumModel
 
 
@@ -33,5 +33,30 @@ class DictDatumMapper(SqlModelMapper[DictDatumModel]):
         db_response = await db_session.exec(select(self.model).where(self.model.type.in_(data)))
         return db_response.all()
 
+    async def select_types_by_ids(
+        self, ids: list[int], db_session: Union[AsyncSession, None] = None
+    ) -> list[Optional[str]]:
+        """Select the distinct types of the given dictionary data."""
+        db_session = db_session or self.db.session
+        db_response = await db_session.exec(
+            select(self.model.type).where(self.model.id.in_(ids)).distinct()
+        )
+        return list(db_response.all())
+
+    async def select_options(
+        self, types: Optional[list[str]] = None, db_session: Union[AsyncSession, None] = None
+    ) -> list[tuple[Optional[str], Optional[str], Optional[str]]]:
+        """
+        Select the (type, label, value) of the dictionary data of the given
+        types, of every type when ``types`` is None, ordered by type then sort.
+        """
+        db_session = db_session or self.db.session
+        statement = select(self.model.type, self.model.label, self.model.value)
+        if types is not None:
+            statement = statement.where(self.model.type.in_(types))
+        statement = statement.order_by(self.model.type, self.model.sort, self.model.id)
+        db_response = await db_session.exec(statement)
+        return [tuple(row) for row in db_response.all()]
+
 
 dictDatumMapper = DictDatumMapper(DictDatumModel)
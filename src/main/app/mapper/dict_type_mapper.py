@@ -15,12 +15,35 @@
 """DictType mapper"""
 
 from __future__ import annotations
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+
+from typing import Optional, Union
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.dict_type_model import DictTypeModel
 
 
 class DictTypeMapper(SqlModelMapper[DictTypeModel]):
-    pass
+    async def select_type_names(
+        self, types: Optional[list[str]] = None, db_session: Union[AsyncSession, None] = None
+    ) -> list[str]:
+        """Select the given dictionary types that exist, every type when ``types`` is None."""
+        db_session = db_session or self.db.session
+        statement = select(self.model.type).where(self.model.type.is_not(None))
+        if types is not None:
+            statement = statement.where(self.model.type.in_(types))
+        db_response = await db_session.exec(statement)
+        return list(db_response.all())
+
+    async def select_types_by_ids(
+        self, ids: list[int], db_session: Union[AsyncSession, None] = None
+    ) -> list[Optional[str]]:
+        """Select the types of the given dictionary types."""
+        db_session = db_session or self.db.session
+        db_response = await db_session.exec(select(self.model.type).where(self.model.id.in_(ids)))
+        return list(db_response.all())
 
 
 dictTypeMapper = DictTypeMapper(DictTypeModel)
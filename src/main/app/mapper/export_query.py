@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: MIT
+"""Rows of an export read from a server-side cursor, chunk by chunk"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Optional, Union
+
+from sqlalchemy import null
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.config import get_export_config
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.mapper.db_session import db
+
+
+def _primary_key(mapper: SqlModelMapper):
+    return mapper.model.__table__.primary_key.columns[0]
+
+
+async def exists_by_ids(
+    mapper: SqlModelMapper, ids: Sequence[Any], db_session: Union[AsyncSession, None] = None
+) -> bool:
+    """Whether any of the given ids exists in the table of a mapper."""
+    db_session = db_session or mapper.db.session
+    pk = _primary_key(mapper)
+    ids = list(ids)
+    step = get_export_config().ids_per_statement
+    for start in range(0, len(ids), step):
+        statement = select(pk).where(pk.in_(ids[start : start + step])).limit(1)
+        if (await db_session.exec(statement)).first() is not None:
+            return True
+    return False
+
+
+async def stream_rows_by_ids(
+    mapper: SqlModelMapper,
+    fields: Sequence[str],
+    ids: Sequence[Any],
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[list[tuple]]:
+    """
+    Yield the rows of the given ids in chunks, as tuples of the given fields.
+
+    Only the exported columns are selected, as plain rows: no ORM instance or
+    schema object is built. The rows are fetched from a server-side cursor,
+    ``chunk_size`` at a time, on a session of its own since the export is
+    sent after the request session is closed. Fields that are not columns of
+    the table are exported empty.
+
+    Args:
+        mapper: Mapper of the exported model.
+        fields: Exported fields, in column order of the workbook.
+        ids: Primary keys of the rows, exported in key order.
+        chunk_size: Rows per chunk, ``export.chunk_size`` when omitted.
+    """
+    config = get_export_config()
+    chunk_size = chunk_size or config.chunk_size
+    table_columns = mapper.model.__table__.columns
+    columns = [
+        table_columns[field] if field in table_columns else null().label(field)
+        for field in fields
+    ]
+    pk = _primary_key(mapper)
+    ids = sorted(set(ids))
+    step = config.ids_per_statement
+    async with db():
+        for start in range(0, len(ids), step):
+            statement = (
+                select(*columns)
+                .where(pk.in_(ids[start : start + step]))
+                .order_by(pk)
+                .execution_options(yield_per=chunk_size)
+            )
+            result = await db.session.stream(statement)
+            try:
+                async for rows in result.partitions():
+                    yield [tuple(row) for row in rows]
+            finally:
+                await result.close()
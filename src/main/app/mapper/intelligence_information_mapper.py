@@ -3,11 +3,12 @@
 
 from __future__ import annotations
 
-from sqlmodel import select
+from sqlmodel import func, select
 from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from fastlib.mapper.impl.base_mapper_impl import SchemaType
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.intelligence_information_model import IntelligenceInformationModel
 
 
@@ -37,7 +38,73 @@ class IntelligenceInformationMapper(SqlModelMapper[IntelligenceInformationModel]
         )
         return result.all()
 
+    async def select_latest_by_stock_symbol_full(
+        self,
+        *,
+        stock_symbol_full: str,
+        limit: int,
+        schema: type[SchemaType],
+        db_session: Optional[AsyncSession] = None,
+    ) -> list[SchemaType]:
+        """
+        Retrieve the newest records of a stock, selecting only the schema fields.
+        """
+        db_session = db_session or self.db.session
+        fields = self._get_fields_from_schema(schema)
+        statement = (
+            select(*[getattr(self.model, field) for field in fields])
+            .where(self.model.stock_symbol_full == stock_symbol_full)
+            .order_by(self.model.publish_time.desc())
+            .limit(limit)
+        )
+        result = await db_session.exec(statement)
+        return await self._convert_results(result.all(), fields, schema)
 
+    async def select_latest_per_stock(
+        self,
+        *,
+        limit: int,
+        max_stocks: int,
+        schema: type[SchemaType],
+        db_session: Optional[AsyncSession] = None,
+    ) -> list[SchemaType]:
+        """
+        Retrieve the newest ``limit`` records of each of the ``max_stocks`` most
+        recently active stocks in a single query, ordered by publish_time.
+        """
+        db_session = db_session or self.db.session
+        fields = self._get_fields_from_schema(schema)
+        recent_stocks = (
+            select(self.model.stock_symbol_full.label("recent_symbol"))
+            .where(self.model.stock_symbol_full.is_not(None))
+            .group_by(self.model.stock_symbol_full)
+            .order_by(func.max(self.model.publish_time).desc())
+            .limit(max_stocks)
+            .subquery()
+        )
+        row_number = (
+            func.row_number()
+            .over(
+                partition_by=self.model.stock_symbol_full,
+                order_by=self.model.publish_time.desc(),
+            )
+            .label("row_number")
+        )
+        ranked = (
+            select(*[getattr(self.model, field) for field in fields], row_number)
+            .join(
+                recent_stocks,
+                recent_stocks.c.recent_symbol == self.model.stock_symbol_full,
+            )
+            .subquery()
+        )
+        statement = (
+            select(*[ranked.c[field] for field in fields])
+            .where(ranked.c.row_number <= limit)
+            .order_by(ranked.c.publish_time)
+        )
+        result = await db_session.exec(statement)
+        return await self._convert_results(result.all(), fields, schema)
 
 
 intelligenceInformationMapper = IntelligenceInformationMapper(IntelligenceInformationModel)
\ No newline at end of file
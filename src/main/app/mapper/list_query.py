@@ -0,0 +1,299 @@
+# SPDX-License-Identifier: MIT
+"""List requests compiled once into filtered, sorted and paged statements"""
+
+from __future__ import annotations
+
+import functools
+import json
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, NamedTuple, Optional, Union
+
+from fastlib.request import ListRequest
+from sqlalchemy import ColumnElement, Integer, bindparam, func, null
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_export_config
+from src.main.app.exception.biz_exception import BusinessErrorCode, BusinessException
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.mapper.db_session import db
+
+# Escape character of the LIKE patterns built for prefix filters
+_LIKE_ESCAPE = "/"
+_MAX_STATEMENTS = 256
+_MAX_SORTS = 256
+
+
+class FilterOperator:
+    """
+    Operators of the fields of a List*Request, declared on the field as
+    ``Field(json_schema_extra={"filter": "prefix"})``. Fields
+    declaring none are filtered with EQ. The filtered column defaults to the
+    field name and is set with ``"column"``, as for ``gross_margin_min``.
+    """
+
+    EQ = "eq"
+    # List of values, the column equals any of them
+    IN = "in"
+    # [start, end] list, both inclusive
+    RANGE = "range"
+    # The column starts with the value, LIKE wildcards in it are escaped
+    PREFIX = "prefix"
+    GE = "ge"
+    LE = "le"
+
+
+class _FieldFilter(NamedTuple):
+    field: str
+    operator: str
+    clause: ColumnElement
+
+
+class CompiledListQuery:
+    """
+    Filters and sortable columns of a List*Request on a model, compiled once.
+
+    Every filter is a clause on bound parameters named after its field. The
+    statements of a combination of present filters and sort are built once
+    and kept, so a request only binds its values; the statements being equal
+    in structure, SQLAlchemy also reuses their compiled SQL. Sorting is only
+    allowed on indexed columns, a sort on any other column would scan and
+    sort the whole table on each page.
+    """
+
+    def __init__(self, request_schema: type[ListRequest], model: type):
+        columns = model.__table__.columns
+        self.model = model
+        self._filters: list[_FieldFilter] = []
+        for field, info in request_schema.model_fields.items():
+            if field in ListRequest.model_fields:
+                continue
+            extra = info.json_schema_extra if isinstance(info.json_schema_extra, dict) else {}
+            column = columns.get(extra.get("column", field))
+            if column is None:
+                continue
+            operator = extra.get("filter", FilterOperator.EQ)
+            clause = self._clause(field, operator, column)
+            self._filters.append(_FieldFilter(field, operator, clause))
+        self.sortable: dict[str, Any] = {
+            column.name: column for column in columns if column.primary_key or column.index
+        }
+        for constraint in [*model.__table__.indexes, *model.__table__.constraints]:
+            for column in getattr(constraint, "columns", ()):
+                self.sortable[column.name] = column
+        self._statements: LRUCache[tuple, tuple[Any, Any]] = LRUCache(max_size=_MAX_STATEMENTS)
+        self._sorts: LRUCache[str, tuple] = LRUCache(max_size=_MAX_SORTS)
+        self._streams: LRUCache[tuple, Any] = LRUCache(max_size=_MAX_STATEMENTS)
+
+    @staticmethod
+    def _clause(field: str, operator: str, column) -> ColumnElement:
+        if operator == FilterOperator.EQ:
+            return column == bindparam(f"f_{field}")
+        if operator == FilterOperator.IN:
+            return column.in_(bindparam(f"f_{field}", expanding=True))
+        if operator == FilterOperator.RANGE:
+            return column.between(bindparam(f"f_{field}_start"), bindparam(f"f_{field}_end"))
+        if operator == FilterOperator.PREFIX:
+            return column.like(bindparam(f"f_{field}"), escape=_LIKE_ESCAPE)
+        if operator == FilterOperator.GE:
+            return column >= bindparam(f"f_{field}")
+        if operator == FilterOperator.LE:
+            return column <= bindparam(f"f_{field}")
+        raise ValueError(f"Unknown filter operator {operator!r} of field {field!r}")
+
+    def bind(self, req: ListRequest) -> tuple[tuple[int, ...], dict[str, Any]]:
+        """Positions of the filters present in the request and their parameters."""
+        present: list[int] = []
+        params: dict[str, Any] = {}
+        for position, (field, operator, _) in enumerate(self._filters):
+            value = getattr(req, field)
+            if value is None or value == "" or value == []:
+                continue
+            if operator == FilterOperator.RANGE:
+                if len(value) != 2:
+                    raise BusinessException(
+                        BusinessErrorCode.PARAMETER_ERROR, f"{field} must be [start, end]"
+                    )
+                params[f"f_{field}_start"], params[f"f_{field}_end"] = value
+            elif operator == FilterOperator.PREFIX:
+                params[f"f_{field}"] = _escape_like(str(value)) + "%"
+            else:
+                params[f"f_{field}"] = value
+            present.append(position)
+        return tuple(present), params
+
+    def order_by(self, sort_str: Optional[str]) -> tuple:
+        """Order by clauses of a sort string, parsed and validated once."""
+        sort_str = sort_str or ""
+        order_by = self._sorts.get(sort_str)
+        if order_by is None:
+            columns = [(self._sort_column(field), order) for field, order in parse_sort(sort_str)]
+            order_by = tuple(
+                column.asc() if order == "asc" else column.desc() for column, order in columns
+            )
+            order_by = order_by or (self.model.__table__.primary_key.columns[0].asc(),)
+            self._sorts.put(sort_str, order_by)
+        return order_by
+
+    def _sort_column(self, field: str):
+        column = self.sortable.get(field)
+        if column is None:
+            raise BusinessException(
+                BusinessErrorCode.PARAMETER_ERROR, f"Sorting by {field} is not supported"
+            )
+        return column
+
+    def statements(self, present: tuple[int, ...], sort_str: Optional[str]) -> tuple[Any, Any]:
+        """Page and count statements of a combination of filters and sort."""
+        key = (present, sort_str or "")
+        statements = self._statements.get(key)
+        if statements is None:
+            clauses = [self._filters[position].clause for position in present]
+            page_statement = (
+                select(self.model)
+                .where(*clauses)
+                .order_by(*self.order_by(sort_str))
+                .offset(bindparam("page_offset", type_=Integer))
+                .limit(bindparam("page_limit", type_=Integer))
+            )
+            count_statement = select(func.count()).select_from(self.model).where(*clauses)
+            statements = (page_statement, count_statement)
+            self._statements.put(key, statements)
+        return statements
+
+    def stream_statement(
+        self, present: tuple[int, ...], sort_str: Optional[str], fields: tuple[str, ...]
+    ) -> Any:
+        """
+        Statement of every row of a combination of filters and sort, selecting
+        the given fields as plain columns. Fields that are not columns of the
+        table are selected as NULL.
+        """
+        key = (present, sort_str or "", fields)
+        statement = self._streams.get(key)
+        if statement is None:
+            table_columns = self.model.__table__.columns
+            columns = [
+                table_columns[field] if field in table_columns else null().label(field)
+                for field in fields
+            ]
+            clauses = [self._filters[position].clause for position in present]
+            statement = select(*columns).where(*clauses).order_by(*self.order_by(sort_str))
+            self._streams.put(key, statement)
+        return statement
+
+    async def select_page(
+        self, db_session: AsyncSession, req: ListRequest, default_sort: Optional[str] = None
+    ) -> tuple[list[Any], int]:
+        present, params = self.bind(req)
+        page_statement, count_statement = self.statements(present, req.sort_str or default_sort)
+        total = 0
+        if req.count:
+            total = (await db_session.exec(count_statement, params=params)).one()
+        params["page_offset"] = (req.current - 1) * req.page_size
+        params["page_limit"] = req.page_size
+        records = (await db_session.exec(page_statement, params=params)).all()
+        return list(records), total
+
+
+def _escape_like(value: str) -> str:
+    for char in (_LIKE_ESCAPE, "%", "_"):
+        value = value.replace(char, _LIKE_ESCAPE + char)
+    return value
+
+
+def parse_sort(sort_str: str) -> list[tuple[str, str]]:
+    """
+    Parse a sort string into (field, order) pairs.
+
+    Accepts the JSON list of ``{"field", "order"}`` objects sent by the
+    frontend, or ``"field:asc,field2:desc"``. An order other than ``asc`` is
+    descending.
+    """
+    sort_str = sort_str.strip()
+    if not sort_str:
+        return []
+    if sort_str.startswith("["):
+        try:
+            return [(item["field"], item.get("order", "asc")) for item in json.loads(sort_str)]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR, "Invalid sort_str") from None
+    sort_list = []
+    for item in sort_str.split(","):
+        field, _, order = item.strip().partition(":")
+        sort_list.append((field.strip(), order.strip() or "asc"))
+    return sort_list
+
+
+@functools.cache
+def compile_list_query(request_schema: type[ListRequest], model: type) -> CompiledListQuery:
+    return CompiledListQuery(request_schema, model)
+
+
+async def select_by_list_request(
+    mapper: SqlModelMapper,
+    req: ListRequest,
+    default_sort: Optional[str] = None,
+    db_session: Union[AsyncSession, None] = None,
+) -> tuple[list[Any], int]:
+    """
+    Select a page of the model of a mapper filtered and sorted as a
+    List*Request asks, with the total count if requested.
+
+    Args:
+        mapper: Mapper of the listed model.
+        req: The list request, its schema is compiled on first use.
+        default_sort: Sort string used when the request has none, by primary
+            key when omitted.
+        db_session: The database session to use.
+    """
+    db_session = db_session or mapper.db.session
+    query = compile_list_query(type(req), mapper.model)
+    return await query.select_page(db_session, req, default_sort=default_sort)
+
+
+async def _stream_rows(
+    statement: Any, params: dict[str, Any], chunk_size: int
+) -> AsyncGenerator[Sequence[Any], None]:
+    async with db():
+        result = await db.session.stream(
+            statement.execution_options(yield_per=chunk_size), params=params
+        )
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+
+def stream_by_list_request(
+    mapper: SqlModelMapper,
+    req: ListRequest,
+    fields: Sequence[str],
+    default_sort: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> AsyncGenerator[Sequence[Any], None]:
+    """
+    Rows of the model of a mapper filtered and sorted as a List*Request asks,
+    every one of them, read by a single query.
+
+    The paging fields of the request are ignored. The rows are fetched from a
+    server-side cursor ``chunk_size`` at a time, as plain rows of the given
+    fields, on a session of its own since they are sent after the request
+    session is closed. The filters and sort are checked before the generator
+    is returned, so that an invalid request fails before the stream starts;
+    the query runs on first iteration and closing the generator stops it.
+
+    Args:
+        mapper: Mapper of the listed model.
+        req: The list request, its schema is compiled on first use.
+        fields: Selected fields, rows are read by attribute.
+        default_sort: Sort string used when the request has none, by primary
+            key when omitted.
+        chunk_size: Rows per chunk, ``export.stream_chunk_size`` when omitted.
+    """
+    query = compile_list_query(type(req), mapper.model)
+    present, params = query.bind(req)
+    statement = query.stream_statement(present, req.sort_str or default_sort, tuple(fields))
+    return _stream_rows(statement, params, chunk_size or get_export_config().stream_chunk_size)
@@ -16,10 +16,12 @@
 
 from typing import Optional
 
+from sqlalchemy import case, func, literal, or_, update
+from sqlalchemy.orm import aliased
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.menu_model import MenuModel
 
 
@@ -44,5 +46,104 @@ class MenuMapper(SqlModelMapper[MenuModel]):
         result = await db_session.exec(select(self.model).where(self.model.name.in_(names)))
         return result.all()
 
+    async def select_all_menus(
+        self, *, db_session: Optional[AsyncSession] = None
+    ) -> list[MenuModel]:
+        """
+        Retrieve every menu record ordered by sort.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(select(self.model).order_by(self.model.sort, self.model.id))
+        return result.all()
+
+    async def select_subtrees(
+        self, *, tree_paths: list[str], db_session: Optional[AsyncSession] = None
+    ) -> list[MenuModel]:
+        """
+        Retrieve the menus under the given materialized paths, the subtree
+        roots included, ordered by sort.
+        """
+        if not tree_paths:
+            return []
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(self.model)
+            .where(or_(*[self.model.tree_path.startswith(tree_path) for tree_path in tree_paths]))
+            .order_by(self.model.sort, self.model.id)
+        )
+        return result.all()
+
+    async def select_subtree_by_id(
+        self, *, id: int, db_session: Optional[AsyncSession] = None
+    ) -> list[MenuModel]:
+        """
+        Retrieve a menu and all of its descendants ordered by sort.
+        """
+        db_session = db_session or self.db.session
+        root = aliased(self.model)
+        result = await db_session.exec(
+            select(self.model)
+            .join(root, self.model.tree_path.startswith(root.tree_path))
+            .where(root.id == id)
+            .order_by(self.model.sort, self.model.id)
+        )
+        return result.all()
+
+    async def select_ancestors_by_id(
+        self, *, id: int, db_session: Optional[AsyncSession] = None
+    ) -> list[MenuModel]:
+        """
+        Retrieve the ancestors of a menu ordered from the root down.
+        """
+        db_session = db_session or self.db.session
+        node = aliased(self.model)
+        result = await db_session.exec(
+            select(self.model)
+            .join(node, node.tree_path.startswith(self.model.tree_path))
+            .where(node.id == id, self.model.id != id)
+            .order_by(func.length(self.model.tree_path))
+        )
+        return result.all()
+
+    async def select_parent_links(
+        self, *, db_session: Optional[AsyncSession] = None
+    ) -> list[tuple[int, Optional[int], Optional[str]]]:
+        """
+        Retrieve (id, parent_id, tree_path) of every menu.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(self.model.id, self.model.parent_id, self.model.tree_path)
+        )
+        return result.all()
+
+    async def move_subtree(
+        self,
+        *,
+        id: int,
+        parent_id: Optional[int],
+        old_path: str,
+        new_path: str,
+        db_session: Optional[AsyncSession] = None,
+    ) -> int:
+        """
+        Move a menu and its descendants in a single statement: the prefix
+        ``old_path`` of every path in the subtree is replaced by ``new_path``
+        and the parent of the subtree root is set to ``parent_id``.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            update(self.model)
+            .where(self.model.tree_path.startswith(old_path))
+            .values(
+                tree_path=literal(new_path).concat(
+                    func.substr(self.model.tree_path, len(old_path) + 1)
+                ),
+                parent_id=case((self.model.id == id, parent_id), else_=self.model.parent_id),
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.rowcount
+
 
 menuMapper = MenuMapper(MenuModel)
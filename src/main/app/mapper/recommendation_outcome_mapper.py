@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationOutcome mapper"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import Row
+from sqlmodel import case, delete, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.model.recommendation_outcome_model import RecommendationOutcomeModel
+
+
+class RecommendationOutcomeMapper(SqlModelMapper[RecommendationOutcomeModel]):
+
+    async def delete_by_recommendation_id_list(
+        self, *, recommendation_id_list: list[int], db_session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Delete records by list of recommendation_id.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            delete(self.model).where(self.model.recommendation_id.in_(recommendation_id_list))
+        )
+        return result.rowcount
+
+    async def select_scorecard_stats(
+        self, *, scope: str, name_list: list[str], db_session: Optional[AsyncSession] = None
+    ) -> list[Row]:
+        """
+        Aggregate the evaluated outcomes of the given analysts or institutions.
+
+        Each row holds name, recommendation_count, final_count, hit_count,
+        avg_return, avg_excess_return and avg_max_drawdown. Returns are
+        averaged over final outcomes only, since they are measured at expiry.
+        """
+        db_session = db_session or self.db.session
+        name = getattr(self.model, scope)
+        is_final = self.model.is_final == 1
+        statement = (
+            select(
+                name,
+                func.count(self.model.id),
+                func.sum(self.model.is_final),
+                func.sum(self.model.is_target_hit),
+                func.avg(case((is_final, self.model.return_at_expiry))),
+                func.avg(case((is_final, self.model.excess_return))),
+                func.avg(self.model.max_drawdown),
+            )
+            .where(name.in_(name_list), self.model.bars_observed > 0)
+            .group_by(name)
+        )
+        result = await db_session.exec(statement)
+        return result.all()
+
+
+recommendationOutcomeMapper = RecommendationOutcomeMapper(RecommendationOutcomeModel)
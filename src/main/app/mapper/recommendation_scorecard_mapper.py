@@ -0,0 +1,32 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationScorecard mapper"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlmodel import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.model.recommendation_scorecard_model import (
+    RecommendationScorecardModel,
+)
+
+
+class RecommendationScorecardMapper(SqlModelMapper[RecommendationScorecardModel]):
+
+    async def delete_by_scope_and_name_list(
+        self, *, scope: str, name_list: list[str], db_session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Delete records of a scope by list of name.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            delete(self.model).where(self.model.scope == scope, self.model.name.in_(name_list))
+        )
+        return result.rowcount
+
+
+recommendationScorecardMapper = RecommendationScorecardMapper(RecommendationScorecardModel)
@@ -7,7 +7,7 @@ from sqlmodel import select
 from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.report_income_statement_model import ReportIncomeStatementModel
 
 
@@ -17,7 +17,7 @@
 from __future__ import annotations
 
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.role_model import RoleModel
 
 
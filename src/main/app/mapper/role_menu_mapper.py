@@ -19,7 +19,7 @@ from typing import Optional
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.role_menu_model import RoleMenuModel
 
 
@@ -34,5 +34,27 @@ class RoleMenuMapper(SqlModelMapper[RoleMenuModel]):
         result = await db_session.exec(select(self.model).where(self.model.role_id.in_(role_ids)))
         return result.all()
 
+    async def select_role_ids_by_menu_ids(
+        self, *, menu_ids: list[int], db_session: Optional[AsyncSession] = None
+    ) -> list[int]:
+        """
+        Retrieve the distinct ids of the roles granted any of the menus.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(self.model.role_id).where(self.model.menu_id.in_(menu_ids)).distinct()
+        )
+        return result.all()
+
+    async def select_role_menu_pairs(
+        self, *, db_session: Optional[AsyncSession] = None
+    ) -> list[tuple[int, int]]:
+        """
+        Retrieve the (role_id, menu_id) pairs of every record.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(select(self.model.role_id, self.model.menu_id))
+        return result.all()
+
 
 roleMenuMapper = RoleMenuMapper(RoleMenuModel)
@@ -3,11 +3,13 @@
 
 from __future__ import annotations
 
-from sqlmodel import select
+from datetime import datetime
+from sqlalchemy import Row
+from sqlmodel import func, select
 from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.stock_daily_info_model import StockDailyInfoModel
 
 
@@ -62,6 +64,40 @@ class StockDailyInfoMapper(SqlModelMapper[StockDailyInfoModel]):
         )
         return result.all()
 
+    async def select_price_path(
+        self,
+        *,
+        fields: list[str],
+        start_date: datetime,
+        end_date: Optional[datetime] = None,
+        stock_symbol_full_list: Optional[list[str]] = None,
+        db_session: Optional[AsyncSession] = None,
+    ) -> list[Row]:
+        """
+        Retrieve the given fields of the bars traded after start_date and up to
+        end_date, optionally restricted to some stocks.
+        """
+        db_session = db_session or self.db.session
+        statement = select(*[getattr(self.model, field) for field in fields]).where(
+            self.model.trade_date > start_date
+        )
+        if end_date is not None:
+            statement = statement.where(self.model.trade_date <= end_date)
+        if stock_symbol_full_list is not None:
+            statement = statement.where(self.model.stock_symbol_full.in_(stock_symbol_full_list))
+        result = await db_session.exec(statement)
+        return result.all()
+
+    async def select_latest_trade_date(
+        self, *, db_session: Optional[AsyncSession] = None
+    ) -> Optional[datetime]:
+        """
+        Retrieve the most recent trade_date.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(select(func.max(self.model.trade_date)))
+        return result.one_or_none()
+
 
 
 stockDailyInfoMapper = StockDailyInfoMapper(StockDailyInfoModel)
\ No newline at end of file
@@ -3,11 +3,15 @@
 
 from __future__ import annotations
 
-from sqlmodel import select
+from datetime import datetime
+from sqlalchemy import Row
+from sqlmodel import or_, select
 from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from fastlib.mapper.impl.base_mapper_impl import SchemaType
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.model.recommendation_outcome_model import RecommendationOutcomeModel
 from src.main.app.model.stock_daily_recommendation_model import StockDailyRecommendationModel
 
 
@@ -37,6 +41,66 @@ class StockDailyRecommendationMapper(SqlModelMapper[StockDailyRecommendationMode
         )
         return result.all()
 
+    async def select_pending_evaluation(
+        self,
+        *,
+        fields: list[str],
+        stock_symbol_full_list: Optional[list[str]] = None,
+        db_session: Optional[AsyncSession] = None,
+    ) -> list[Row]:
+        """
+        Retrieve the given fields of recommendations whose outcome is missing
+        or not final yet, optionally restricted to some stocks.
+        """
+        db_session = db_session or self.db.session
+        outcome = RecommendationOutcomeModel
+        statement = (
+            select(*[getattr(self.model, field) for field in fields])
+            .outerjoin(outcome, outcome.recommendation_id == self.model.id)
+            .where(or_(outcome.id.is_(None), outcome.is_final == 0))
+        )
+        if stock_symbol_full_list is not None:
+            statement = statement.where(self.model.stock_symbol_full.in_(stock_symbol_full_list))
+        result = await db_session.exec(statement)
+        return result.all()
+
+    async def select_active(
+        self,
+        *,
+        expiry_from: datetime,
+        schema: type[SchemaType],
+        db_session: Optional[AsyncSession] = None,
+    ) -> list[SchemaType]:
+        """
+        Retrieve the recommendations expiring on or after expiry_from,
+        selecting only the schema fields.
+        """
+        db_session = db_session or self.db.session
+        fields = self._get_fields_from_schema(schema)
+        result = await db_session.exec(
+            select(*[getattr(self.model, field) for field in fields]).where(
+                self.model.expiry_date >= expiry_from
+            )
+        )
+        return await self._convert_results(result.all(), fields, schema)
+
+    async def select_missing_expiry_date(
+        self, *, db_session: Optional[AsyncSession] = None
+    ) -> list[Row]:
+        """
+        Retrieve id, recommend_date and validity_period of the records whose
+        expiry_date has not been filled in yet.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(self.model.id, self.model.recommend_date, self.model.validity_period).where(
+                self.model.expiry_date.is_(None),
+                self.model.recommend_date.is_not(None),
+                self.model.validity_period.is_not(None),
+            )
+        )
+        return result.all()
+
 
 
 stockDailyRecommendationMapper = StockDailyRecommendationMapper(StockDailyRecommendationModel)
\ No newline at end of file
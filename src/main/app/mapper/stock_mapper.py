@@ -7,12 +7,13 @@ from sqlmodel import select
 from typing import Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.stock_model import StockModel
 
 
 class StockMapper(SqlModelMapper[StockModel]):
-    
+    cached_fields = ("id", "stock_code")
+
     async def select_all_stocks(
         self, db_session: Optional[AsyncSession] = None
     ) -> list[dict]:
@@ -135,11 +136,9 @@ class StockMapper(SqlModelMapper[StockModel]):
         """
         Retrieve a record by stock_code.
         """
-        db_session = db_session or self.db.session
-        result = await db_session.exec(
-            select(self.model).where(self.model.stock_code == stock_code)
+        return await self.select_one_by(
+            field="stock_code", value=stock_code, db_session=db_session
         )
-        return result.one_or_none()
 
     async def select_by_stock_code_list(
         self, *, stock_code_list: list[str], db_session: Optional[AsyncSession] = None
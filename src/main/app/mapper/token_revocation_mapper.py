@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: MIT
+"""TokenRevocation mapper"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.model.token_revocation_model import TokenRevocationModel
+
+
+class TokenRevocationMapper(SqlModelMapper[TokenRevocationModel]):
+
+    async def select_unexpired(
+        self, *, now: datetime, db_session: Optional[AsyncSession] = None
+    ) -> list[tuple[Optional[str], int, Optional[float]]]:
+        """
+        Retrieve the (token_digest, user_id, revoked_at) of the revocations
+        that have not expired yet.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(
+                self.model.token_digest, self.model.user_id, self.model.revoked_at
+            ).where(self.model.expires_at > now)
+        )
+        return result.all()
+
+    async def exists_by_token_digest(
+        self, *, token_digest: str, db_session: Optional[AsyncSession] = None
+    ) -> bool:
+        """
+        Whether a token digest is on the deny list.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(self.model.id).where(self.model.token_digest == token_digest).limit(1)
+        )
+        return result.first() is not None
+
+    async def delete_expired(
+        self, *, now: datetime, db_session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Delete the revocations whose tokens have expired anyway.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(delete(self.model).where(self.model.expires_at <= now))
+        return result.rowcount
+
+
+tokenRevocationMapper = TokenRevocationMapper(TokenRevocationModel)
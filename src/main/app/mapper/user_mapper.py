@@ -21,20 +21,20 @@ from typing import Optional
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.user_model import UserModel
 
 
 class UserMapper(SqlModelMapper[UserModel]):
+    cached_fields = ("id", "username")
+
     async def select_by_username(
         self, *, username: str, db_session: Optional[AsyncSession] = None
     ) -> Optional[UserModel]:
         """
         Retrieve a record by username.
         """
-        db_session = db_session or self.db.session
-        result = await db_session.exec(select(self.model).where(self.model.username == username))
-        return result.one_or_none()
+        return await self.select_one_by(field="username", value=username, db_session=db_session)
 
     async def select_by_username_list(
         self, *, username_list: list[str], db_session: Optional[AsyncSession] = None
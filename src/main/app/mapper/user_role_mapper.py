@@ -14,12 +14,37 @@
 #
 """UserRole mapper"""
 
-from fastlib.mapper.impl.base_mapper_impl import SqlModelMapper
+from typing import Optional
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.mapper.base_mapper import SqlModelMapper
 from src.main.app.model.user_role_model import UserRoleModel
 
 
 class UserRoleMapper(SqlModelMapper[UserRoleModel]):
-    pass
+    async def select_by_user_id(
+        self, *, user_id: int, db_session: Optional[AsyncSession] = None
+    ) -> list[UserRoleModel]:
+        """
+        Retrieve the role bindings of a user.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(select(self.model).where(self.model.user_id == user_id))
+        return result.all()
+
+    async def select_user_ids_by_role_ids(
+        self, *, role_ids: list[int], db_session: Optional[AsyncSession] = None
+    ) -> list[int]:
+        """
+        Retrieve the distinct ids of the users bound to any of the roles.
+        """
+        db_session = db_session or self.db.session
+        result = await db_session.exec(
+            select(self.model.user_id).where(self.model.role_id.in_(role_ids)).distinct()
+        )
+        return result.all()
 
 
 userRoleMapper = UserRoleMapper(UserRoleModel)
@@ -0,0 +1,24 @@
+"""Export application middleware symbols"""
+
+from src.main.app.middleware.jwt_middleware import get_current_user, jwt_middleware
+from src.main.app.middleware.permission_middleware import (
+    compile_route_permissions,
+    permission_middleware,
+)
+from src.main.app.middleware.rate_limit_middleware import (
+    compile_rate_limits,
+    rate_limit,
+    rate_limit_middleware,
+)
+from src.main.app.middleware.replica_middleware import replica_middleware
+
+__all__ = [
+    get_current_user,
+    jwt_middleware,
+    compile_route_permissions,
+    permission_middleware,
+    compile_rate_limits,
+    rate_limit,
+    rate_limit_middleware,
+    replica_middleware,
+]
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: MIT
+"""JWT middleware with a verified-token fast path and token revocation"""
+
+from __future__ import annotations
+
+import http
+from collections.abc import Callable
+
+from fastapi import Depends, Request
+from fastlib import ConfigManager
+from fastlib import constants as constant
+from fastlib.contextvars import clear_current_user, set_current_user
+from fastlib.contextvars import get_current_user as get_current_user_id
+from fastlib.enums import MediaTypeEnum
+from fastlib.logging.handlers import logger
+from fastlib.middleware.jwt import JWTErrorCode
+from fastlib.schema import CurrentUser
+from fastlib.security import get_oauth2_scheme
+from jwt.exceptions import PyJWTError
+from starlette.responses import JSONResponse
+
+from src.main.app.exception import AuthException
+from src.main.app.service.auth_service import AuthService
+from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
+
+server_config = ConfigManager.get_server_config()
+security_config = ConfigManager.get_security_config()
+auth_service: AuthService = AuthServiceImpl()
+
+if server_config.enable_api_prefix:
+    white_list_routes = {
+        server_config.api_prefix + route.strip()
+        for route in security_config.white_list_routes.split(",")
+    }
+else:
+    white_list_routes = {route.strip() for route in security_config.white_list_routes.split(",")}
+
+
+def _error_response(status_code: int, code: int, message: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"code": code, "message": message})
+
+
+async def jwt_middleware(request: Request, call_next):
+    """
+    Authenticate the request and bind its user to the request context.
+
+    Same routing rules as ``fastlib.middleware.jwt.jwt_middleware``, with the
+    token verified through ``AuthService.authenticate`` so that a token is
+    decoded once and revoked tokens are rejected.
+    """
+    raw_url_path = request.url.path
+    if (
+        server_config.enable_api_prefix
+        and server_config.api_prefix not in raw_url_path
+        or MediaTypeEnum.JSON.value in raw_url_path
+    ):
+        if security_config.enable_swagger:
+            return await call_next(request)
+        return _error_response(
+            http.HTTPStatus.FORBIDDEN,
+            JWTErrorCode.OPENAPI_FORBIDDEN.code,
+            JWTErrorCode.OPENAPI_FORBIDDEN.message,
+        )
+
+    if server_config.enable_api_prefix:
+        request_url_path = server_config.api_prefix + raw_url_path.split(server_config.api_prefix)[1]
+    else:
+        request_url_path = raw_url_path
+
+    if request_url_path in white_list_routes or not security_config.enable:
+        user_id = constant.ADMIN_ID
+    else:
+        auth_header = request.headers.get(constant.AUTHORIZATION)
+        if not auth_header:
+            return _error_response(
+                http.HTTPStatus.UNAUTHORIZED,
+                JWTErrorCode.MISSING_TOKEN.code,
+                JWTErrorCode.MISSING_TOKEN.message,
+            )
+        try:
+            user_id = await auth_service.authenticate(auth_header.split(" ")[-1])
+        except PyJWTError as e:
+            logger.error(e)
+            return _error_response(
+                http.HTTPStatus.UNAUTHORIZED,
+                JWTErrorCode.TOKEN_EXPIRED.code,
+                JWTErrorCode.TOKEN_EXPIRED.message,
+            )
+        except AuthException as e:
+            return _error_response(e.code.code, e.code.code, e.message)
+
+    ctx_token = set_current_user(user_id=user_id)
+    try:
+        return await call_next(request)
+    finally:
+        clear_current_user(ctx_token)
+
+
+def get_current_user() -> Callable[[], CurrentUser]:
+    """
+    Dependency returning the user authenticated by ``jwt_middleware``.
+
+    Unlike ``fastlib.security.get_current_user`` the token is not decoded
+    again; the OAuth2 scheme is kept so that a bearer token stays required
+    and documented in OpenAPI.
+    """
+
+    def current_user(_: str = Depends(get_oauth2_scheme())) -> CurrentUser:
+        return CurrentUser(user_id=get_current_user_id())
+
+    return current_user
@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: MIT
+"""Authorization middleware enforcing the permissions declared by menus"""
+
+from __future__ import annotations
+
+import http
+from collections.abc import Iterable
+from typing import Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from fastlib.contextvars import get_current_user as get_current_user_id
+from fastlib.logging.handlers import logger
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute
+
+from src.main.app.exception.auth_exception import AuthErrorCode
+from src.main.app.service.auth_service import AuthService
+from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
+from src.main.app.utils.route_util import RouteTrie, compile_routes, route_permission
+
+auth_service: AuthService = AuthServiceImpl()
+routePermissionTrie: RouteTrie[tuple[str, ...]] = RouteTrie()
+
+
+def compile_route_permissions(routes: Iterable[BaseRoute]) -> RouteTrie[tuple[str, ...]]:
+    """
+    Map every registered API route to the permissions satisfying it: its
+    ``resource:action`` permission and the ``resource:*`` wildcard.
+
+    Called once at startup, when every router is included.
+    """
+    global routePermissionTrie
+
+    def permissions_of(route: APIRoute, method: str) -> Optional[tuple[str, ...]]:
+        permission = route_permission(route.path, method)
+        if permission is None:
+            return None
+        return permission, f"{permission.partition(':')[0]}:*"
+
+    routePermissionTrie = compile_routes(routes, permissions_of)
+    logger.info(f"Compiled {routePermissionTrie.size} route permissions")
+    return routePermissionTrie
+
+
+async def permission_middleware(request: Request, call_next):
+    """
+    Reject requests whose route requires a permission the user lacks.
+
+    Runs inside ``jwt_middleware``, which binds the user. The permissions of
+    the route are looked up in the compiled trie and checked against the
+    menus granted to the user, both served from memory.
+    """
+    user_id = get_current_user_id()
+    if user_id is None:
+        return await call_next(request)
+    permissions = routePermissionTrie.match(request.method, request.url.path)
+    if permissions is None or await auth_service.is_permitted(user_id, permissions):
+        return await call_next(request)
+    return JSONResponse(
+        status_code=http.HTTPStatus.FORBIDDEN,
+        content={
+            "code": AuthErrorCode.PERMISSION_DENIED.code,
+            "message": f"{AuthErrorCode.PERMISSION_DENIED.message}: {permissions[0]}",
+        },
+    )
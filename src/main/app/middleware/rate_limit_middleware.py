@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: MIT
+"""Rate limit middleware with sliding windows per client and route"""
+
+from __future__ import annotations
+
+import http
+from collections.abc import Callable, Iterable
+from typing import TypeVar
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from fastlib import ConfigManager
+from fastlib import constants as constant
+from fastlib.contextvars import get_current_user as get_current_user_id
+from fastlib.logging.handlers import logger
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute
+
+from src.main.app.cache.rate_limiter import (
+    RateLimit,
+    RateLimitResult,
+    parse_rate_limits,
+    rateLimiter,
+)
+from src.main.app.exception.biz_exception import BusinessErrorCode
+from src.main.app.utils.route_util import RouteTrie, compile_routes
+
+EndpointType = TypeVar("EndpointType", bound=Callable)
+
+server_config = ConfigManager.get_server_config()
+security_config = ConfigManager.get_security_config()
+# (route key, limits) of every compiled route
+routeRateLimits: RouteTrie[tuple[str, list[RateLimit]]] = RouteTrie()
+
+
+def rate_limit(limits: str) -> Callable[[EndpointType], EndpointType]:
+    """
+    Set the rate limits of a route instead of ``server.global_default_limits``.
+
+    Applied below the route decorator, so that the router registers the
+    marked endpoint:
+
+        @stock_router.post("/stocks:syncManually")
+        @rate_limit("2/minute")
+        async def sync_stocks_manual(): ...
+
+    Args:
+        limits: Limits such as ``"2/minute"`` or ``"5/second;100/hour"``.
+    """
+    parsed = parse_rate_limits(limits)
+
+    def decorator(endpoint: EndpointType) -> EndpointType:
+        endpoint.__rate_limits__ = parsed
+        return endpoint
+
+    return decorator
+
+
+def compile_rate_limits(routes: Iterable[BaseRoute]) -> RouteTrie[tuple[str, list[RateLimit]]]:
+    """Map every registered API route to its own limits or to the global default."""
+    global routeRateLimits
+    default_limits = parse_rate_limits(server_config.global_default_limits)
+
+    def limits_of(route: APIRoute, method: str) -> tuple[str, list[RateLimit]]:
+        return f"{method} {route.path}", getattr(route.endpoint, "__rate_limits__", default_limits)
+
+    routeRateLimits = compile_routes(routes, limits_of)
+    return routeRateLimits
+
+
+def client_key(request: Request) -> str:
+    """Users signed in with a token are limited by id, other clients by address."""
+    if security_config.enable and request.headers.get(constant.AUTHORIZATION):
+        user_id = get_current_user_id()
+        if user_id is not None:
+            return f"user:{user_id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _limit_headers(result: RateLimitResult) -> dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(result.limit.count),
+        "X-RateLimit-Remaining": str(result.remaining),
+    }
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    """
+    Reject with 429 the requests exceeding a limit of their route.
+
+    Runs inside ``jwt_middleware`` so that signed-in users are counted by id.
+    Requests are counted per client and per route, and only when
+    ``server.enable_rate_limit`` is set. Should the counter backend fail,
+    requests are let through.
+    """
+    if not server_config.enable_rate_limit:
+        return await call_next(request)
+    matched = routeRateLimits.match(request.method, request.url.path)
+    if matched is None:
+        return await call_next(request)
+    route_key, limits = matched
+    key = f"{route_key}|{client_key(request)}"
+    tightest = None
+    try:
+        for limit in limits:
+            result = await rateLimiter.hit(key, limit)
+            if not result.allowed:
+                return JSONResponse(
+                    status_code=http.HTTPStatus.TOO_MANY_REQUESTS,
+                    content={
+                        "code": BusinessErrorCode.RATE_LIMITED.code,
+                        "message": f"{BusinessErrorCode.RATE_LIMITED.message}: {limit}",
+                    },
+                    headers={**_limit_headers(result), "Retry-After": str(result.retry_after)},
+                )
+            if tightest is None or result.remaining < tightest.remaining:
+                tightest = result
+    except Exception as e:
+        logger.warning(f"Rate limiter unavailable, request let through: {e}")
+    response = await call_next(request)
+    if tightest is not None:
+        response.headers.update(_limit_headers(tightest))
+    return response
@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: MIT
+"""Read replica routing of the database sessions of a request"""
+
+from __future__ import annotations
+
+import time
+
+from fastapi import Request
+
+from src.main.app.cache.lru import LRUCache
+from src.main.app.config import get_replica_config
+from src.main.app.middleware.rate_limit_middleware import client_key
+from src.main.app.utils import replica_util
+
+replica_config = get_replica_config()
+_READ_METHODS = frozenset(("GET", "HEAD"))
+# Seconds a client reads from the primary after a write: a replica in
+# rotation lagged at most max_lag_seconds at its last check
+_STICKY_SECONDS = replica_config.max_lag_seconds + replica_config.health_check_seconds
+# Monotonic time of the last write of each client
+recentWriters: LRUCache[str, float] = LRUCache(replica_config.max_sticky_clients)
+
+
+def _wrote_recently(key: str) -> bool:
+    written_at = recentWriters.peek(key)
+    if written_at is None:
+        return False
+    if time.monotonic() - written_at > _STICKY_SECONDS:
+        recentWriters.pop(key)
+        return False
+    return True
+
+
+async def replica_middleware(request: Request, call_next):
+    """
+    Serve the reads of GET and HEAD requests from a read replica.
+
+    Runs inside ``jwt_middleware`` so that signed-in users are told apart by
+    id, and outside ``DBSessionMiddleware`` whose session is opened in the
+    scope set here. Writes always go to the primary, and a client that wrote
+    keeps reading from the primary until the replicas have caught up with
+    its writes. Only in effect when ``replica.urls`` is set.
+    """
+    if replica_util.replicaSet is None:
+        return await call_next(request)
+    key = client_key(request)
+    read_only = request.method in _READ_METHODS and not _wrote_recently(key)
+    with replica_util.request_scope(read_only) as scope:
+        response = await call_next(request)
+    if scope.wrote:
+        recentWriters.put(key, time.monotonic())
+    return response
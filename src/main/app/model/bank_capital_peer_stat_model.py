@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: MIT
+"""BankCapitalPeerStat data model"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import (
+    BigInteger,
+    Column,
+    DateTime,
+    Field,
+    Float,
+    Index,
+    Integer,
+    SQLModel,
+    String,
+)
+
+from src.main.app.utils.snowflake_util import snowflake_id
+
+
+class BankCapitalPeerStatBase(SQLModel):
+
+    id: int = Field(
+        default_factory=snowflake_id,
+        primary_key=True,
+        nullable=False,
+        sa_type=BigInteger,sa_column_kwargs={"comment": "主键"}
+    )
+    trade_date: datetime = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=False,
+            comment="交易日期"
+        )
+    )
+    bank_type: int = Field(
+        sa_column=Column(
+            Integer,
+            nullable=False,
+            comment="银行类型(1-国有行 2-股份制 3-城商行 4-农商行 5-政策性)"
+        )
+    )
+    bank_code: str = Field(
+        sa_column=Column(
+            String(20),
+            nullable=False,
+            comment="银行代码"
+        )
+    )
+    bank_name: Optional[str] = Field(
+        sa_column=Column(
+            String(100),
+            nullable=True,
+            comment="银行名称"
+        )
+    )
+    metric: str = Field(
+        sa_column=Column(
+            String(50),
+            nullable=False,
+            comment="指标字段名"
+        )
+    )
+    value: Optional[int] = Field(
+        sa_column=Column(
+            BigInteger,
+            nullable=True,
+            comment="指标值(与bank_capital_info一致)"
+        )
+    )
+    peer_count: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="同类银行数"
+        )
+    )
+    peer_rank: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="同类排名(1为最优)"
+        )
+    )
+    percentile: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="同类百分位(1为最优)"
+        )
+    )
+    z_score: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="同类标准分"
+        )
+    )
+    created_at: Optional[datetime] = Field(
+        sa_type=DateTime,
+        default_factory=lambda: datetime.now(timezone.utc),sa_column_kwargs={"comment": "创建时间"}
+    )
+
+
+class BankCapitalPeerStatModel(BankCapitalPeerStatBase, table=True):
+    __tablename__ = "bank_capital_peer_stat"
+    __table_args__ = (
+        Index("idx_peer_date_type_metric_rank", "trade_date", "bank_type", "metric", "peer_rank"),
+        Index("idx_peer_bank_metric_date", "bank_code", "metric", "trade_date"),
+    )
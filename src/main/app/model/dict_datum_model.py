@@ -28,7 +28,7 @@ from sqlmodel import (
     String,
 )
 
-from fastlib.utils.snowflake_util import snowflake_id
+from src.main.app.utils.snowflake_util import snowflake_id
 
 
 class DictDatumBase(SQLModel):
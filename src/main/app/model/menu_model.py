@@ -29,7 +29,7 @@ from sqlmodel import (
     String,
 )
 
-from fastlib.utils.snowflake_util import snowflake_id
+from src.main.app.utils.snowflake_util import snowflake_id
 
 
 class MenuBase(SQLModel):
@@ -80,7 +80,15 @@ class MenuBase(SQLModel):
         )
     )
     parent_id: Optional[int] = Field(
-        sa_column=Column(Integer, nullable=True, default=None, comment="父ID")
+        sa_column=Column(BigInteger, nullable=True, default=None, comment="父ID")
+    )
+    tree_path: Optional[str] = Field(
+        sa_column=Column(
+            String(500),
+            nullable=True,
+            default=None,
+            comment="物化路径（/祖先ID/.../自身ID/）",
+        )
     )
     status: Optional[int] = Field(
         sa_column=Column(Integer, nullable=True, default=None, comment="状态（1正常 0停用）")
@@ -107,6 +115,7 @@ class MenuModel(MenuBase, table=True):
     __tablename__ = "menus"
     __table_args__ = (
         Index("idx_parent_id", "parent_id"),
+        Index("idx_tree_path", "tree_path"),
         UniqueConstraint("name", name="udx_name"),
         {"comment": "系统菜单表"},
     )
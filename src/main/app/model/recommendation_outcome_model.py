@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationOutcome data model"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import (
+    BigInteger,
+    Column,
+    DateTime,
+    Field,
+    Float,
+    Index,
+    Integer,
+    SQLModel,
+    String,
+)
+
+from src.main.app.utils.snowflake_util import snowflake_id
+
+
+class RecommendationOutcomeBase(SQLModel):
+
+    id: int = Field(
+        default_factory=snowflake_id,
+        primary_key=True,
+        nullable=False,
+        sa_type=BigInteger,sa_column_kwargs={"comment": "主键"}
+    )
+    recommendation_id: int = Field(
+        sa_column=Column(
+            BigInteger,
+            nullable=False,
+            comment="推荐记录ID"
+        )
+    )
+    stock_symbol_full: Optional[str] = Field(
+        sa_column=Column(
+            String(20),
+            nullable=True,
+            comment="股票代码"
+        )
+    )
+    analyst: Optional[str] = Field(
+        sa_column=Column(
+            String(100),
+            nullable=True,
+            comment="分析师"
+        )
+    )
+    institution: Optional[str] = Field(
+        sa_column=Column(
+            String(100),
+            nullable=True,
+            comment="机构名称"
+        )
+    )
+    recommend_date: Optional[datetime] = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=True,
+            comment="推荐日期"
+        )
+    )
+    expiry_date: Optional[datetime] = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=True,
+            comment="到期日期"
+        )
+    )
+    direction: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="方向(1:看多 -1:看空)"
+        )
+    )
+    bars_observed: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="已观察交易日数"
+        )
+    )
+    evaluated_through: Optional[datetime] = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=True,
+            comment="已评估至交易日期"
+        )
+    )
+    is_target_hit: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="是否达到目标价(0:否 1:是)"
+        )
+    )
+    target_hit_date: Optional[datetime] = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=True,
+            comment="达到目标价日期"
+        )
+    )
+    max_drawdown: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="持仓最大回撤"
+        )
+    )
+    return_at_expiry: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="到期收益率(按推荐方向)"
+        )
+    )
+    market_return: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="同期市场收益率"
+        )
+    )
+    excess_return: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="超额收益率(按推荐方向)"
+        )
+    )
+    is_final: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="是否已到期定稿(0:否 1:是)"
+        )
+    )
+    created_at: Optional[datetime] = Field(
+        sa_type=DateTime,
+        default_factory=lambda: datetime.now(timezone.utc),sa_column_kwargs={"comment": "创建时间"}
+    )
+    updated_at: Optional[datetime] = Field(
+        sa_type=DateTime,
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={
+            "onupdate":lambda: datetime.now(timezone.utc),"comment": "更新时间",
+        },
+    )
+
+
+class RecommendationOutcomeModel(RecommendationOutcomeBase, table=True):
+    __tablename__ = "stock_recommendation_outcome"
+    __table_args__ = (
+        Index("uk_recommendation_id", "recommendation_id", unique=True),
+        Index("idx_outcome_analyst", "analyst"),
+        Index("idx_outcome_institution", "institution"),
+        Index("idx_outcome_stock_final", "stock_symbol_full", "is_final"),
+    )
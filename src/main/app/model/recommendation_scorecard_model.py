@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationScorecard data model"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import (
+    BigInteger,
+    Column,
+    DateTime,
+    Field,
+    Float,
+    Index,
+    Integer,
+    SQLModel,
+    String,
+)
+
+from src.main.app.utils.snowflake_util import snowflake_id
+
+
+class RecommendationScorecardBase(SQLModel):
+
+    id: int = Field(
+        default_factory=snowflake_id,
+        primary_key=True,
+        nullable=False,
+        sa_type=BigInteger,sa_column_kwargs={"comment": "主键"}
+    )
+    scope: str = Field(
+        sa_column=Column(
+            String(20),
+            nullable=False,
+            comment="统计维度(analyst:分析师 institution:机构)"
+        )
+    )
+    name: str = Field(
+        sa_column=Column(
+            String(100),
+            nullable=False,
+            comment="分析师或机构名称"
+        )
+    )
+    recommendation_count: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="已评估推荐数"
+        )
+    )
+    final_count: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="已到期推荐数"
+        )
+    )
+    hit_count: Optional[int] = Field(
+        sa_column=Column(
+            Integer,
+            nullable=True,
+            comment="达到目标价推荐数"
+        )
+    )
+    hit_rate: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="目标价命中率"
+        )
+    )
+    avg_return: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="平均到期收益率"
+        )
+    )
+    avg_excess_return: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="平均超额收益率"
+        )
+    )
+    avg_max_drawdown: Optional[float] = Field(
+        sa_column=Column(
+            Float,
+            nullable=True,
+            comment="平均最大回撤"
+        )
+    )
+    created_at: Optional[datetime] = Field(
+        sa_type=DateTime,
+        default_factory=lambda: datetime.now(timezone.utc),sa_column_kwargs={"comment": "创建时间"}
+    )
+    updated_at: Optional[datetime] = Field(
+        sa_type=DateTime,
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={
+            "onupdate":lambda: datetime.now(timezone.utc),"comment": "更新时间",
+        },
+    )
+
+
+class RecommendationScorecardModel(RecommendationScorecardBase, table=True):
+    __tablename__ = "recommendation_scorecard"
+    __table_args__ = (
+        Index("uk_scope_name", "scope", "name", unique=True),
+        Index("idx_scope_hit_rate", "scope", "hit_rate"),
+    )
@@ -18,7 +18,7 @@ from sqlmodel import (
     String,
 )
 
-from fastlib.utils.snowflake_util import snowflake_id
+from src.main.app.utils.snowflake_util import snowflake_id
 
 
 class ReportIncomeStatementBase(SQLModel):
@@ -83,6 +83,18 @@ class ReportIncomeStatementBase(SQLModel):
     quarter: Optional[float] = Field(
         sa_column=Column(Float, nullable=True, comment="季度")
     )
+    gross_margin: Optional[float] = Field(
+        sa_column=Column(Float, nullable=True, comment="毛利率(%)")
+    )
+    expense_ratio: Optional[float] = Field(
+        sa_column=Column(Float, nullable=True, comment="期间费用率(%)")
+    )
+    operating_profit_margin: Optional[float] = Field(
+        sa_column=Column(Float, nullable=True, comment="营业利润率(%)")
+    )
+    net_profit_margin: Optional[float] = Field(
+        sa_column=Column(Float, nullable=True, comment="净利率(%)")
+    )
     created_at: Optional[datetime] = Field(
         sa_type=DateTime,
         default_factory=lambda: datetime.now(timezone.utc),
@@ -104,5 +116,9 @@ class ReportIncomeStatementModel(ReportIncomeStatementBase, table=True):
         Index("idx_announcement_date", "announcement_date"),
         Index("idx_net_profit_yoy", "net_profit_yoy"),
         Index("idx_stock_code", "stock_code"),
+        Index("idx_period_gross_margin", "year", "quarter", "gross_margin"),
+        Index("idx_period_expense_ratio", "year", "quarter", "expense_ratio"),
+        Index("idx_period_operating_profit_margin", "year", "quarter", "operating_profit_margin"),
+        Index("idx_period_net_profit_margin", "year", "quarter", "net_profit_margin"),
         {"comment": "利润表"},
     )
@@ -24,7 +24,7 @@ from sqlmodel import (
     DateTime,
 )
 
-from fastlib.utils.snowflake_util import snowflake_id
+from src.main.app.utils.snowflake_util import snowflake_id
 
 
 class RoleMenuBase(SQLModel):
@@ -18,7 +18,7 @@ from sqlmodel import (
     DateTime,
 )
 
-from fastlib.utils.snowflake_util import snowflake_id
+from src.main.app.utils.snowflake_util import snowflake_id
 
 
 class StockDailyRecommendationBase(SQLModel):
@@ -99,6 +99,13 @@ class StockDailyRecommendationBase(SQLModel):
             comment="有效期(天)"
         )
     )
+    expiry_date: Optional[datetime] = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=True,
+            comment="到期日期(推荐日期+有效期)"
+        )
+    )
     created_at: Optional[datetime] = Field(
         sa_type=DateTime,
         default_factory=lambda: datetime.now(timezone.utc),sa_column_kwargs={"comment": "创建时间"}
@@ -117,4 +124,6 @@ class StockDailyRecommendationModel(StockDailyRecommendationBase, table=True):
     __table_args__ = (
         Index("idx_recommend_date", "recommend_date"),
         Index("idx_stock_date", "stock_symbol_full", "recommend_date"),
+        Index("idx_expiry_date", "expiry_date"),
+        Index("idx_stock_expiry", "stock_symbol_full", "expiry_date"),
     )
\ No newline at end of file
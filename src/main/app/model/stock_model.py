@@ -18,7 +18,7 @@ from sqlmodel import (
     Integer,
 )
 
-from fastlib.utils.snowflake_util import snowflake_id
+from src.main.app.utils.snowflake_util import snowflake_id
 
 
 class StockBase(SQLModel):
@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: MIT
+"""TokenRevocation data model"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlmodel import (
+    BigInteger,
+    Column,
+    DateTime,
+    Double,
+    Field,
+    Index,
+    SQLModel,
+    String,
+)
+
+from src.main.app.utils.snowflake_util import snowflake_id
+
+
+class TokenRevocationBase(SQLModel):
+
+    id: int = Field(
+        default_factory=snowflake_id,
+        primary_key=True,
+        nullable=False,
+        sa_type=BigInteger,sa_column_kwargs={"comment": "主键"}
+    )
+    token_digest: Optional[str] = Field(
+        sa_column=Column(
+            String(64),
+            nullable=True,
+            comment="被吊销令牌的摘要(为空表示吊销该用户此前签发的全部令牌)"
+        )
+    )
+    user_id: int = Field(
+        sa_column=Column(
+            BigInteger,
+            nullable=False,
+            comment="用户ID"
+        )
+    )
+    revoked_at: Optional[float] = Field(
+        sa_column=Column(
+            Double,
+            nullable=True,
+            comment="按用户吊销的时间戳(秒, 与令牌 iat 同精度, 此前签发的令牌均被拒绝)"
+        )
+    )
+    expires_at: datetime = Field(
+        sa_column=Column(
+            DateTime,
+            nullable=False,
+            comment="过期时间(此后被吊销的令牌已自然失效, 记录可清理)"
+        )
+    )
+    created_at: Optional[datetime] = Field(
+        sa_type=DateTime,
+        default_factory=lambda: datetime.now(timezone.utc),sa_column_kwargs={"comment": "吊销时间"}
+    )
+
+
+class TokenRevocationModel(TokenRevocationBase, table=True):
+    __tablename__ = "token_revocation"
+    __table_args__ = (
+        Index("idx_token_digest", "token_digest"),
+        Index("idx_expires_at", "expires_at"),
+    )
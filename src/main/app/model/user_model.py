@@ -29,7 +29,7 @@ from sqlmodel import (
     String,
 )
 
-from fastlib.utils.snowflake_util import snowflake_id
+from src.main.app.utils.snowflake_util import snowflake_id
 
 
 class UserBase(SQLModel):
@@ -11,6 +11,11 @@ class SignInWithEmailAndPasswordRequest(BaseModel):
     password: str
 
 
+class SignOutRequest(BaseModel):
+    # 同时吊销的刷新令牌
+    refresh_token: Optional[str] = None
+
+
 class UserPage(BaseModel):
     """
     用户信息分页信息
@@ -63,3 +68,20 @@ class UserInfo(BaseModel):
         if user_id is not None and user_id == 9:
             return True
         return False
+
+
+class ResolvedAuthorization(BaseModel):
+    """
+    用户已解析的授权信息
+    """
+
+    # 用户ID
+    user_id: int
+    # 解析时的缓存版本号
+    version: int
+    # 用户信息(含角色、权限与菜单)
+    user_info: UserInfo
+    # 角色ID集合
+    role_ids: list[int] = []
+    # 可访问菜单ID集合
+    menu_ids: list[int] = []
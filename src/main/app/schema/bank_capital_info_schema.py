@@ -9,13 +9,14 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListBankCapitalInfosRequest(ListRequest):
     id: Optional[int] = None
     trade_date: Optional[datetime] = None
     bank_code: Optional[str] = None
-    bank_name: Optional[str] = None
+    bank_name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     bank_type: Optional[int] = None
     total_deposits: Optional[int] = None
     total_loans: Optional[int] = None
@@ -29,6 +30,7 @@ class ListBankCapitalInfosRequest(ListRequest):
     data_frequency: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    with_labels: bool = False
 
 
 class BankCapitalInfo(BaseModel):
@@ -36,7 +38,7 @@ class BankCapitalInfo(BaseModel):
     trade_date: Optional[datetime] = None
     bank_code: Optional[str] = None
     bank_name: Optional[str] = None
-    bank_type: Optional[int] = None
+    bank_type: Optional[int] = Field(None, json_schema_extra={"dict_type": "bank_type"})
     total_deposits: Optional[int] = '0'
     total_loans: Optional[int] = '0'
     non_performing_loan_ratio: Optional[int] = '0'
@@ -179,5 +181,25 @@ class ImportBankCapitalInfo(CreateBankCapitalInfo):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportBankCapitalInfosResponse(BaseModel):
-    bank_capital_infos: list[ImportBankCapitalInfo] = Field(default_factory=list, alias="bankCapitalInfos")
\ No newline at end of file
+class ImportBankCapitalInfosResponse(ImportResult):
+    pass
+
+class ListBankCapitalPeerStatsRequest(ListRequest):
+    trade_date: Optional[datetime] = None
+    bank_type: Optional[int] = None
+    bank_code: Optional[str] = None
+    metric: Optional[str] = None
+    with_labels: bool = False
+
+
+class BankCapitalPeerStat(BaseModel):
+    trade_date: datetime
+    bank_type: int = Field(json_schema_extra={"dict_type": "bank_type"})
+    bank_code: str
+    bank_name: Optional[str] = None
+    metric: str
+    value: Optional[int] = None
+    peer_count: Optional[int] = None
+    peer_rank: Optional[int] = None
+    percentile: Optional[float] = None
+    z_score: Optional[float] = None
@@ -17,12 +17,16 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Generic, Optional, TypeVar
 
 from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from fastlib.response import ListResponse
+from src.main.app.schema.import_schema import ImportResult
+
+T = TypeVar("T")
 
 
 class ListDictDataRequest(ListRequest):
@@ -40,6 +44,15 @@ class DictDataOption(BaseModel):
     options: dict[str, list[DictDataOptionItem]]
 
 
+class LabeledListResponse(ListResponse[T], Generic[T]):
+    """
+    Paginated result with, when requested, the labels of the values its
+    dictionary-backed fields take, as field name -> {value: label}.
+    """
+
+    labels: Optional[dict[str, dict[str, Optional[str]]]] = None
+
+
 class DictDatum(BaseModel):
     id: int
     sort: Optional[int] = None
@@ -148,5 +161,5 @@ class ImportDictDatum(CreateDictDatum):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportDictDataResponse(BaseModel):
-    dict_data: list[ImportDictDatum] = Field(default_factory=list, alias="dictData")
+class ImportDictDataResponse(ImportResult):
+    pass
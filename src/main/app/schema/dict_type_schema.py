@@ -22,11 +22,12 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListDictTypesRequest(ListRequest):
     id: Optional[int] = None
-    name: Optional[str] = None
+    name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     type: Optional[str] = None
     status: Optional[int] = None
     create_time: Optional[datetime] = None
@@ -125,5 +126,5 @@ class ImportDictType(CreateDictType):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportDictTypesResponse(BaseModel):
-    dict_types: list[ImportDictType] = Field(default_factory=list, alias="dictTypes")
+class ImportDictTypesResponse(ImportResult):
+    pass
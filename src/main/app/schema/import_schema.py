@@ -0,0 +1,24 @@
+# SPDX-License-Identifier: MIT
+"""Import result schema"""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class ImportRowError(BaseModel):
+    # Row number in the uploaded file, the header being row 1
+    row: int
+    err_msg: str = Field(alias="errMsg")
+
+
+class ImportResult(BaseModel):
+    """
+    Outcome of a file import. Nothing is inserted when any row is invalid,
+    ``errors`` then lists the invalid rows, up to ``import.max_errors``.
+    """
+
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = Field(default_factory=list)
@@ -9,6 +9,7 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListIntelligenceInformationRequest(ListRequest):
@@ -18,6 +19,9 @@ class ListIntelligenceInformationRequest(ListRequest):
     news_content: Optional[str] = None
     news_source: Optional[str] = None
     publish_time: Optional[datetime] = None
+    publish_time_range: Optional[list[datetime]] = Field(
+        None, json_schema_extra={"filter": "range", "column": "publish_time"}
+    )
     news_url: Optional[str] = None
     impact_direction: Optional[int] = None
     impact_level: Optional[int] = None
@@ -53,6 +57,30 @@ class IntelligenceInformationDetail(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class ListLatestNewsRequest(BaseModel):
+    stock_symbol_full: str
+    limit: int = Field(default=20, ge=1, le=200)
+    with_labels: bool = False
+
+
+class LatestNews(BaseModel):
+    id: int
+    stock_symbol_full: Optional[str] = None
+    news_title: Optional[str] = None
+    news_source: Optional[str] = None
+    publish_time: Optional[datetime] = None
+    news_url: Optional[str] = None
+    impact_direction: Optional[int] = Field(
+        None, json_schema_extra={"dict_type": "impact_direction"}
+    )
+    impact_level: Optional[int] = Field(None, json_schema_extra={"dict_type": "impact_level"})
+
+
+class ListLatestNewsResponse(BaseModel):
+    records: list[LatestNews] = Field(default_factory=list)
+    labels: Optional[dict[str, dict[str, Optional[str]]]] = None
+
+
 class CreateIntelligenceInformation(BaseModel):
     stock_symbol_full: Optional[str] = None
     news_title: Optional[str] = None
@@ -143,5 +171,5 @@ class ImportIntelligenceInformation(CreateIntelligenceInformation):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportIntelligenceInformationResponse(BaseModel):
-    intelligence_information: list[ImportIntelligenceInformation] = Field(default_factory=list, alias="intelligenceInformation")
\ No newline at end of file
+class ImportIntelligenceInformationResponse(ImportResult):
+    pass
\ No newline at end of file
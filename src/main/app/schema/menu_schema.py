@@ -23,6 +23,7 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListMenusRequest(ListRequest):
@@ -33,7 +34,7 @@ class ListMenusRequest(ListRequest):
     # 主键
     id: Optional[int] = None
     # 名称
-    name: Optional[str] = None
+    name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     # 图标
     icon: Optional[str] = None
     # 权限标识
@@ -48,8 +49,8 @@ class ListMenusRequest(ListRequest):
     type: Optional[int] = None
     # 是否缓存（1缓存 0不缓存）
     cacheable: Optional[int] = None
-    # 父ID
-    parent_id: Optional[int] = None
+    # 父ID，缺省时查询顶层菜单
+    parent_id: Optional[int] = 0
     # 是否显示（1显示 0隐藏）
     visible: Optional[int] = None
     # 状态（1正常 0停用）
@@ -171,6 +172,15 @@ class UpdateMenuRequest(BaseModel):
     menu: UpdateMenu
 
 
+class MoveMenuRequest(BaseModel):
+    # 新的父ID，为空或 0 时移动为根菜单
+    parent_id: Optional[int] = None
+
+
+class MenuTreeResponse(BaseModel):
+    menus: list[Menu]
+
+
 class BatchGetMenusResponse(BaseModel):
     menus: list[MenuDetail]
 
@@ -220,5 +230,5 @@ class ImportMenu(CreateMenu):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportMenusResponse(BaseModel):
-    menus: list[ImportMenu]
+class ImportMenusResponse(ImportResult):
+    pass
@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationScorecard schema"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from fastlib.request import ListRequest
+from pydantic import BaseModel, Field
+
+
+class ListRecommendationScorecardsRequest(ListRequest):
+    scope: Optional[str] = None
+    name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
+
+
+class RecommendationScorecard(BaseModel):
+    id: int
+    scope: str
+    name: str
+    recommendation_count: Optional[int] = None
+    final_count: Optional[int] = None
+    hit_count: Optional[int] = None
+    hit_rate: Optional[float] = None
+    avg_return: Optional[float] = None
+    avg_excess_return: Optional[float] = None
+    avg_max_drawdown: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+
+class ListRecommendationOutcomesRequest(ListRequest):
+    recommendation_id: Optional[int] = None
+    stock_symbol_full: Optional[str] = None
+    analyst: Optional[str] = None
+    institution: Optional[str] = None
+    is_target_hit: Optional[int] = None
+    is_final: Optional[int] = None
+
+
+class RecommendationOutcome(BaseModel):
+    id: int
+    recommendation_id: int
+    stock_symbol_full: Optional[str] = None
+    analyst: Optional[str] = None
+    institution: Optional[str] = None
+    recommend_date: Optional[datetime] = None
+    expiry_date: Optional[datetime] = None
+    direction: Optional[int] = None
+    bars_observed: Optional[int] = None
+    evaluated_through: Optional[datetime] = None
+    is_target_hit: Optional[int] = None
+    target_hit_date: Optional[datetime] = None
+    max_drawdown: Optional[float] = None
+    return_at_expiry: Optional[float] = None
+    market_return: Optional[float] = None
+    excess_return: Optional[float] = None
+    is_final: Optional[int] = None
+
+
+class RefreshRecommendationScorecardsRequest(BaseModel):
+    stock_symbol_full_list: Optional[list[str]] = None
+
+
+class RefreshRecommendationScorecardsResponse(BaseModel):
+    evaluated_count: int
+    finalized_count: int
+    scorecard_count: int
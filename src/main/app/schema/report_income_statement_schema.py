@@ -9,27 +9,55 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListReportIncomeStatementsRequest(ListRequest):
     id: Optional[int] = None
     stock_code: Optional[str] = None
-    stock_name: Optional[str] = None
+    stock_name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     exchange: Optional[str] = None
-    net_profit: Optional[str] = None
-    net_profit_yoy: Optional[str] = None
-    total_operating_income: Optional[str] = None
-    total_operating_income_yoy: Optional[str] = None
-    operating_expenses: Optional[str] = None
-    sales_expenses: Optional[str] = None
-    management_expenses: Optional[str] = None
-    financial_expenses: Optional[str] = None
-    total_operating_expenses: Optional[str] = None
-    operating_profit: Optional[str] = None
-    total_profit: Optional[str] = None
+    net_profit: Optional[float] = None
+    net_profit_yoy: Optional[float] = None
+    total_operating_income: Optional[float] = None
+    total_operating_income_yoy: Optional[float] = None
+    operating_expenses: Optional[float] = None
+    sales_expenses: Optional[float] = None
+    management_expenses: Optional[float] = None
+    financial_expenses: Optional[float] = None
+    total_operating_expenses: Optional[float] = None
+    operating_profit: Optional[float] = None
+    total_profit: Optional[float] = None
     announcement_date: Optional[datetime] = None
+    announcement_date_range: Optional[list[datetime]] = Field(
+        None, json_schema_extra={"filter": "range", "column": "announcement_date"}
+    )
     year: Optional[int] = None
     quarter: Optional[int] = None
+    gross_margin_min: Optional[float] = Field(
+        None, json_schema_extra={"filter": "ge", "column": "gross_margin"}
+    )
+    gross_margin_max: Optional[float] = Field(
+        None, json_schema_extra={"filter": "le", "column": "gross_margin"}
+    )
+    expense_ratio_min: Optional[float] = Field(
+        None, json_schema_extra={"filter": "ge", "column": "expense_ratio"}
+    )
+    expense_ratio_max: Optional[float] = Field(
+        None, json_schema_extra={"filter": "le", "column": "expense_ratio"}
+    )
+    operating_profit_margin_min: Optional[float] = Field(
+        None, json_schema_extra={"filter": "ge", "column": "operating_profit_margin"}
+    )
+    operating_profit_margin_max: Optional[float] = Field(
+        None, json_schema_extra={"filter": "le", "column": "operating_profit_margin"}
+    )
+    net_profit_margin_min: Optional[float] = Field(
+        None, json_schema_extra={"filter": "ge", "column": "net_profit_margin"}
+    )
+    net_profit_margin_max: Optional[float] = Field(
+        None, json_schema_extra={"filter": "le", "column": "net_profit_margin"}
+    )
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -39,20 +67,24 @@ class ReportIncomeStatement(BaseModel):
     stock_code: Optional[str] = None
     stock_name: Optional[str] = None
     exchange: Optional[str] = None
-    net_profit: Optional[str] = None
-    net_profit_yoy: Optional[str] = None
-    total_operating_income: Optional[str] = None
-    total_operating_income_yoy: Optional[str] = None
-    operating_expenses: Optional[str] = None
-    sales_expenses: Optional[str] = None
-    management_expenses: Optional[str] = None
-    financial_expenses: Optional[str] = None
-    total_operating_expenses: Optional[str] = None
-    operating_profit: Optional[str] = None
-    total_profit: Optional[str] = None
+    net_profit: Optional[float] = None
+    net_profit_yoy: Optional[float] = None
+    total_operating_income: Optional[float] = None
+    total_operating_income_yoy: Optional[float] = None
+    operating_expenses: Optional[float] = None
+    sales_expenses: Optional[float] = None
+    management_expenses: Optional[float] = None
+    financial_expenses: Optional[float] = None
+    total_operating_expenses: Optional[float] = None
+    operating_profit: Optional[float] = None
+    total_profit: Optional[float] = None
     announcement_date: Optional[datetime] = None
     year: Optional[int] = None
     quarter: Optional[int] = None
+    gross_margin: Optional[float] = None
+    expense_ratio: Optional[float] = None
+    operating_profit_margin: Optional[float] = None
+    net_profit_margin: Optional[float] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -62,20 +94,24 @@ class ReportIncomeStatementDetail(BaseModel):
     stock_code: Optional[str] = None
     stock_name: Optional[str] = None
     exchange: Optional[str] = None
-    net_profit: Optional[str] = None
-    net_profit_yoy: Optional[str] = None
-    total_operating_income: Optional[str] = None
-    total_operating_income_yoy: Optional[str] = None
-    operating_expenses: Optional[str] = None
-    sales_expenses: Optional[str] = None
-    management_expenses: Optional[str] = None
-    financial_expenses: Optional[str] = None
-    total_operating_expenses: Optional[str] = None
-    operating_profit: Optional[str] = None
-    total_profit: Optional[str] = None
+    net_profit: Optional[float] = None
+    net_profit_yoy: Optional[float] = None
+    total_operating_income: Optional[float] = None
+    total_operating_income_yoy: Optional[float] = None
+    operating_expenses: Optional[float] = None
+    sales_expenses: Optional[float] = None
+    management_expenses: Optional[float] = None
+    financial_expenses: Optional[float] = None
+    total_operating_expenses: Optional[float] = None
+    operating_profit: Optional[float] = None
+    total_profit: Optional[float] = None
     announcement_date: Optional[datetime] = None
     year: Optional[int] = None
     quarter: Optional[int] = None
+    gross_margin: Optional[float] = None
+    expense_ratio: Optional[float] = None
+    operating_profit_margin: Optional[float] = None
+    net_profit_margin: Optional[float] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -84,17 +120,17 @@ class CreateReportIncomeStatement(BaseModel):
     stock_code: Optional[str] = None
     stock_name: Optional[str] = None
     exchange: Optional[str] = None
-    net_profit: Optional[str] = None
-    net_profit_yoy: Optional[str] = None
-    total_operating_income: Optional[str] = None
-    total_operating_income_yoy: Optional[str] = None
-    operating_expenses: Optional[str] = None
-    sales_expenses: Optional[str] = None
-    management_expenses: Optional[str] = None
-    financial_expenses: Optional[str] = None
-    total_operating_expenses: Optional[str] = None
-    operating_profit: Optional[str] = None
-    total_profit: Optional[str] = None
+    net_profit: Optional[float] = None
+    net_profit_yoy: Optional[float] = None
+    total_operating_income: Optional[float] = None
+    total_operating_income_yoy: Optional[float] = None
+    operating_expenses: Optional[float] = None
+    sales_expenses: Optional[float] = None
+    management_expenses: Optional[float] = None
+    financial_expenses: Optional[float] = None
+    total_operating_expenses: Optional[float] = None
+    operating_profit: Optional[float] = None
+    total_profit: Optional[float] = None
     announcement_date: Optional[datetime] = None
     year: Optional[int] = None
     quarter: Optional[int] = None
@@ -110,17 +146,17 @@ class UpdateReportIncomeStatement(BaseModel):
     stock_code: Optional[str] = None
     stock_name: Optional[str] = None
     exchange: Optional[str] = None
-    net_profit: Optional[str] = None
-    net_profit_yoy: Optional[str] = None
-    total_operating_income: Optional[str] = None
-    total_operating_income_yoy: Optional[str] = None
-    operating_expenses: Optional[str] = None
-    sales_expenses: Optional[str] = None
-    management_expenses: Optional[str] = None
-    financial_expenses: Optional[str] = None
-    total_operating_expenses: Optional[str] = None
-    operating_profit: Optional[str] = None
-    total_profit: Optional[str] = None
+    net_profit: Optional[float] = None
+    net_profit_yoy: Optional[float] = None
+    total_operating_income: Optional[float] = None
+    total_operating_income_yoy: Optional[float] = None
+    operating_expenses: Optional[float] = None
+    sales_expenses: Optional[float] = None
+    management_expenses: Optional[float] = None
+    financial_expenses: Optional[float] = None
+    total_operating_expenses: Optional[float] = None
+    operating_profit: Optional[float] = None
+    total_profit: Optional[float] = None
     announcement_date: Optional[datetime] = None
     year: Optional[int] = None
     quarter: Optional[int] = None
@@ -147,17 +183,17 @@ class BatchUpdateReportIncomeStatement(BaseModel):
     stock_code: Optional[str] = None
     stock_name: Optional[str] = None
     exchange: Optional[str] = None
-    net_profit: Optional[str] = None
-    net_profit_yoy: Optional[str] = None
-    total_operating_income: Optional[str] = None
-    total_operating_income_yoy: Optional[str] = None
-    operating_expenses: Optional[str] = None
-    sales_expenses: Optional[str] = None
-    management_expenses: Optional[str] = None
-    financial_expenses: Optional[str] = None
-    total_operating_expenses: Optional[str] = None
-    operating_profit: Optional[str] = None
-    total_profit: Optional[str] = None
+    net_profit: Optional[float] = None
+    net_profit_yoy: Optional[float] = None
+    total_operating_income: Optional[float] = None
+    total_operating_income_yoy: Optional[float] = None
+    operating_expenses: Optional[float] = None
+    sales_expenses: Optional[float] = None
+    management_expenses: Optional[float] = None
+    financial_expenses: Optional[float] = None
+    total_operating_expenses: Optional[float] = None
+    operating_profit: Optional[float] = None
+    total_profit: Optional[float] = None
     announcement_date: Optional[datetime] = None
     year: Optional[int] = None
     quarter: Optional[int] = None
@@ -197,5 +233,5 @@ class ImportReportIncomeStatement(CreateReportIncomeStatement):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportReportIncomeStatementsResponse(BaseModel):
-    report_income_statements: list[ImportReportIncomeStatement] = Field(default_factory=list, alias="reportIncomeStatements")
\ No newline at end of file
+class ImportReportIncomeStatementsResponse(ImportResult):
+    pass
\ No newline at end of file
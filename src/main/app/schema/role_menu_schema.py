@@ -22,12 +22,13 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListRoleMenusRequest(ListRequest):
     id: Optional[int] = None
     role_id: Optional[int] = None
-    create_time: Optional[datetime] = None
+    create_time: Optional[list[datetime]] = Field(None, json_schema_extra={"filter": "range"})
 
 
 class RoleMenu(BaseModel):
@@ -113,5 +114,5 @@ class ImportRoleMenu(CreateRoleMenu):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportRoleMenusResponse(BaseModel):
-    role_menus: list[ImportRoleMenu] = Field(default_factory=list, alias="roleMenus")
+class ImportRoleMenusResponse(ImportResult):
+    pass
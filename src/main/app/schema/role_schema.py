@@ -22,13 +22,15 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListRolesRequest(ListRequest):
     id: Optional[int] = None
-    name: Optional[str] = None
-    code: Optional[str] = None
-    create_time: Optional[list[datetime]] = None
+    name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
+    code: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
+    create_time: Optional[list[datetime]] = Field(None, json_schema_extra={"filter": "range"})
+    with_labels: bool = False
 
 
 class Role(BaseModel):
@@ -39,7 +41,7 @@ class Role(BaseModel):
     operation_type: Optional[str] = None
     data_scope: Optional[int] = None
     data_scope_dept_ids: Optional[str] = None
-    status: int
+    status: int = Field(json_schema_extra={"dict_type": "sys_status"})
     comment: Optional[str] = None
     create_time: Optional[datetime] = None
 
@@ -137,5 +139,5 @@ class ImportRole(CreateRole):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportRolesResponse(BaseModel):
-    roles: list[ImportRole] = Field(default_factory=list, alias="roles")
+class ImportRolesResponse(ImportResult):
+    pass
@@ -9,11 +9,15 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListStockCapitalFlowsRequest(ListRequest):
     id: Optional[int] = None
     trade_date: Optional[datetime] = None
+    trade_date_range: Optional[list[datetime]] = Field(
+        None, json_schema_extra={"filter": "range", "column": "trade_date"}
+    )
     stock_symbol_full: Optional[str] = None
     exchange: Optional[str] = None
     main_inflow: Optional[int] = None
@@ -167,5 +171,5 @@ class ImportStockCapitalFlow(CreateStockCapitalFlow):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportStockCapitalFlowsResponse(BaseModel):
-    stock_capital_flows: list[ImportStockCapitalFlow] = Field(default_factory=list, alias="stockCapitalFlows")
\ No newline at end of file
+class ImportStockCapitalFlowsResponse(ImportResult):
+    pass
\ No newline at end of file
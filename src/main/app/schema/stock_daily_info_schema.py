@@ -9,12 +9,19 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListStockDailyInfosRequest(ListRequest):
     id: Optional[int] = None
     stock_symbol_full: Optional[str] = None
+    stock_symbol_full_in: Optional[list[str]] = Field(
+        None, json_schema_extra={"filter": "in", "column": "stock_symbol_full"}
+    )
     trade_date: Optional[datetime] = None
+    trade_date_range: Optional[list[datetime]] = Field(
+        None, json_schema_extra={"filter": "range", "column": "trade_date"}
+    )
     open_price: Optional[int] = None
     close_price: Optional[int] = None
     high_price: Optional[int] = None
@@ -305,5 +312,5 @@ class ImportStockDailyInfo(CreateStockDailyInfo):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportStockDailyInfosResponse(BaseModel):
-    stock_daily_infos: list[ImportStockDailyInfo] = Field(default_factory=list, alias="stockDailyInfos")
\ No newline at end of file
+class ImportStockDailyInfosResponse(ImportResult):
+    pass
\ No newline at end of file
@@ -9,12 +9,16 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListStockDailyRecommendationsRequest(ListRequest):
     id: Optional[int] = None
     stock_symbol_full: Optional[str] = None
     recommend_date: Optional[datetime] = None
+    recommend_date_range: Optional[list[datetime]] = Field(
+        None, json_schema_extra={"filter": "range", "column": "recommend_date"}
+    )
     recommend_level: Optional[int] = None
     price: Optional[int] = None
     target_price: Optional[int] = None
@@ -39,8 +43,9 @@ class StockDailyRecommendation(BaseModel):
     institution: Optional[str] = None
     risk_level: Optional[str] = None
     validity_period: Optional[int] = None
-    created_at: Optional[datetime] = CURRENT_TIMESTAMP
-    updated_at: Optional[datetime] = CURRENT_TIMESTAMP
+    expiry_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
 class StockDailyRecommendationDetail(BaseModel):
@@ -55,8 +60,9 @@ class StockDailyRecommendationDetail(BaseModel):
     institution: Optional[str] = None
     risk_level: Optional[str] = None
     validity_period: Optional[int] = None
-    created_at: Optional[datetime] = CURRENT_TIMESTAMP
-    updated_at: Optional[datetime] = CURRENT_TIMESTAMP
+    expiry_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
 class CreateStockDailyRecommendation(BaseModel):
@@ -70,7 +76,7 @@ class CreateStockDailyRecommendation(BaseModel):
     institution: Optional[str] = None
     risk_level: Optional[str] = None
     validity_period: Optional[int] = None
-    updated_at: Optional[datetime] = CURRENT_TIMESTAMP
+    updated_at: Optional[datetime] = None
 
 
 class CreateStockDailyRecommendationRequest(BaseModel):
@@ -89,7 +95,7 @@ class UpdateStockDailyRecommendation(BaseModel):
     institution: Optional[str] = None
     risk_level: Optional[str] = None
     validity_period: Optional[int] = None
-    updated_at: Optional[datetime] = CURRENT_TIMESTAMP
+    updated_at: Optional[datetime] = None
 
 
 class UpdateStockDailyRecommendationRequest(BaseModel):
@@ -119,7 +125,7 @@ class BatchUpdateStockDailyRecommendation(BaseModel):
     institution: Optional[str] = None
     risk_level: Optional[str] = None
     validity_period: Optional[int] = None
-    updated_at: Optional[datetime] = CURRENT_TIMESTAMP
+    updated_at: Optional[datetime] = None
 
 
 class BatchUpdateStockDailyRecommendationsRequest(BaseModel):
@@ -155,5 +161,29 @@ class ImportStockDailyRecommendation(CreateStockDailyRecommendation):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportStockDailyRecommendationsResponse(BaseModel):
-    stock_daily_recommendations: list[ImportStockDailyRecommendation] = Field(default_factory=list, alias="stockDailyRecommendations")
\ No newline at end of file
+class ImportStockDailyRecommendationsResponse(ImportResult):
+    pass
+
+
+class ListActiveRecommendationsRequest(BaseModel):
+    stock_symbol_full: Optional[str] = None
+    with_labels: bool = False
+
+
+class ActiveRecommendation(BaseModel):
+    id: int
+    stock_symbol_full: Optional[str] = None
+    recommend_date: Optional[datetime] = None
+    recommend_level: Optional[int] = None
+    price: Optional[int] = None
+    target_price: Optional[int] = None
+    analyst: Optional[str] = None
+    institution: Optional[str] = None
+    risk_level: Optional[str] = Field(None, json_schema_extra={"dict_type": "risk_level"})
+    validity_period: Optional[int] = None
+    expiry_date: Optional[datetime] = None
+
+
+class ListActiveRecommendationsResponse(BaseModel):
+    records: list[ActiveRecommendation] = Field(default_factory=list)
+    labels: Optional[dict[str, dict[str, Optional[str]]]] = None
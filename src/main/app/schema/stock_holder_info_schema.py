@@ -9,12 +9,13 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListStockHolderInfosRequest(ListRequest):
     id: Optional[int] = None
     stock_symbol_full: Optional[str] = None
-    holder_name: Optional[str] = None
+    holder_name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     holder_info: Optional[str] = None
     holder_type: Optional[int] = None
     share_amount: Optional[int] = None
@@ -33,11 +34,11 @@ class StockHolderInfo(BaseModel):
     stock_symbol_full: Optional[str] = None
     holder_name: Optional[str] = None
     holder_info: Optional[str] = None
-    holder_type: Optional[int] = None
+    holder_type: Optional[int] = Field(None, json_schema_extra={"dict_type": "holder_type"})
     share_amount: Optional[int] = None
     share_ratio: Optional[int] = None
     change_amount: Optional[int] = None
-    change_type: Optional[int] = None
+    change_type: Optional[int] = Field(None, json_schema_extra={"dict_type": "change_type"})
     report_date: Optional[datetime] = None
     is_top_ten: Optional[int] = '0'
     ranking: Optional[int] = None
@@ -161,5 +162,5 @@ class ImportStockHolderInfo(CreateStockHolderInfo):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportStockHolderInfosResponse(BaseModel):
-    stock_holder_infos: list[ImportStockHolderInfo] = Field(default_factory=list, alias="stockHolderInfos")
\ No newline at end of file
+class ImportStockHolderInfosResponse(ImportResult):
+    pass
\ No newline at end of file
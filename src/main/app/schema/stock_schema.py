@@ -9,20 +9,21 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListStocksRequest(ListRequest):
     id: Optional[int] = None
     stock_code: Optional[str] = None
-    stock_name: Optional[str] = None
+    stock_name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     exchange: Optional[str] = None
     listing_date: Optional[datetime] = None
     industry: Optional[str] = None
     province: Optional[str] = None
     city: Optional[str] = None
-    company_name: Optional[str] = None
-    english_name: Optional[str] = None
-    former_name: Optional[str] = None
+    company_name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
+    english_name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
+    former_name: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     market_type: Optional[str] = None
     legal_representative: Optional[str] = None
     registered_capital: Optional[str] = None
@@ -236,5 +237,5 @@ class ImportStock(CreateStock):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportStocksResponse(BaseModel):
-    stocks: list[ImportStock] = Field(default_factory=list, alias="stocks")
\ No newline at end of file
+class ImportStocksResponse(ImportResult):
+    pass
\ No newline at end of file
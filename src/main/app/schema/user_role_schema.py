@@ -23,6 +23,7 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class AssignUserRoles(BaseModel):
@@ -114,5 +115,5 @@ class ImportUserRole(CreateUserRole):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportUserRolesResponse(BaseModel):
-    user_roles: list[ImportUserRole] = Field(default_factory=list, alias="userRoles")
+class ImportUserRolesResponse(ImportResult):
+    pass
@@ -22,14 +22,16 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 
 from fastlib.request import ListRequest
+from src.main.app.schema.import_schema import ImportResult
 
 
 class ListUsersRequest(ListRequest):
     id: Optional[int] = None
-    username: Optional[str] = None
-    nickname: Optional[str] = None
+    username: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
+    nickname: Optional[str] = Field(None, json_schema_extra={"filter": "prefix"})
     status: Optional[int] = None
     create_time: Optional[datetime] = None
+    with_labels: bool = False
 
 
 class User(BaseModel):
@@ -37,7 +39,7 @@ class User(BaseModel):
     username: str
     nickname: str
     avatar_url: Optional[str] = None
-    status: Optional[int] = None
+    status: Optional[int] = Field(None, json_schema_extra={"dict_type": "user_status"})
     remark: Optional[str] = None
     create_time: Optional[datetime] = None
 
@@ -129,5 +131,5 @@ class ImportUser(CreateUser):
     err_msg: Optional[str] = Field(None, alias="errMsg")
 
 
-class ImportUsersResponse(BaseModel):
-    users: list[ImportUser] = Field(default_factory=list, alias="users")
+class ImportUsersResponse(ImportResult):
+    pass
@@ -5,6 +5,7 @@ handler、jwt, openapi...
 """
 
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import uvicorn
@@ -13,15 +14,92 @@ from fastlib import ConfigManager, exception, openapi, router
 from fastlib.constants import RESOURCE_DIR
 from fastlib.db_engine import get_async_engine
 from fastlib.logging import logger
-from fastlib.middleware.db_session import (
-    SQLAlchemyMiddleware,
-)
-from fastlib.middleware.jwt import jwt_middleware
 from starlette.middleware.cors import CORSMiddleware
 
+from src.main.app.config import get_cache_config
+from src.main.app.mapper.db_session import DBSessionMiddleware, db
+from src.main.app.middleware import (
+    compile_rate_limits,
+    compile_route_permissions,
+    jwt_middleware,
+    permission_middleware,
+    rate_limit_middleware,
+    replica_middleware,
+)
+from src.main.app.utils import import_util, password_util, replica_util
+from src.main.app.utils.response_util import FastJSONResponse
+
 # Load config
 server_config = ConfigManager.get_server_config()
 security_config = ConfigManager.get_security_config()
+cache_config = get_cache_config()
+
+
+async def warm_up_caches() -> None:
+    """Preload in-process caches so the first requests are served from memory."""
+    from src.main.app.mapper.intelligence_information_mapper import (
+        intelligenceInformationMapper,
+    )
+    from src.main.app.mapper.stock_daily_recommendation_mapper import (
+        stockDailyRecommendationMapper,
+    )
+    from src.main.app.mapper.dict_datum_mapper import dictDatumMapper
+    from src.main.app.mapper.menu_mapper import menuMapper
+    from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
+    from src.main.app.service.impl.dict_datum_service_impl import DictDatumServiceImpl
+    from src.main.app.service.impl.intelligence_information_service_impl import (
+        IntelligenceInformationServiceImpl,
+    )
+    from src.main.app.service.impl.menu_service_impl import MenuServiceImpl
+    from src.main.app.service.impl.stock_daily_recommendation_service_impl import (
+        StockDailyRecommendationServiceImpl,
+    )
+
+    if cache_config.news_warm_on_startup:
+        try:
+            async with db():
+                await IntelligenceInformationServiceImpl(
+                    mapper=intelligenceInformationMapper
+                ).warm_latest_news_cache()
+        except Exception as e:
+            logger.warning(f"Failed to warm latest news cache: {e}")
+    try:
+        # Commits the expiry_date backfill of older recommendations
+        async with db(commit_on_exit=True):
+            await StockDailyRecommendationServiceImpl(
+                mapper=stockDailyRecommendationMapper
+            ).warm_active_recommendation_index()
+    except Exception as e:
+        logger.warning(f"Failed to warm active recommendation index: {e}")
+    try:
+        # Commits the tree_path backfill of menus written outside the services
+        async with db(commit_on_exit=True):
+            await MenuServiceImpl(mapper=menuMapper).rebuild_menu_tree_paths()
+    except Exception as e:
+        logger.warning(f"Failed to rebuild menu tree paths: {e}")
+    try:
+        # Commits the purge of expired revocations
+        async with db(commit_on_exit=True):
+            await AuthServiceImpl().warm_token_revocation_filter()
+    except Exception as e:
+        logger.warning(f"Failed to warm token revocation filter: {e}")
+    try:
+        async with db():
+            await DictDatumServiceImpl(mapper=dictDatumMapper).warm_dict_registry()
+    except Exception as e:
+        logger.warning(f"Failed to warm dictionary registry: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    compile_route_permissions(app.routes)
+    compile_rate_limits(app.routes)
+    await warm_up_caches()
+    await replica_util.start()
+    yield
+    await replica_util.shutdown()
+    import_util.shutdown()
+    password_util.shutdown()
 
 
 # Setup fastapi instance
@@ -31,10 +109,16 @@ app = FastAPI(
     title=server_config.name,
     version=server_config.version,
     description=server_config.app_desc,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Register middleware
-app.add_middleware(SQLAlchemyMiddleware, custom_engine=get_async_engine())
+app.add_middleware(
+    DBSessionMiddleware,
+    custom_engine=get_async_engine(),
+    session_args=replica_util.session_args(),
+)
 origins = [origin.strip() for origin in security_config.backend_cors_origins.split(",")]
 app.add_middleware(
     CORSMiddleware,
@@ -43,6 +127,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added first so that they run inside jwt_middleware, which binds the user
+app.middleware("http")(replica_middleware)
+app.middleware("http")(permission_middleware)
+app.middleware("http")(rate_limit_middleware)
 app.middleware("http")(jwt_middleware)
 
 # Register exception handler
@@ -17,13 +17,14 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Set
+from typing import Optional, Set
 
 
 from fastlib.schema import UserCredential
 from src.main.app.model.role_model import RoleModel
 from src.main.app.schema.menu_schema import Menu
 from src.main.app.schema.auth_schema import (
+    ResolvedAuthorization,
     SignInWithEmailAndPasswordRequest,
 )
 
@@ -39,3 +40,36 @@ class AuthService(ABC):
 
     @abstractmethod
     async def get_menus(self, id: int, role_models: list[RoleModel]) -> list[Menu]: ...
+
+    @abstractmethod
+    async def get_authorization(self, user_id: int) -> ResolvedAuthorization: ...
+
+    @abstractmethod
+    async def get_menu_tree(self, user_id: int) -> tuple[str, bytes]: ...
+
+    @abstractmethod
+    async def invalidate_user_authorizations(self, user_ids: list[int]) -> None: ...
+
+    @abstractmethod
+    async def invalidate_role_authorizations(self, role_ids: list[int]) -> None: ...
+
+    @abstractmethod
+    async def invalidate_menu_authorizations(self, menu_ids: list[int]) -> None: ...
+
+    @abstractmethod
+    async def invalidate_role_menu_authorizations(self, role_ids: list[int]) -> None: ...
+
+    @abstractmethod
+    async def is_permitted(self, user_id: int, permissions: tuple[str, ...]) -> bool: ...
+
+    @abstractmethod
+    async def authenticate(self, token: str) -> int: ...
+
+    @abstractmethod
+    async def sign_out(self, access_token: str, refresh_token: Optional[str] = None) -> None: ...
+
+    @abstractmethod
+    async def force_sign_out(self, user_id: int) -> None: ...
+
+    @abstractmethod
+    async def warm_token_revocation_filter(self) -> None: ...
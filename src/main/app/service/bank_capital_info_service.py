@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.bank_capital_info_model import BankCapitalInfoModel
+from src.main.app.model.bank_capital_peer_stat_model import BankCapitalPeerStatModel
 from src.main.app.schema.bank_capital_info_schema import (
     ListBankCapitalInfosRequest,
     CreateBankCapitalInfoRequest,
@@ -19,9 +21,10 @@ from src.main.app.schema.bank_capital_info_schema import (
     BatchCreateBankCapitalInfosRequest,
     BatchUpdateBankCapitalInfosRequest,
     ImportBankCapitalInfosRequest,
-    ImportBankCapitalInfo,
     BatchPatchBankCapitalInfosRequest,
+    ListBankCapitalPeerStatsRequest,
 )
+from src.main.app.schema.import_schema import ImportResult
 
 
 class BankCapitalInfoService(BaseService[BankCapitalInfoModel], ABC):
@@ -37,8 +40,18 @@ class BankCapitalInfoService(BaseService[BankCapitalInfoModel], ABC):
         self, *, req: ListBankCapitalInfosRequest
     ) -> tuple[list[BankCapitalInfoModel], int]: ...
 
+    @abstractmethod
+    async def stream_bank_capital_infos(
+        self, *, req: ListBankCapitalInfosRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     
 
+    @abstractmethod
+    async def list_bank_capital_peer_stats(
+        self, *, req: ListBankCapitalPeerStatsRequest
+    ) -> tuple[list[BankCapitalPeerStatModel], int]: ...
+
     @abstractmethod
     async def create_bank_capital_info(self, *, req: CreateBankCapitalInfoRequest) -> BankCapitalInfoModel: ...
 
@@ -82,4 +95,4 @@ class BankCapitalInfoService(BaseService[BankCapitalInfoModel], ABC):
     @abstractmethod
     async def import_bank_capital_infos(
         self, req: ImportBankCapitalInfosRequest
-    ) -> list[ImportBankCapitalInfo]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
\ No newline at end of file
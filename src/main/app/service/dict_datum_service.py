@@ -17,7 +17,10 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Optional
 
+from pydantic import BaseModel
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
@@ -31,9 +34,9 @@ from src.main.app.schema.dict_datum_schema import (
     BatchCreateDictDataRequest,
     BatchUpdateDictDataRequest,
     ImportDictDataRequest,
-    ImportDictDatum,
     BatchPatchDictDataRequest,
 )
+from src.main.app.schema.import_schema import ImportResult
 
 
 class DictDatumService(BaseService[DictDatumModel], ABC):
@@ -50,10 +53,22 @@ class DictDatumService(BaseService[DictDatumModel], ABC):
     ) -> tuple[list[DictDatumModel], int]: ...
 
     @abstractmethod
-    async def get_all_dict_data(self) -> list[DictDatumModel]: ...
+    async def stream_dict_data(
+        self, *, req: ListDictDataRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
+    @abstractmethod
+    async def get_dict_options(
+        self, types: Optional[list[str]] = None
+    ) -> tuple[str, bytes]: ...
+
+    @abstractmethod
+    async def resolve_dict_labels(
+        self, records: Sequence[Any], schema: type[BaseModel]
+    ) -> dict[str, dict[str, Optional[str]]]: ...
 
     @abstractmethod
-    async def get_dict_options(self, req: list[str]) -> list[DictDatumModel]: ...
+    async def warm_dict_registry(self) -> None: ...
 
     @abstractmethod
     async def create_dict_datum(self, *, req: CreateDictDatumRequest) -> DictDatumModel: ...
@@ -94,4 +109,4 @@ class DictDatumService(BaseService[DictDatumModel], ABC):
     async def export_dict_data(self, req: ExportDictDataRequest) -> StreamingResponse: ...
 
     @abstractmethod
-    async def import_dict_data(self, req: ImportDictDataRequest) -> list[ImportDictDatum]: ...
+    async def import_dict_data(self, req: ImportDictDataRequest) -> ImportResult: ...
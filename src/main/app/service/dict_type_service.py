@@ -16,6 +16,8 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any
 
 from starlette.responses import StreamingResponse
 
@@ -30,9 +32,9 @@ from src.main.app.schema.dict_type_schema import (
     BatchCreateDictTypesRequest,
     BatchUpdateDictTypesRequest,
     ImportDictTypesRequest,
-    ImportDictType,
     BatchPatchDictTypesRequest,
 )
+from src.main.app.schema.import_schema import ImportResult
 
 
 class DictTypeService(BaseService[DictTypeModel], ABC):
@@ -48,6 +50,11 @@ class DictTypeService(BaseService[DictTypeModel], ABC):
         self, *, req: ListDictTypesRequest
     ) -> tuple[list[DictTypeModel], int]: ...
 
+    @abstractmethod
+    async def stream_dict_types(
+        self, *, req: ListDictTypesRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     @abstractmethod
     async def create_dict_type(self, *, req: CreateDictTypeRequest) -> DictTypeModel: ...
 
@@ -87,4 +94,4 @@ class DictTypeService(BaseService[DictTypeModel], ABC):
     async def export_dict_types(self, req: ExportDictTypesRequest) -> StreamingResponse: ...
 
     @abstractmethod
-    async def import_dict_types(self, req: ImportDictTypesRequest) -> list[ImportDictType]: ...
+    async def import_dict_types(self, req: ImportDictTypesRequest) -> ImportResult: ...
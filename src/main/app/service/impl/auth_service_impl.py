@@ -16,30 +16,67 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
-from typing import Set
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Optional, Set
 
-from fastlib import security
+from jwt.exceptions import PyJWTError
+
+from fastlib import constants as constant
 from fastlib.config import ConfigManager
 from fastlib.schema import UserCredential
+from src.main.app.cache.authorization_cache import authorizationCache
+from src.main.app.cache.menu_tree_cache import CompiledMenuTree, menuTreeCache
+from src.main.app.cache.token_cache import tokenRevocationFilter, verifiedTokenCache
 from src.main.app.exception.auth_exception import AuthErrorCode
+from src.main.app.exception.biz_exception import BusinessErrorCode, BusinessException
 from src.main.app.enums.enum import TokenTypeEnum
 from src.main.app.exception import AuthException
+from src.main.app.mapper.db_session import after_commit, db
 from src.main.app.mapper.menu_mapper import menuMapper
 from src.main.app.mapper.role_mapper import roleMapper
 from src.main.app.mapper.role_menu_mapper import roleMenuMapper
+from src.main.app.mapper.token_revocation_mapper import tokenRevocationMapper
 from src.main.app.mapper.user_mapper import userMapper
 from src.main.app.mapper.user_role_mapper import userRoleMapper
 from src.main.app.model.menu_model import MenuModel
 from src.main.app.model.role_menu_model import RoleMenuModel
 from src.main.app.model.role_model import RoleModel
+from src.main.app.model.token_revocation_model import TokenRevocationModel
+from src.main.app.model.user_model import UserModel
 from src.main.app.model.user_role_model import UserRoleModel
 from src.main.app.schema.menu_schema import Menu
 from src.main.app.schema.auth_schema import (
+    ResolvedAuthorization,
     SignInWithEmailAndPasswordRequest,
     UserInfo,
 )
 from src.main.app.service.auth_service import AuthService
+from src.main.app.utils import password_util, token_util
+
+# Serializes the rebuilds of the revocation filter triggered by requests
+_revocation_reload_lock = asyncio.Lock()
+
+
+def _utcnow() -> datetime:
+    """Naive UTC now, the convention of the DATETIME columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def _invalidate_menu_tree() -> None:
+    menuTreeCache.invalidate()
+
+
+async def _revoke_tokens(token_digests: list[str]) -> None:
+    for token_digest in token_digests:
+        tokenRevocationFilter.revoke_token(token_digest)
+        verifiedTokenCache.pop(token_digest)
+
+
+async def _revoke_user(user_id: int, revoked_at: float) -> None:
+    tokenRevocationFilter.revoke_user(user_id, revoked_at)
 
 
 class AuthServiceImpl(AuthService):
@@ -51,11 +88,11 @@ class AuthServiceImpl(AuthService):
     async def generate_tokens(cls, user_id: int) -> UserCredential:
         security_config = ConfigManager.get_security_config()
 
-        access_token = security.create_token(subject=user_id, token_type=TokenTypeEnum.access)
+        access_token = token_util.create_token(subject=user_id, token_type=TokenTypeEnum.access)
 
         # generate refresh token
         refresh_token_expires = timedelta(minutes=security_config.refresh_token_expire_minutes)
-        refresh_token = security.create_token(
+        refresh_token = token_util.create_token(
             subject=user_id,
             token_type=TokenTypeEnum.refresh,
             expires_delta=refresh_token_expires,
@@ -82,7 +119,9 @@ class AuthServiceImpl(AuthService):
         username: str = req.username
 
         user_record = await userMapper.select_by_username(username=username)
-        if user_record is None or not security.verify_password(req.password, user_record.password):
+        if user_record is None or not await password_util.verify_password(
+            req.password, user_record.password
+        ):
             raise AuthException(AuthErrorCode.AUTH_FAILED)
         return await self.generate_tokens(user_id=user_record.id)
 
@@ -99,12 +138,12 @@ class AuthServiceImpl(AuthService):
             roles.add("admin")
         else:
             # Get roles from database for non-admin users
-            user_roles: list[UserRoleModel] = await userRoleMapper.select_by_userid(user_id=id)
+            user_roles: list[UserRoleModel] = await userRoleMapper.select_by_user_id(user_id=id)
             if not user_roles:
                 return roles, role_models
 
             role_ids = [user_role.role_id for user_role in user_roles]
-            role_models = roleMapper.select_by_role_ids(role_ids=role_ids)
+            role_models = await roleMapper.select_by_ids(ids=role_ids)
             if not role_models:
                 return roles, role_models
 
@@ -117,15 +156,13 @@ class AuthServiceImpl(AuthService):
     async def get_menus(self, id: int, role_models: list[RoleModel] = None) -> list[Menu]:
         """
         Get accessible menus for user based on their roles.
-        Returns a list of menu pages.
+        Returns a list of menu pages ordered by sort.
         """
         menus: list[Menu] = []
 
         # Admin gets all menus
         if UserInfo.is_admin(id):
-            menu_list, total_count = await menuMapper.select_by_parent_id()
-            if total_count == 0:
-                return menus
+            menu_list: list[MenuModel] = await menuMapper.select_all_menus()
             menus = [Menu(**menu.model_dump()) for menu in menu_list]
             return menus
 
@@ -135,14 +172,251 @@ class AuthServiceImpl(AuthService):
 
         # Get menus associated with user's roles
         role_ids = [role_model.id for role_model in role_models]
-        role_menu_records: list[RoleMenuModel] = roleMenuMapper.select_by_role_ids(
+        role_menu_records: list[RoleMenuModel] = await roleMenuMapper.get_by_role_ids(
             role_ids=role_ids
         )
         if not role_menu_records:
             return menus
 
         # Convert menu models to menu pages
-        menu_id_list = [role_menu_record.menu_id for role_menu_record in role_menu_records]
-        menu_list: list[MenuModel] = menuMapper.select_by_ids(ids=menu_id_list)
+        menu_id_list = list({role_menu_record.menu_id for role_menu_record in role_menu_records})
+        menu_list: list[MenuModel] = await menuMapper.select_by_ids(ids=menu_id_list)
         menus = [Menu(**menu.model_dump()) for menu in menu_list]
+        menus.sort(key=lambda menu: (menu.sort is None, menu.sort or 0, menu.id))
         return menus
+
+    async def get_authorization(self, user_id: int) -> ResolvedAuthorization:
+        """
+        Get the resolved roles, permissions and menus of a user.
+
+        Served from the authorization cache; on a miss the user, role and menu
+        lookups run once and their result is cached for the following calls.
+        """
+        authorization = await authorizationCache.get(user_id)
+        if authorization is not None:
+            return authorization
+
+        # Read the version first, a write landing during the lookups voids the entry
+        version = await authorizationCache.version()
+        user_record: UserModel = await userMapper.select_by_id(id=user_id)
+        if user_record is None:
+            raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
+        roles, role_models = await self.get_roles(id=user_id)
+        menus: list[Menu] = await self.get_menus(id=user_id, role_models=role_models)
+        if UserInfo.is_admin(user_id):
+            permissions = ["*.*.*"]
+        else:
+            permission_list = [menu.permission for menu in menus]
+            permissions = [permission for permission in permission_list if permission]
+        user_info = UserInfo(
+            **user_record.model_dump(),
+            permissions=permissions,
+            roles=roles,
+            menus=menus,
+        )
+        authorization = ResolvedAuthorization(
+            user_id=user_id,
+            version=version,
+            user_info=user_info,
+            role_ids=[role_model.id for role_model in role_models],
+            menu_ids=[menu.id for menu in menus],
+        )
+        await authorizationCache.put(authorization)
+        return authorization
+
+    async def get_menu_tree(self, user_id: int) -> tuple[str, bytes]:
+        """
+        Get the ETag and JSON body of the visible menu tree of a user.
+
+        The tree is compiled once per menu table version, and the menus of the
+        user are selected with the bitmask of their roles.
+        """
+        authorization = await self.get_authorization(user_id=user_id)
+        tree = menuTreeCache.get()
+        if tree is None:
+            tree = await self._compile_menu_tree()
+        if UserInfo.is_admin(user_id):
+            return tree.render(tree.full_mask)
+        return tree.render(tree.mask_of(authorization.role_ids))
+
+    async def is_permitted(self, user_id: int, permissions: tuple[str, ...]) -> bool:
+        """
+        Whether the menus granted to the user declare any of the permissions.
+
+        Permissions declared by no menu are not enforced. The check is served
+        from the compiled menu tree and the authorization cache, the database
+        is only read when one of them must be loaded again.
+        """
+        if UserInfo.is_admin(user_id):
+            return True
+        tree = menuTreeCache.get()
+        if tree is None:
+            async with db():
+                tree = await self._compile_menu_tree()
+        required_mask = tree.permission_mask(permissions)
+        if not required_mask:
+            return True
+        authorization = await authorizationCache.get(user_id)
+        if authorization is None:
+            try:
+                async with db():
+                    authorization = await self.get_authorization(user_id=user_id)
+            except BusinessException:
+                # The user was deleted while the token is still valid
+                return False
+        return bool(required_mask & tree.mask_of(authorization.role_ids))
+
+    @staticmethod
+    async def _compile_menu_tree() -> CompiledMenuTree:
+        version = menuTreeCache.version
+        menu_list: list[MenuModel] = await menuMapper.select_all_menus()
+        role_menus: list[tuple[int, int]] = await roleMenuMapper.select_role_menu_pairs()
+        menus = [Menu(**menu.model_dump()) for menu in menu_list]
+        return menuTreeCache.load(version, menus, role_menus)
+
+    async def invalidate_user_authorizations(self, user_ids: list[int]) -> None:
+        """
+        Drop the cached authorization of the given users once the ongoing
+        transaction is committed.
+
+        Invalidating before the commit would let a concurrent lookup read the
+        new version with the old rows and cache them until they expire.
+        """
+        after_commit(partial(authorizationCache.invalidate, user_ids))
+
+    async def invalidate_role_authorizations(self, role_ids: list[int]) -> None:
+        """
+        Drop the cached authorization of the users bound to the given roles,
+        once committed.
+        """
+        role_ids = [role_id for role_id in role_ids if role_id is not None]
+        if not role_ids:
+            return
+        user_ids: list[int] = await userRoleMapper.select_user_ids_by_role_ids(role_ids=role_ids)
+        await self.invalidate_user_authorizations(user_ids)
+
+    async def invalidate_menu_authorizations(self, menu_ids: list[int]) -> None:
+        """
+        Drop the cached authorization of the users who can access the given
+        menus, the admin always included as it sees every menu, once committed.
+        """
+        menu_ids = [menu_id for menu_id in menu_ids if menu_id is not None]
+        if not menu_ids:
+            return
+        after_commit(_invalidate_menu_tree)
+        role_ids: list[int] = await roleMenuMapper.select_role_ids_by_menu_ids(menu_ids=menu_ids)
+        user_ids: list[int] = []
+        if role_ids:
+            user_ids = await userRoleMapper.select_user_ids_by_role_ids(role_ids=role_ids)
+        await self.invalidate_user_authorizations([constant.ADMIN_ID, *user_ids])
+
+    async def invalidate_role_menu_authorizations(self, role_ids: list[int]) -> None:
+        """
+        Drop the compiled menu tree, whose role masks change with the
+        role_menu table, and the cached authorization of the users bound to
+        the given roles, once committed.
+        """
+        after_commit(_invalidate_menu_tree)
+        await self.invalidate_role_authorizations(role_ids=role_ids)
+
+    async def authenticate(self, token: str) -> int:
+        """
+        Verify a bearer token and return the id of its user.
+
+        The signature is verified once per token, its claims are then served
+        from the verified token cache until the token expires. Revocation is
+        checked on every call, with the Bloom filter answering the common
+        not-revoked case from memory.
+
+        Raises:
+            PyJWTError: If the token is malformed, forged or expired.
+            AuthException: If the token has been revoked.
+        """
+        digest = token_util.token_digest(token)
+        claims = verifiedTokenCache.get(digest)
+        if claims is None:
+            claims = token_util.decode_token(token)
+            verifiedTokenCache.put(digest, claims)
+        if await self._is_revoked(digest, claims):
+            raise AuthException(AuthErrorCode.TOKEN_REVOKED)
+        return int(claims["sub"])
+
+    async def _is_revoked(self, digest: str, claims: dict) -> bool:
+        if not tokenRevocationFilter.is_fresh():
+            async with _revocation_reload_lock:
+                if not tokenRevocationFilter.is_fresh():
+                    async with db():
+                        revocations = await tokenRevocationMapper.select_unexpired(
+                            now=_utcnow()
+                        )
+                    tokenRevocationFilter.load(revocations)
+        if tokenRevocationFilter.is_user_revoked(claims):
+            return True
+        if not tokenRevocationFilter.might_be_revoked(digest):
+            return False
+        if tokenRevocationFilter.is_confirmed_revoked(digest):
+            return True
+        async with db():
+            revoked = await tokenRevocationMapper.exists_by_token_digest(token_digest=digest)
+        if revoked:
+            tokenRevocationFilter.confirm_revoked(digest)
+        return revoked
+
+    async def sign_out(self, access_token: str, refresh_token: Optional[str] = None) -> None:
+        """
+        Revoke the tokens of the current session before they expire.
+
+        Tokens that no longer verify are skipped, they are rejected anyway.
+        The filter of this worker is updated once the revocations are
+        committed.
+        """
+        token_digests: list[str] = []
+        for token in (access_token, refresh_token):
+            if not token:
+                continue
+            try:
+                claims = token_util.decode_token(token)
+            except PyJWTError:
+                continue
+            digest = token_util.token_digest(token)
+            await tokenRevocationMapper.insert(
+                data=TokenRevocationModel(
+                    token_digest=digest,
+                    user_id=int(claims["sub"]),
+                    expires_at=datetime.fromtimestamp(claims["exp"], timezone.utc).replace(
+                        tzinfo=None
+                    ),
+                )
+            )
+            token_digests.append(digest)
+        if token_digests:
+            after_commit(partial(_revoke_tokens, token_digests))
+
+    async def force_sign_out(self, user_id: int) -> None:
+        """
+        Revoke every token issued to a user so far.
+
+        The revocation is kept for the lifetime of a refresh token, the
+        longest-lived token that can have been issued before it.
+        """
+        security_config = ConfigManager.get_security_config()
+        # Epoch seconds, the precision of the iat claim it is compared with
+        revoked_at = time.time()
+        await tokenRevocationMapper.insert(
+            data=TokenRevocationModel(
+                user_id=user_id,
+                revoked_at=revoked_at,
+                expires_at=_utcnow()
+                + timedelta(minutes=security_config.refresh_token_expire_minutes),
+            )
+        )
+        after_commit(partial(_revoke_user, user_id, revoked_at))
+
+    async def warm_token_revocation_filter(self) -> None:
+        """
+        Purge the expired revocations and load the deny list into the filter.
+        """
+        now = _utcnow()
+        await tokenRevocationMapper.delete_expired(now=now)
+        revocations = await tokenRevocationMapper.select_unexpired(now=now)
+        tokenRevocationFilter.load(revocations)
@@ -3,23 +3,23 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
+from datetime import datetime
 from typing import Type, Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
 from src.main.app.mapper.bank_capital_info_mapper import BankCapitalInfoMapper
+from src.main.app.mapper.bank_capital_peer_stat_mapper import bankCapitalPeerStatMapper
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.model.bank_capital_info_model import BankCapitalInfoModel
+from src.main.app.model.bank_capital_peer_stat_model import BankCapitalPeerStatModel
 from src.main.app.schema.bank_capital_info_schema import (
     ListBankCapitalInfosRequest,
     BankCapitalInfo,
@@ -35,9 +35,16 @@ from src.main.app.schema.bank_capital_info_schema import (
     ImportBankCapitalInfo,
     ExportBankCapitalInfo,
     BatchPatchBankCapitalInfosRequest,
+    ListBankCapitalPeerStatsRequest,
     BatchUpdateBankCapitalInfo,
 )
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.service.bank_capital_info_service import BankCapitalInfoService
+from src.main.app.utils import frame_util, import_util, peer_stat_util, snowflake_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+pd = lazy_import("pandas")
 
 
 class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapitalInfoModel], BankCapitalInfoService):
@@ -68,67 +75,52 @@ class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapi
     async def list_bank_capital_infos(
         self, req: ListBankCapitalInfosRequest
     ) -> tuple[list[BankCapitalInfoModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.trade_date is not None and req.trade_date != "":
-            filters[FilterOperators.EQ]["trade_date"] = req.trade_date
-        if req.bank_code is not None and req.bank_code != "":
-            filters[FilterOperators.EQ]["bank_code"] = req.bank_code
-        if req.bank_name is not None and req.bank_name != "":
-            filters[FilterOperators.LIKE]["bank_name"] = req.bank_name
-        if req.bank_type is not None and req.bank_type != "":
-            filters[FilterOperators.EQ]["bank_type"] = req.bank_type
-        if req.total_deposits is not None and req.total_deposits != "":
-            filters[FilterOperators.EQ]["total_deposits"] = req.total_deposits
-        if req.total_loans is not None and req.total_loans != "":
-            filters[FilterOperators.EQ]["total_loans"] = req.total_loans
-        if req.non_performing_loan_ratio is not None and req.non_performing_loan_ratio != "":
-            filters[FilterOperators.EQ]["non_performing_loan_ratio"] = req.non_performing_loan_ratio
-        if req.loan_loss_provision_ratio is not None and req.loan_loss_provision_ratio != "":
-            filters[FilterOperators.EQ]["loan_loss_provision_ratio"] = req.loan_loss_provision_ratio
-        if req.net_interest_margin is not None and req.net_interest_margin != "":
-            filters[FilterOperators.EQ]["net_interest_margin"] = req.net_interest_margin
-        if req.capital_adequacy_ratio is not None and req.capital_adequacy_ratio != "":
-            filters[FilterOperators.EQ]["capital_adequacy_ratio"] = req.capital_adequacy_ratio
-        if req.tier1_capital_ratio is not None and req.tier1_capital_ratio != "":
-            filters[FilterOperators.EQ]["tier1_capital_ratio"] = req.tier1_capital_ratio
-        if req.core_tier1_ratio is not None and req.core_tier1_ratio != "":
-            filters[FilterOperators.EQ]["core_tier1_ratio"] = req.core_tier1_ratio
-        if req.data_source is not None and req.data_source != "":
-            filters[FilterOperators.EQ]["data_source"] = req.data_source
-        if req.data_frequency is not None and req.data_frequency != "":
-            filters[FilterOperators.EQ]["data_frequency"] = req.data_frequency
-        if req.created_at is not None and req.created_at != "":
-            filters[FilterOperators.EQ]["created_at"] = req.created_at
-        if req.updated_at is not None and req.updated_at != "":
-            filters[FilterOperators.EQ]["updated_at"] = req.updated_at
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_bank_capital_infos(
+        self, req: ListBankCapitalInfosRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(BankCapitalInfo.model_fields))
 
     
 
+    async def list_bank_capital_peer_stats(
+        self, *, req: ListBankCapitalPeerStatsRequest
+    ) -> tuple[list[BankCapitalPeerStatModel], int]:
+        return await select_by_list_request(
+            bankCapitalPeerStatMapper, req, default_sort="peer_rank:asc"
+        )
+
+    async def refresh_peer_stats(self, trade_date_list: list[datetime]) -> int:
+        """
+        Rebuild the peer cross-sections of the given trade dates.
+
+        Any change to a bank moves the ranks of its peers, so the whole
+        cross-section of each affected trade_date is recomputed in one pass.
+        """
+        trade_date_list = list({trade_date for trade_date in trade_date_list if trade_date is not None})
+        if not trade_date_list:
+            return 0
+        rows = await self.mapper.select_cross_section(
+            fields=peer_stat_util.SOURCE_COLUMNS, trade_date_list=trade_date_list
+        )
+        cross_section = peer_stat_util.build_cross_section(
+            pd.DataFrame.from_records(list(rows), columns=peer_stat_util.SOURCE_COLUMNS)
+        )
+        await bankCapitalPeerStatMapper.delete_by_trade_date_list(trade_date_list=trade_date_list)
+        if cross_section.empty:
+            return 0
+        cross_section["id"] = snowflake_util.reserve_ids(len(cross_section))
+        await bankCapitalPeerStatMapper.batch_insert(
+            data_list=[BankCapitalPeerStatModel(**record) for record in frame_util.to_records(cross_section)]
+        )
+        return len(cross_section)
+
     async def create_bank_capital_info(self, req: CreateBankCapitalInfoRequest) -> BankCapitalInfoModel:
         bank_capital_info: BankCapitalInfoModel = BankCapitalInfoModel(**req.bank_capital_info.model_dump())
-        return await self.save(data=bank_capital_info)
+        bank_capital_info = await self.save(data=bank_capital_info)
+        await self.refresh_peer_stats([bank_capital_info.trade_date])
+        return bank_capital_info
 
     async def update_bank_capital_info(self, req: UpdateBankCapitalInfoRequest) -> BankCapitalInfoModel:
         bank_capital_info_record: BankCapitalInfoModel = await self.retrieve_by_id(id=req.bank_capital_info.id)
@@ -137,6 +129,7 @@ class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapi
         bank_capital_info_model = BankCapitalInfoModel(**req.bank_capital_info.model_dump(exclude_unset=True))
         await self.modify_by_id(data=bank_capital_info_model)
         merged_data = {**bank_capital_info_record.model_dump(), **bank_capital_info_model.model_dump()}
+        await self.refresh_peer_stats([bank_capital_info_record.trade_date, merged_data.get("trade_date")])
         return BankCapitalInfoModel(**merged_data)
 
     async def delete_bank_capital_info(self, id: int) -> None:
@@ -144,6 +137,7 @@ class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapi
         if bank_capital_info_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        await self.refresh_peer_stats([bank_capital_info_record.trade_date])
 
     async def batch_get_bank_capital_infos(self, ids: list[int]) -> list[BankCapitalInfoModel]:
         bank_capital_info_records = list[BankCapitalInfoModel] = await self.retrieve_by_ids(ids=ids)
@@ -167,6 +161,7 @@ class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapi
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         data_list = [BankCapitalInfoModel(**bank_capital_info.model_dump()) for bank_capital_info in bank_capital_info_list]
         await self.mapper.batch_insert(data_list=data_list)
+        await self.refresh_peer_stats([data.trade_date for data in data_list])
         return data_list
 
     async def batch_update_bank_capital_infos(
@@ -176,10 +171,13 @@ class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapi
         ids: list[int] = req.ids
         if not bank_capital_info or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
+        old_records = await self.mapper.select_by_ids(ids=ids)
         await self.mapper.batch_update_by_ids(
             ids=ids, data=bank_capital_info.model_dump(exclude_none=True)
         )
-        return await self.mapper.select_by_ids(ids=ids)
+        new_records = await self.mapper.select_by_ids(ids=ids)
+        await self.refresh_peer_stats([record.trade_date for record in [*old_records, *new_records]])
+        return new_records
 
     async def batch_patch_bank_capital_infos(
         self, req: BatchPatchBankCapitalInfosRequest
@@ -190,13 +188,23 @@ class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapi
         update_data: list[dict[str, Any]] = [
             bank_capital_info.model_dump(exclude_unset=True) for bank_capital_info in bank_capital_infos
         ]
-        await self.mapper.batch_update(items=update_data)
         bank_capital_info_ids: list[int] = [bank_capital_info.id for bank_capital_info in bank_capital_infos]
-        return await self.mapper.select_by_ids(ids=bank_capital_info_ids)
+        # Read before the patch, which refreshes the records of the session
+        old_trade_dates = [
+            record.trade_date
+            for record in await self.mapper.select_by_ids(ids=bank_capital_info_ids)
+        ]
+        new_records = await batch_patch(self.mapper, update_data)
+        await self.refresh_peer_stats(
+            [*old_trade_dates, *[record.trade_date for record in new_records]]
+        )
+        return new_records
 
     async def batch_delete_bank_capital_infos(self, req: BatchDeleteBankCapitalInfosRequest):
         ids: list[int] = req.ids
+        records = await self.mapper.select_by_ids(ids=ids)
         await self.mapper.batch_delete_by_ids(ids=ids)
+        await self.refresh_peer_stats([record.trade_date for record in records])
 
     async def export_bank_capital_infos_template(self) -> StreamingResponse:
         file_name = "bank_capital_info_import_tpl"
@@ -206,42 +214,26 @@ class BankCapitalInfoServiceImpl(BaseServiceImpl[BankCapitalInfoMapper, BankCapi
 
     async def export_bank_capital_infos(self, req: ExportBankCapitalInfosRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        bank_capital_info_list: list[BankCapitalInfoModel] = await self.mapper.select_by_ids(ids=ids)
-        if bank_capital_info_list is None or len(bank_capital_info_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No bank_capital_infos found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        bank_capital_info_page_list = [ExportBankCapitalInfo(**bank_capital_info.model_dump()) for bank_capital_info in bank_capital_info_list]
-        file_name = "bank_capital_info_data_export"
-        return await excel_util.export_excel(
-            schema=ExportBankCapitalInfo, file_name=file_name, data_list=bank_capital_info_page_list
+        fields = list(ExportBankCapitalInfo.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="bank_capital_info_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_bank_capital_infos(self, req: ImportBankCapitalInfosRequest) -> list[ImportBankCapitalInfo]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        bank_capital_info_records = import_df.to_dict(orient="records")
-        if bank_capital_info_records is None or len(bank_capital_info_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in bank_capital_info_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        bank_capital_info_import_list = []
-        for bank_capital_info_record in bank_capital_info_records:
-            try:
-                bank_capital_info_create = ImportBankCapitalInfo(**bank_capital_info_record)
-                bank_capital_info_import_list.append(bank_capital_info_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v
-                    for k, v in bank_capital_info_record.items()
-                    if k in ImportBankCapitalInfo.model_fields
-                }
-                bank_capital_info_create = ImportBankCapitalInfo.model_construct(**valid_data)
-                bank_capital_info_create.err_msg = ValidateService.get_validate_err_msg(e)
-                bank_capital_info_import_list.append(bank_capital_info_create)
-                return bank_capital_info_import_list
-
-        return bank_capital_info_import_list
\ No newline at end of file
+    async def import_bank_capital_infos(self, req: ImportBankCapitalInfosRequest) -> ImportResult:
+        trade_date_list: list[datetime] = []
+
+        async def before_insert(values_list: list[dict[str, Any]]) -> None:
+            trade_date_list.extend(values["trade_date"] for values in values_list)
+
+        result = await import_util.import_file(
+            req.file, ImportBankCapitalInfo, self.mapper, before_insert=before_insert
+        )
+        # The imported rows are in the transaction, rolled back if any was invalid
+        if result.inserted:
+            await self.refresh_peer_stats(trade_date_list)
+        return result
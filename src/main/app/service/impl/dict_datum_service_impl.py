@@ -16,24 +16,27 @@
 
 from __future__ import annotations
 
-import io
-import json
-from typing import Any
+from collections.abc import AsyncGenerator, Sequence
+from functools import partial
+from typing import Any, Optional
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
+from pydantic import BaseModel
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
+from src.main.app.cache.dict_registry import dict_fields, dictRegistry
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
 from src.main.app.mapper.dict_datum_mapper import DictDatumMapper
+from src.main.app.mapper.dict_type_mapper import dictTypeMapper
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.db_session import after_commit
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.model.dict_datum_model import DictDatumModel
 from src.main.app.schema.dict_datum_schema import (
+    DictDatum,
     ListDictDataRequest,
     CreateDictDatumRequest,
     UpdateDictDatumRequest,
@@ -49,7 +52,16 @@ from src.main.app.schema.dict_datum_schema import (
     BatchPatchDictDataRequest,
     BatchUpdateDictDatum,
 )
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.service.dict_datum_service import DictDatumService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+
+async def _invalidate_dict_types(types: list[Optional[str]]) -> None:
+    dictRegistry.invalidate(types)
 
 
 class DictDatumServiceImpl(BaseServiceImpl[DictDatumMapper, DictDatumModel], DictDatumService):
@@ -78,73 +90,83 @@ class DictDatumServiceImpl(BaseServiceImpl[DictDatumMapper, DictDatumModel], Dic
         return dict_datum_record
 
     async def list_dict_data(self, req: ListDictDataRequest) -> tuple[list[DictDatumModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.label is not None and req.label != "":
-            filters[FilterOperators.EQ]["label"] = req.label
-        if req.value is not None and req.value != "":
-            filters[FilterOperators.EQ]["value"] = req.value
-        if req.type is not None and req.type != "":
-            filters[FilterOperators.EQ]["type"] = req.type
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
 
-    async def get_all_dict_data(self) -> list[DictDatumModel]:
-        result = []
-        current = 1
-        page_size = 1000
+    async def stream_dict_data(
+        self, req: ListDictDataRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(DictDatum.model_fields))
 
-        while True:
-            items, total = await self.mapper.select_by_ordered_page(
-                current=current,
-                page_size=page_size,
-            )
-            result.extend(items)
-            if len(items) == total:
-                break
-            current += 1
-            
+    async def get_dict_options(self, types: Optional[list[str]] = None) -> tuple[str, bytes]:
+        """
+        Get the ETag and JSON body of the options of the given dictionary
+        types, of every type when ``types`` is None.
+
+        Served from the dictionary registry, the database is only read for
+        the types written since they were last read, or when the registry
+        must be loaded again.
+        """
+        await self._refresh_dict_registry()
+        return dictRegistry.render(types)
+
+    async def resolve_dict_labels(
+        self, records: Sequence[Any], schema: type[BaseModel]
+    ) -> dict[str, dict[str, Optional[str]]]:
+        """
+        Resolve the labels of the dictionary-backed fields of ``schema`` for a
+        page of records, as field name -> {value: label}.
+
+        The labels of the whole page are looked up at once in the dictionary
+        registry, instead of a join per row or a round trip of the client.
+        """
+        fields = dict_fields(schema)
+        if not fields:
+            return {}
+        await self._refresh_dict_registry()
+        return dictRegistry.resolve_labels(records, fields)
 
-        return result
+    async def warm_dict_registry(self) -> None:
+        """Load every dictionary type and its options into the registry."""
+        version = dictRegistry.version
+        dict_types = await dictTypeMapper.select_type_names()
+        options = await self.mapper.select_options()
+        dictRegistry.load(version, dict_types, options)
 
-    async def get_dict_options(self, req: list[str]) -> list[DictDatumModel]:
-        return await self.mapper.select_by_types(data=req)
+    async def _refresh_dict_registry(self) -> None:
+        if not dictRegistry.is_fresh():
+            await self.warm_dict_registry()
+            return
+        stale_types = dictRegistry.stale_types()
+        if stale_types:
+            version = dictRegistry.version
+            dict_types = await dictTypeMapper.select_type_names(types=stale_types)
+            options = await self.mapper.select_options(types=stale_types)
+            dictRegistry.reload(version, stale_types, dict_types, options)
 
     async def create_dict_datum(self, req: CreateDictDatumRequest) -> DictDatumModel:
         dict_datum: DictDatumModel = DictDatumModel(**req.dict_datum.model_dump())
-        return await self.save(data=dict_datum)
+        dict_datum = await self.save(data=dict_datum)
+        after_commit(partial(_invalidate_dict_types, [dict_datum.type]))
+        return dict_datum
 
     async def update_dict_datum(self, req: UpdateDictDatumRequest) -> DictDatumModel:
-        dict_datum_record: DictDatumModel = await self.retrieve_by_id(id=req.dict_datum.id)
+        dict_datum_record: DictDatumModel = await self.mapper.select_by_id(id=req.dict_datum.id)
         if dict_datum_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
-        dict_datum_model = DictDatumModel(**req.dict_datum.model_dump(exclude_unset=True))
-        await self.modify_by_id(data=dict_datum_model)
-        merged_data = {**dict_datum_record.model_dump(), **dict_datum_model.model_dump()}
-        return DictDatumModel(**merged_data)
+        dict_datum_type = dict_datum_record.type
+        dict_datum_data = req.dict_datum.model_dump(exclude_unset=True)
+        await self.mapper.update_by_id(data=DictDatumModel(**dict_datum_data))
+        after_commit(
+            partial(_invalidate_dict_types, [dict_datum_type, dict_datum_data.get("type")])
+        )
+        return await self.mapper.select_by_id(id=req.dict_datum.id)
 
     async def delete_dict_datum(self, id: int) -> None:
-        dict_datum_record: DictDatumModel = await self.retrieve_by_id(id=id)
+        dict_datum_record: DictDatumModel = await self.mapper.select_by_id(id=id)
         if dict_datum_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        after_commit(partial(_invalidate_dict_types, [dict_datum_record.type]))
 
     async def batch_get_dict_data(self, ids: list[int]) -> list[DictDatumModel]:
         dict_datum_records = list[DictDatumModel] = await self.retrieve_by_ids(ids=ids)
@@ -168,6 +190,7 @@ class DictDatumServiceImpl(BaseServiceImpl[DictDatumMapper, DictDatumModel], Dic
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         data_list = [DictDatumModel(**dict_datum.model_dump()) for dict_datum in dict_datum_list]
         await self.mapper.batch_insert(data_list=data_list)
+        after_commit(partial(_invalidate_dict_types, [dict_datum.type for dict_datum in data_list]))
         return data_list
 
     async def batch_update_dict_data(self, req: BatchUpdateDictDataRequest) -> list[DictDatumModel]:
@@ -178,7 +201,11 @@ class DictDatumServiceImpl(BaseServiceImpl[DictDatumMapper, DictDatumModel], Dic
         await self.mapper.batch_update_by_ids(
             ids=ids, data=dict_datum.model_dump(exclude_none=True)
         )
-        return await self.mapper.select_by_ids(ids=ids)
+        dict_datum_records: list[DictDatumModel] = await self.mapper.select_by_ids(ids=ids)
+        after_commit(
+            partial(_invalidate_dict_types, [record.type for record in dict_datum_records])
+        )
+        return dict_datum_records
 
     async def batch_patch_dict_data(self, req: BatchPatchDictDataRequest) -> list[DictDatumModel]:
         dict_data: list[UpdateDictDatum] = req.dict_data
@@ -187,13 +214,23 @@ class DictDatumServiceImpl(BaseServiceImpl[DictDatumMapper, DictDatumModel], Dic
         update_data: list[dict[str, Any]] = [
             dict_datum.model_dump(exclude_unset=True) for dict_datum in dict_data
         ]
-        await self.mapper.batch_update(items=update_data)
         dict_datum_ids: list[int] = [dict_datum.id for dict_datum in dict_data]
-        return await self.mapper.select_by_ids(ids=dict_datum_ids)
+        # The types before the patch lose the options moved to another type
+        previous_types = await self.mapper.select_types_by_ids(ids=dict_datum_ids)
+        dict_datum_records: list[DictDatumModel] = await batch_patch(self.mapper, update_data)
+        after_commit(
+            partial(
+                _invalidate_dict_types,
+                [*previous_types, *[record.type for record in dict_datum_records]],
+            )
+        )
+        return dict_datum_records
 
     async def batch_delete_dict_data(self, req: BatchDeleteDictDataRequest):
         ids: list[int] = req.ids
+        dict_datum_types = await self.mapper.select_types_by_ids(ids=ids)
         await self.mapper.batch_delete_by_ids(ids=ids)
+        after_commit(partial(_invalidate_dict_types, dict_datum_types))
 
     async def export_dict_data_template(self) -> StreamingResponse:
         file_name = "dict_datum_import_tpl"
@@ -201,42 +238,20 @@ class DictDatumServiceImpl(BaseServiceImpl[DictDatumMapper, DictDatumModel], Dic
 
     async def export_dict_data(self, req: ExportDictDataRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        dict_datum_list: list[DictDatumModel] = await self.mapper.select_by_ids(ids=ids)
-        if dict_datum_list is None or len(dict_datum_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No dict_data found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        dict_datum_page_list = [
-            ExportDictDatum(**dict_datum.model_dump()) for dict_datum in dict_datum_list
-        ]
-        file_name = "dict_datum_data_export"
-        return await excel_util.export_excel(
-            schema=ExportDictDatum, file_name=file_name, data_list=dict_datum_page_list
+        fields = list(ExportDictDatum.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="dict_datum_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_dict_data(self, req: ImportDictDataRequest) -> list[ImportDictDatum]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        dict_datum_records = import_df.to_dict(orient="records")
-        if dict_datum_records is None or len(dict_datum_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in dict_datum_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        dict_datum_import_list = []
-        for dict_datum_record in dict_datum_records:
-            try:
-                dict_datum_create = ImportDictDatum(**dict_datum_record)
-                dict_datum_import_list.append(dict_datum_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v for k, v in dict_datum_record.items() if k in ImportDictDatum.model_fields
-                }
-                dict_datum_create = ImportDictDatum.model_construct(**valid_data)
-                dict_datum_create.err_msg = ValidateService.get_validate_err_msg(e)
-                dict_datum_import_list.append(dict_datum_create)
-                return dict_datum_import_list
-
-        return dict_datum_import_list
+    async def import_dict_data(self, req: ImportDictDataRequest) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportDictDatum, self.mapper, before_insert=self._before_import
+        )
+
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        after_commit(partial(_invalidate_dict_types, [values["type"] for values in values_list]))
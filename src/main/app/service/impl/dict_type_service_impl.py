@@ -16,22 +16,22 @@
 
 from __future__ import annotations
 
-import io
-import json
-from typing import Type, Any
+from collections.abc import AsyncGenerator, Sequence
+from functools import partial
+from typing import Type, Any, Optional
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
+from src.main.app.cache.dict_registry import dictRegistry
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
 from src.main.app.mapper.dict_type_mapper import DictTypeMapper
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.db_session import after_commit
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.model.dict_type_model import DictTypeModel
 from src.main.app.schema.dict_type_schema import (
     ListDictTypesRequest,
@@ -50,7 +50,16 @@ from src.main.app.schema.dict_type_schema import (
     BatchPatchDictTypesRequest,
     BatchUpdateDictType,
 )
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.service.dict_type_service import DictTypeService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+
+async def _invalidate_dict_types(types: list[Optional[str]]) -> None:
+    dictRegistry.invalidate(types)
 
 
 class DictTypeServiceImpl(BaseServiceImpl[DictTypeMapper, DictTypeModel], DictTypeService):
@@ -79,37 +88,12 @@ class DictTypeServiceImpl(BaseServiceImpl[DictTypeMapper, DictTypeModel], DictTy
         return dict_type_record
 
     async def list_dict_types(self, req: ListDictTypesRequest) -> tuple[list[DictTypeModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.name is not None and req.name != "":
-            filters[FilterOperators.LIKE]["name"] = req.name
-        if req.type is not None and req.type != "":
-            filters[FilterOperators.EQ]["type"] = req.type
-        if req.status is not None and req.status != "":
-            filters[FilterOperators.EQ]["status"] = req.status
-        if req.create_time is not None and req.create_time != "":
-            filters[FilterOperators.EQ]["create_time"] = req.create_time
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_dict_types(
+        self, req: ListDictTypesRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(DictType.model_fields))
 
     async def get_children_recursively(
         self, *, parent_data: list[DictTypeModel], schema_class: Type[DictType]
@@ -123,22 +107,26 @@ class DictTypeServiceImpl(BaseServiceImpl[DictTypeMapper, DictTypeModel], DictTy
 
     async def create_dict_type(self, req: CreateDictTypeRequest) -> DictTypeModel:
         dict_type: DictTypeModel = DictTypeModel(**req.dict_type.model_dump())
-        return await self.save(data=dict_type)
+        dict_type = await self.save(data=dict_type)
+        after_commit(partial(_invalidate_dict_types, [dict_type.type]))
+        return dict_type
 
     async def update_dict_type(self, req: UpdateDictTypeRequest) -> DictTypeModel:
-        dict_type_record: DictTypeModel = await self.retrieve_by_id(id=req.dict_type.id)
+        dict_type_record: DictTypeModel = await self.mapper.select_by_id(id=req.dict_type.id)
         if dict_type_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
-        dict_type_model = DictTypeModel(**req.dict_type.model_dump(exclude_unset=True))
-        await self.modify_by_id(data=dict_type_model)
-        merged_data = {**dict_type_record.model_dump(), **dict_type_model.model_dump()}
-        return DictTypeModel(**merged_data)
+        previous_type = dict_type_record.type
+        dict_type_data = req.dict_type.model_dump(exclude_unset=True)
+        await self.mapper.update_by_id(data=DictTypeModel(**dict_type_data))
+        after_commit(partial(_invalidate_dict_types, [previous_type, dict_type_data.get("type")]))
+        return await self.mapper.select_by_id(id=req.dict_type.id)
 
     async def delete_dict_type(self, id: int) -> None:
-        dict_type_record: DictTypeModel = await self.retrieve_by_id(id=id)
+        dict_type_record: DictTypeModel = await self.mapper.select_by_id(id=id)
         if dict_type_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        after_commit(partial(_invalidate_dict_types, [dict_type_record.type]))
 
     async def batch_get_dict_types(self, ids: list[int]) -> list[DictTypeModel]:
         dict_type_records = list[DictTypeModel] = await self.retrieve_by_ids(ids=ids)
@@ -162,6 +150,7 @@ class DictTypeServiceImpl(BaseServiceImpl[DictTypeMapper, DictTypeModel], DictTy
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         data_list = [DictTypeModel(**dict_type.model_dump()) for dict_type in dict_type_list]
         await self.mapper.batch_insert(data_list=data_list)
+        after_commit(partial(_invalidate_dict_types, [dict_type.type for dict_type in data_list]))
         return data_list
 
     async def batch_update_dict_types(
@@ -171,7 +160,9 @@ class DictTypeServiceImpl(BaseServiceImpl[DictTypeMapper, DictTypeModel], DictTy
         ids: list[int] = req.ids
         if not dict_type or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
+        previous_types = await self.mapper.select_types_by_ids(ids=ids)
         await self.mapper.batch_update_by_ids(ids=ids, data=dict_type.model_dump(exclude_none=True))
+        after_commit(partial(_invalidate_dict_types, [*previous_types, dict_type.type]))
         return await self.mapper.select_by_ids(ids=ids)
 
     async def batch_patch_dict_types(self, req: BatchPatchDictTypesRequest) -> list[DictTypeModel]:
@@ -181,13 +172,22 @@ class DictTypeServiceImpl(BaseServiceImpl[DictTypeMapper, DictTypeModel], DictTy
         update_data: list[dict[str, Any]] = [
             dict_type.model_dump(exclude_unset=True) for dict_type in dict_types
         ]
-        await self.mapper.batch_update(items=update_data)
         dict_type_ids: list[int] = [dict_type.id for dict_type in dict_types]
-        return await self.mapper.select_by_ids(ids=dict_type_ids)
+        previous_types = await self.mapper.select_types_by_ids(ids=dict_type_ids)
+        dict_type_records: list[DictTypeModel] = await batch_patch(self.mapper, update_data)
+        after_commit(
+            partial(
+                _invalidate_dict_types,
+                [*previous_types, *[dict_type.type for dict_type in dict_types]],
+            )
+        )
+        return dict_type_records
 
     async def batch_delete_dict_types(self, req: BatchDeleteDictTypesRequest):
         ids: list[int] = req.ids
+        dict_types = await self.mapper.select_types_by_ids(ids=ids)
         await self.mapper.batch_delete_by_ids(ids=ids)
+        after_commit(partial(_invalidate_dict_types, dict_types))
 
     async def export_dict_types_template(self) -> StreamingResponse:
         file_name = "dict_type_import_tpl"
@@ -195,42 +195,20 @@ class DictTypeServiceImpl(BaseServiceImpl[DictTypeMapper, DictTypeModel], DictTy
 
     async def export_dict_types(self, req: ExportDictTypesRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        dict_type_list: list[DictTypeModel] = await self.mapper.select_by_ids(ids=ids)
-        if dict_type_list is None or len(dict_type_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No dict_types found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        dict_type_page_list = [
-            ExportDictType(**dict_type.model_dump()) for dict_type in dict_type_list
-        ]
-        file_name = "dict_type_data_export"
-        return await excel_util.export_excel(
-            schema=ExportDictType, file_name=file_name, data_list=dict_type_page_list
+        fields = list(ExportDictType.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="dict_type_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_dict_types(self, req: ImportDictTypesRequest) -> list[ImportDictType]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        dict_type_records = import_df.to_dict(orient="records")
-        if dict_type_records is None or len(dict_type_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in dict_type_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        dict_type_import_list = []
-        for dict_type_record in dict_type_records:
-            try:
-                dict_type_create = ImportDictType(**dict_type_record)
-                dict_type_import_list.append(dict_type_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v for k, v in dict_type_record.items() if k in ImportDictType.model_fields
-                }
-                dict_type_create = ImportDictType.model_construct(**valid_data)
-                dict_type_create.err_msg = ValidateService.get_validate_err_msg(e)
-                dict_type_import_list.append(dict_type_create)
-                return dict_type_import_list
-
-        return dict_type_import_list
+    async def import_dict_types(self, req: ImportDictTypesRequest) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportDictType, self.mapper, before_insert=self._before_import
+        )
+
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        after_commit(partial(_invalidate_dict_types, [values["type"] for values in values_list]))
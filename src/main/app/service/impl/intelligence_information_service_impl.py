@@ -3,23 +3,25 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
+from datetime import datetime
+from functools import partial
 from typing import Type, Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
+from src.main.app.cache.news_cache import latestNewsCache
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.db_session import after_commit
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
 from src.main.app.mapper.intelligence_information_mapper import IntelligenceInformationMapper
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.model.intelligence_information_model import IntelligenceInformationModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.intelligence_information_schema import (
     ListIntelligenceInformationRequest,
     IntelligenceInformation,
@@ -36,8 +38,14 @@ from src.main.app.schema.intelligence_information_schema import (
     ExportIntelligenceInformation,
     BatchPatchIntelligenceInformationRequest,
     BatchUpdateIntelligenceInformation,
+    ListLatestNewsRequest,
+    LatestNews,
 )
 from src.main.app.service.intelligence_information_service import IntelligenceInformationService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
 
 
 class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformationMapper, IntelligenceInformationModel], IntelligenceInformationService):
@@ -68,55 +76,56 @@ class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformation
     async def list_intelligence_information(
         self, req: ListIntelligenceInformationRequest
     ) -> tuple[list[IntelligenceInformationModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.stock_symbol_full is not None and req.stock_symbol_full != "":
-            filters[FilterOperators.EQ]["stock_symbol_full"] = req.stock_symbol_full
-        if req.news_title is not None and req.news_title != "":
-            filters[FilterOperators.EQ]["news_title"] = req.news_title
-        if req.news_content is not None and req.news_content != "":
-            filters[FilterOperators.EQ]["news_content"] = req.news_content
-        if req.news_source is not None and req.news_source != "":
-            filters[FilterOperators.EQ]["news_source"] = req.news_source
-        if req.publish_time is not None and req.publish_time != "":
-            filters[FilterOperators.EQ]["publish_time"] = req.publish_time
-        if req.news_url is not None and req.news_url != "":
-            filters[FilterOperators.EQ]["news_url"] = req.news_url
-        if req.impact_direction is not None and req.impact_direction != "":
-            filters[FilterOperators.EQ]["impact_direction"] = req.impact_direction
-        if req.impact_level is not None and req.impact_level != "":
-            filters[FilterOperators.EQ]["impact_level"] = req.impact_level
-        if req.created_at is not None and req.created_at != "":
-            filters[FilterOperators.EQ]["created_at"] = req.created_at
-        if req.updated_at is not None and req.updated_at != "":
-            filters[FilterOperators.EQ]["updated_at"] = req.updated_at
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
-
-    
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_intelligence_information(
+        self, req: ListIntelligenceInformationRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(
+            self.mapper, req, fields=list(IntelligenceInformation.model_fields)
+        )
+
+    async def list_latest_news(self, *, req: ListLatestNewsRequest) -> list[LatestNews]:
+        cached_news = await latestNewsCache.get(req.stock_symbol_full, req.limit)
+        if cached_news is not None:
+            return cached_news
+        version = await latestNewsCache.version()
+        news_list: list[LatestNews] = await self.mapper.select_latest_by_stock_symbol_full(
+            stock_symbol_full=req.stock_symbol_full,
+            limit=max(req.limit, latestNewsCache.buffer_size),
+            schema=LatestNews,
+        )
+        if req.limit <= latestNewsCache.buffer_size:
+            await latestNewsCache.fill(req.stock_symbol_full, news_list, version)
+        return news_list[: req.limit]
+
+    async def warm_latest_news_cache(self) -> None:
+        version = await latestNewsCache.version()
+        news_list: list[LatestNews] = await self.mapper.select_latest_per_stock(
+            limit=latestNewsCache.buffer_size,
+            max_stocks=latestNewsCache.max_symbols,
+            schema=LatestNews,
+        )
+        news_by_symbol: dict[str, list[LatestNews]] = {}
+        for news in news_list:
+            news_by_symbol.setdefault(news.stock_symbol_full, []).append(news)
+        # Rows are ordered by publish_time, so the most active stocks are
+        # filled last and end up most recently used.
+        for stock_symbol_full in sorted(
+            news_by_symbol, key=lambda symbol: news_by_symbol[symbol][-1].publish_time or datetime.min
+        ):
+            await latestNewsCache.fill(
+                stock_symbol_full, news_by_symbol[stock_symbol_full], version
+            )
+        logger.info(f"Latest news cache warmed with {len(news_by_symbol)} stocks")
 
     async def create_intelligence_information(self, req: CreateIntelligenceInformationRequest) -> IntelligenceInformationModel:
         intelligence_information: IntelligenceInformationModel = IntelligenceInformationModel(**req.intelligence_information.model_dump())
-        return await self.save(data=intelligence_information)
+        intelligence_information = await self.save(data=intelligence_information)
+        after_commit(
+            partial(latestNewsCache.push, [LatestNews(**intelligence_information.model_dump())])
+        )
+        return intelligence_information
 
     async def update_intelligence_information(self, req: UpdateIntelligenceInformationRequest) -> IntelligenceInformationModel:
         intelligence_information_record: IntelligenceInformationModel = await self.retrieve_by_id(id=req.intelligence_information.id)
@@ -125,6 +134,12 @@ class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformation
         intelligence_information_model = IntelligenceInformationModel(**req.intelligence_information.model_dump(exclude_unset=True))
         await self.modify_by_id(data=intelligence_information_model)
         merged_data = {**intelligence_information_record.model_dump(), **intelligence_information_model.model_dump()}
+        after_commit(
+            partial(
+                latestNewsCache.invalidate,
+                [intelligence_information_record.stock_symbol_full, merged_data.get("stock_symbol_full")],
+            )
+        )
         return IntelligenceInformationModel(**merged_data)
 
     async def delete_intelligence_information(self, id: int) -> None:
@@ -132,6 +147,9 @@ class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformation
         if intelligence_information_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        after_commit(
+            partial(latestNewsCache.invalidate, [intelligence_information_record.stock_symbol_full])
+        )
 
     async def batch_get_intelligence_information(self, ids: list[int]) -> list[IntelligenceInformationModel]:
         intelligence_information_records = list[IntelligenceInformationModel] = await self.retrieve_by_ids(ids=ids)
@@ -155,6 +173,9 @@ class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformation
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         data_list = [IntelligenceInformationModel(**intelligence_information.model_dump()) for intelligence_information in intelligence_information_list]
         await self.mapper.batch_insert(data_list=data_list)
+        after_commit(
+            partial(latestNewsCache.push, [LatestNews(**data.model_dump()) for data in data_list])
+        )
         return data_list
 
     async def batch_update_intelligence_information(
@@ -164,10 +185,18 @@ class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformation
         ids: list[int] = req.ids
         if not intelligence_information or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
+        old_records: list[IntelligenceInformationModel] = await self.mapper.select_by_ids(ids=ids)
         await self.mapper.batch_update_by_ids(
             ids=ids, data=intelligence_information.model_dump(exclude_none=True)
         )
-        return await self.mapper.select_by_ids(ids=ids)
+        new_records: list[IntelligenceInformationModel] = await self.mapper.select_by_ids(ids=ids)
+        after_commit(
+            partial(
+                latestNewsCache.invalidate,
+                [record.stock_symbol_full for record in [*old_records, *new_records]],
+            )
+        )
+        return new_records
 
     async def batch_patch_intelligence_information(
         self, req: BatchPatchIntelligenceInformationRequest
@@ -178,13 +207,30 @@ class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformation
         update_data: list[dict[str, Any]] = [
             intelligence_information.model_dump(exclude_unset=True) for intelligence_information in intelligence_information
         ]
-        await self.mapper.batch_update(items=update_data)
         intelligence_information_ids: list[int] = [intelligence_information.id for intelligence_information in intelligence_information]
-        return await self.mapper.select_by_ids(ids=intelligence_information_ids)
+        # Read before the patch, which refreshes the records of the session
+        old_symbols = [
+            record.stock_symbol_full
+            for record in await self.mapper.select_by_ids(ids=intelligence_information_ids)
+        ]
+        new_records: list[IntelligenceInformationModel] = await batch_patch(
+            self.mapper, update_data
+        )
+        after_commit(
+            partial(
+                latestNewsCache.invalidate,
+                [*old_symbols, *[record.stock_symbol_full for record in new_records]],
+            )
+        )
+        return new_records
 
     async def batch_delete_intelligence_information(self, req: BatchDeleteIntelligenceInformationRequest):
         ids: list[int] = req.ids
+        records: list[IntelligenceInformationModel] = await self.mapper.select_by_ids(ids=ids)
         await self.mapper.batch_delete_by_ids(ids=ids)
+        after_commit(
+            partial(latestNewsCache.invalidate, [record.stock_symbol_full for record in records])
+        )
 
     async def export_intelligence_information_template(self) -> StreamingResponse:
         file_name = "intelligence_information_import_tpl"
@@ -194,42 +240,25 @@ class IntelligenceInformationServiceImpl(BaseServiceImpl[IntelligenceInformation
 
     async def export_intelligence_information(self, req: ExportIntelligenceInformationRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        intelligence_information_list: list[IntelligenceInformationModel] = await self.mapper.select_by_ids(ids=ids)
-        if intelligence_information_list is None or len(intelligence_information_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No intelligence_information found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        intelligence_information_page_list = [ExportIntelligenceInformation(**intelligence_information.model_dump()) for intelligence_information in intelligence_information_list]
-        file_name = "intelligence_information_data_export"
-        return await excel_util.export_excel(
-            schema=ExportIntelligenceInformation, file_name=file_name, data_list=intelligence_information_page_list
+        fields = list(ExportIntelligenceInformation.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="intelligence_information_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_intelligence_information(self, req: ImportIntelligenceInformationRequest) -> list[ImportIntelligenceInformation]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        intelligence_information_records = import_df.to_dict(orient="records")
-        if intelligence_information_records is None or len(intelligence_information_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in intelligence_information_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        intelligence_information_import_list = []
-        for intelligence_information_record in intelligence_information_records:
-            try:
-                intelligence_information_create = ImportIntelligenceInformation(**intelligence_information_record)
-                intelligence_information_import_list.append(intelligence_information_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v
-                    for k, v in intelligence_information_record.items()
-                    if k in ImportIntelligenceInformation.model_fields
-                }
-                intelligence_information_create = ImportIntelligenceInformation.model_construct(**valid_data)
-                intelligence_information_create.err_msg = ValidateService.get_validate_err_msg(e)
-                intelligence_information_import_list.append(intelligence_information_create)
-                return intelligence_information_import_list
-
-        return intelligence_information_import_list
\ No newline at end of file
+    async def import_intelligence_information(
+        self, req: ImportIntelligenceInformationRequest
+    ) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportIntelligenceInformation, self.mapper, before_insert=self._before_import
+        )
+
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        """Drop the latest news of the stocks of a chunk of imported news, once committed."""
+        after_commit(
+            partial(latestNewsCache.invalidate, [values["stock_symbol_full"] for values in values_list])
+        )
@@ -16,23 +16,21 @@
 
 from __future__ import annotations
 
-import io
-import json
-from typing import Type, Any
+from collections.abc import AsyncGenerator, Sequence
+from typing import Optional, Type, Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.menu_mapper import MenuMapper
 from src.main.app.model.menu_model import MenuModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.menu_schema import (
     ListMenusRequest,
     Menu,
@@ -50,7 +48,21 @@ from src.main.app.schema.menu_schema import (
     BatchPatchMenusRequest,
     BatchUpdateMenu,
 )
+from src.main.app.service.auth_service import AuthService
+from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
 from src.main.app.service.menu_service import MenuService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.tree_util import (
+    build_tree_path,
+    compute_tree_paths,
+    list_to_tree,
+    parse_tree_path,
+)
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+auth_service: AuthService = AuthServiceImpl()
 
 
 class MenuServiceImpl(BaseServiceImpl[MenuMapper, MenuModel], MenuService):
@@ -79,64 +91,93 @@ class MenuServiceImpl(BaseServiceImpl[MenuMapper, MenuModel], MenuService):
         return menu_record
 
     async def list_menus(self, req: ListMenusRequest) -> tuple[list[MenuModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.parent_id is not None and req.parent_id != "":
-            filters[FilterOperators.EQ]["parent_id"] = req.parent_id
-        else:
-            filters[FilterOperators.EQ]["parent_id"] = 0
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.name is not None and req.name != "":
-            filters[FilterOperators.LIKE]["name"] = req.name
-        if req.icon is not None and req.icon != "":
-            filters[FilterOperators.EQ]["icon"] = req.icon
-        if req.permission is not None and req.permission != "":
-            filters[FilterOperators.EQ]["permission"] = req.permission
-        if req.sort is not None and req.sort != "":
-            filters[FilterOperators.EQ]["sort"] = req.sort
-        if req.path is not None and req.path != "":
-            filters[FilterOperators.EQ]["path"] = req.path
-        if req.component is not None and req.component != "":
-            filters[FilterOperators.EQ]["component"] = req.component
-        if req.type is not None and req.type != "":
-            filters[FilterOperators.EQ]["type"] = req.type
-        if req.cacheable is not None and req.cacheable != "":
-            filters[FilterOperators.EQ]["cacheable"] = req.cacheable
-        if req.visible is not None and req.visible != "":
-            filters[FilterOperators.EQ]["visible"] = req.visible
-        if req.status is not None and req.status != "":
-            filters[FilterOperators.EQ]["status"] = req.status
-        if req.create_time is not None and req.create_time != "":
-            filters[FilterOperators.EQ]["create_time"] = req.create_time
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_menus(
+        self, req: ListMenusRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(Menu.model_fields))
 
     async def get_children_recursively(
         self, *, parent_data: list[MenuModel], schema_class: Type[Menu]
     ) -> list[Menu]:
         if not parent_data:
             return []
-        menu_list = [Menu(**record.model_dump()) for record in parent_data]
-        return await self.mapper.get_children_recursively(
-            parent_data=menu_list, schema_class=schema_class
+        # One prefix query on tree_path fetches the subtrees at any depth
+        tree_paths = [record.tree_path for record in parent_data if record.tree_path]
+        descendants = await self.mapper.select_subtrees(tree_paths=tree_paths)
+        parent_ids = {record.id for record in parent_data}
+        data_list = [record.model_dump() for record in parent_data] + [
+            record.model_dump() for record in descendants if record.id not in parent_ids
+        ]
+        return [schema_class(**node) for node in list_to_tree(data_list)]
+
+    async def get_menu_tree(self) -> list[Menu]:
+        menu_records: list[MenuModel] = await self.mapper.select_all_menus()
+        return [Menu(**node) for node in list_to_tree([m.model_dump() for m in menu_records])]
+
+    async def get_menu_subtree(self, *, id: int) -> Menu:
+        menu_records: list[MenuModel] = await self.mapper.select_subtree_by_id(id=id)
+        roots = list_to_tree([record.model_dump() for record in menu_records])
+        root = next((node for node in roots if node["id"] == id), None)
+        if root is None:
+            raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
+        return Menu(**root)
+
+    async def get_menu_ancestors(self, *, id: int) -> list[MenuModel]:
+        await self.get_menu(id=id)
+        return await self.mapper.select_ancestors_by_id(id=id)
+
+    async def move_menu(self, *, id: int, parent_id: Optional[int]) -> MenuModel:
+        menu_record: MenuModel = await self.get_menu(id=id)
+        await self._move_subtree(menu_record=menu_record, parent_id=parent_id)
+        await auth_service.invalidate_menu_authorizations(menu_ids=[id])
+        return await self.mapper.select_by_id(id=id)
+
+    async def rebuild_menu_tree_paths(self) -> int:
+        """
+        Store the tree_path of every menu whose path does not match its
+        parent_id, such as rows written before the column existed.
+        """
+        links = await self.mapper.select_parent_links()
+        tree_paths = compute_tree_paths((id, parent_id) for id, parent_id, _ in links)
+        items = [
+            {"id": id, "tree_path": tree_paths[id]}
+            for id, _, tree_path in links
+            if tree_paths[id] != tree_path
+        ]
+        if items:
+            await self.mapper.batch_update(items=items)
+            logger.info(f"Rebuilt tree_path of {len(items)} menus")
+        return len(items)
+
+    async def _get_parent_path(self, parent_id: Optional[int]) -> Optional[str]:
+        """Materialized path of a parent, None for roots and unknown parents."""
+        if not parent_id:
+            return None
+        parent_record: MenuModel = await self.mapper.select_by_id(id=parent_id)
+        if parent_record is None:
+            return None
+        if parent_record.tree_path is None:
+            await self.rebuild_menu_tree_paths()
+            parent_record = await self.mapper.select_by_id(id=parent_id)
+        return parent_record.tree_path
+
+    async def _move_subtree(self, *, menu_record: MenuModel, parent_id: Optional[int]) -> None:
+        parent_path = await self._get_parent_path(parent_id)
+        if parent_id and parent_path is None:
+            raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
+        old_path = menu_record.tree_path
+        if old_path is None:
+            await self.rebuild_menu_tree_paths()
+            old_path = (await self.mapper.select_by_id(id=menu_record.id)).tree_path
+        if parent_path is not None and parent_path.startswith(old_path):
+            raise BusinessException(BusinessErrorCode.MENU_MOVE_CYCLE)
+        await self.mapper.move_subtree(
+            id=menu_record.id,
+            parent_id=parent_id,
+            old_path=old_path,
+            new_path=build_tree_path(menu_record.id, parent_path),
         )
 
     async def create_menu(self, req: CreateMenuRequest) -> MenuModel:
@@ -144,22 +185,30 @@ class MenuServiceImpl(BaseServiceImpl[MenuMapper, MenuModel], MenuService):
         if menu_record is not None:
             raise BusinessException(BusinessErrorCode.MENU_NAME_EXISTS)
         menu: MenuModel = MenuModel(**req.menu.model_dump())
-        return await self.save(data=menu)
+        menu.tree_path = build_tree_path(menu.id, await self._get_parent_path(menu.parent_id))
+        menu = await self.save(data=menu)
+        await auth_service.invalidate_menu_authorizations(menu_ids=[menu.id])
+        return menu
 
     async def update_menu(self, req: UpdateMenuRequest) -> MenuModel:
-        menu_record: MenuModel = await self.retrieve_by_id(id=req.menu.id)
+        menu_record: MenuModel = await self.mapper.select_by_id(id=req.menu.id)
         if menu_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
-        menu_model = MenuModel(**req.menu.model_dump(exclude_unset=True))
-        await self.modify_by_id(data=menu_model)
-        merged_data = {**menu_record.model_dump(), **menu_model.model_dump()}
-        return MenuModel(**merged_data)
+        menu_data = req.menu.model_dump(exclude_unset=True)
+        if "parent_id" in menu_data and menu_data["parent_id"] != menu_record.parent_id:
+            await self._move_subtree(menu_record=menu_record, parent_id=menu_data["parent_id"])
+        menu_data.pop("parent_id", None)
+        menu_model = MenuModel(**menu_data)
+        await self.mapper.update_by_id(data=menu_model)
+        await auth_service.invalidate_menu_authorizations(menu_ids=[menu_model.id])
+        return await self.mapper.select_by_id(id=menu_model.id)
 
     async def delete_menu(self, id: int) -> None:
-        menu_record: MenuModel = await self.retrieve_by_id(id=id)
+        menu_record: MenuModel = await self.mapper.select_by_id(id=id)
         if menu_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        await auth_service.invalidate_menu_authorizations(menu_ids=[id])
 
     async def batch_get_menus(self, ids: list[int]) -> list[MenuModel]:
         menu_records = list[MenuModel] = await self.retrieve_by_ids(ids=ids)
@@ -190,15 +239,41 @@ class MenuServiceImpl(BaseServiceImpl[MenuMapper, MenuModel], MenuService):
                 f"{BusinessErrorCode.MENU_NAME_EXISTS.message}: {str(exist_menu_names)}",
             )
         data_list = [MenuModel(**menu.model_dump()) for menu in menu_list]
+        await self._assign_tree_paths(data_list)
         await self.mapper.batch_insert(data_list=data_list)
+        await auth_service.invalidate_menu_authorizations(menu_ids=[data.id for data in data_list])
         return data_list
 
+    async def _assign_tree_paths(self, data_list: list[MenuModel]) -> None:
+        """Set the tree_path of new menus whose parents are in the batch or stored."""
+        batch_paths = compute_tree_paths((menu.id, menu.parent_id) for menu in data_list)
+        menus_by_id = {menu.id: menu for menu in data_list}
+        stored_parent_ids = {
+            menu.parent_id
+            for menu in data_list
+            if menu.parent_id and menu.parent_id not in menus_by_id
+        }
+        stored_parents: list[MenuModel] = await self.mapper.select_by_ids(
+            ids=list(stored_parent_ids)
+        )
+        if any(parent.tree_path is None for parent in stored_parents):
+            await self.rebuild_menu_tree_paths()
+            stored_parents = await self.mapper.select_by_ids(ids=list(stored_parent_ids))
+        stored_paths = {parent.id: parent.tree_path for parent in stored_parents}
+        for menu in data_list:
+            batch_path = batch_paths[menu.id]
+            # The topmost menu of the chain inside the batch hangs below a stored parent, if any
+            top = menus_by_id[parse_tree_path(batch_path)[0]]
+            parent_path = stored_paths.get(top.parent_id)
+            menu.tree_path = parent_path[:-1] + batch_path if parent_path else batch_path
+
     async def batch_update_menus(self, req: BatchUpdateMenusRequest) -> list[MenuModel]:
         menu: BatchUpdateMenu = req.menu
         ids: list[int] = req.ids
         if not menu or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         await self.mapper.batch_update_by_ids(ids=ids, data=menu.model_dump(exclude_none=True))
+        await auth_service.invalidate_menu_authorizations(menu_ids=ids)
         return await self.mapper.select_by_ids(ids=ids)
 
     async def batch_patch_menus(self, req: BatchPatchMenusRequest) -> list[MenuModel]:
@@ -206,13 +281,23 @@ class MenuServiceImpl(BaseServiceImpl[MenuMapper, MenuModel], MenuService):
         if not menus:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         update_data: list[dict[str, Any]] = [menu.model_dump(exclude_unset=True) for menu in menus]
-        await self.mapper.batch_update(items=update_data)
         menu_ids: list[int] = [menu.id for menu in menus]
-        return await self.mapper.select_by_ids(ids=menu_ids)
+        for item in update_data:
+            if "parent_id" not in item:
+                continue
+            parent_id = item.pop("parent_id")
+            # Read one at a time, an earlier move may have changed the path of this menu
+            menu_record: MenuModel = await self.mapper.select_by_id(id=item["id"])
+            if menu_record is not None and parent_id != menu_record.parent_id:
+                await self._move_subtree(menu_record=menu_record, parent_id=parent_id)
+        menu_records: list[MenuModel] = await batch_patch(self.mapper, update_data)
+        await auth_service.invalidate_menu_authorizations(menu_ids=menu_ids)
+        return menu_records
 
     async def batch_delete_menus(self, req: BatchDeleteMenusRequest):
         ids: list[int] = req.ids
         await self.mapper.batch_delete_by_ids(ids=ids)
+        await auth_service.invalidate_menu_authorizations(menu_ids=ids)
 
     async def export_menus_template(self) -> StreamingResponse:
         file_name = "menu_import_tpl"
@@ -220,38 +305,33 @@ class MenuServiceImpl(BaseServiceImpl[MenuMapper, MenuModel], MenuService):
 
     async def export_menus(self, req: ExportMenusRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        menu_list: list[MenuModel] = await self.mapper.select_by_ids(ids=ids)
-        if menu_list is None or len(menu_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No menus found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        menu_page_list = [ExportMenu(**menu.model_dump()) for menu in menu_list]
-        file_name = "menu_data_export"
-        return await excel_util.export_excel(
-            schema=ExportMenu, file_name=file_name, data_list=menu_page_list
+        fields = list(ExportMenu.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="menu_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_menus(self, req: ImportMenusRequest) -> list[ImportMenu]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        menu_records = import_df.to_dict(orient="records")
-        if menu_records is None or len(menu_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in menu_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        menu_import_list = []
-        for menu_record in menu_records:
-            try:
-                menu_create = ImportMenu(**menu_record)
-                menu_import_list.append(menu_create)
-            except ValidationError as e:
-                valid_data = {k: v for k, v in menu_record.items() if k in ImportMenu.model_fields}
-                menu_create = ImportMenu.model_construct(**valid_data)
-                menu_create.err_msg = ValidateService.get_validate_err_msg(e)
-                menu_import_list.append(menu_create)
-                return menu_import_list
-
-        return menu_import_list
+    async def import_menus(self, req: ImportMenusRequest) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportMenu, self.mapper, before_insert=self._before_import
+        )
+
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        """Check the names of a chunk of imported menus and set their tree paths."""
+        menu_names = [values["name"] for values in values_list]
+        menu_records: list[MenuModel] = await self.mapper.select_by_names(names=menu_names)
+        if menu_records:
+            exist_menu_names = [menu.name for menu in menu_records]
+            raise BusinessException(
+                BusinessErrorCode.MENU_NAME_EXISTS,
+                f"{BusinessErrorCode.MENU_NAME_EXISTS.message}: {str(exist_menu_names)}",
+            )
+        data_list = [MenuModel(**values) for values in values_list]
+        await self._assign_tree_paths(data_list)
+        for values, menu in zip(values_list, data_list, strict=True):
+            values["tree_path"] = menu.tree_path
+        await auth_service.invalidate_menu_authorizations(menu_ids=[data.id for data in data_list])
@@ -0,0 +1,207 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationScorecard domain service impl"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastlib.service.impl.base_service_impl import BaseServiceImpl
+from loguru import logger
+
+from src.main.app.enums.enum import ScorecardScopeEnum
+from src.main.app.mapper.db_session import db
+from src.main.app.mapper.list_query import select_by_list_request
+from src.main.app.mapper.recommendation_outcome_mapper import (
+    recommendationOutcomeMapper,
+)
+from src.main.app.mapper.recommendation_scorecard_mapper import (
+    RecommendationScorecardMapper,
+)
+from src.main.app.mapper.stock_daily_info_mapper import stockDailyInfoMapper
+from src.main.app.mapper.stock_daily_recommendation_mapper import (
+    stockDailyRecommendationMapper,
+)
+from src.main.app.model.recommendation_outcome_model import RecommendationOutcomeModel
+from src.main.app.model.recommendation_scorecard_model import (
+    RecommendationScorecardModel,
+)
+from src.main.app.schema.recommendation_scorecard_schema import (
+    ListRecommendationOutcomesRequest,
+    ListRecommendationScorecardsRequest,
+    RefreshRecommendationScorecardsRequest,
+    RefreshRecommendationScorecardsResponse,
+)
+from src.main.app.service.recommendation_scorecard_service import (
+    RecommendationScorecardService,
+)
+from src.main.app.utils import backtest_util, frame_util, snowflake_util
+from src.main.app.utils.lazy_util import lazy_import
+
+pd = lazy_import("pandas")
+
+# Calendar days loaded before the first recommendation so that the market
+# index has a previous close for its first daily return
+_MARKET_LOOKBACK_DAYS = 10
+# Span of the recommend_date of the recommendations evaluated together
+_EVALUATION_WINDOW_DAYS = 90
+
+
+class RecommendationScorecardServiceImpl(
+    BaseServiceImpl[RecommendationScorecardMapper, RecommendationScorecardModel], RecommendationScorecardService
+):
+    """
+    Implementation of the RecommendationScorecardService interface.
+    """
+
+    def __init__(self, mapper: RecommendationScorecardMapper):
+        """
+        Initialize the RecommendationScorecardServiceImpl instance.
+
+        Args:
+            mapper (RecommendationScorecardMapper): The RecommendationScorecardMapper instance to use for database operations.
+        """
+        super().__init__(mapper=mapper, model=RecommendationScorecardModel)
+        self.mapper = mapper
+        self._pending_symbols: set[str] = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def list_recommendation_scorecards(
+        self, *, req: ListRecommendationScorecardsRequest
+    ) -> tuple[list[RecommendationScorecardModel], int]:
+        return await select_by_list_request(self.mapper, req)
+
+    async def list_recommendation_outcomes(
+        self, *, req: ListRecommendationOutcomesRequest
+    ) -> tuple[list[RecommendationOutcomeModel], int]:
+        return await select_by_list_request(recommendationOutcomeMapper, req)
+
+    async def refresh_recommendation_scorecards(
+        self, *, req: RefreshRecommendationScorecardsRequest
+    ) -> RefreshRecommendationScorecardsResponse:
+        """
+        Re-evaluate every recommendation whose outcome is not final yet and
+        rebuild the scorecards of the analysts and institutions involved.
+
+        Final outcomes are never loaded again, so each run only pays for the
+        recommendations still inside their validity window. Recommendations
+        are evaluated by windows of their recommend_date, so that the bars
+        and closes loaded at once span a bounded period.
+        """
+        rows = await stockDailyRecommendationMapper.select_pending_evaluation(
+            fields=backtest_util.RECOMMENDATION_COLUMNS,
+            stock_symbol_full_list=req.stock_symbol_full_list,
+        )
+        recommendations = backtest_util.to_frame(rows, backtest_util.RECOMMENDATION_COLUMNS)
+        if recommendations.empty:
+            return RefreshRecommendationScorecardsResponse(evaluated_count=0, finalized_count=0, scorecard_count=0)
+
+        as_of = await stockDailyInfoMapper.select_latest_trade_date()
+        evaluated_count = finalized_count = 0
+        names: dict[str, set[str]] = {scope.value: set() for scope in ScorecardScopeEnum}
+        for window in backtest_util.split_by_window(recommendations, _EVALUATION_WINDOW_DAYS):
+            outcomes = await self._evaluate_window(window, as_of)
+            if outcomes.empty:
+                continue
+            await recommendationOutcomeMapper.delete_by_recommendation_id_list(
+                recommendation_id_list=outcomes["recommendation_id"].tolist()
+            )
+            outcomes["id"] = snowflake_util.reserve_ids(len(outcomes))
+            await recommendationOutcomeMapper.batch_insert(
+                data_list=[RecommendationOutcomeModel(**record) for record in frame_util.to_records(outcomes)]
+            )
+            evaluated_count += len(outcomes)
+            finalized_count += int(outcomes["is_final"].sum())
+            for scope, name_set in names.items():
+                name_set.update(outcomes[scope].dropna().unique().tolist())
+
+        scorecard_count = 0
+        for scope, name_set in names.items():
+            scorecard_count += await self._rebuild_scorecards(scope=scope, name_list=sorted(name_set))
+        logger.info(
+            f"Evaluated {evaluated_count} recommendations, {finalized_count} finalized, "
+            f"{scorecard_count} scorecards rebuilt"
+        )
+        return RefreshRecommendationScorecardsResponse(
+            evaluated_count=evaluated_count,
+            finalized_count=finalized_count,
+            scorecard_count=scorecard_count,
+        )
+
+    async def schedule_refresh(self, stock_symbol_full_list: list[str]) -> None:
+        """
+        Refresh the scorecards of the given stocks in the background, in a
+        session of its own, rather than in the request writing their bars.
+
+        Stocks scheduled while a refresh runs are refreshed together by the
+        next one, so refreshes never run concurrently.
+        """
+        self._pending_symbols.update(stock_symbol_full_list)
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._run_scheduled_refreshes())
+
+    async def _run_scheduled_refreshes(self) -> None:
+        while self._pending_symbols:
+            symbols = sorted(self._pending_symbols)
+            self._pending_symbols.clear()
+            try:
+                async with db(commit_on_exit=True):
+                    await self.refresh_recommendation_scorecards(
+                        req=RefreshRecommendationScorecardsRequest(stock_symbol_full_list=symbols)
+                    )
+            except Exception as e:
+                logger.warning(f"Refreshing the scorecards of {len(symbols)} stocks failed: {e}")
+
+    async def _evaluate_window(
+        self, recommendations: pd.DataFrame, as_of: Optional[datetime]
+    ) -> pd.DataFrame:
+        bar_rows = close_rows = []
+        dates = recommendations["recommend_date"].dropna()
+        if as_of is not None and not dates.empty:
+            start_date = dates.min().to_pydatetime()
+            # No bar is traded after the latest trade date
+            end_date = min(backtest_util.expiry_dates(recommendations).max().to_pydatetime(), as_of)
+            bar_rows = await stockDailyInfoMapper.select_price_path(
+                fields=backtest_util.BAR_COLUMNS,
+                start_date=start_date,
+                end_date=end_date,
+                stock_symbol_full_list=recommendations["stock_symbol_full"].dropna().unique().tolist(),
+            )
+            close_rows = await stockDailyInfoMapper.select_price_path(
+                fields=backtest_util.CLOSE_COLUMNS,
+                start_date=start_date - timedelta(days=_MARKET_LOOKBACK_DAYS),
+                end_date=end_date,
+            )
+        market_index = backtest_util.build_market_index(
+            backtest_util.to_frame(close_rows, backtest_util.CLOSE_COLUMNS)
+        )
+        return backtest_util.evaluate_recommendations(
+            recommendations,
+            backtest_util.to_frame(bar_rows, backtest_util.BAR_COLUMNS),
+            market_index,
+            as_of,
+        )
+
+    async def _rebuild_scorecards(self, *, scope: str, name_list: list[str]) -> int:
+        if not name_list:
+            return 0
+        stats = await recommendationOutcomeMapper.select_scorecard_stats(scope=scope, name_list=name_list)
+        await self.mapper.delete_by_scope_and_name_list(scope=scope, name_list=name_list)
+        scorecards = [
+            RecommendationScorecardModel(
+                scope=scope,
+                name=name,
+                recommendation_count=recommendation_count,
+                final_count=final_count or 0,
+                hit_count=hit_count or 0,
+                hit_rate=(hit_count or 0) / recommendation_count,
+                avg_return=avg_return,
+                avg_excess_return=avg_excess_return,
+                avg_max_drawdown=avg_max_drawdown,
+            )
+            for name, recommendation_count, final_count, hit_count, avg_return, avg_excess_return, avg_max_drawdown in stats
+        ]
+        if scorecards:
+            await self.mapper.batch_insert(data_list=scorecards)
+        return len(scorecards)
@@ -16,23 +16,21 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
 from typing import Type, Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.role_menu_mapper import RoleMenuMapper
 from src.main.app.model.role_menu_model import RoleMenuModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.role_menu_schema import (
     ListRoleMenusRequest,
     RoleMenu,
@@ -50,7 +48,15 @@ from src.main.app.schema.role_menu_schema import (
     BatchPatchRoleMenusRequest,
     BatchUpdateRoleMenu,
 )
+from src.main.app.service.auth_service import AuthService
+from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
 from src.main.app.service.role_menu_service import RoleMenuService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+auth_service: AuthService = AuthServiceImpl()
 
 
 class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMenuService):
@@ -79,31 +85,12 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
         return role_menu_record
 
     async def list_role_menus(self, req: ListRoleMenusRequest) -> tuple[list[RoleMenuModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.role_id:
-            filters[FilterOperators.EQ]["role_id"] = req.role_id
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_role_menus(
+        self, req: ListRoleMenusRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(RoleMenu.model_fields))
 
     async def get_children_recursively(
         self, *, parent_data: list[RoleMenuModel], schema_class: Type[RoleMenu]
@@ -117,7 +104,9 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
 
     async def create_role_menu(self, req: CreateRoleMenuRequest) -> RoleMenuModel:
         role_menu: RoleMenuModel = RoleMenuModel(**req.role_menu.model_dump())
-        return await self.save(data=role_menu)
+        role_menu = await self.save(data=role_menu)
+        await auth_service.invalidate_role_menu_authorizations(role_ids=[role_menu.role_id])
+        return role_menu
 
     async def update_role_menu(self, req: UpdateRoleMenuRequest) -> RoleMenuModel:
         role_menu_record: RoleMenuModel = await self.retrieve_by_id(id=req.role_menu.id)
@@ -125,6 +114,9 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         role_menu_model = RoleMenuModel(**req.role_menu.model_dump(exclude_unset=True))
         await self.modify_by_id(data=role_menu_model)
+        await auth_service.invalidate_role_menu_authorizations(
+            role_ids=[role_menu_record.role_id, role_menu_model.role_id]
+        )
         merged_data = {**role_menu_record.model_dump(), **role_menu_model.model_dump()}
         return RoleMenuModel(**merged_data)
 
@@ -133,6 +125,7 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
         if role_menu_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        await auth_service.invalidate_role_menu_authorizations(role_ids=[role_menu_record.role_id])
 
     async def batch_get_role_menus(self, ids: list[int]) -> list[RoleMenuModel]:
         role_menu_records = list[RoleMenuModel] = await self.retrieve_by_ids(ids=ids)
@@ -156,6 +149,9 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         data_list = [RoleMenuModel(**role_menu.model_dump()) for role_menu in role_menu_list]
         await self.mapper.batch_insert(data_list=data_list)
+        await auth_service.invalidate_role_menu_authorizations(
+            role_ids=[data.role_id for data in data_list]
+        )
         return data_list
 
     async def batch_update_role_menus(
@@ -165,8 +161,13 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
         ids: list[int] = req.ids
         if not role_menu or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
+        role_ids: list[int] = await self._select_role_ids(ids=ids)
         await self.mapper.batch_update_by_ids(ids=ids, data=role_menu.model_dump(exclude_none=True))
-        return await self.mapper.select_by_ids(ids=ids)
+        role_menu_records: list[RoleMenuModel] = await self.mapper.select_by_ids(ids=ids)
+        await auth_service.invalidate_role_menu_authorizations(
+            role_ids=[*role_ids, *[record.role_id for record in role_menu_records]]
+        )
+        return role_menu_records
 
     async def batch_patch_role_menus(self, req: BatchPatchRoleMenusRequest) -> list[RoleMenuModel]:
         role_menus: list[UpdateRoleMenu] = req.role_menus
@@ -175,13 +176,27 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
         update_data: list[dict[str, Any]] = [
             role_menu.model_dump(exclude_unset=True) for role_menu in role_menus
         ]
-        await self.mapper.batch_update(items=update_data)
         role_menu_ids: list[int] = [role_menu.id for role_menu in role_menus]
-        return await self.mapper.select_by_ids(ids=role_menu_ids)
+        role_ids: list[int] = await self._select_role_ids(ids=role_menu_ids)
+        role_menu_records: list[RoleMenuModel] = await batch_patch(self.mapper, update_data)
+        await auth_service.invalidate_role_menu_authorizations(
+            role_ids=[*role_ids, *[record.role_id for record in role_menu_records]]
+        )
+        return role_menu_records
 
     async def batch_delete_role_menus(self, req: BatchDeleteRoleMenusRequest):
         ids: list[int] = req.ids
+        role_ids: list[int] = await self._select_role_ids(ids=ids)
         await self.mapper.batch_delete_by_ids(ids=ids)
+        await auth_service.invalidate_role_menu_authorizations(role_ids=role_ids)
+
+    async def _select_role_ids(self, ids: list[int]) -> list[int]:
+        """
+        role_id of the given bindings, read before a write replaces them, so that
+        the roles losing a binding are invalidated too.
+        """
+        role_menu_records: list[RoleMenuModel] = await self.mapper.select_by_ids(ids=ids)
+        return [record.role_id for record in role_menu_records]
 
     async def export_role_menus_template(self) -> StreamingResponse:
         file_name = "role_menu_import_tpl"
@@ -189,42 +204,22 @@ class RoleMenuServiceImpl(BaseServiceImpl[RoleMenuMapper, RoleMenuModel], RoleMe
 
     async def export_role_menus(self, req: ExportRoleMenusRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        role_menu_list: list[RoleMenuModel] = await self.mapper.select_by_ids(ids=ids)
-        if role_menu_list is None or len(role_menu_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No role_menus found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        role_menu_page_list = [
-            ExportRoleMenu(**role_menu.model_dump()) for role_menu in role_menu_list
-        ]
-        file_name = "role_menu_data_export"
-        return await excel_util.export_excel(
-            schema=ExportRoleMenu, file_name=file_name, data_list=role_menu_page_list
+        fields = list(ExportRoleMenu.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="role_menu_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_role_menus(self, req: ImportRoleMenusRequest) -> list[ImportRoleMenu]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        role_menu_records = import_df.to_dict(orient="records")
-        if role_menu_records is None or len(role_menu_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in role_menu_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        role_menu_import_list = []
-        for role_menu_record in role_menu_records:
-            try:
-                role_menu_create = ImportRoleMenu(**role_menu_record)
-                role_menu_import_list.append(role_menu_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v for k, v in role_menu_record.items() if k in ImportRoleMenu.model_fields
-                }
-                role_menu_create = ImportRoleMenu.model_construct(**valid_data)
-                role_menu_create.err_msg = ValidateService.get_validate_err_msg(e)
-                role_menu_import_list.append(role_menu_create)
-                return role_menu_import_list
-
-        return role_menu_import_list
+    async def import_role_menus(self, req: ImportRoleMenusRequest) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportRoleMenu, self.mapper, before_insert=self._before_import
+        )
+
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        await auth_service.invalidate_role_menu_authorizations(
+            role_ids=[values["role_id"] for values in values_list]
+        )
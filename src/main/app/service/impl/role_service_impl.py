@@ -16,24 +16,23 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
 from typing import Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.role_mapper import RoleMapper
 from src.main.app.model.role_model import RoleModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.role_schema import (
+    Role,
     ListRolesRequest,
     CreateRoleRequest,
     UpdateRoleRequest,
@@ -49,7 +48,15 @@ from src.main.app.schema.role_schema import (
     BatchPatchRolesRequest,
     BatchUpdateRole,
 )
+from src.main.app.service.auth_service import AuthService
+from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
 from src.main.app.service.role_service import RoleService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+auth_service: AuthService = AuthServiceImpl()
 
 
 class RoleServiceImpl(BaseServiceImpl[RoleMapper, RoleModel], RoleService):
@@ -78,38 +85,12 @@ class RoleServiceImpl(BaseServiceImpl[RoleMapper, RoleModel], RoleService):
         return role_record
 
     async def list_roles(self, req: ListRolesRequest) -> tuple[list[RoleModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.name is not None and req.name != "":
-            filters[FilterOperators.LIKE]["name"] = req.name
-        if req.code is not None and req.code != "":
-            filters[FilterOperators.LIKE]["code"] = req.code
-        if req.create_time is not None and req.create_time != "":
-            filters[FilterOperators.BETWEEN]["create_time"] = (
-                req.create_time[0],
-                req.create_time[1],
-            )
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_roles(
+        self, req: ListRolesRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(Role.model_fields))
 
     async def create_role(self, req: CreateRoleRequest) -> RoleModel:
         role: RoleModel = RoleModel(**req.role.model_dump())
@@ -122,6 +103,7 @@ class RoleServiceImpl(BaseServiceImpl[RoleMapper, RoleModel], RoleService):
         req.role.operation_type = ",".join(req.role.operation_type)
         role_model = RoleModel(**req.role.model_dump(exclude_unset=True))
         await self.modify_by_id(data=role_model)
+        await auth_service.invalidate_role_authorizations(role_ids=[role_model.id])
         merged_data = {**role_record.model_dump(), **role_model.model_dump()}
         return RoleModel(**merged_data)
 
@@ -130,6 +112,7 @@ class RoleServiceImpl(BaseServiceImpl[RoleMapper, RoleModel], RoleService):
         if role_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        await auth_service.invalidate_role_authorizations(role_ids=[id])
 
     async def batch_get_roles(self, ids: list[int]) -> list[RoleModel]:
         role_records = list[RoleModel] = await self.retrieve_by_ids(ids=ids)
@@ -161,6 +144,7 @@ class RoleServiceImpl(BaseServiceImpl[RoleMapper, RoleModel], RoleService):
         if not role or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         await self.mapper.batch_update_by_ids(ids=ids, data=role.model_dump(exclude_none=True))
+        await auth_service.invalidate_role_authorizations(role_ids=ids)
         return await self.mapper.select_by_ids(ids=ids)
 
     async def batch_patch_roles(self, req: BatchPatchRolesRequest) -> list[RoleModel]:
@@ -168,13 +152,15 @@ class RoleServiceImpl(BaseServiceImpl[RoleMapper, RoleModel], RoleService):
         if not roles:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         update_data: list[dict[str, Any]] = [role.model_dump(exclude_unset=True) for role in roles]
-        await self.mapper.batch_update(items=update_data)
+        role_records: list[RoleModel] = await batch_patch(self.mapper, update_data)
         role_ids: list[int] = [role.id for role in roles]
-        return await self.mapper.select_by_ids(ids=role_ids)
+        await auth_service.invalidate_role_authorizations(role_ids=role_ids)
+        return role_records
 
     async def batch_delete_roles(self, req: BatchDeleteRolesRequest):
         ids: list[int] = req.ids
         await self.mapper.batch_delete_by_ids(ids=ids)
+        await auth_service.invalidate_role_authorizations(role_ids=ids)
 
     async def export_roles_template(self) -> StreamingResponse:
         file_name = "role_import_tpl"
@@ -182,38 +168,15 @@ class RoleServiceImpl(BaseServiceImpl[RoleMapper, RoleModel], RoleService):
 
     async def export_roles(self, req: ExportRolesRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        role_list: list[RoleModel] = await self.mapper.select_by_ids(ids=ids)
-        if role_list is None or len(role_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No roles found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        role_page_list = [ExportRole(**role.model_dump()) for role in role_list]
-        file_name = "role_data_export"
-        return await excel_util.export_excel(
-            schema=ExportRole, file_name=file_name, data_list=role_page_list
+        fields = list(ExportRole.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="role_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_roles(self, req: ImportRolesRequest) -> list[ImportRole]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        role_records = import_df.to_dict(orient="records")
-        if role_records is None or len(role_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in role_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        role_import_list = []
-        for role_record in role_records:
-            try:
-                role_create = ImportRole(**role_record)
-                role_import_list.append(role_create)
-            except ValidationError as e:
-                valid_data = {k: v for k, v in role_record.items() if k in ImportRole.model_fields}
-                role_create = ImportRole.model_construct(**valid_data)
-                role_create.err_msg = ValidateService.get_validate_err_msg(e)
-                role_import_list.append(role_create)
-                return role_import_list
-
-        return role_import_list
+    async def import_roles(self, req: ImportRolesRequest) -> ImportResult:
+        return await import_util.import_file(req.file, ImportRole, self.mapper)
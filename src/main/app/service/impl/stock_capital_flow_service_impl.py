@@ -3,23 +3,21 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
 from typing import Type, Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.stock_capital_flow_mapper import StockCapitalFlowMapper
 from src.main.app.model.stock_capital_flow_model import StockCapitalFlowModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_capital_flow_schema import (
     ListStockCapitalFlowsRequest,
     StockCapitalFlow,
@@ -38,6 +36,10 @@ from src.main.app.schema.stock_capital_flow_schema import (
     BatchUpdateStockCapitalFlow,
 )
 from src.main.app.service.stock_capital_flow_service import StockCapitalFlowService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
 
 
 class StockCapitalFlowServiceImpl(BaseServiceImpl[StockCapitalFlowMapper, StockCapitalFlowModel], StockCapitalFlowService):
@@ -68,57 +70,12 @@ class StockCapitalFlowServiceImpl(BaseServiceImpl[StockCapitalFlowMapper, StockC
     async def list_stock_capital_flows(
         self, req: ListStockCapitalFlowsRequest
     ) -> tuple[list[StockCapitalFlowModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.trade_date is not None and req.trade_date != "":
-            filters[FilterOperators.EQ]["trade_date"] = req.trade_date
-        if req.stock_symbol_full is not None and req.stock_symbol_full != "":
-            filters[FilterOperators.EQ]["stock_symbol_full"] = req.stock_symbol_full
-        if req.exchange is not None and req.exchange != "":
-            filters[FilterOperators.EQ]["exchange"] = req.exchange
-        if req.main_inflow is not None and req.main_inflow != "":
-            filters[FilterOperators.EQ]["main_inflow"] = req.main_inflow
-        if req.main_outflow is not None and req.main_outflow != "":
-            filters[FilterOperators.EQ]["main_outflow"] = req.main_outflow
-        if req.main_net is not None and req.main_net != "":
-            filters[FilterOperators.EQ]["main_net"] = req.main_net
-        if req.retail_inflow is not None and req.retail_inflow != "":
-            filters[FilterOperators.EQ]["retail_inflow"] = req.retail_inflow
-        if req.retail_outflow is not None and req.retail_outflow != "":
-            filters[FilterOperators.EQ]["retail_outflow"] = req.retail_outflow
-        if req.retail_net is not None and req.retail_net != "":
-            filters[FilterOperators.EQ]["retail_net"] = req.retail_net
-        if req.total_inflow is not None and req.total_inflow != "":
-            filters[FilterOperators.EQ]["total_inflow"] = req.total_inflow
-        if req.total_outflow is not None and req.total_outflow != "":
-            filters[FilterOperators.EQ]["total_outflow"] = req.total_outflow
-        if req.total_net is not None and req.total_net != "":
-            filters[FilterOperators.EQ]["total_net"] = req.total_net
-        if req.created_at is not None and req.created_at != "":
-            filters[FilterOperators.EQ]["created_at"] = req.created_at
-        if req.updated_at is not None and req.updated_at != "":
-            filters[FilterOperators.EQ]["updated_at"] = req.updated_at
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_stock_capital_flows(
+        self, req: ListStockCapitalFlowsRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(StockCapitalFlow.model_fields))
 
     
 
@@ -186,9 +143,7 @@ class StockCapitalFlowServiceImpl(BaseServiceImpl[StockCapitalFlowMapper, StockC
         update_data: list[dict[str, Any]] = [
             stock_capital_flow.model_dump(exclude_unset=True) for stock_capital_flow in stock_capital_flows
         ]
-        await self.mapper.batch_update(items=update_data)
-        stock_capital_flow_ids: list[int] = [stock_capital_flow.id for stock_capital_flow in stock_capital_flows]
-        return await self.mapper.select_by_ids(ids=stock_capital_flow_ids)
+        return await batch_patch(self.mapper, update_data)
 
     async def batch_delete_stock_capital_flows(self, req: BatchDeleteStockCapitalFlowsRequest):
         ids: list[int] = req.ids
@@ -202,42 +157,15 @@ class StockCapitalFlowServiceImpl(BaseServiceImpl[StockCapitalFlowMapper, StockC
 
     async def export_stock_capital_flows(self, req: ExportStockCapitalFlowsRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        stock_capital_flow_list: list[StockCapitalFlowModel] = await self.mapper.select_by_ids(ids=ids)
-        if stock_capital_flow_list is None or len(stock_capital_flow_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No stock_capital_flows found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        stock_capital_flow_page_list = [ExportStockCapitalFlow(**stock_capital_flow.model_dump()) for stock_capital_flow in stock_capital_flow_list]
-        file_name = "stock_capital_flow_data_export"
-        return await excel_util.export_excel(
-            schema=ExportStockCapitalFlow, file_name=file_name, data_list=stock_capital_flow_page_list
+        fields = list(ExportStockCapitalFlow.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="stock_capital_flow_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_stock_capital_flows(self, req: ImportStockCapitalFlowsRequest) -> list[ImportStockCapitalFlow]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        stock_capital_flow_records = import_df.to_dict(orient="records")
-        if stock_capital_flow_records is None or len(stock_capital_flow_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in stock_capital_flow_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        stock_capital_flow_import_list = []
-        for stock_capital_flow_record in stock_capital_flow_records:
-            try:
-                stock_capital_flow_create = ImportStockCapitalFlow(**stock_capital_flow_record)
-                stock_capital_flow_import_list.append(stock_capital_flow_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v
-                    for k, v in stock_capital_flow_record.items()
-                    if k in ImportStockCapitalFlow.model_fields
-                }
-                stock_capital_flow_create = ImportStockCapitalFlow.model_construct(**valid_data)
-                stock_capital_flow_create.err_msg = ValidateService.get_validate_err_msg(e)
-                stock_capital_flow_import_list.append(stock_capital_flow_create)
-                return stock_capital_flow_import_list
-
-        return stock_capital_flow_import_list
\ No newline at end of file
+    async def import_stock_capital_flows(self, req: ImportStockCapitalFlowsRequest) -> ImportResult:
+        return await import_util.import_file(req.file, ImportStockCapitalFlow, self.mapper)
@@ -3,23 +3,25 @@
 
 from __future__ import annotations
 
-import io
-import json
-from typing import Type, Any
+from collections.abc import AsyncGenerator, Sequence
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Type, Any, Optional
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
+from src.main.app.cache.active_recommendation_cache import activeRecommendationIndex, today
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.db_session import after_commit
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.stock_daily_recommendation_mapper import StockDailyRecommendationMapper
 from src.main.app.model.stock_daily_recommendation_model import StockDailyRecommendationModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_daily_recommendation_schema import (
     ListStockDailyRecommendationsRequest,
     StockDailyRecommendation,
@@ -36,8 +38,29 @@ from src.main.app.schema.stock_daily_recommendation_schema import (
     ExportStockDailyRecommendation,
     BatchPatchStockDailyRecommendationsRequest,
     BatchUpdateStockDailyRecommendation,
+    ListActiveRecommendationsRequest,
+    ActiveRecommendation,
 )
 from src.main.app.service.stock_daily_recommendation_service import StockDailyRecommendationService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+
+def compute_expiry_date(recommend_date: Optional[datetime], validity_period: Optional[int]) -> Optional[datetime]:
+    """Last day a recommendation is valid, or None when it cannot be known."""
+    if recommend_date is None or validity_period is None:
+        return None
+    return recommend_date + timedelta(days=validity_period)
+
+
+async def _put_active(active_list: list[ActiveRecommendation]) -> None:
+    activeRecommendationIndex.put(active_list)
+
+
+async def _remove_active(ids: list[int]) -> None:
+    activeRecommendationIndex.remove(ids)
 
 
 class StockDailyRecommendationServiceImpl(BaseServiceImpl[StockDailyRecommendationMapper, StockDailyRecommendationModel], StockDailyRecommendationService):
@@ -68,67 +91,42 @@ class StockDailyRecommendationServiceImpl(BaseServiceImpl[StockDailyRecommendati
     async def list_stock_daily_recommendations(
         self, req: ListStockDailyRecommendationsRequest
     ) -> tuple[list[StockDailyRecommendationModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.stock_symbol_full is not None and req.stock_symbol_full != "":
-            filters[FilterOperators.EQ]["stock_symbol_full"] = req.stock_symbol_full
-        if req.recommend_date is not None and req.recommend_date != "":
-            filters[FilterOperators.EQ]["recommend_date"] = req.recommend_date
-        if req.recommend_level is not None and req.recommend_level != "":
-            filters[FilterOperators.EQ]["recommend_level"] = req.recommend_level
-        if req.price is not None and req.price != "":
-            filters[FilterOperators.EQ]["price"] = req.price
-        if req.target_price is not None and req.target_price != "":
-            filters[FilterOperators.EQ]["target_price"] = req.target_price
-        if req.recommend_reason is not None and req.recommend_reason != "":
-            filters[FilterOperators.EQ]["recommend_reason"] = req.recommend_reason
-        if req.analyst is not None and req.analyst != "":
-            filters[FilterOperators.EQ]["analyst"] = req.analyst
-        if req.institution is not None and req.institution != "":
-            filters[FilterOperators.EQ]["institution"] = req.institution
-        if req.risk_level is not None and req.risk_level != "":
-            filters[FilterOperators.EQ]["risk_level"] = req.risk_level
-        if req.validity_period is not None and req.validity_period != "":
-            filters[FilterOperators.EQ]["validity_period"] = req.validity_period
-        if req.created_at is not None and req.created_at != "":
-            filters[FilterOperators.EQ]["created_at"] = req.created_at
-        if req.updated_at is not None and req.updated_at != "":
-            filters[FilterOperators.EQ]["updated_at"] = req.updated_at
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_stock_daily_recommendations(
+        self, req: ListStockDailyRecommendationsRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(
+            self.mapper, req, fields=list(StockDailyRecommendation.model_fields)
         )
 
     
 
     async def create_stock_daily_recommendation(self, req: CreateStockDailyRecommendationRequest) -> StockDailyRecommendationModel:
         stock_daily_recommendation: StockDailyRecommendationModel = StockDailyRecommendationModel(**req.stock_daily_recommendation.model_dump())
-        return await self.save(data=stock_daily_recommendation)
+        stock_daily_recommendation.expiry_date = compute_expiry_date(
+            stock_daily_recommendation.recommend_date, stock_daily_recommendation.validity_period
+        )
+        stock_daily_recommendation = await self.save(data=stock_daily_recommendation)
+        self._index_active([stock_daily_recommendation])
+        return stock_daily_recommendation
 
     async def update_stock_daily_recommendation(self, req: UpdateStockDailyRecommendationRequest) -> StockDailyRecommendationModel:
         stock_daily_recommendation_record: StockDailyRecommendationModel = await self.retrieve_by_id(id=req.stock_daily_recommendation.id)
         if stock_daily_recommendation_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         stock_daily_recommendation_model = StockDailyRecommendationModel(**req.stock_daily_recommendation.model_dump(exclude_unset=True))
+        changed_data = {
+            **stock_daily_recommendation_record.model_dump(),
+            **req.stock_daily_recommendation.model_dump(exclude_unset=True),
+        }
+        stock_daily_recommendation_model.expiry_date = compute_expiry_date(
+            changed_data.get("recommend_date"), changed_data.get("validity_period")
+        )
         await self.modify_by_id(data=stock_daily_recommendation_model)
         merged_data = {**stock_daily_recommendation_record.model_dump(), **stock_daily_recommendation_model.model_dump()}
+        changed_data["expiry_date"] = stock_daily_recommendation_model.expiry_date
+        self._index_active([StockDailyRecommendationModel(**changed_data)])
         return StockDailyRecommendationModel(**merged_data)
 
     async def delete_stock_daily_recommendation(self, id: int) -> None:
@@ -136,6 +134,7 @@ class StockDailyRecommendationServiceImpl(BaseServiceImpl[StockDailyRecommendati
         if stock_daily_recommendation_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        self._unindex_active([id])
 
     async def batch_get_stock_daily_recommendations(self, ids: list[int]) -> list[StockDailyRecommendationModel]:
         stock_daily_recommendation_records = list[StockDailyRecommendationModel] = await self.retrieve_by_ids(ids=ids)
@@ -158,7 +157,10 @@ class StockDailyRecommendationServiceImpl(BaseServiceImpl[StockDailyRecommendati
         if not stock_daily_recommendation_list:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         data_list = [StockDailyRecommendationModel(**stock_daily_recommendation.model_dump()) for stock_daily_recommendation in stock_daily_recommendation_list]
+        for data in data_list:
+            data.expiry_date = compute_expiry_date(data.recommend_date, data.validity_period)
         await self.mapper.batch_insert(data_list=data_list)
+        self._index_active(data_list)
         return data_list
 
     async def batch_update_stock_daily_recommendations(
@@ -171,7 +173,9 @@ class StockDailyRecommendationServiceImpl(BaseServiceImpl[StockDailyRecommendati
         await self.mapper.batch_update_by_ids(
             ids=ids, data=stock_daily_recommendation.model_dump(exclude_none=True)
         )
-        return await self.mapper.select_by_ids(ids=ids)
+        stock_daily_recommendation_records = await self.mapper.select_by_ids(ids=ids)
+        await self._sync_expiry_dates(stock_daily_recommendation_records)
+        return stock_daily_recommendation_records
 
     async def batch_patch_stock_daily_recommendations(
         self, req: BatchPatchStockDailyRecommendationsRequest
@@ -182,13 +186,66 @@ class StockDailyRecommendationServiceImpl(BaseServiceImpl[StockDailyRecommendati
         update_data: list[dict[str, Any]] = [
             stock_daily_recommendation.model_dump(exclude_unset=True) for stock_daily_recommendation in stock_daily_recommendations
         ]
-        await self.mapper.batch_update(items=update_data)
-        stock_daily_recommendation_ids: list[int] = [stock_daily_recommendation.id for stock_daily_recommendation in stock_daily_recommendations]
-        return await self.mapper.select_by_ids(ids=stock_daily_recommendation_ids)
+        stock_daily_recommendation_records = await batch_patch(self.mapper, update_data)
+        await self._sync_expiry_dates(stock_daily_recommendation_records)
+        return stock_daily_recommendation_records
 
     async def batch_delete_stock_daily_recommendations(self, req: BatchDeleteStockDailyRecommendationsRequest):
         ids: list[int] = req.ids
         await self.mapper.batch_delete_by_ids(ids=ids)
+        self._unindex_active(ids)
+
+    async def list_active_recommendations(
+        self, *, req: ListActiveRecommendationsRequest
+    ) -> list[ActiveRecommendation]:
+        if not activeRecommendationIndex.is_fresh():
+            await self.warm_active_recommendation_index()
+        if req.stock_symbol_full:
+            return activeRecommendationIndex.active_for(req.stock_symbol_full)
+        return activeRecommendationIndex.active_all()
+
+    async def warm_active_recommendation_index(self) -> None:
+        """
+        Load every unexpired recommendation into the active index through the
+        expiry_date index, filling in expiry_date for older rows first.
+        """
+        missing = await self.mapper.select_missing_expiry_date()
+        if missing:
+            await self.mapper.batch_update(
+                items=[
+                    {"id": id, "expiry_date": compute_expiry_date(recommend_date, validity_period)}
+                    for id, recommend_date, validity_period in missing
+                ]
+            )
+            logger.info(f"Filled in expiry_date of {len(missing)} stock_daily_recommendations")
+        records = await self.mapper.select_active(expiry_from=today(), schema=ActiveRecommendation)
+        activeRecommendationIndex.load(records)
+        logger.info(f"Loaded {len(records)} active recommendations")
+
+    async def _sync_expiry_dates(self, records: list[StockDailyRecommendationModel]) -> None:
+        """Store the expiry_date of records whose recommend_date or validity_period changed."""
+        items = []
+        for record in records:
+            expiry_date = compute_expiry_date(record.recommend_date, record.validity_period)
+            if record.expiry_date != expiry_date:
+                record.expiry_date = expiry_date
+                items.append({"id": record.id, "expiry_date": expiry_date})
+        if items:
+            await self.mapper.batch_update(items=items)
+        self._index_active(records)
+
+    @staticmethod
+    def _index_active(records: list[Any]) -> None:
+        """Add or replace the records in the active index once committed."""
+        active_list = [
+            ActiveRecommendation.model_validate(record, from_attributes=True) for record in records
+        ]
+        after_commit(partial(_put_active, active_list))
+
+    @staticmethod
+    def _unindex_active(ids: list[int]) -> None:
+        """Drop the records from the active index once committed."""
+        after_commit(partial(_remove_active, ids))
 
     async def export_stock_daily_recommendations_template(self) -> StreamingResponse:
         file_name = "stock_daily_recommendation_import_tpl"
@@ -198,42 +255,25 @@ class StockDailyRecommendationServiceImpl(BaseServiceImpl[StockDailyRecommendati
 
     async def export_stock_daily_recommendations(self, req: ExportStockDailyRecommendationsRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        stock_daily_recommendation_list: list[StockDailyRecommendationModel] = await self.mapper.select_by_ids(ids=ids)
-        if stock_daily_recommendation_list is None or len(stock_daily_recommendation_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No stock_daily_recommendations found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        stock_daily_recommendation_page_list = [ExportStockDailyRecommendation(**stock_daily_recommendation.model_dump()) for stock_daily_recommendation in stock_daily_recommendation_list]
-        file_name = "stock_daily_recommendation_data_export"
-        return await excel_util.export_excel(
-            schema=ExportStockDailyRecommendation, file_name=file_name, data_list=stock_daily_recommendation_page_list
+        fields = list(ExportStockDailyRecommendation.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="stock_daily_recommendation_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_stock_daily_recommendations(self, req: ImportStockDailyRecommendationsRequest) -> list[ImportStockDailyRecommendation]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        stock_daily_recommendation_records = import_df.to_dict(orient="records")
-        if stock_daily_recommendation_records is None or len(stock_daily_recommendation_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in stock_daily_recommendation_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        stock_daily_recommendation_import_list = []
-        for stock_daily_recommendation_record in stock_daily_recommendation_records:
-            try:
-                stock_daily_recommendation_create = ImportStockDailyRecommendation(**stock_daily_recommendation_record)
-                stock_daily_recommendation_import_list.append(stock_daily_recommendation_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v
-                    for k, v in stock_daily_recommendation_record.items()
-                    if k in ImportStockDailyRecommendation.model_fields
-                }
-                stock_daily_recommendation_create = ImportStockDailyRecommendation.model_construct(**valid_data)
-                stock_daily_recommendation_create.err_msg = ValidateService.get_validate_err_msg(e)
-                stock_daily_recommendation_import_list.append(stock_daily_recommendation_create)
-                return stock_daily_recommendation_import_list
-
-        return stock_daily_recommendation_import_list
\ No newline at end of file
+    async def import_stock_daily_recommendations(
+        self, req: ImportStockDailyRecommendationsRequest
+    ) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportStockDailyRecommendation, self.mapper, before_insert=self._before_import
+        )
+
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        """Set the expiry dates of a chunk of imported recommendations, indexed once committed."""
+        for values in values_list:
+            values["expiry_date"] = compute_expiry_date(values["recommend_date"], values["validity_period"])
+        self._index_active(values_list)
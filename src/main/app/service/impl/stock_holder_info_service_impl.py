@@ -3,23 +3,21 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
 from typing import Type, Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.stock_holder_info_mapper import StockHolderInfoMapper
 from src.main.app.model.stock_holder_info_model import StockHolderInfoModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_holder_info_schema import (
     ListStockHolderInfosRequest,
     StockHolderInfo,
@@ -38,6 +36,10 @@ from src.main.app.schema.stock_holder_info_schema import (
     BatchUpdateStockHolderInfo,
 )
 from src.main.app.service.stock_holder_info_service import StockHolderInfoService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
 
 
 class StockHolderInfoServiceImpl(BaseServiceImpl[StockHolderInfoMapper, StockHolderInfoModel], StockHolderInfoService):
@@ -68,55 +70,12 @@ class StockHolderInfoServiceImpl(BaseServiceImpl[StockHolderInfoMapper, StockHol
     async def list_stock_holder_infos(
         self, req: ListStockHolderInfosRequest
     ) -> tuple[list[StockHolderInfoModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.stock_symbol_full is not None and req.stock_symbol_full != "":
-            filters[FilterOperators.EQ]["stock_symbol_full"] = req.stock_symbol_full
-        if req.holder_name is not None and req.holder_name != "":
-            filters[FilterOperators.LIKE]["holder_name"] = req.holder_name
-        if req.holder_info is not None and req.holder_info != "":
-            filters[FilterOperators.EQ]["holder_info"] = req.holder_info
-        if req.holder_type is not None and req.holder_type != "":
-            filters[FilterOperators.EQ]["holder_type"] = req.holder_type
-        if req.share_amount is not None and req.share_amount != "":
-            filters[FilterOperators.EQ]["share_amount"] = req.share_amount
-        if req.share_ratio is not None and req.share_ratio != "":
-            filters[FilterOperators.EQ]["share_ratio"] = req.share_ratio
-        if req.change_amount is not None and req.change_amount != "":
-            filters[FilterOperators.EQ]["change_amount"] = req.change_amount
-        if req.change_type is not None and req.change_type != "":
-            filters[FilterOperators.EQ]["change_type"] = req.change_type
-        if req.report_date is not None and req.report_date != "":
-            filters[FilterOperators.EQ]["report_date"] = req.report_date
-        if req.is_top_ten is not None and req.is_top_ten != "":
-            filters[FilterOperators.EQ]["is_top_ten"] = req.is_top_ten
-        if req.ranking is not None and req.ranking != "":
-            filters[FilterOperators.EQ]["ranking"] = req.ranking
-        if req.created_at is not None and req.created_at != "":
-            filters[FilterOperators.EQ]["created_at"] = req.created_at
-        if req.updated_at is not None and req.updated_at != "":
-            filters[FilterOperators.EQ]["updated_at"] = req.updated_at
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_stock_holder_infos(
+        self, req: ListStockHolderInfosRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(StockHolderInfo.model_fields))
 
     
 
@@ -184,9 +143,7 @@ class StockHolderInfoServiceImpl(BaseServiceImpl[StockHolderInfoMapper, StockHol
         update_data: list[dict[str, Any]] = [
             stock_holder_info.model_dump(exclude_unset=True) for stock_holder_info in stock_holder_infos
         ]
-        await self.mapper.batch_update(items=update_data)
-        stock_holder_info_ids: list[int] = [stock_holder_info.id for stock_holder_info in stock_holder_infos]
-        return await self.mapper.select_by_ids(ids=stock_holder_info_ids)
+        return await batch_patch(self.mapper, update_data)
 
     async def batch_delete_stock_holder_infos(self, req: BatchDeleteStockHolderInfosRequest):
         ids: list[int] = req.ids
@@ -200,42 +157,15 @@ class StockHolderInfoServiceImpl(BaseServiceImpl[StockHolderInfoMapper, StockHol
 
     async def export_stock_holder_infos(self, req: ExportStockHolderInfosRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        stock_holder_info_list: list[StockHolderInfoModel] = await self.mapper.select_by_ids(ids=ids)
-        if stock_holder_info_list is None or len(stock_holder_info_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No stock_holder_infos found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        stock_holder_info_page_list = [ExportStockHolderInfo(**stock_holder_info.model_dump()) for stock_holder_info in stock_holder_info_list]
-        file_name = "stock_holder_info_data_export"
-        return await excel_util.export_excel(
-            schema=ExportStockHolderInfo, file_name=file_name, data_list=stock_holder_info_page_list
+        fields = list(ExportStockHolderInfo.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="stock_holder_info_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_stock_holder_infos(self, req: ImportStockHolderInfosRequest) -> list[ImportStockHolderInfo]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        stock_holder_info_records = import_df.to_dict(orient="records")
-        if stock_holder_info_records is None or len(stock_holder_info_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in stock_holder_info_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        stock_holder_info_import_list = []
-        for stock_holder_info_record in stock_holder_info_records:
-            try:
-                stock_holder_info_create = ImportStockHolderInfo(**stock_holder_info_record)
-                stock_holder_info_import_list.append(stock_holder_info_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v
-                    for k, v in stock_holder_info_record.items()
-                    if k in ImportStockHolderInfo.model_fields
-                }
-                stock_holder_info_create = ImportStockHolderInfo.model_construct(**valid_data)
-                stock_holder_info_create.err_msg = ValidateService.get_validate_err_msg(e)
-                stock_holder_info_import_list.append(stock_holder_info_create)
-                return stock_holder_info_import_list
-
-        return stock_holder_info_import_list
\ No newline at end of file
+    async def import_stock_holder_infos(self, req: ImportStockHolderInfosRequest) -> ImportResult:
+        return await import_util.import_file(req.file, ImportStockHolderInfo, self.mapper)
@@ -3,28 +3,26 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncGenerator, Sequence
 from datetime import datetime
-import io
-import json
 import random
 import time
 from typing import Any
-import akshare as ak
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.stock_mapper import StockMapper
 from src.main.app.model.stock_model import StockModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_schema import (
+    Stock,
     ListStocksRequest,
     CreateStockRequest,
     UpdateStockRequest,
@@ -41,6 +39,11 @@ from src.main.app.schema.stock_schema import (
     BatchUpdateStock,
 )
 from src.main.app.service.stock_service import StockService
+from src.main.app.utils import import_util, snowflake_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+ak = lazy_import("akshare")
+excel_util = lazy_import("fastlib.utils.excel_util")
 
 
 class StockServiceImpl(BaseServiceImpl[StockMapper, StockModel], StockService):
@@ -390,6 +393,7 @@ class StockServiceImpl(BaseServiceImpl[StockMapper, StockModel], StockService):
             logger.info("没有需要处理的新数据")
             return
 
+        snowflake_util.assign_ids(all_stocks)
         data = [StockModel(**item) for item in all_stocks]
 
         # 每100条入库一次
@@ -424,81 +428,12 @@ class StockServiceImpl(BaseServiceImpl[StockMapper, StockModel], StockService):
         return stock_record
 
     async def list_stocks(self, req: ListStocksRequest) -> tuple[list[StockModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.stock_code is not None and req.stock_code != "":
-            filters[FilterOperators.EQ]["stock_code"] = req.stock_code
-        if req.stock_name is not None and req.stock_name != "":
-            filters[FilterOperators.LIKE]["stock_name"] = req.stock_name
-        if req.exchange is not None and req.exchange != "":
-            filters[FilterOperators.EQ]["exchange"] = req.exchange
-        if req.listing_date is not None and req.listing_date != "":
-            filters[FilterOperators.EQ]["listing_date"] = req.listing_date
-        if req.industry is not None and req.industry != "":
-            filters[FilterOperators.EQ]["industry"] = req.industry
-        if req.province is not None and req.province != "":
-            filters[FilterOperators.EQ]["province"] = req.province
-        if req.city is not None and req.city != "":
-            filters[FilterOperators.EQ]["city"] = req.city
-        if req.company_name is not None and req.company_name != "":
-            filters[FilterOperators.LIKE]["company_name"] = req.company_name
-        if req.english_name is not None and req.english_name != "":
-            filters[FilterOperators.LIKE]["english_name"] = req.english_name
-        if req.former_name is not None and req.former_name != "":
-            filters[FilterOperators.LIKE]["former_name"] = req.former_name
-        if req.market_type is not None and req.market_type != "":
-            filters[FilterOperators.EQ]["market_type"] = req.market_type
-        if req.legal_representative is not None and req.legal_representative != "":
-            filters[FilterOperators.EQ][
-                "legal_representative"
-            ] = req.legal_representative
-        if req.registered_capital is not None and req.registered_capital != "":
-            filters[FilterOperators.EQ]["registered_capital"] = req.registered_capital
-        if req.establish_date is not None and req.establish_date != "":
-            filters[FilterOperators.EQ]["establish_date"] = req.establish_date
-        if req.website is not None and req.website != "":
-            filters[FilterOperators.EQ]["website"] = req.website
-        if req.email is not None and req.email != "":
-            filters[FilterOperators.EQ]["email"] = req.email
-        if req.telephone is not None and req.telephone != "":
-            filters[FilterOperators.EQ]["telephone"] = req.telephone
-        if req.fax is not None and req.fax != "":
-            filters[FilterOperators.EQ]["fax"] = req.fax
-        if req.registered_address is not None and req.registered_address != "":
-            filters[FilterOperators.EQ]["registered_address"] = req.registered_address
-        if req.business_address is not None and req.business_address != "":
-            filters[FilterOperators.EQ]["business_address"] = req.business_address
-        if req.postal_code is not None and req.postal_code != "":
-            filters[FilterOperators.EQ]["postal_code"] = req.postal_code
-        if req.main_business is not None and req.main_business != "":
-            filters[FilterOperators.EQ]["main_business"] = req.main_business
-        if req.business_scope is not None and req.business_scope != "":
-            filters[FilterOperators.EQ]["business_scope"] = req.business_scope
-        if req.company_profile is not None and req.company_profile != "":
-            filters[FilterOperators.EQ]["company_profile"] = req.company_profile
-        if req.data_source is not None and req.data_source != "":
-            filters[FilterOperators.EQ]["data_source"] = req.data_source
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_stocks(
+        self, req: ListStocksRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(Stock.model_fields))
 
     async def create_stock(self, req: CreateStockRequest) -> StockModel:
         stock: StockModel = StockModel(**req.stock.model_dump())
@@ -564,9 +499,7 @@ class StockServiceImpl(BaseServiceImpl[StockMapper, StockModel], StockService):
         update_data: list[dict[str, Any]] = [
             stock.model_dump(exclude_unset=True) for stock in stocks
         ]
-        await self.mapper.batch_update(items=update_data)
-        stock_ids: list[int] = [stock.id for stock in stocks]
-        return await self.mapper.select_by_ids(ids=stock_ids)
+        return await batch_patch(self.mapper, update_data)
 
     async def batch_delete_stocks(self, req: BatchDeleteStocksRequest):
         ids: list[int] = req.ids
@@ -578,42 +511,15 @@ class StockServiceImpl(BaseServiceImpl[StockMapper, StockModel], StockService):
 
     async def export_stocks(self, req: ExportStocksRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        stock_list: list[StockModel] = await self.mapper.select_by_ids(ids=ids)
-        if stock_list is None or len(stock_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No stocks found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        stock_page_list = [ExportStock(**stock.model_dump()) for stock in stock_list]
-        file_name = "stock_data_export"
-        return await excel_util.export_excel(
-            schema=ExportStock, file_name=file_name, data_list=stock_page_list
+        fields = list(ExportStock.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="stock_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_stocks(self, req: ImportStocksRequest) -> list[ImportStock]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        stock_records = import_df.to_dict(orient="records")
-        if stock_records is None or len(stock_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in stock_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        stock_import_list = []
-        for stock_record in stock_records:
-            try:
-                stock_create = ImportStock(**stock_record)
-                stock_import_list.append(stock_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v
-                    for k, v in stock_record.items()
-                    if k in ImportStock.model_fields
-                }
-                stock_create = ImportStock.model_construct(**valid_data)
-                stock_create.err_msg = ValidateService.get_validate_err_msg(e)
-                stock_import_list.append(stock_create)
-                return stock_import_list
-
-        return stock_import_list
+    async def import_stocks(self, req: ImportStocksRequest) -> ImportResult:
+        return await import_util.import_file(req.file, ImportStock, self.mapper)
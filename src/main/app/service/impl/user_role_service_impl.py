@@ -16,23 +16,21 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
 from typing import Type, Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.user_role_mapper import UserRoleMapper
 from src.main.app.model.user_role_model import UserRoleModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.user_role_schema import (
     ListUserRolesRequest,
     UserRole,
@@ -50,7 +48,15 @@ from src.main.app.schema.user_role_schema import (
     BatchPatchUserRolesRequest,
     BatchUpdateUserRole,
 )
+from src.main.app.service.auth_service import AuthService
+from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
 from src.main.app.service.user_role_service import UserRoleService
+from src.main.app.utils import import_util, xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+auth_service: AuthService = AuthServiceImpl()
 
 
 class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRoleService):
@@ -79,33 +85,12 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
         return user_role_record
 
     async def list_user_roles(self, req: ListUserRolesRequest) -> tuple[list[UserRoleModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.user_id:
-            filters[FilterOperators.EQ]["user_id"] = req.user_id
-        if req.create_time is not None and req.create_time != "":
-            filters[FilterOperators.EQ]["create_time"] = req.create_time
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_user_roles(
+        self, req: ListUserRolesRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(UserRole.model_fields))
 
     async def get_children_recursively(
         self, *, parent_data: list[UserRoleModel], schema_class: Type[UserRole]
@@ -119,7 +104,9 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
 
     async def create_user_role(self, req: CreateUserRoleRequest) -> UserRoleModel:
         user_role: UserRoleModel = UserRoleModel(**req.user_role.model_dump())
-        return await self.save(data=user_role)
+        user_role = await self.save(data=user_role)
+        await auth_service.invalidate_user_authorizations(user_ids=[user_role.user_id])
+        return user_role
 
     async def update_user_role(self, req: UpdateUserRoleRequest) -> UserRoleModel:
         user_role_record: UserRoleModel = await self.retrieve_by_id(id=req.user_role.id)
@@ -127,6 +114,9 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         user_role_model = UserRoleModel(**req.user_role.model_dump(exclude_unset=True))
         await self.modify_by_id(data=user_role_model)
+        await auth_service.invalidate_user_authorizations(
+            user_ids=[user_role_record.user_id, user_role_model.user_id]
+        )
         merged_data = {**user_role_record.model_dump(), **user_role_model.model_dump()}
         return UserRoleModel(**merged_data)
 
@@ -135,6 +125,7 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
         if user_role_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        await auth_service.invalidate_user_authorizations(user_ids=[user_role_record.user_id])
 
     async def batch_get_user_roles(self, ids: list[int]) -> list[UserRoleModel]:
         user_role_records = list[UserRoleModel] = await self.retrieve_by_ids(ids=ids)
@@ -158,6 +149,9 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         data_list = [UserRoleModel(**user_role.model_dump()) for user_role in user_role_list]
         await self.mapper.batch_insert(data_list=data_list)
+        await auth_service.invalidate_user_authorizations(
+            user_ids=[data.user_id for data in data_list]
+        )
         return data_list
 
     async def batch_update_user_roles(
@@ -167,8 +161,13 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
         ids: list[int] = req.ids
         if not user_role or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
+        user_ids: list[int] = await self._select_user_ids(ids=ids)
         await self.mapper.batch_update_by_ids(ids=ids, data=user_role.model_dump(exclude_none=True))
-        return await self.mapper.select_by_ids(ids=ids)
+        user_role_records: list[UserRoleModel] = await self.mapper.select_by_ids(ids=ids)
+        await auth_service.invalidate_user_authorizations(
+            user_ids=[*user_ids, *[record.user_id for record in user_role_records]]
+        )
+        return user_role_records
 
     async def batch_patch_user_roles(self, req: BatchPatchUserRolesRequest) -> list[UserRoleModel]:
         user_roles: list[UpdateUserRole] = req.user_roles
@@ -177,13 +176,27 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
         update_data: list[dict[str, Any]] = [
             user_role.model_dump(exclude_unset=True) for user_role in user_roles
         ]
-        await self.mapper.batch_update(items=update_data)
         user_role_ids: list[int] = [user_role.id for user_role in user_roles]
-        return await self.mapper.select_by_ids(ids=user_role_ids)
+        user_ids: list[int] = await self._select_user_ids(ids=user_role_ids)
+        user_role_records: list[UserRoleModel] = await batch_patch(self.mapper, update_data)
+        await auth_service.invalidate_user_authorizations(
+            user_ids=[*user_ids, *[record.user_id for record in user_role_records]]
+        )
+        return user_role_records
 
     async def batch_delete_user_roles(self, req: BatchDeleteUserRolesRequest):
         ids: list[int] = req.ids
+        user_ids: list[int] = await self._select_user_ids(ids=ids)
         await self.mapper.batch_delete_by_ids(ids=ids)
+        await auth_service.invalidate_user_authorizations(user_ids=user_ids)
+
+    async def _select_user_ids(self, ids: list[int]) -> list[int]:
+        """
+        user_id of the given bindings, read before a write replaces them, so that
+        the users losing a binding are invalidated too.
+        """
+        user_role_records: list[UserRoleModel] = await self.mapper.select_by_ids(ids=ids)
+        return [record.user_id for record in user_role_records]
 
     async def export_user_roles_template(self) -> StreamingResponse:
         file_name = "user_role_import_tpl"
@@ -191,42 +204,22 @@ class UserRoleServiceImpl(BaseServiceImpl[UserRoleMapper, UserRoleModel], UserRo
 
     async def export_user_roles(self, req: ExportUserRolesRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        user_role_list: list[UserRoleModel] = await self.mapper.select_by_ids(ids=ids)
-        if user_role_list is None or len(user_role_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No user_roles found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        user_role_page_list = [
-            ExportUserRole(**user_role.model_dump()) for user_role in user_role_list
-        ]
-        file_name = "user_role_data_export"
-        return await excel_util.export_excel(
-            schema=ExportUserRole, file_name=file_name, data_list=user_role_page_list
+        fields = list(ExportUserRole.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="user_role_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
         )
 
-    async def import_user_roles(self, req: ImportUserRolesRequest) -> list[ImportUserRole]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        user_role_records = import_df.to_dict(orient="records")
-        if user_role_records is None or len(user_role_records) == 0:
-            raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in user_role_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        user_role_import_list = []
-        for user_role_record in user_role_records:
-            try:
-                user_role_create = ImportUserRole(**user_role_record)
-                user_role_import_list.append(user_role_create)
-            except ValidationError as e:
-                valid_data = {
-                    k: v for k, v in user_role_record.items() if k in ImportUserRole.model_fields
-                }
-                user_role_create = ImportUserRole.model_construct(**valid_data)
-                user_role_create.err_msg = ValidateService.get_validate_err_msg(e)
-                user_role_import_list.append(user_role_create)
-                return user_role_import_list
-
-        return user_role_import_list
+    async def import_user_roles(self, req: ImportUserRolesRequest) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportUserRole, self.mapper, before_insert=self._before_import
+        )
+
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        await auth_service.invalidate_user_authorizations(
+            user_ids=[values["user_id"] for values in values_list]
+        )
@@ -16,25 +16,23 @@
 
 from __future__ import annotations
 
-import io
-import json
+from collections.abc import AsyncGenerator, Sequence
 from typing import Any
 
-import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
 from starlette.responses import StreamingResponse
 
-from fastlib.constants import FilterOperators
-from fastlib import security
 from fastlib.service.impl.base_service_impl import BaseServiceImpl
-from fastlib.utils import excel_util
-from fastlib.utils.validate_util import ValidateService
 from src.main.app.exception.biz_exception import BusinessErrorCode
 from src.main.app.exception.biz_exception import BusinessException
+from src.main.app.mapper.bulk_update import batch_patch
+from src.main.app.mapper.export_query import exists_by_ids, stream_rows_by_ids
+from src.main.app.mapper.list_query import select_by_list_request, stream_by_list_request
 from src.main.app.mapper.user_mapper import UserMapper
 from src.main.app.model.user_model import UserModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.user_schema import (
+    User,
     ListUsersRequest,
     CreateUserRequest,
     UpdateUserRequest,
@@ -50,7 +48,16 @@ from src.main.app.schema.user_schema import (
     BatchPatchUsersRequest,
     BatchUpdateUser,
 )
+from src.main.app.service.auth_service import AuthService
+from src.main.app.service.impl.auth_service_impl import AuthServiceImpl
 from src.main.app.service.user_service import UserService
+from src.main.app.utils import import_util, password_util
+from src.main.app.utils import xlsx_util
+from src.main.app.utils.lazy_util import lazy_import
+
+excel_util = lazy_import("fastlib.utils.excel_util")
+
+auth_service: AuthService = AuthServiceImpl()
 
 
 class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
@@ -79,37 +86,12 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
         return user_record
 
     async def list_users(self, req: ListUsersRequest) -> tuple[list[UserModel], int]:
-        filters = {
-            FilterOperators.EQ: {},
-            FilterOperators.NE: {},
-            FilterOperators.GT: {},
-            FilterOperators.GE: {},
-            FilterOperators.LT: {},
-            FilterOperators.LE: {},
-            FilterOperators.BETWEEN: {},
-            FilterOperators.LIKE: {},
-        }
-        if req.id is not None and req.id != "":
-            filters[FilterOperators.EQ]["id"] = req.id
-        if req.username is not None and req.username != "":
-            filters[FilterOperators.LIKE]["username"] = req.username
-        if req.nickname is not None and req.nickname != "":
-            filters[FilterOperators.LIKE]["nickname"] = req.nickname
-        if req.status is not None and req.status != "":
-            filters[FilterOperators.EQ]["status"] = req.status
-        if req.create_time is not None and req.create_time != "":
-            filters[FilterOperators.EQ]["create_time"] = req.create_time
-        sort_list = None
-        sort_str = req.sort_str
-        if sort_str is not None:
-            sort_list = json.loads(sort_str)
-        return await self.mapper.select_by_ordered_page(
-            current=req.current,
-            page_size=req.page_size,
-            count=req.count,
-            **filters,
-            sort_list=sort_list,
-        )
+        return await select_by_list_request(self.mapper, req)
+
+    async def stream_users(
+        self, req: ListUsersRequest
+    ) -> AsyncGenerator[Sequence[Any], None]:
+        return stream_by_list_request(self.mapper, req, fields=list(User.model_fields))
 
     async def create_user(self, req: CreateUserRequest) -> UserModel:
         user_data = req.user
@@ -118,7 +100,7 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
             raise BusinessException(BusinessErrorCode.USER_NAME_EXISTS)
         if not user_data.password:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        user_data.password = security.get_password_hash(user_data.password.strip())
+        user_data.password = await password_util.hash_password(user_data.password.strip())
         user_data.username = user_data.username.strip()
         user: UserModel = UserModel(**user_data.model_dump())
         return await self.save(data=user)
@@ -129,6 +111,7 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         user_model = UserModel(**req.user.model_dump(exclude_unset=True))
         await self.modify_by_id(data=user_model)
+        await auth_service.invalidate_user_authorizations(user_ids=[user_model.id])
         merged_data = {**user_record.model_dump(), **user_model.model_dump()}
         return UserModel(**merged_data)
 
@@ -137,6 +120,7 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
         if user_record is None:
             raise BusinessException(BusinessErrorCode.RESOURCE_NOT_FOUND)
         await self.mapper.delete_by_id(id=id)
+        await auth_service.invalidate_user_authorizations(user_ids=[id])
 
     async def batch_get_users(self, ids: list[int]) -> list[UserModel]:
         user_records = list[UserModel] = await self.retrieve_by_ids(ids=ids)
@@ -156,9 +140,23 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
         req: BatchCreateUsersRequest,
     ) -> list[UserModel]:
         user_list: list[CreateUser] = req.users
-        if not user_list:
+        if not user_list or any(not user.password for user in user_list):
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        data_list = [UserModel(**user.model_dump()) for user in user_list]
+        usernames = [user.username.strip() for user in user_list]
+        if len(set(usernames)) != len(usernames):
+            raise BusinessException(BusinessErrorCode.USER_NAME_EXISTS)
+        if await self.mapper.select_by_username_list(username_list=usernames):
+            raise BusinessException(BusinessErrorCode.USER_NAME_EXISTS)
+        # Hashed across processes, a large import would otherwise hold the worker for seconds
+        hashed_passwords = await password_util.hash_passwords(
+            [user.password.strip() for user in user_list]
+        )
+        data_list = [
+            UserModel(**{**user.model_dump(), "username": username, "password": hashed_password})
+            for user, username, hashed_password in zip(
+                user_list, usernames, hashed_passwords, strict=True
+            )
+        ]
         await self.mapper.batch_insert(data_list=data_list)
         return data_list
 
@@ -168,6 +166,7 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
         if not user or not ids:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         await self.mapper.batch_update_by_ids(ids=ids, data=user.model_dump(exclude_none=True))
+        await auth_service.invalidate_user_authorizations(user_ids=ids)
         return await self.mapper.select_by_ids(ids=ids)
 
     async def batch_patch_users(self, req: BatchPatchUsersRequest) -> list[UserModel]:
@@ -175,13 +174,15 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
         if not users:
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
         update_data: list[dict[str, Any]] = [user.model_dump(exclude_unset=True) for user in users]
-        await self.mapper.batch_update(items=update_data)
+        user_records: list[UserModel] = await batch_patch(self.mapper, update_data)
         user_ids: list[int] = [user.id for user in users]
-        return await self.mapper.select_by_ids(ids=user_ids)
+        await auth_service.invalidate_user_authorizations(user_ids=user_ids)
+        return user_records
 
     async def batch_delete_users(self, req: BatchDeleteUsersRequest):
         ids: list[int] = req.ids
         await self.mapper.batch_delete_by_ids(ids=ids)
+        await auth_service.invalidate_user_authorizations(user_ids=ids)
 
     async def export_users_template(self) -> StreamingResponse:
         file_name = "user_import_tpl"
@@ -189,38 +190,36 @@ class UserServiceImpl(BaseServiceImpl[UserMapper, UserModel], UserService):
 
     async def export_users(self, req: ExportUsersRequest) -> StreamingResponse:
         ids: list[int] = req.ids
-        user_list: list[UserModel] = await self.mapper.select_by_ids(ids=ids)
-        if user_list is None or len(user_list) == 0:
+        if not ids or not await exists_by_ids(self.mapper, ids):
             logger.error(f"No users found with ids {ids}")
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        user_page_list = [ExportUser(**user.model_dump()) for user in user_list]
-        file_name = "user_data_export"
-        return await excel_util.export_excel(
-            schema=ExportUser, file_name=file_name, data_list=user_page_list
+        fields = list(ExportUser.model_fields)
+        return await xlsx_util.stream_excel(
+            headers=fields,
+            file_name="user_data_export",
+            chunks=stream_rows_by_ids(self.mapper, fields, ids),
+        )
+
+    async def import_users(self, req: ImportUsersRequest) -> ImportResult:
+        return await import_util.import_file(
+            req.file, ImportUser, self.mapper, before_insert=self._before_import
         )
 
-    async def import_users(self, req: ImportUsersRequest) -> list[ImportUser]:
-        file = req.file
-        contents = await file.read()
-        import_df = pd.read_excel(io.BytesIO(contents))
-        import_df = import_df.fillna("")
-        user_records = import_df.to_dict(orient="records")
-        if user_records is None or len(user_records) == 0:
+    async def _before_import(self, values_list: list[dict[str, Any]]) -> None:
+        """Check the usernames of a chunk of imported users and hash their passwords."""
+        if any(not values["password"] for values in values_list):
             raise BusinessException(BusinessErrorCode.PARAMETER_ERROR)
-        for record in user_records:
-            for key, value in record.items():
-                if value == "":
-                    record[key] = None
-        user_import_list = []
-        for user_record in user_records:
-            try:
-                user_create = ImportUser(**user_record)
-                user_import_list.append(user_create)
-            except ValidationError as e:
-                valid_data = {k: v for k, v in user_record.items() if k in ImportUser.model_fields}
-                user_create = ImportUser.model_construct(**valid_data)
-                user_create.err_msg = ValidateService.get_validate_err_msg(e)
-                user_import_list.append(user_create)
-                return user_import_list
-
-        return user_import_list
+        usernames = [values["username"].strip() for values in values_list]
+        if len(set(usernames)) != len(usernames):
+            raise BusinessException(BusinessErrorCode.USER_NAME_EXISTS)
+        # Also finds the users of the chunks imported before, inserted in the same transaction
+        if await self.mapper.select_by_username_list(username_list=usernames):
+            raise BusinessException(BusinessErrorCode.USER_NAME_EXISTS)
+        hashed_passwords = await password_util.hash_passwords(
+            [values["password"].strip() for values in values_list]
+        )
+        for values, username, hashed_password in zip(
+            values_list, usernames, hashed_passwords, strict=True
+        ):
+            values["username"] = username
+            values["password"] = hashed_password
@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.intelligence_information_model import IntelligenceInformationModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.intelligence_information_schema import (
     ListIntelligenceInformationRequest,
     CreateIntelligenceInformationRequest,
@@ -19,8 +21,9 @@ from src.main.app.schema.intelligence_information_schema import (
     BatchCreateIntelligenceInformationRequest,
     BatchUpdateIntelligenceInformationRequest,
     ImportIntelligenceInformationRequest,
-    ImportIntelligenceInformation,
     BatchPatchIntelligenceInformationRequest,
+    ListLatestNewsRequest,
+    LatestNews,
 )
 
 
@@ -37,7 +40,16 @@ class IntelligenceInformationService(BaseService[IntelligenceInformationModel],
         self, *, req: ListIntelligenceInformationRequest
     ) -> tuple[list[IntelligenceInformationModel], int]: ...
 
-    
+    @abstractmethod
+    async def stream_intelligence_information(
+        self, *, req: ListIntelligenceInformationRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
+    @abstractmethod
+    async def list_latest_news(self, *, req: ListLatestNewsRequest) -> list[LatestNews]: ...
+
+    @abstractmethod
+    async def warm_latest_news_cache(self) -> None: ...
 
     @abstractmethod
     async def create_intelligence_information(self, *, req: CreateIntelligenceInformationRequest) -> IntelligenceInformationModel: ...
@@ -82,4 +94,4 @@ class IntelligenceInformationService(BaseService[IntelligenceInformationModel],
     @abstractmethod
     async def import_intelligence_information(
         self, req: ImportIntelligenceInformationRequest
-    ) -> list[ImportIntelligenceInformation]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
\ No newline at end of file
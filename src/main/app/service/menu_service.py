@@ -17,12 +17,14 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Optional, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.menu_model import MenuModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.menu_schema import (
     ListMenusRequest,
     CreateMenuRequest,
@@ -33,7 +35,6 @@ from src.main.app.schema.menu_schema import (
     BatchCreateMenusRequest,
     BatchUpdateMenusRequest,
     ImportMenusRequest,
-    ImportMenu,
     BatchPatchMenusRequest,
 )
 
@@ -49,11 +50,31 @@ class MenuService(BaseService[MenuModel], ABC):
     @abstractmethod
     async def list_menus(self, *, req: ListMenusRequest) -> tuple[list[MenuModel], int]: ...
 
+    @abstractmethod
+    async def stream_menus(
+        self, *, req: ListMenusRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     @abstractmethod
     async def get_children_recursively(
         self, *, parent_data: list[MenuModel], schema_class: Type[Menu]
     ) -> list[Menu]: ...
 
+    @abstractmethod
+    async def get_menu_tree(self) -> list[Menu]: ...
+
+    @abstractmethod
+    async def get_menu_subtree(self, *, id: int) -> Menu: ...
+
+    @abstractmethod
+    async def get_menu_ancestors(self, *, id: int) -> list[MenuModel]: ...
+
+    @abstractmethod
+    async def move_menu(self, *, id: int, parent_id: Optional[int]) -> MenuModel: ...
+
+    @abstractmethod
+    async def rebuild_menu_tree_paths(self) -> int: ...
+
     @abstractmethod
     async def create_menu(self, *, req: CreateMenuRequest) -> MenuModel: ...
 
@@ -89,4 +110,4 @@ class MenuService(BaseService[MenuModel], ABC):
     async def export_menus(self, req: ExportMenusRequest) -> StreamingResponse: ...
 
     @abstractmethod
-    async def import_menus(self, req: ImportMenusRequest) -> list[ImportMenu]: ...
+    async def import_menus(self, req: ImportMenusRequest) -> ImportResult: ...
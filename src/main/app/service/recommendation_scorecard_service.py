@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: MIT
+"""RecommendationScorecard Service"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+from fastlib.service.base_service import BaseService
+
+from src.main.app.model.recommendation_outcome_model import RecommendationOutcomeModel
+from src.main.app.model.recommendation_scorecard_model import (
+    RecommendationScorecardModel,
+)
+from src.main.app.schema.recommendation_scorecard_schema import (
+    ListRecommendationOutcomesRequest,
+    ListRecommendationScorecardsRequest,
+    RefreshRecommendationScorecardsRequest,
+    RefreshRecommendationScorecardsResponse,
+)
+
+
+class RecommendationScorecardService(BaseService[RecommendationScorecardModel], ABC):
+    @abstractmethod
+    async def list_recommendation_scorecards(
+        self, *, req: ListRecommendationScorecardsRequest
+    ) -> tuple[list[RecommendationScorecardModel], int]: ...
+
+    @abstractmethod
+    async def list_recommendation_outcomes(
+        self, *, req: ListRecommendationOutcomesRequest
+    ) -> tuple[list[RecommendationOutcomeModel], int]: ...
+
+    @abstractmethod
+    async def refresh_recommendation_scorecards(
+        self, *, req: RefreshRecommendationScorecardsRequest
+    ) -> RefreshRecommendationScorecardsResponse: ...
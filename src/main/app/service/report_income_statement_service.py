@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.report_income_statement_model import ReportIncomeStatementModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.report_income_statement_schema import (
     ListReportIncomeStatementsRequest,
     CreateReportIncomeStatementRequest,
@@ -19,7 +21,6 @@ from src.main.app.schema.report_income_statement_schema import (
     BatchCreateReportIncomeStatementsRequest,
     BatchUpdateReportIncomeStatementsRequest,
     ImportReportIncomeStatementsRequest,
-    ImportReportIncomeStatement,
     BatchPatchReportIncomeStatementsRequest,
 )
 
@@ -44,6 +45,11 @@ class ReportIncomeStatementService(BaseService[ReportIncomeStatementModel], ABC)
         self, *, req: ListReportIncomeStatementsRequest
     ) -> tuple[list[ReportIncomeStatementModel], int]: ...
 
+    @abstractmethod
+    async def stream_report_income_statements(
+        self, *, req: ListReportIncomeStatementsRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     
 
     @abstractmethod
@@ -89,4 +95,4 @@ class ReportIncomeStatementService(BaseService[ReportIncomeStatementModel], ABC)
     @abstractmethod
     async def import_report_income_statements(
         self, req: ImportReportIncomeStatementsRequest
-    ) -> list[ImportReportIncomeStatement]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
\ No newline at end of file
@@ -16,11 +16,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.role_menu_model import RoleMenuModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.role_menu_schema import (
     ListRoleMenusRequest,
     CreateRoleMenuRequest,
@@ -30,7 +33,6 @@ from src.main.app.schema.role_menu_schema import (
     BatchCreateRoleMenusRequest,
     BatchUpdateRoleMenusRequest,
     ImportRoleMenusRequest,
-    ImportRoleMenu,
     BatchPatchRoleMenusRequest,
 )
 
@@ -48,6 +50,11 @@ class RoleMenuService(BaseService[RoleMenuModel], ABC):
         self, *, req: ListRoleMenusRequest
     ) -> tuple[list[RoleMenuModel], int]: ...
 
+    @abstractmethod
+    async def stream_role_menus(
+        self, *, req: ListRoleMenusRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     @abstractmethod
     async def create_role_menu(self, *, req: CreateRoleMenuRequest) -> RoleMenuModel: ...
 
@@ -87,4 +94,4 @@ class RoleMenuService(BaseService[RoleMenuModel], ABC):
     async def export_role_menus(self, req: ExportRoleMenusRequest) -> StreamingResponse: ...
 
     @abstractmethod
-    async def import_role_menus(self, req: ImportRoleMenusRequest) -> list[ImportRoleMenu]: ...
+    async def import_role_menus(self, req: ImportRoleMenusRequest) -> ImportResult: ...
@@ -16,11 +16,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.role_model import RoleModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.role_schema import (
     ListRolesRequest,
     CreateRoleRequest,
@@ -30,7 +33,6 @@ from src.main.app.schema.role_schema import (
     BatchCreateRolesRequest,
     BatchUpdateRolesRequest,
     ImportRolesRequest,
-    ImportRole,
     BatchPatchRolesRequest,
 )
 
@@ -46,6 +48,11 @@ class RoleService(BaseService[RoleModel], ABC):
     @abstractmethod
     async def list_roles(self, *, req: ListRolesRequest) -> tuple[list[RoleModel], int]: ...
 
+    @abstractmethod
+    async def stream_roles(
+        self, *, req: ListRolesRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     @abstractmethod
     async def create_role(self, *, req: CreateRoleRequest) -> RoleModel: ...
 
@@ -81,4 +88,4 @@ class RoleService(BaseService[RoleModel], ABC):
     async def export_roles(self, req: ExportRolesRequest) -> StreamingResponse: ...
 
     @abstractmethod
-    async def import_roles(self, req: ImportRolesRequest) -> list[ImportRole]: ...
+    async def import_roles(self, req: ImportRolesRequest) -> ImportResult: ...
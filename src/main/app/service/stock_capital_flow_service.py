@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.stock_capital_flow_model import StockCapitalFlowModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_capital_flow_schema import (
     ListStockCapitalFlowsRequest,
     CreateStockCapitalFlowRequest,
@@ -19,7 +21,6 @@ from src.main.app.schema.stock_capital_flow_schema import (
     BatchCreateStockCapitalFlowsRequest,
     BatchUpdateStockCapitalFlowsRequest,
     ImportStockCapitalFlowsRequest,
-    ImportStockCapitalFlow,
     BatchPatchStockCapitalFlowsRequest,
 )
 
@@ -37,6 +38,11 @@ class StockCapitalFlowService(BaseService[StockCapitalFlowModel], ABC):
         self, *, req: ListStockCapitalFlowsRequest
     ) -> tuple[list[StockCapitalFlowModel], int]: ...
 
+    @abstractmethod
+    async def stream_stock_capital_flows(
+        self, *, req: ListStockCapitalFlowsRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     
 
     @abstractmethod
@@ -82,4 +88,4 @@ class StockCapitalFlowService(BaseService[StockCapitalFlowModel], ABC):
     @abstractmethod
     async def import_stock_capital_flows(
         self, req: ImportStockCapitalFlowsRequest
-    ) -> list[ImportStockCapitalFlow]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
\ No newline at end of file
@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.stock_daily_info_model import StockDailyInfoModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_daily_info_schema import (
     ListStockDailyInfosRequest,
     CreateStockDailyInfoRequest,
@@ -19,7 +21,6 @@ from src.main.app.schema.stock_daily_info_schema import (
     BatchCreateStockDailyInfosRequest,
     BatchUpdateStockDailyInfosRequest,
     ImportStockDailyInfosRequest,
-    ImportStockDailyInfo,
     BatchPatchStockDailyInfosRequest,
 )
 
@@ -37,6 +38,11 @@ class StockDailyInfoService(BaseService[StockDailyInfoModel], ABC):
         self, *, req: ListStockDailyInfosRequest
     ) -> tuple[list[StockDailyInfoModel], int]: ...
 
+    @abstractmethod
+    async def stream_stock_daily_infos(
+        self, *, req: ListStockDailyInfosRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     
 
     @abstractmethod
@@ -82,4 +88,4 @@ class StockDailyInfoService(BaseService[StockDailyInfoModel], ABC):
     @abstractmethod
     async def import_stock_daily_infos(
         self, req: ImportStockDailyInfosRequest
-    ) -> list[ImportStockDailyInfo]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
\ No newline at end of file
@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.stock_daily_recommendation_model import StockDailyRecommendationModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_daily_recommendation_schema import (
     ListStockDailyRecommendationsRequest,
     CreateStockDailyRecommendationRequest,
@@ -19,8 +21,9 @@ from src.main.app.schema.stock_daily_recommendation_schema import (
     BatchCreateStockDailyRecommendationsRequest,
     BatchUpdateStockDailyRecommendationsRequest,
     ImportStockDailyRecommendationsRequest,
-    ImportStockDailyRecommendation,
     BatchPatchStockDailyRecommendationsRequest,
+    ListActiveRecommendationsRequest,
+    ActiveRecommendation,
 )
 
 
@@ -37,6 +40,11 @@ class StockDailyRecommendationService(BaseService[StockDailyRecommendationModel]
         self, *, req: ListStockDailyRecommendationsRequest
     ) -> tuple[list[StockDailyRecommendationModel], int]: ...
 
+    @abstractmethod
+    async def stream_stock_daily_recommendations(
+        self, *, req: ListStockDailyRecommendationsRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     
 
     @abstractmethod
@@ -82,4 +90,12 @@ class StockDailyRecommendationService(BaseService[StockDailyRecommendationModel]
     @abstractmethod
     async def import_stock_daily_recommendations(
         self, req: ImportStockDailyRecommendationsRequest
-    ) -> list[ImportStockDailyRecommendation]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
+
+    @abstractmethod
+    async def list_active_recommendations(
+        self, *, req: ListActiveRecommendationsRequest
+    ) -> list[ActiveRecommendation]: ...
+
+    @abstractmethod
+    async def warm_active_recommendation_index(self) -> None: ...
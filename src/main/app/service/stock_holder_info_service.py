@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.stock_holder_info_model import StockHolderInfoModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_holder_info_schema import (
     ListStockHolderInfosRequest,
     CreateStockHolderInfoRequest,
@@ -19,7 +21,6 @@ from src.main.app.schema.stock_holder_info_schema import (
     BatchCreateStockHolderInfosRequest,
     BatchUpdateStockHolderInfosRequest,
     ImportStockHolderInfosRequest,
-    ImportStockHolderInfo,
     BatchPatchStockHolderInfosRequest,
 )
 
@@ -37,6 +38,11 @@ class StockHolderInfoService(BaseService[StockHolderInfoModel], ABC):
         self, *, req: ListStockHolderInfosRequest
     ) -> tuple[list[StockHolderInfoModel], int]: ...
 
+    @abstractmethod
+    async def stream_stock_holder_infos(
+        self, *, req: ListStockHolderInfosRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     
 
     @abstractmethod
@@ -82,4 +88,4 @@ class StockHolderInfoService(BaseService[StockHolderInfoModel], ABC):
     @abstractmethod
     async def import_stock_holder_infos(
         self, req: ImportStockHolderInfosRequest
-    ) -> list[ImportStockHolderInfo]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
\ No newline at end of file
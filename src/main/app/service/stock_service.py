@@ -3,12 +3,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Type
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Type
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.stock_model import StockModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.stock_schema import (
     ListStocksRequest,
     CreateStockRequest,
@@ -19,7 +21,6 @@ from src.main.app.schema.stock_schema import (
     BatchCreateStocksRequest,
     BatchUpdateStocksRequest,
     ImportStocksRequest,
-    ImportStock,
     BatchPatchStocksRequest,
 )
 
@@ -44,6 +45,11 @@ class StockService(BaseService[StockModel], ABC):
         self, *, req: ListStocksRequest
     ) -> tuple[list[StockModel], int]: ...
 
+    @abstractmethod
+    async def stream_stocks(
+        self, *, req: ListStocksRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     
 
     @abstractmethod
@@ -89,4 +95,4 @@ class StockService(BaseService[StockModel], ABC):
     @abstractmethod
     async def import_stocks(
         self, req: ImportStocksRequest
-    ) -> list[ImportStock]: ...
\ No newline at end of file
+    ) -> ImportResult: ...
\ No newline at end of file
@@ -17,11 +17,14 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.user_role_model import UserRoleModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.user_role_schema import (
     ListUserRolesRequest,
     CreateUserRoleRequest,
@@ -31,7 +34,6 @@ from src.main.app.schema.user_role_schema import (
     BatchCreateUserRolesRequest,
     BatchUpdateUserRolesRequest,
     ImportUserRolesRequest,
-    ImportUserRole,
     BatchPatchUserRolesRequest,
 )
 
@@ -49,6 +51,11 @@ class UserRoleService(BaseService[UserRoleModel], ABC):
         self, *, req: ListUserRolesRequest
     ) -> tuple[list[UserRoleModel], int]: ...
 
+    @abstractmethod
+    async def stream_user_roles(
+        self, *, req: ListUserRolesRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     @abstractmethod
     async def create_user_role(self, *, req: CreateUserRoleRequest) -> UserRoleModel: ...
 
@@ -88,4 +95,4 @@ class UserRoleService(BaseService[UserRoleModel], ABC):
     async def export_user_roles(self, req: ExportUserRolesRequest) -> StreamingResponse: ...
 
     @abstractmethod
-    async def import_user_roles(self, req: ImportUserRolesRequest) -> list[ImportUserRole]: ...
+    async def import_user_roles(self, req: ImportUserRolesRequest) -> ImportResult: ...
@@ -16,11 +16,14 @@
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any
 
 from starlette.responses import StreamingResponse
 
 from fastlib.service.base_service import BaseService
 from src.main.app.model.user_model import UserModel
+from src.main.app.schema.import_schema import ImportResult
 from src.main.app.schema.user_schema import (
     ListUsersRequest,
     CreateUserRequest,
@@ -30,7 +33,6 @@ from src.main.app.schema.user_schema import (
     BatchCreateUsersRequest,
     BatchUpdateUsersRequest,
     ImportUsersRequest,
-    ImportUser,
     BatchPatchUsersRequest,
 )
 
@@ -46,6 +48,11 @@ class UserService(BaseService[UserModel], ABC):
     @abstractmethod
     async def list_users(self, *, req: ListUsersRequest) -> tuple[list[UserModel], int]: ...
 
+    @abstractmethod
+    async def stream_users(
+        self, *, req: ListUsersRequest
+    ) -> AsyncGenerator[Sequence[Any], None]: ...
+
     @abstractmethod
     async def create_user(self, *, req: CreateUserRequest) -> UserModel: ...
 
@@ -81,4 +88,4 @@ class UserService(BaseService[UserModel], ABC):
     async def export_users(self, req: ExportUsersRequest) -> StreamingResponse: ...
 
     @abstractmethod
-    async def import_users(self, req: ImportUsersRequest) -> list[ImportUser]: ...
+    async def import_users(self, req: ImportUsersRequest) -> ImportResult: ...
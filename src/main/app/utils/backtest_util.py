@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: MIT
+"""Vectorized evaluation of stock recommendations against daily bars"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from src.main.app.utils.lazy_util import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Horizon used for recommendations that do not declare a validity period
+DEFAULT_VALIDITY_DAYS = 180
+
+RECOMMENDATION_COLUMNS = [
+    "id",
+    "stock_symbol_full",
+    "analyst",
+    "institution",
+    "recommend_date",
+    "price",
+    "target_price",
+    "validity_period",
+]
+BAR_COLUMNS = ["stock_symbol_full", "trade_date", "close_price", "high_price", "low_price"]
+CLOSE_COLUMNS = ["stock_symbol_full", "trade_date", "close_price"]
+OUTCOME_COLUMNS = [
+    "recommendation_id",
+    "stock_symbol_full",
+    "analyst",
+    "institution",
+    "recommend_date",
+    "expiry_date",
+    "direction",
+    "bars_observed",
+    "evaluated_through",
+    "is_target_hit",
+    "target_hit_date",
+    "max_drawdown",
+    "return_at_expiry",
+    "market_return",
+    "excess_return",
+    "is_final",
+]
+
+
+def to_frame(rows: list[Any], columns: list[str]) -> pd.DataFrame:
+    """
+    Build a typed frame from query rows: *_date columns become datetimes and
+    price-like columns become floats, so that NULLs turn into NaN/NaT.
+    """
+    frame = pd.DataFrame.from_records(list(rows), columns=columns)
+    for column in columns:
+        if column.endswith("_date"):
+            frame[column] = pd.to_datetime(frame[column])
+        elif column.endswith("_price") or column in ("price", "validity_period"):
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(float)
+    return frame
+
+
+def expiry_dates(
+    recommendations: pd.DataFrame, default_validity_days: int = DEFAULT_VALIDITY_DAYS
+) -> pd.Series:
+    """Expiry of every recommendation: recommend_date plus its validity period in days."""
+    validity = recommendations["validity_period"].fillna(default_validity_days)
+    return recommendations["recommend_date"] + pd.to_timedelta(validity, unit="D")
+
+
+def split_by_window(recommendations: pd.DataFrame, window_days: int) -> list[pd.DataFrame]:
+    """
+    Split recommendations into groups made within the same ``window_days``
+    long window, counted from the earliest recommend_date, so that each group
+    only needs the bars of a bounded period. Recommendations without a
+    recommend_date form a group of their own.
+    """
+    if recommendations.empty:
+        return []
+    dates = recommendations["recommend_date"]
+    windows = ((dates - dates.min()) // pd.Timedelta(days=window_days)).fillna(-1)
+    return [group for _, group in recommendations.groupby(windows, sort=True)]
+
+
+def build_market_index(closes: pd.DataFrame) -> pd.Series:
+    """
+    Equal-weighted market level by trade_date, starting at 1.0.
+
+    The level compounds the cross-sectional mean of the daily close-to-close
+    returns of every stock present in ``closes``.
+    """
+    if closes.empty:
+        return pd.Series(dtype=float)
+    closes = closes.sort_values(["stock_symbol_full", "trade_date"], kind="stable")
+    daily_return = closes.groupby("stock_symbol_full")["close_price"].pct_change(fill_method=None)
+    daily_return = daily_return.replace([np.inf, -np.inf], np.nan)
+    mean_return = daily_return.groupby(closes["trade_date"]).mean().fillna(0.0)
+    return (1.0 + mean_return).cumprod()
+
+
+def _level_at(market_index: pd.Series, dates: pd.Series) -> np.ndarray:
+    """Market level on or before each date; dates before the index read as the base level."""
+    if market_index.empty:
+        return np.full(len(dates), np.nan)
+    dates = pd.DatetimeIndex(dates)
+    positions = market_index.index.searchsorted(dates, side="right") - 1
+    levels = market_index.to_numpy()[np.clip(positions, 0, None)]
+    levels = np.where(positions < 0, 1.0, levels)
+    return np.where(dates.isna(), np.nan, levels)
+
+
+def evaluate_recommendations(
+    recommendations: pd.DataFrame,
+    bars: pd.DataFrame,
+    market_index: pd.Series,
+    as_of: Optional[datetime],
+    default_validity_days: int = DEFAULT_VALIDITY_DAYS,
+) -> pd.DataFrame:
+    """
+    Evaluate recommendations against the bars that follow them.
+
+    Every recommendation is joined with the bars of its stock in
+    (recommend_date, expiry_date] in a single merge, and all metrics are
+    computed with group-wise vectorized operations. Returns are measured from
+    the recommendation price and from the point of view of the recommended
+    position: calls whose target is below the price are treated as short.
+
+    Args:
+        recommendations: Frame with ``RECOMMENDATION_COLUMNS``.
+        bars: Frame with ``BAR_COLUMNS`` for the recommended stocks.
+        market_index: Market level by trade_date, see ``build_market_index``.
+        as_of: Latest trade date available; outcomes expiring on or before it
+            are final and never evaluated again.
+        default_validity_days: Horizon of recommendations without validity_period.
+
+    Returns:
+        Frame with ``OUTCOME_COLUMNS``, one row per recommendation. Those
+        without a stock, a recommend_date or a positive price get a final
+        outcome with no bars observed, which scorecards leave out.
+    """
+    valid = (
+        recommendations["stock_symbol_full"].notna()
+        & recommendations["recommend_date"].notna()
+        & (recommendations["price"] > 0)
+    )
+    recs = recommendations.copy()
+    recs["expiry_date"] = expiry_dates(recs, default_validity_days)
+    direction = np.where(recs["target_price"] < recs["price"], -1, 1)
+    recs["direction"] = pd.Series(direction, index=recs.index, dtype="Int64").where(valid)
+
+    path = recs.loc[
+        valid,
+        ["id", "stock_symbol_full", "recommend_date", "expiry_date", "price", "target_price", "direction"],
+    ].merge(bars[BAR_COLUMNS], on="stock_symbol_full")
+    path = path.loc[
+        (path["trade_date"] > path["recommend_date"]) & (path["trade_date"] <= path["expiry_date"])
+    ].sort_values(["id", "trade_date"], kind="stable")
+
+    # NaN targets or prices compare as False, so they never count as a hit
+    path["hit"] = np.where(
+        path["direction"] > 0,
+        path["high_price"] >= path["target_price"],
+        path["low_price"] <= path["target_price"],
+    )
+    # Value of the recommended position, entered at 1.0 on the recommendation price
+    path["value"] = 1.0 + path["direction"] * (path["close_price"] / path["price"] - 1.0)
+    peak = path.groupby("id")["value"].cummax().clip(lower=1.0)
+    path["drawdown"] = path["value"] / peak - 1.0
+
+    summary = path.groupby("id").agg(
+        bars_observed=("trade_date", "size"),
+        evaluated_through=("trade_date", "max"),
+        max_drawdown=("drawdown", "min"),
+        is_target_hit=("hit", "any"),
+    )
+    summary["exit_close"] = path.dropna(subset=["close_price"]).groupby("id")["close_price"].last()
+    summary["target_hit_date"] = path.loc[path["hit"]].groupby("id")["trade_date"].min()
+
+    outcomes = recs.join(summary, on="id")
+    outcomes["bars_observed"] = outcomes["bars_observed"].fillna(0).astype(int)
+    outcomes["is_target_hit"] = outcomes["is_target_hit"].astype("boolean").fillna(False).astype(int)
+    stock_return = outcomes["exit_close"] / outcomes["price"] - 1.0
+    start_level = _level_at(market_index, outcomes["recommend_date"])
+    end_level = _level_at(market_index, outcomes["evaluated_through"])
+    outcomes["market_return"] = end_level / start_level - 1.0
+    outcomes["return_at_expiry"] = outcomes["direction"] * stock_return
+    outcomes["excess_return"] = outcomes["direction"] * (stock_return - outcomes["market_return"])
+    # Recommendations that cannot be evaluated are final right away
+    if as_of is None:
+        outcomes["is_final"] = (~valid).astype(int)
+    else:
+        expired = outcomes["expiry_date"] <= pd.Timestamp(as_of)
+        outcomes["is_final"] = (expired | ~valid).astype(int)
+    outcomes = outcomes.rename(columns={"id": "recommendation_id"})
+    return outcomes[OUTCOME_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,30 @@
+# SPDX-License-Identifier: MIT
+"""Entity tags for conditional GET requests"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+
+def compute_etag(content: bytes) -> str:
+    """Strong entity tag derived from the response body, equal across workers."""
+    return '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches the current entity tag, in which
+    case the request can be answered with 304 Not Modified.
+
+    Uses the weak comparison required for If-None-Match: a ``W/`` prefix on
+    either side is ignored.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current for candidate in header.split(",")
+    )
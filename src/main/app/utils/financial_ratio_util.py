@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: MIT
+"""Vectorized key financial ratios of income statements"""
+
+from __future__ import annotations
+
+from src.main.app.utils.lazy_util import lazy_import
+
+pd = lazy_import("pandas")
+
+RATIO_COLUMNS = ["gross_margin", "expense_ratio", "operating_profit_margin", "net_profit_margin"]
+SOURCE_COLUMNS = [
+    "total_operating_income",
+    "operating_expenses",
+    "sales_expenses",
+    "management_expenses",
+    "financial_expenses",
+    "operating_profit",
+    "net_profit",
+]
+
+
+def compute_financial_ratios(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the key ratios of every income statement in ``frame`` at once.
+
+    Ratios are percentages rounded to two decimals and are NaN when the total
+    operating income is missing or zero; missing expense or profit items
+    count as zero. ``operating_expenses`` is taken as the operating cost.
+
+    - gross_margin: (income - operating cost) / income
+    - expense_ratio: (sales + management + financial expenses) / income
+    - operating_profit_margin: operating profit / income
+    - net_profit_margin: net profit / income
+
+    Args:
+        frame: Frame holding ``SOURCE_COLUMNS``.
+
+    Returns:
+        Frame with ``RATIO_COLUMNS`` aligned on the index of ``frame``.
+    """
+    def amount(column: str) -> pd.Series:
+        return pd.to_numeric(frame[column], errors="coerce").fillna(0.0)
+
+    income = pd.to_numeric(frame["total_operating_income"], errors="coerce")
+    income = income.where(income != 0)
+    ratios = pd.DataFrame(
+        {
+            "gross_margin": (income - amount("operating_expenses")) / income,
+            "expense_ratio": (
+                amount("sales_expenses") + amount("management_expenses") + amount("financial_expenses")
+            ) / income,
+            "operating_profit_margin": amount("operating_profit") / income,
+            "net_profit_margin": amount("net_profit") / income,
+        },
+        index=frame.index,
+    )
+    return (ratios * 100).round(2)
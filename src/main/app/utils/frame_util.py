@@ -0,0 +1,15 @@
+# SPDX-License-Identifier: MIT
+"""Helpers for moving rows between the database and pandas"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from src.main.app.utils.lazy_util import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def to_records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+    """Convert a frame to plain dicts with None in place of NaN/NaT."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
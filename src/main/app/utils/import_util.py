@@ -0,0 +1,271 @@
+# SPDX-License-Identifier: MIT
+"""Excel and CSV files imported in validated, bulk-inserted chunks"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import csv
+import os
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Union
+
+from fastapi import UploadFile
+from fastlib import ConfigManager
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.main.app.config import get_import_config
+from src.main.app.exception.biz_exception import BusinessErrorCode, BusinessException
+from src.main.app.mapper.base_mapper import SqlModelMapper
+from src.main.app.schema.import_schema import ImportResult, ImportRowError
+from src.main.app.utils import snowflake_util
+from src.main.app.utils.lazy_util import lazy_import
+
+openpyxl = lazy_import("openpyxl")
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# Column values of the rows of a chunk, errors as (row number, message)
+_Validated = tuple[list[dict[str, Any]], list[tuple[int, str]]]
+BeforeInsert = Callable[[list[dict[str, Any]]], Awaitable[None]]
+
+
+def _error_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in e.errors()
+    )
+
+
+def _validate_chunk(
+    schema: type[BaseModel],
+    model: type,
+    headers: Sequence[Optional[str]],
+    first_row: int,
+    rows: list[Sequence[Any]],
+) -> _Validated:
+    """
+    Validate the rows of a chunk against the import schema and turn the valid
+    ones into the column values of the model, defaults included.
+
+    A primary key generated by the model is left out: the ids of a chunk are
+    reserved as one block by the importing process.
+    """
+    model_fields = model.model_fields
+    columns = [column.name for column in model.__table__.columns]
+    generated_pk = {
+        column.name
+        for column in model.__table__.primary_key.columns
+        if model_fields[column.name].default_factory is not None
+    }
+    values_list: list[dict[str, Any]] = []
+    errors: list[tuple[int, str]] = []
+    for row_number, row in enumerate(rows, first_row):
+        data = {
+            header: None if value == "" else value
+            # Rows may be shorter or longer than the header row
+            for header, value in zip(headers, row, strict=False)
+            if header
+        }
+        if all(value is None for value in data.values()):
+            continue
+        try:
+            item = schema.model_validate(data)
+        except ValidationError as e:
+            errors.append((row_number, _error_message(e)))
+            continue
+        dumped = item.model_dump()
+        values = {}
+        for column in columns:
+            if column in dumped:
+                values[column] = dumped[column]
+            elif column not in generated_pk:
+                values[column] = model_fields[column].get_default(call_default_factory=True)
+        values_list.append(values)
+    return values_list, errors
+
+
+def _init_process() -> None:
+    # Spawned processes do not inherit the config the schema modules read on import
+    ConfigManager.initialize_global_config()
+
+
+def _process_count() -> int:
+    return get_import_config().validate_processes or os.cpu_count() or 1
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=_process_count(), initializer=_init_process
+        )
+    return _process_pool
+
+
+def _read_xlsx(file) -> Iterator[Sequence[Any]]:
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise BusinessException(BusinessErrorCode.PARAMETER_ERROR, "Invalid Excel file") from e
+    try:
+        worksheet = workbook.worksheets[0]
+        # Dimensions written by other tools can be wrong, the rows are read to the end
+        worksheet.reset_dimensions()
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _read_csv(file) -> Iterator[Sequence[Any]]:
+    text = codecs.getreader("utf-8-sig")(file)
+    try:
+        yield from csv.reader(text)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise BusinessException(BusinessErrorCode.PARAMETER_ERROR, "Invalid CSV file") from e
+
+
+def _read_rows(file: UploadFile) -> Iterator[Sequence[Any]]:
+    """Rows of an uploaded xlsx or CSV file, read as a stream."""
+    file.file.seek(0)
+    if (file.filename or "").lower().endswith(".csv"):
+        return _read_csv(file.file)
+    return _read_xlsx(file.file)
+
+
+def _next_chunk(rows: Iterator[Sequence[Any]], size: int) -> list[Sequence[Any]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            break
+    return chunk
+
+
+async def insert_values(
+    mapper: SqlModelMapper,
+    values_list: list[dict[str, Any]],
+    db_session: Union[AsyncSession, None] = None,
+) -> None:
+    """Insert rows given as column values in one executemany."""
+    db_session = db_session or mapper.db.session
+    await db_session.exec(insert(mapper.model.__table__), params=values_list)
+
+
+async def _validate_in_pool(
+    schema: type[BaseModel],
+    model: type,
+    headers: Sequence[Optional[str]],
+    rows: Iterator[Sequence[Any]],
+    chunk: list[Sequence[Any]],
+    next_chunk: list[Sequence[Any]],
+    handle: Callable[[_Validated], Awaitable[None]],
+) -> None:
+    """
+    Validate the chunks of a file on the process pool, one per process at
+    most, handing them in file order to ``handle`` as they complete. The
+    next chunk is read while the previous ones are validated and inserted.
+    """
+    loop = asyncio.get_running_loop()
+    process_pool = _get_process_pool()
+    chunk_size = get_import_config().chunk_size
+    pending: deque[asyncio.Future] = deque()
+    first_row = 2
+    while chunk:
+        pending.append(
+            loop.run_in_executor(
+                process_pool, _validate_chunk, schema, model, headers, first_row, chunk
+            )
+        )
+        first_row += len(chunk)
+        if len(pending) >= _process_count():
+            await handle(await pending.popleft())
+        chunk = next_chunk
+        next_chunk = await asyncio.to_thread(_next_chunk, rows, chunk_size)
+    while pending:
+        await handle(await pending.popleft())
+
+
+async def import_file(
+    file: UploadFile,
+    schema: type[BaseModel],
+    mapper: SqlModelMapper,
+    before_insert: Optional[BeforeInsert] = None,
+    db_session: Union[AsyncSession, None] = None,
+) -> ImportResult:
+    """
+    Import the rows of an uploaded xlsx or CSV file into the table of a mapper.
+
+    The file is read as a stream, ``import.chunk_size`` rows at a time, on a
+    worker thread. Chunks are validated in parallel on a process pool, files
+    of a single chunk on a thread, while the chunks validated before are
+    inserted. Every invalid row is reported with its row number; as soon as
+    one is found nothing more is inserted and the import is rolled back once
+    the whole file is validated.
+
+    Args:
+        file: Uploaded file, a header row of field names then a row per record.
+        schema: Import schema each row is validated against.
+        mapper: Mapper of the table the rows are inserted into.
+        before_insert: Called with the column values of each valid chunk, ids
+            assigned, before it is inserted; it may complete or change them.
+        db_session: The database session to use, whose transaction holds the
+            inserted chunks.
+    """
+    db_session = db_session or mapper.db.session
+    config = get_import_config()
+    model = mapper.model
+    pk = model.__table__.primary_key.columns[0].name
+    rows = _read_rows(file)
+    headers = await asyncio.to_thread(next, rows, None)
+    if not headers or not any(headers):
+        raise BusinessException(BusinessErrorCode.PARAMETER_ERROR, "Missing header row")
+    headers = [str(header).strip() if header is not None else None for header in headers]
+    result = ImportResult()
+
+    async def handle(validated: _Validated) -> None:
+        values_list, errors = validated
+        result.total += len(values_list) + len(errors)
+        result.failed += len(errors)
+        room = max(config.max_errors - len(result.errors), 0)
+        result.errors.extend(
+            ImportRowError(row=row, errMsg=message) for row, message in errors[:room]
+        )
+        if result.failed or not values_list:
+            return
+        snowflake_util.assign_ids(values_list, key=pk)
+        if before_insert is not None:
+            await before_insert(values_list)
+        await insert_values(mapper, values_list, db_session=db_session)
+        result.inserted += len(values_list)
+
+    try:
+        chunk = await asyncio.to_thread(_next_chunk, rows, config.chunk_size)
+        next_chunk = await asyncio.to_thread(_next_chunk, rows, config.chunk_size)
+        if not next_chunk:
+            validated = await asyncio.to_thread(
+                _validate_chunk, schema, model, headers, 2, chunk
+            )
+            await handle(validated)
+        else:
+            await _validate_in_pool(schema, model, headers, rows, chunk, next_chunk, handle)
+    except BaseException:
+        await db_session.rollback()
+        raise
+    if result.total == 0:
+        raise BusinessException(BusinessErrorCode.PARAMETER_ERROR, "No rows to import")
+    if result.failed:
+        await db_session.rollback()
+        result.inserted = 0
+    return result
+
+
+def shutdown() -> None:
+    """Stop the validation pool, it is started again on next use."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+    _process_pool = None
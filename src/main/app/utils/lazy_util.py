@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: MIT
+"""Modules imported on first use rather than at startup"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from types import ModuleType
+from typing import Any, Optional
+
+from loguru import logger
+
+_lock = threading.RLock()
+# Seconds taken by the first import of each lazy module, in import order
+importTimes: dict[str, float] = {}
+
+
+class LazyModule:
+    """
+    Stand-in of a module, importing it when one of its attributes is first
+    accessed.
+
+    Heavy modules only used by the sync, import and export paths, such as
+    pandas, akshare or openpyxl, are bound through it so that importing the
+    controllers, and thus starting a worker, does not pay for them. Type
+    annotations naming such a module only work under
+    ``from __future__ import annotations``.
+    """
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._module
+        if module is None:
+            module = self._load()
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "imported" if self._module is not None else "not imported"
+        return f"<lazy module {self._name!r}, {state}>"
+
+    def _load(self) -> ModuleType:
+        with _lock:
+            if self._module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self._name)
+                elapsed = time.perf_counter() - start
+                if self._name not in importTimes:
+                    importTimes[self._name] = elapsed
+                    logger.info(f"Imported {self._name} on first use in {elapsed * 1000:.0f} ms")
+                self._module = module
+        return self._module
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Bind the module ``name``, imported when first used."""
+    return LazyModule(name)
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: MIT
+"""Password hashing and verification off the event loop"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from fastlib import ConfigManager
+
+from src.main.app.config import get_password_config
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pending: Optional[asyncio.Semaphore] = None
+
+
+def _hash(password: str) -> str:
+    """Hash a password into the stored ``hash:salt`` format."""
+    from fastlib import security
+
+    return security.get_password_hash_compat(password)
+
+
+def _verify(password: str, stored_password: Optional[str]) -> bool:
+    """Verify a password against a stored ``hash:salt``, or a bare legacy hash."""
+    from fastlib import security
+
+    if not stored_password:
+        return False
+    hashed_password, salt = security.parse_hashed_password(stored_password)
+    return security.verify_password(password, hashed_password, salt)
+
+
+def _hash_chunk(passwords: list[str]) -> list[str]:
+    return [_hash(password) for password in passwords]
+
+
+def _init_process() -> None:
+    # Spawned processes do not inherit the config that fastlib.security reads on import
+    ConfigManager.initialize_global_config()
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool, _pending
+    if _thread_pool is None:
+        password_config = get_password_config()
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=password_config.hash_workers, thread_name_prefix="password"
+        )
+        _pending = asyncio.Semaphore(password_config.max_pending)
+    return _thread_pool
+
+
+def _process_count() -> int:
+    return get_password_config().bulk_processes or os.cpu_count() or 1
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=_process_count(), initializer=_init_process
+        )
+    return _process_pool
+
+
+async def _run_in_thread_pool(func, *args):
+    thread_pool = _get_thread_pool()
+    async with _pending:
+        return await asyncio.get_running_loop().run_in_executor(thread_pool, func, *args)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password on the password thread pool.
+
+    Hashing is CPU bound and takes milliseconds, running it on the event loop
+    would stall every other request of the worker meanwhile.
+    """
+    return await _run_in_thread_pool(_hash, password)
+
+
+async def verify_password(password: str, stored_password: Optional[str]) -> bool:
+    """Verify a password against its stored hash on the password thread pool."""
+    return await _run_in_thread_pool(_verify, password, stored_password)
+
+
+async def hash_passwords(passwords: Sequence[str]) -> list[str]:
+    """
+    Hash the passwords of a bulk import in parallel across processes.
+
+    The passwords are split into one chunk per process so that the pickling
+    overhead is paid once per chunk. Small imports are hashed on the thread
+    pool, where starting processes would cost more than it saves.
+    """
+    passwords = list(passwords)
+    password_config = get_password_config()
+    if len(passwords) < password_config.bulk_min_size:
+        return await _run_in_thread_pool(_hash_chunk, passwords)
+    process_pool = _get_process_pool()
+    chunk_size = -(-len(passwords) // _process_count())
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(
+        *[
+            loop.run_in_executor(process_pool, _hash_chunk, passwords[start : start + chunk_size])
+            for start in range(0, len(passwords), chunk_size)
+        ]
+    )
+    return [hashed for chunk in chunks for hashed in chunk]
+
+
+def shutdown() -> None:
+    """Stop the password pools, they are started again on next use."""
+    global _thread_pool, _process_pool, _pending
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+    _thread_pool = _process_pool = _pending = None
@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: MIT
+"""Vectorized cross-sectional peer statistics for bank capital indicators"""
+
+from __future__ import annotations
+
+from src.main.app.utils.lazy_util import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Indicators compared across peers, mapped to True when a lower value is better
+PEER_METRICS: dict[str, bool] = {
+    "non_performing_loan_ratio": True,
+    "loan_loss_provision_ratio": False,
+    "net_interest_margin": False,
+    "capital_adequacy_ratio": False,
+    "tier1_capital_ratio": False,
+    "core_tier1_ratio": False,
+}
+ID_COLUMNS = ["trade_date", "bank_type", "bank_code", "bank_name"]
+SOURCE_COLUMNS = [*ID_COLUMNS, *PEER_METRICS]
+PEER_GROUP = ["trade_date", "bank_type", "metric"]
+
+
+def build_cross_section(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rank every bank against the banks of the same bank_type on the same trade_date.
+
+    The indicators are unpivoted into one row per bank and metric, then ranks,
+    percentiles and z-scores are computed with group-wise transforms over
+    (trade_date, bank_type, metric). Rank 1 and percentile 1.0 denote the best
+    value of the group, taking into account metrics where lower is better;
+    z-scores are signed on the raw value.
+
+    Args:
+        frame: Frame with ``SOURCE_COLUMNS``; when a bank has several rows on a
+            trade_date, the last one wins.
+
+    Returns:
+        Frame with one row per (trade_date, bank_type, metric, bank_code).
+    """
+    frame = frame.dropna(subset=["trade_date", "bank_type", "bank_code"])
+    frame = frame.drop_duplicates(subset=["trade_date", "bank_code"], keep="last")
+    long = frame.melt(
+        id_vars=ID_COLUMNS, value_vars=list(PEER_METRICS), var_name="metric", value_name="value"
+    )
+    long = long.dropna(subset=["value"]).reset_index(drop=True)
+    long["bank_type"] = long["bank_type"].astype(int)
+    long["value"] = long["value"].astype("int64")
+    if long.empty:
+        return long
+
+    keys = [long[column] for column in PEER_GROUP]
+    lower_is_better = long["metric"].map(PEER_METRICS).astype(bool)
+    oriented = long["value"].where(lower_is_better, -long["value"])
+    long["peer_rank"] = oriented.groupby(keys).rank(method="min").astype(int)
+    values = long["value"].groupby(keys)
+    long["peer_count"] = values.transform("count").astype(int)
+    long["percentile"] = np.where(
+        long["peer_count"] > 1,
+        (long["peer_count"] - long["peer_rank"]) / (long["peer_count"] - 1).clip(lower=1),
+        1.0,
+    )
+    std = values.transform("std", ddof=0)
+    long["z_score"] = ((long["value"] - values.transform("mean")) / std.where(std > 0)).fillna(0.0)
+    return long
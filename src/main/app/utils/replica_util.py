@@ -0,0 +1,251 @@
+# SPDX-License-Identifier: MIT
+"""Read replicas serving the reads of read-only request scopes"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from fastlib import ConfigManager
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlmodel import Session
+
+from src.main.app.config import get_replica_config
+
+replica_config = get_replica_config()
+
+# No lag while the replica has replayed all it received, so that an idle
+# primary does not look like a lagging replica
+_POSTGRESQL_LAG_QUERY = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Engine of a replica, with the pool settings of the primary."""
+    database_config = ConfigManager.get_database_config()
+    pool_args = {}
+    if make_url(url).get_backend_name() != "sqlite":
+        pool_args = {
+            "pool_size": database_config.pool_size,
+            "max_overflow": database_config.max_overflow,
+        }
+    return create_async_engine(
+        url=url,
+        echo=database_config.echo_sql,
+        pool_recycle=database_config.pool_recycle,
+        pool_pre_ping=True,
+        **pool_args,
+    )
+
+
+async def _mysql_lag(connection: AsyncConnection) -> Optional[float]:
+    try:
+        result = await connection.execute(text("SHOW REPLICA STATUS"))
+    except DBAPIError:
+        # Before MySQL 8.0.22, and on MariaDB
+        result = await connection.execute(text("SHOW SLAVE STATUS"))
+    status = result.mappings().first()
+    if status is None:
+        # Not replicating, as a stand-in of a replica
+        return 0.0
+    lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+class Replica:
+    """A read replica and the outcome of its last health check."""
+
+    def __init__(self, url: str):
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = _create_engine(url)
+        self.sync_engine = self.engine.sync_engine
+        self.healthy = False
+        # Lag in seconds, None when unknown or when replication is broken
+        self.lag: Optional[float] = None
+        event.listen(self.sync_engine, "handle_error", self._on_error)
+
+    def usable(self, max_lag_seconds: float) -> bool:
+        return self.healthy and self.lag is not None and self.lag <= max_lag_seconds
+
+    def _on_error(self, context: Any) -> None:
+        # Out of rotation at once, back after its next successful check
+        if context.is_disconnect and self.healthy:
+            self.healthy = False
+            logger.warning(f"Read replica {self.name} disconnected, reads fail over")
+
+    async def _measure_lag(self, lag_query: str) -> Optional[float]:
+        async with self.engine.connect() as connection:
+            if lag_query:
+                lag = await connection.scalar(text(lag_query))
+                return None if lag is None else float(lag)
+            dialect = self.engine.dialect.name
+            if dialect == "mysql":
+                return await _mysql_lag(connection)
+            if dialect == "postgresql":
+                return float(await connection.scalar(text(_POSTGRESQL_LAG_QUERY)) or 0)
+            await connection.execute(text("SELECT 1"))
+            return 0.0
+
+    async def check(self, lag_query: str, timeout: float, max_lag_seconds: float) -> None:
+        """Check that the replica answers and measure its lag."""
+        was_usable = self.usable(max_lag_seconds)
+        try:
+            self.lag = await asyncio.wait_for(self._measure_lag(lag_query), timeout)
+            self.healthy = True
+        except Exception as e:
+            if self.healthy:
+                logger.warning(f"Read replica {self.name} failed its health check: {e}")
+            self.healthy = False
+            self.lag = None
+        usable = self.usable(max_lag_seconds)
+        if usable and not was_usable:
+            logger.info(f"Read replica {self.name} serves reads, lag {self.lag}s")
+        elif was_usable and not usable and self.healthy:
+            state = "is not replicating" if self.lag is None else f"lags {self.lag}s"
+            logger.warning(f"Read replica {self.name} {state}, reads fail over")
+
+
+class ReplicaSet:
+    """
+    Read replicas taking turns to serve the reads of read-only scopes.
+
+    Only the replicas that passed their last health check with a lag within
+    ``max_lag_seconds`` take turns; with none of them, reads fail over to the
+    primary.
+    """
+
+    def __init__(self, urls: list[str], max_lag_seconds: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_lag_seconds = max_lag_seconds
+        self._turns = itertools.count()
+
+    def choose(self) -> Optional[Replica]:
+        usable = [replica for replica in self.replicas if replica.usable(self.max_lag_seconds)]
+        if not usable:
+            return None
+        return usable[next(self._turns) % len(usable)]
+
+    async def check(self, lag_query: str, timeout: float) -> None:
+        await asyncio.gather(
+            *(
+                replica.check(lag_query, timeout, self.max_lag_seconds)
+                for replica in self.replicas
+            )
+        )
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replicaSet: Optional[ReplicaSet] = (
+    ReplicaSet(replica_config.url_list, replica_config.max_lag_seconds)
+    if replica_config.url_list
+    else None
+)
+_health_check_task: Optional[asyncio.Task] = None
+
+
+class RequestScope:
+    """Routing of the database sessions opened while serving a request."""
+
+    __slots__ = ("read_only", "wrote")
+
+    def __init__(self, read_only: bool):
+        self.read_only = read_only
+        # Set once a session of the request wrote to the primary
+        self.wrote = False
+
+
+_request_scope: ContextVar[Optional[RequestScope]] = ContextVar("_request_scope", default=None)
+
+
+@contextmanager
+def request_scope(read_only: bool) -> Iterator[RequestScope]:
+    """Route the sessions opened within the block, reads to a replica if read_only."""
+    token = _request_scope.set(RequestScope(read_only))
+    try:
+        yield _request_scope.get()
+    finally:
+        _request_scope.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    Session of the request scope it was opened in.
+
+    In a read-only scope, the SELECT statements of the session are sent to a
+    replica, the same one for the life of the session. A write, a flush or a
+    ``SELECT ... FOR UPDATE`` goes to the primary, and the session then stays
+    on the primary so that it reads its own writes. Sessions opened outside
+    a request scope, as by the sync jobs, only use the primary.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._scope = _request_scope.get()
+        self._replica: Optional[Replica] = None
+        self._pinned = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        scope = self._scope
+        if scope is not None and kw.get("bind") is None:
+            reading = (
+                getattr(clause, "is_select", False)
+                and getattr(clause, "_for_update_arg", None) is None
+            )
+            if self._flushing or (clause is not None and not reading):
+                scope.wrote = True
+                self._pinned = True
+            elif reading and scope.read_only and not self._pinned and replicaSet is not None:
+                replica = self._replica
+                if replica is None or not replica.usable(replicaSet.max_lag_seconds):
+                    replica = self._replica = replicaSet.choose()
+                if replica is not None:
+                    return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def session_args() -> dict[str, Any]:
+    """Arguments of the sessions of DBSessionMiddleware, routed if replicas are set."""
+    return {} if replicaSet is None else {"sync_session_class": RoutingSession}
+
+
+async def _run_health_checks() -> None:
+    while True:
+        await asyncio.sleep(replica_config.health_check_seconds)
+        await replicaSet.check(replica_config.lag_query, replica_config.health_check_timeout)
+
+
+async def start() -> None:
+    """Check the replicas once, then keep checking them in the background."""
+    global _health_check_task
+    if replicaSet is None or _health_check_task is not None:
+        return
+    await replicaSet.check(replica_config.lag_query, replica_config.health_check_timeout)
+    _health_check_task = asyncio.create_task(_run_health_checks())
+
+
+async def shutdown() -> None:
+    """Stop the health checks and close the connections to the replicas."""
+    global _health_check_task
+    if _health_check_task is not None:
+        _health_check_task.cancel()
+        try:
+            await _health_check_task
+        except asyncio.CancelledError:
+            pass
+        _health_check_task = None
+    if replicaSet is not None:
+        await replicaSet.dispose()
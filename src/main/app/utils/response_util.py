@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: MIT
+"""JSON responses serialized by pydantic-core, without intermediate dicts"""
+
+from __future__ import annotations
+
+import functools
+from collections.abc import AsyncGenerator, AsyncIterator, Sequence
+from typing import Any
+
+import anyio
+import pydantic_core
+from loguru import logger
+from pydantic import TypeAdapter
+from starlette.requests import ClientDisconnect
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+_NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by the Rust serializer of pydantic-core.
+
+    Models, datetimes and decimals are encoded natively, without going through
+    ``jsonable_encoder``. Content already encoded, as returned by
+    ``json_response``, is sent as is.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return pydantic_core.to_json(content, by_alias=True)
+
+
+@functools.cache
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def _loaded_values(record: Any) -> Any:
+    """
+    Column values of a loaded ORM instance, else the record itself.
+
+    SQLAlchemy keeps the loaded values of an instance in its ``__dict__``;
+    reading them from there costs a dict lookup per field instead of a trip
+    through the instrumented attribute. Expired instances are read through
+    their attributes, so that the missing values are loaded.
+    """
+    state = getattr(record, "_sa_instance_state", None)
+    if state is None or state.key is None or state.expired_attributes:
+        return record
+    return record.__dict__
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_loaded_values(item) for item in value]
+    return _loaded_values(value)
+
+
+def json_response(response_type: Any, **fields: Any) -> FastJSONResponse:
+    """
+    Validate the content of a response against its type and encode it.
+
+    ORM instances are validated into the response schema from their loaded
+    values, without being dumped into dicts first, other records through
+    their attributes; the result is encoded straight to bytes. Routes
+    returning the response skip the validation and serialization FastAPI
+    would otherwise run on the result.
+
+    Args:
+        response_type: Response model, as ``ListResponse[Stock]``.
+        **fields: Fields of the response model, records or lists of records.
+    """
+    adapter = _adapter(response_type)
+    content = {name: _plain(value) for name, value in fields.items()}
+    validated = adapter.validate_python(content, from_attributes=True)
+    return FastJSONResponse(adapter.dump_json(validated, by_alias=True))
+
+
+def _ndjson_lines(schema: Any, rows: Sequence[Any]) -> bytes:
+    records = _adapter(list[schema]).validate_python(rows, from_attributes=True)
+    return b"".join(pydantic_core.to_json(record, by_alias=True) + b"\n" for record in records)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response that lets its body stop on a client disconnect.
+
+    StreamingResponse cancels its body as soon as the client disconnects,
+    possibly in the middle of a database fetch, which leaves the cursor and
+    its connection to be torn down. Here the disconnect only sets
+    ``disconnected``, and the body checks it between chunks.
+    """
+
+    media_type = _NDJSON_MEDIA_TYPE
+
+    def __init__(self, content: Any, disconnected: anyio.Event):
+        super().__init__(content)
+        self.disconnected = disconnected
+
+    async def _listen_for_disconnect(self, receive: Receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        self.disconnected.set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(self._listen_for_disconnect, receive)
+            try:
+                await self.stream_response(send)
+            except OSError as e:
+                self.disconnected.set()
+                raise ClientDisconnect() from e
+            finally:
+                task_group.cancel_scope.cancel()
+
+
+def ndjson_response(
+    schema: Any, chunks: AsyncGenerator[Sequence[Any], None]
+) -> NDJSONStreamingResponse:
+    """
+    Stream rows as newline-delimited JSON, one record of the schema per line.
+
+    Each chunk of rows is validated into the schema, encoded by pydantic-core
+    and sent before the next chunk is read. Once the client has disconnected
+    no further chunk is read and ``chunks`` is closed, which ends the query
+    feeding it.
+
+    Args:
+        schema: Schema of a record, as ``Stock``.
+        chunks: Lists of rows, as produced by a server-side cursor.
+    """
+    disconnected = anyio.Event()
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for rows in chunks:
+                yield _ndjson_lines(schema, rows)
+                if disconnected.is_set():
+                    logger.info("Client disconnected, stream stopped")
+                    break
+        finally:
+            await chunks.aclose()
+
+    return NDJSONStreamingResponse(body(), disconnected)
@@ -0,0 +1,165 @@
+# SPDX-License-Identifier: MIT
+"""Route compilation into a path trie and route to permission mapping"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Generic, Optional, TypeVar
+
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+
+ValueType = TypeVar("ValueType")
+
+# Action of routes without a custom method, by HTTP method
+_METHOD_ACTIONS = {
+    "GET": "list",
+    "POST": "create",
+    "PUT": "update",
+    "PATCH": "patch",
+    "DELETE": "delete",
+}
+# Key of the child matching any single path segment
+_PARAM = "{}"
+
+
+def split_segment(segment: str) -> tuple[str, str]:
+    """
+    Split a route path segment into its base and its custom method.
+
+    ``"stocks:syncManually"`` gives ``("stocks", "syncManually")`` and
+    ``"{id}:subtree"`` gives ``("{id}", "subtree")``; colons inside a
+    parameter, as in ``"{id:int}"``, belong to the parameter.
+    """
+    if segment.startswith("{") and "}" in segment:
+        end = segment.index("}") + 1
+        base, rest = segment[:end], segment[end:]
+        return base, rest[1:] if rest.startswith(":") else ""
+    base, _, verb = segment.partition(":")
+    return base, verb
+
+
+def route_permission(path: str, method: str) -> Optional[str]:
+    """
+    Permission required by a route, in ``resource:action`` form.
+
+    The resource is the last literal segment of the path. The action is the
+    custom method of the path if any, as in ``/stocks:syncManually``, else it
+    is derived from the HTTP method, ``get`` for a GET on a single resource.
+
+    Returns:
+        The permission, or None if the path has no literal segment.
+    """
+    segments = [split_segment(segment) for segment in path.strip("/").split("/") if segment]
+    resource = next((base for base, _ in reversed(segments) if not base.startswith("{")), None)
+    if resource is None:
+        return None
+    base, verb = segments[-1]
+    if verb:
+        action = verb
+    elif method == "GET" and base.startswith("{"):
+        action = "get"
+    else:
+        action = _METHOD_ACTIONS.get(method, method.lower())
+    return f"{resource}:{action}"
+
+
+class _Node(Generic[ValueType]):
+    __slots__ = ("children", "handlers")
+
+    def __init__(self):
+        self.children: dict[str, _Node[ValueType]] = {}
+        # (custom method, HTTP method) -> value of the route
+        self.handlers: dict[tuple[str, str], ValueType] = {}
+
+
+class RouteTrie(Generic[ValueType]):
+    """
+    Trie of route paths mapped to a value per HTTP method.
+
+    Built once from the registered routes, so that the route of a request is
+    found by walking its path segments, with no pattern matching. Literal
+    segments take precedence over parameters, as in the router. Custom
+    methods, as in ``/stocks:syncManually``, are recognized on the last
+    segment.
+    """
+
+    def __init__(self):
+        self._root: _Node[ValueType] = _Node()
+        self.size = 0
+
+    def add(self, path: str, methods: Iterable[str], value: ValueType) -> None:
+        segments = [split_segment(segment) for segment in path.strip("/").split("/") if segment]
+        node = self._root
+        verb = ""
+        for index, (base, segment_verb) in enumerate(segments):
+            if index == len(segments) - 1:
+                verb = segment_verb
+            else:
+                base = f"{base}:{segment_verb}" if segment_verb else base
+            key = _PARAM if base.startswith("{") else base
+            node = node.children.setdefault(key, _Node())
+        for method in methods:
+            node.handlers[(verb, method)] = value
+            self.size += 1
+
+    def match(self, method: str, path: str) -> Optional[ValueType]:
+        """Value of the route serving a request, or None if it matches no route."""
+        segments = [segment for segment in path.strip("/").split("/") if segment]
+        if not segments:
+            return None
+        *parents, last = segments
+        base, verb = last.partition(":")[::2]
+        candidates = [(base, verb), (last, "")] if verb else [(last, "")]
+        for base, verb in candidates:
+            value = self._match(self._root, parents, 0, base, (verb, method))
+            if value is not None:
+                return value
+        return None
+
+    def _match(
+        self,
+        node: _Node[ValueType],
+        parents: list[str],
+        index: int,
+        last: str,
+        handler: tuple[str, str],
+    ) -> Optional[ValueType]:
+        if index == len(parents):
+            for key in (last, _PARAM):
+                child = node.children.get(key)
+                if child is not None and handler in child.handlers:
+                    return child.handlers[handler]
+            return None
+        for key in (parents[index], _PARAM):
+            child = node.children.get(key)
+            if child is not None:
+                value = self._match(child, parents, index + 1, last, handler)
+                if value is not None:
+                    return value
+        return None
+
+
+def compile_routes(
+    routes: Iterable[BaseRoute], value_of: Callable[[APIRoute, str], Optional[ValueType]]
+) -> RouteTrie[ValueType]:
+    """
+    Compile the registered API routes into a trie.
+
+    Routes with a path parameter spanning several segments cannot be walked
+    segment by segment and are left out.
+
+    Args:
+        routes: Routes of the application, only APIRoute instances are used.
+        value_of: Callable of (route, method) returning the value of the
+            route for that method, or None to leave it out.
+    """
+    trie: RouteTrie[ValueType] = RouteTrie()
+    for route in routes:
+        if not isinstance(route, APIRoute) or ":path}" in route.path:
+            continue
+        for method in route.methods:
+            value = value_of(route, method)
+            if value is not None:
+                trie.add(route.path, [method], value)
+    return trie
@@ -0,0 +1,167 @@
+# SPDX-License-Identifier: MIT
+"""Snowflake ids reserved in blocks, with worker bits of their own per process"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+from collections.abc import MutableMapping, Sequence
+from typing import IO, Any, Optional
+
+from loguru import logger
+
+from src.main.app.config import get_snowflake_config
+
+# Same layout and epoch as fastlib.utils.snowflake_util, so that the ids of
+# both generators sort and parse alike
+EPOCH = 1672531200000
+_DATACENTER_ID_BITS = 5
+_WORKER_ID_BITS = 5
+_SEQUENCE_BITS = 12
+MAX_DATACENTER_ID = (1 << _DATACENTER_ID_BITS) - 1
+MAX_WORKER_ID = (1 << _WORKER_ID_BITS) - 1
+_SEQUENCES = 1 << _SEQUENCE_BITS
+_WORKER_ID_SHIFT = _SEQUENCE_BITS
+_DATACENTER_ID_SHIFT = _SEQUENCE_BITS + _WORKER_ID_BITS
+_TIMESTAMP_SHIFT = _SEQUENCE_BITS + _WORKER_ID_BITS + _DATACENTER_ID_BITS
+
+
+class SnowflakeAllocator:
+    """
+    Snowflake id generator that hands out blocks of ids in one call.
+
+    The ids of a millisecond differ only by their sequence, so a block is a
+    few ranges of consecutive integers, reserved under a single lock. A block
+    larger than the sequences left in the current millisecond borrows the
+    next milliseconds; the clock of the allocator never goes backwards, later
+    ids are taken after the borrowed ones, and a wall clock set back does not
+    stop the allocator either.
+    """
+
+    def __init__(self, datacenter_id: int, worker_id: int):
+        if not 0 <= datacenter_id <= MAX_DATACENTER_ID:
+            raise ValueError(f"Datacenter ID must be between 0 and {MAX_DATACENTER_ID}")
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker ID must be between 0 and {MAX_WORKER_ID}")
+        self.datacenter_id = datacenter_id
+        self.worker_id = worker_id
+        self._node = (datacenter_id << _DATACENTER_ID_SHIFT) | (worker_id << _WORKER_ID_SHIFT)
+        self._timestamp = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, count: int) -> list[int]:
+        """Reserve ``count`` ids, in increasing order."""
+        ids: list[int] = []
+        with self._lock:
+            now = time.time_ns() // 1_000_000
+            if now > self._timestamp:
+                self._timestamp = now
+                self._sequence = 0
+            while count > 0:
+                if self._sequence == _SEQUENCES:
+                    self._timestamp += 1
+                    self._sequence = 0
+                taken = min(count, _SEQUENCES - self._sequence)
+                base = ((self._timestamp - EPOCH) << _TIMESTAMP_SHIFT) | self._node
+                ids.extend(range(base + self._sequence, base + self._sequence + taken))
+                self._sequence += taken
+                count -= taken
+        return ids
+
+    def next_id(self) -> int:
+        return self.reserve(1)[0]
+
+
+_allocator: Optional[SnowflakeAllocator] = None
+_allocator_lock = threading.Lock()
+# Lock file holding the worker id claimed by this process
+_worker_lock_file: Optional[IO] = None
+
+
+def _claim_worker_id(datacenter_id: int) -> int:
+    """
+    Claim a worker id no other process of the host holds, by taking the
+    exclusive lock of its lock file. The lock is released by the system when
+    the process exits, so the worker id is free again for the next process.
+    """
+    global _worker_lock_file
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        lock_dir = tempfile.gettempdir()
+        for worker_id in range(MAX_WORKER_ID + 1):
+            path = os.path.join(lock_dir, f"zeta-snowflake-{datacenter_id}-{worker_id}.lock")
+            lock_file = open(path, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            _worker_lock_file = lock_file
+            return worker_id
+    worker_id = os.getpid() & MAX_WORKER_ID
+    logger.warning(
+        f"No free snowflake worker id could be locked, using {worker_id} from the pid; "
+        f"set snowflake.worker_id for each process to rule out collisions"
+    )
+    return worker_id
+
+
+def get_allocator() -> SnowflakeAllocator:
+    """Allocator of this process, its worker id is claimed on first use."""
+    global _allocator
+    if _allocator is None:
+        with _allocator_lock:
+            if _allocator is None:
+                config = get_snowflake_config()
+                worker_id = config.worker_id
+                if worker_id < 0:
+                    worker_id = _claim_worker_id(config.datacenter_id)
+                _allocator = SnowflakeAllocator(config.datacenter_id, worker_id)
+                logger.info(
+                    f"Snowflake ids of process {os.getpid()} use datacenter id "
+                    f"{config.datacenter_id} and worker id {worker_id}"
+                )
+    return _allocator
+
+
+def _reset_after_fork() -> None:
+    # A forked child must not reuse the worker id, nor the sequence, of its parent
+    global _allocator, _allocator_lock, _worker_lock_file
+    _allocator = None
+    _allocator_lock = threading.Lock()
+    if _worker_lock_file is not None:
+        _worker_lock_file.close()
+        _worker_lock_file = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def snowflake_id() -> int:
+    """Next snowflake id of this process, the default factory of the model ids."""
+    return get_allocator().next_id()
+
+
+def reserve_ids(count: int) -> list[int]:
+    """Reserve a block of ``count`` snowflake ids in one call."""
+    return get_allocator().reserve(count)
+
+
+def assign_ids(rows: Sequence[MutableMapping[str, Any]], key: str = "id") -> None:
+    """
+    Set the id of the rows without one from a single block of reserved ids.
+
+    Args:
+        rows: Column values of the rows, as dicts.
+        key: Name of the id field.
+    """
+    missing = [row for row in rows if row.get(key) is None]
+    for row, id in zip(missing, reserve_ids(len(missing)), strict=True):
+        row[key] = id
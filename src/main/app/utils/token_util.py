@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: MIT
+"""JWT issuing and verification helpers"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from datetime import timedelta
+from typing import Any, Optional
+
+import jwt
+from fastlib import ConfigManager
+
+
+def create_token(
+    subject: str | int,
+    token_type: str,
+    expires_delta: Optional[timedelta] = None,
+) -> str:
+    """
+    Create a signed JWT.
+
+    Same claims as ``fastlib.security.create_token`` plus ``iat``, which
+    forced sign-out compares against to reject the tokens issued before it.
+    ``iat`` keeps sub-second precision so that a token issued right after a
+    forced sign-out is not rejected with the older ones.
+    """
+    security_config = ConfigManager.get_security_config()
+    issued_at = time.time()
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=security_config.refresh_token_expire_minutes)
+    claims = {
+        "exp": int(issued_at + expires_delta.total_seconds()),
+        "iat": issued_at,
+        "sub": str(subject),
+        "type": token_type,
+    }
+    return jwt.encode(
+        claims, security_config.secret_key, algorithm=security_config.algorithm
+    )
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """
+    Verify the signature and expiry of a JWT and return its claims.
+
+    Raises:
+        jwt.PyJWTError: If the token is malformed, forged or expired.
+    """
+    security_config = ConfigManager.get_security_config()
+    return jwt.decode(
+        token,
+        security_config.secret_key,
+        algorithms=[security_config.algorithm],
+        options={"require": ["exp", "sub"]},
+    )
+
+
+def token_digest(token: str) -> str:
+    """Hex SHA-256 of a token, used as its key so raw tokens are never stored."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -1,4 +1,5 @@
-from typing import Any, Dict
+from collections.abc import Iterable
+from typing import Any, Dict, Optional
 
 
 def list_to_tree(
@@ -21,39 +22,76 @@ def list_to_tree(
     # 存储根节点
     roots: list[Dict[str, Any]] = []
 
-    # 第一次遍历：初始化每个节点的引用，并添加 children 属性
+    # 第一次遍历：初始化每个节点的引用，children 字段在挂载第一个子节点时才创建
     for item in data_list:
-        # 将当前节点添加到 node_map 中，并初始化 children 字段
-        node_map[item[id_field]] = {**item, children_field: []}
+        node = dict(item)
+        node.pop(children_field, None)
+        node_map[item[id_field]] = node
 
     # 第二次遍历：将每个节点挂载到其父节点下
     for item in data_list:
+        node = node_map[item[id_field]]
         # 获取当前节点的 parent_id
         parent_id = item[parent_id_field]
 
-        if parent_id is None:
-            # 如果 parent_id 为 None，说明是根节点，直接添加到 roots 中
-            roots.append(node_map[item[id_field]])
+        if parent_id is not None and parent_id in node_map:
+            # 找到父节点，将当前节点挂载到父节点的 children 中
+            node_map[parent_id].setdefault(children_field, []).append(node)
         else:
-            # 否则，找到父节点，将当前节点挂载到父节点的 children 中
-            if parent_id in node_map:
-                node_map[parent_id][children_field].append(node_map[item[id_field]])
-            else:
-                # 如果父节点不存在，可以选择忽略或抛出异常
-                # 这里选择忽略，直接将当前节点作为根节点
-                roots.append(node_map[item[id_field]])
-
-    # 移除空的 children 字段
-    def remove_empty_children(node: Dict[str, Any]) -> Dict[str, Any]:
-        if children_field in node and not node[children_field]:
-            del node[children_field]
-        elif children_field in node:
-            # 递归处理子节点
-            for child in node[children_field]:
-                remove_empty_children(child)
-        return node
-
-    # 对根节点及其子节点进行处理
-    roots = [remove_empty_children(node) for node in roots]
+            # parent_id 为 None 的根节点，以及父节点不存在的节点，都作为根节点
+            roots.append(node)
 
+    # 叶子节点没有 children 字段，无需再递归移除空的 children
     return roots
+
+
+def build_tree_path(node_id: Any, parent_path: Optional[str] = None) -> str:
+    """
+    生成节点的物化路径，格式为 "/祖先ID/.../自身ID/"
+
+    :param node_id: 节点 id
+    :param parent_path: 父节点的物化路径，根节点为 None
+    :return: 节点的物化路径
+    """
+    return f"{parent_path or '/'}{node_id}/"
+
+
+def parse_tree_path(tree_path: str) -> list[int]:
+    """
+    解析物化路径，按从根到自身的顺序返回路径上的 id
+
+    :param tree_path: 物化路径
+    :return: 路径上的 id 列表
+    """
+    return [int(node_id) for node_id in tree_path.strip("/").split("/") if node_id]
+
+
+def compute_tree_paths(
+    nodes: Iterable[tuple[Any, Any]],
+) -> Dict[Any, str]:
+    """
+    根据 (id, parent_id) 计算每个节点的物化路径
+
+    :param nodes: (id, parent_id) 元组
+    :return: id 到物化路径的映射；父节点不存在的节点以及成环的节点都作为根节点
+    """
+    parent_of: Dict[Any, Any] = dict(nodes)
+    paths: Dict[Any, str] = {}
+    for node_id in parent_of:
+        # 沿父节点向上找到第一个已知路径的祖先，再自上而下补齐整条链
+        chain: list[Any] = []
+        seen: set[Any] = set()
+        current = node_id
+        while current not in paths:
+            chain.append(current)
+            seen.add(current)
+            parent_id = parent_of.get(current)
+            if parent_id is None or parent_id not in parent_of or parent_id in seen:
+                current = None
+                break
+            current = parent_id
+        parent_path = paths.get(current) if current is not None else None
+        for chain_id in reversed(chain):
+            parent_path = build_tree_path(chain_id, parent_path)
+            paths[chain_id] = parent_path
+    return paths
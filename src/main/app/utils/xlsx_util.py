@@ -0,0 +1,244 @@
+# SPDX-License-Identifier: MIT
+"""Write-only xlsx workbooks produced as a stream of bytes"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import zipfile
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any
+from xml.sax.saxutils import escape
+
+from starlette.responses import StreamingResponse
+
+_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_EPOCH = datetime(1899, 12, 30)
+# Integers beyond the 15 significant digits Excel keeps, such as snowflake ids,
+# are written as text so that they are not rounded
+_MAX_EXACT_INT = 10**15
+# Characters not allowed in XML 1.0 documents
+_ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Cell styles, indexes into cellXfs of the styles part
+_STYLE_HEADER = 1
+_STYLE_DATETIME = 2
+_STYLE_DATE = 3
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+    '2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+    '2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/'
+    '2006/relationships/styles" Target="styles.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+# Same look as the exports of fastlib's ExcelExporter: Microsoft YaHei 11, bold
+# header on a grey fill
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd"/>'
+    "</numFmts>"
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Microsoft YaHei"/></font>'
+    '<font><b/><sz val="11"/><name val="Microsoft YaHei"/></font>'
+    "</fonts>"
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFE0E0E0"/>'
+    '<bgColor rgb="FFE0E0E0"/></patternFill></fill>'
+    "</fills>"
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" '
+    'applyFill="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    "</cellXfs>"
+    "</styleSheet>"
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+    'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    "<cols>{cols}</cols><sheetData>"
+)
+_SHEET_END = "</sheetData></worksheet>"
+
+
+class _Sink:
+    """Unseekable file the zip is written to, drained after every write."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _text_cell(value: str, style: int = 0) -> str:
+    text = escape(_ILLEGAL_XML_CHARS.sub("", value))
+    style_attr = f' s="{style}"' if style else ""
+    return f'<c t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, int):
+        if -_MAX_EXACT_INT < value < _MAX_EXACT_INT:
+            return f"<c><v>{value}</v></c>"
+        return _text_cell(str(value))
+    if isinstance(value, (float, Decimal)):
+        return f"<c><v>{value}</v></c>" if value == value else "<c/>"
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        serial = (value - _EPOCH).total_seconds() / 86400
+        return f'<c s="{_STYLE_DATETIME}"><v>{serial}</v></c>'
+    if isinstance(value, date):
+        return f'<c s="{_STYLE_DATE}"><v>{(value - _EPOCH.date()).days}</v></c>'
+    return _text_cell(str(value))
+
+
+class XlsxStreamWriter:
+    """
+    Single-sheet xlsx workbook written row by row.
+
+    The workbook parts are written to a zip as they are produced and the
+    compressed bytes are handed back after each call, so neither the rows nor
+    the workbook are held in memory. Strings are written inline, with no
+    shared strings table, and column widths come from the headers since the
+    rows are not known in advance.
+    """
+
+    def __init__(self, headers: Sequence[str], sheet_name: str):
+        self.headers = list(headers)
+        self.sheet_name = sheet_name[:31]
+        self.rows = 0
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+        self._sheet = None
+
+    def start(self) -> bytes:
+        """Write the workbook parts and the header row."""
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        sheet_name = escape(self.sheet_name, {'"': "&quot;"})
+        self._zip.writestr("xl/workbook.xml", _WORKBOOK.format(sheet_name=sheet_name))
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True)
+        cols = "".join(
+            f'<col min="{index}" max="{index}" width="{min(max(len(header) + 2, 12), 50)}" '
+            f'customWidth="1"/>'
+            for index, header in enumerate(self.headers, 1)
+        )
+        header_row = "".join(_text_cell(header, _STYLE_HEADER) for header in self.headers)
+        self._sheet.write(
+            (_SHEET_START.format(cols=cols) + f'<row r="1">{header_row}</row>').encode("utf-8")
+        )
+        self.rows = 1
+        return self._sink.drain()
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        """Append rows of values ordered as the headers."""
+        parts: list[str] = []
+        for row in rows:
+            self.rows += 1
+            parts.append(f'<row r="{self.rows}">{"".join(map(_cell, row))}</row>')
+        self._sheet.write("".join(parts).encode("utf-8"))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Finish the sheet and write the zip directory."""
+        self._sheet.write(_SHEET_END.encode("utf-8"))
+        self._sheet.close()
+        self._zip.close()
+        return self._sink.drain()
+
+
+async def stream_excel(
+    headers: Sequence[str],
+    file_name: str,
+    chunks: AsyncIterator[Sequence[Sequence[Any]]],
+    sheet_name: str | None = None,
+) -> StreamingResponse:
+    """
+    Stream an xlsx workbook of the rows yielded by ``chunks``.
+
+    Each chunk of rows is rendered and compressed on a worker thread, and
+    its bytes are sent before the next chunk is read, so the export holds a
+    single chunk in memory and does not block the event loop.
+
+    Args:
+        headers: Column headers, the rows hold their values in this order.
+        file_name: Name of the downloaded file, before the timestamp.
+        chunks: Lists of rows, as produced by a server-side cursor.
+        sheet_name: Name of the sheet, the file name by default.
+    """
+    writer = XlsxStreamWriter(headers, sheet_name or file_name)
+
+    async def body() -> AsyncIterator[bytes]:
+        yield writer.start()
+        async for rows in chunks:
+            data = await asyncio.to_thread(writer.write_rows, rows)
+            if data:
+                yield data
+        yield await asyncio.to_thread(writer.close)
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    return StreamingResponse(
+        body(),
+        media_type=_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={file_name}_{timestamp}.xlsx"},
+    )
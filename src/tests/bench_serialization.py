@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: MIT
+"""
+Micro-benchmark of the per-row cost of serializing a list page.
+
+Compares the previous path of the list endpoints (a ListResponse of ORM
+instances, validated by FastAPI against the response model, turned into
+dicts by jsonable_encoder and encoded by the stdlib json module) with
+json_response (validation from the loaded values of the rows and encoding
+by pydantic-core), on 1,000-row pages of stock_daily_info.
+
+Run from the project root: python -m src.tests.bench_serialization
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastlib import ConfigManager
+
+ConfigManager.initialize_global_config()
+
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from fastlib.response import ListResponse  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from src.main.app.model.stock_daily_info_model import StockDailyInfoModel  # noqa: E402
+from src.main.app.schema.stock_daily_info_schema import StockDailyInfo  # noqa: E402
+from src.main.app.utils.response_util import json_response  # noqa: E402
+
+PAGE_SIZE = 1000
+ROUNDS = 50
+
+
+def load_page(session: Session) -> list[StockDailyInfoModel]:
+    """Insert a page of daily quotes into the in-memory table and select it back."""
+    start = datetime(2024, 1, 2)
+    columns = [
+        column.name
+        for column in StockDailyInfoModel.__table__.columns
+        if column.name not in ("id", "stock_symbol_full", "trade_date", "created_at", "updated_at")
+    ]
+    for index in range(PAGE_SIZE):
+        session.add(
+            StockDailyInfoModel(
+                id=index + 1,
+                stock_symbol_full=f"sz{index % 500:06d}",
+                trade_date=start + timedelta(days=index // 500),
+                **{column: index * 7 + offset for offset, column in enumerate(columns)},
+            )
+        )
+    session.commit()
+    return list(session.exec(select(StockDailyInfoModel)).all())
+
+
+async def bench(name: str, fn) -> float:
+    await fn()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await fn()
+    per_row = (time.perf_counter() - start) / ROUNDS / PAGE_SIZE * 1e6
+    print(f"{name:<40} {per_row:8.2f} us/row")
+    return per_row
+
+
+async def main() -> None:
+    engine = create_engine("sqlite://")
+    StockDailyInfoModel.__table__.create(engine)
+    session = Session(engine)
+    records = load_page(session)
+    response_type = ListResponse[StockDailyInfo]
+    field = create_model_field(name="Response", type_=response_type, mode="serialization")
+
+    async def previous_path() -> bytes:
+        content = ListResponse(records=records, total=PAGE_SIZE)
+        content = await serialize_response(field=field, response_content=content)
+        return JSONResponse(content).body
+
+    async def fast_path() -> bytes:
+        return json_response(response_type, records=records, total=PAGE_SIZE).body
+
+    assert json.loads(await previous_path()) == json.loads(await fast_path())
+    before = await bench("FastAPI validation + stdlib json", previous_path)
+    after = await bench("json_response (pydantic-core)", fast_path)
+    print(f"speed-up: {before / after:.1f}x")
+    session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: MIT
+"""
+Micro-benchmark of snowflake id allocation for batch inserts.
+
+Compares the previous path, an id drawn from fastlib's generator for every
+object built, with ids reserved as one block by the allocator of
+src.main.app.utils.snowflake_util and assigned to the column values of the
+batch before the objects are built. Ids alone and the construction of
+StockDailyInfoModel objects from column values are measured.
+
+Run from the project root: python -m src.tests.bench_snowflake
+"""
+
+import time
+from datetime import datetime
+
+from fastlib import ConfigManager
+from fastlib.utils.snowflake_util import snowflake_id as fastlib_snowflake_id
+
+from src.main.app.model.stock_daily_info_model import StockDailyInfoModel
+from src.main.app.utils import snowflake_util
+
+BATCH_SIZE = 100_000
+# Building SQLModel objects is far slower than allocating their ids
+OBJECT_BATCH_SIZE = 20_000
+ROUNDS = 3
+
+
+def make_rows() -> list[dict]:
+    """Column values of a batch of daily quotes, without ids."""
+    trade_date = datetime(2024, 1, 2)
+    return [
+        {
+            "stock_symbol_full": f"sz{index % 5000:06d}",
+            "trade_date": trade_date,
+            "open_price": 1000 + index % 7,
+            "close_price": 1050 + index % 5,
+            "volume": index * 100,
+        }
+        for index in range(OBJECT_BATCH_SIZE)
+    ]
+
+
+def bench(name: str, fn, size: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    per_second = size * ROUNDS / (time.perf_counter() - start)
+    print(f"{name:<48} {per_second:>12,.0f} /s")
+    return per_second
+
+
+def main() -> None:
+    ConfigManager.initialize_global_config()
+    print(f"ids, batches of {BATCH_SIZE:,}")
+    before = bench(
+        "fastlib generator, one call per id",
+        lambda: [fastlib_snowflake_id() for _ in range(BATCH_SIZE)],
+        BATCH_SIZE,
+    )
+    after = bench(
+        "allocator, one block per batch",
+        lambda: snowflake_util.reserve_ids(BATCH_SIZE),
+        BATCH_SIZE,
+    )
+    print(f"speed-up: {after / before:.1f}x")
+
+    rows = make_rows()
+
+    def per_object() -> list[StockDailyInfoModel]:
+        return [StockDailyInfoModel(id=fastlib_snowflake_id(), **row) for row in rows]
+
+    def default_factory() -> list[StockDailyInfoModel]:
+        return [StockDailyInfoModel(**row) for row in rows]
+
+    def block() -> list[StockDailyInfoModel]:
+        ids = snowflake_util.reserve_ids(len(rows))
+        return [StockDailyInfoModel(id=id, **row) for id, row in zip(ids, rows, strict=True)]
+
+    ids = [model.id for model in block()]
+    assert len(set(ids)) == len(ids) and ids == sorted(ids)
+    print(f"\nobjects, batches of {OBJECT_BATCH_SIZE:,}")
+    before = bench("fastlib generator, one id per object", per_object, OBJECT_BATCH_SIZE)
+    bench("allocator as default_factory", default_factory, OBJECT_BATCH_SIZE)
+    after = bench("allocator, one block per batch", block, OBJECT_BATCH_SIZE)
+    print(f"speed-up: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: MIT
+"""
+Import-time report and startup-time regression check of the API server.
+
+Imports src.main.app.server, which registers every controller, in fresh
+interpreters under ``python -X importtime`` and reports the modules with the
+largest cumulative import time and the packages with the largest own time.
+The check fails when the median import time of the server exceeds the
+budget, or when a heavy module that the sync, import and export paths bind
+through src.main.app.utils.lazy_util is imported at startup; the chain of
+modules that imported it is printed. The first-use cost of those modules,
+now paid by the first request needing them, is reported as well.
+
+Run from the project root: python -m src.tests.bench_startup [--budget 2.5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+ROUNDS = 3
+TOP = 25
+# Seconds to import the server, controllers included, on a developer machine
+DEFAULT_BUDGET_SECONDS = 2.5
+# Only imported on first use of the paths needing them
+LAZY_MODULES = ("pandas", "numpy", "akshare", "openpyxl", "matplotlib", "seaborn")
+
+_CHILD = """
+import sys, time
+from fastlib import ConfigManager
+ConfigManager.initialize_global_config()
+start = time.perf_counter()
+import src.main.app.server
+print(time.perf_counter() - start)
+if "--first-use" in sys.argv:
+    for name in {lazy_modules!r}:
+        start = time.perf_counter()
+        try:
+            __import__(name)
+        except ImportError:
+            continue
+        print(name, time.perf_counter() - start)
+"""
+
+
+def import_server(first_use: bool = False) -> tuple[list[str], list[tuple[int, int, str]]]:
+    """Import the server in a fresh interpreter; return its stdout lines and import times."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    args = [sys.executable, "-X", "importtime", "-c", _CHILD.format(lazy_modules=LAZY_MODULES)]
+    if first_use:
+        args.append("--first-use")
+    result = subprocess.run(args, env=env, capture_output=True, text=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:") :].split("|")
+        times.append((int(own), int(cumulative), module.rstrip()))
+    if result.returncode != 0:
+        raise SystemExit(f"Importing the server failed:\n{result.stderr[-2000:]}")
+    return result.stdout.split("\n"), times
+
+
+def import_chain(times: list[tuple[int, int, str]], index: int) -> list[str]:
+    """Modules from the one at ``index`` up to the module that started the import."""
+    module = times[index][2]
+    depth = len(module) - len(module.lstrip())
+    chain = [module.strip()]
+    # Importers are reported after the modules they imported, less indented
+    for _, _, importer in times[index + 1 :]:
+        importer_depth = len(importer) - len(importer.lstrip())
+        if importer_depth < depth:
+            chain.append(importer.strip())
+            depth = importer_depth
+    return chain
+
+
+def report(times: list[tuple[int, int, str]]) -> None:
+    print(f"\nmodules by cumulative import time, top {TOP}")
+    for own, cumulative, module in sorted(times, key=lambda t: -t[1])[:TOP]:
+        print(f"{cumulative / 1000:>10.1f} ms {own / 1000:>10.1f} ms  {module.strip()}")
+    packages: Counter[str] = Counter()
+    for own, _, module in times:
+        name = module.strip()
+        # Application modules by layer, others by top-level package
+        package = ".".join(name.split(".")[:4]) if name.startswith("src.") else name.split(".")[0]
+        packages[package] += own
+    print(f"\npackages by own import time, top {TOP}")
+    for package, own in packages.most_common(TOP):
+        print(f"{own / 1000:>10.1f} ms  {package}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_SECONDS,
+        help="Seconds the median import of the server may take",
+    )
+    args = parser.parse_args()
+
+    durations = []
+    times = []
+    for _ in range(ROUNDS):
+        stdout, times = import_server()
+        durations.append(float(stdout[0]))
+    report(times)
+
+    stdout, _ = import_server(first_use=True)
+    print("\nfirst use of the lazy modules, after startup")
+    for line in filter(None, stdout[1:]):
+        name, seconds = line.split()
+        print(f"{float(seconds) * 1000:>10.1f} ms  {name}")
+
+    failures = []
+    median = statistics.median(durations)
+    print(f"\nserver import: median {median:.3f} s over {ROUNDS} rounds, budget {args.budget} s")
+    if median > args.budget:
+        failures.append(f"server import takes {median:.3f} s, over its budget of {args.budget} s")
+    for index, (_, _, module) in enumerate(times):
+        if module.strip() in LAZY_MODULES:
+            chain = " <- ".join(dict.fromkeys(import_chain(times, index)))
+            failures.append(f"{module.strip()} is imported at startup: {chain}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
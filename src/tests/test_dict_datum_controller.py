@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: MIT
+"""
+Tests of the dictionary option routes, against a SQLite database of their own.
+
+Run from the project root: python -m pytest src/tests/test_dict_datum_controller.py
+"""
+
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    database = tmp_path_factory.mktemp("db") / "zeta.db"
+    # monkeypatch is function scoped, a context restores DB_URL after the module
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("DB_URL", f"sqlite+aiosqlite:///{database}")
+
+        from fastlib import ConfigManager
+
+        ConfigManager.initialize_global_config()
+        ConfigManager.get_database_config().echo_sql = False
+
+        from fastapi.testclient import TestClient
+        from sqlalchemy import create_engine
+        from sqlmodel import Session, SQLModel
+
+        from src.main.app.model.dict_datum_model import DictDatumModel
+        from src.main.app.model.dict_type_model import DictTypeModel
+
+        engine = create_engine(f"sqlite:///{database}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(DictTypeModel(id=1, name="Gender", type="gender", status=1))
+            session.add(DictDatumModel(id=2, sort=1, label="Male", value="1", type="gender"))
+            session.add(DictDatumModel(id=3, sort=2, label="Female", value="2", type="gender"))
+            session.commit()
+        engine.dispose()
+
+        from src.main.app.server import app
+
+        with TestClient(app, raise_server_exceptions=False) as client:
+            yield client
+
+
+def test_get_dict_options(client):
+    response = client.get("/v1/dictData:options", params={"req": ["gender"]})
+
+    assert response.status_code == HTTPStatus.OK
+    assert "error" not in response.json()
+    assert "Male" in response.text and "Female" in response.text
+    assert response.headers["ETag"]
+
+
+def test_get_dict_options_not_modified(client):
+    etag = client.get("/v1/dictData:options", params={"req": ["gender"]}).headers["ETag"]
+
+    response = client.get(
+        "/v1/dictData:options", params={"req": ["gender"]}, headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == etag